@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from typing import Optional
+
+# 策略循环读取的时间源。默认是系统时钟；回放时在任务上下文里换成虚拟时钟，
+# 子任务继承该上下文，同进程内的实盘任务不受影响。
+
+
+class VirtualClock:
+    """虚拟时钟：sleep 直接把时间拨到目标时刻而不真正等待。
+
+    设置 end_ms 后，拨过终点的 sleep 会标记 finished 并挂起，由回放驱动方取消任务。
+    """
+
+    def __init__(self, start_ms: int, end_ms: Optional[int] = None) -> None:
+        self.now_ms = int(start_ms)
+        self.end_ms = end_ms
+        self.finished = asyncio.Event()
+
+    async def sleep_until(self, target_ms: int) -> None:
+        if target_ms > self.now_ms:
+            self.now_ms = int(target_ms)
+        if self.end_ms is not None and self.now_ms > self.end_ms:
+            self.finished.set()
+            await asyncio.Future()
+        # 让出事件循环，保持与真实 sleep 相同的调度语义
+        await asyncio.sleep(0)
+
+    async def sleep(self, seconds: float) -> None:
+        await self.sleep_until(self.now_ms + max(0, int(round(seconds * 1000))))
+
+
+_clock: contextvars.ContextVar[Optional[VirtualClock]] = contextvars.ContextVar("virtual_clock", default=None)
+
+
+def use_clock(clock: Optional[VirtualClock]) -> contextvars.Token[Optional[VirtualClock]]:
+    """为当前任务（及其后创建的子任务）设置时钟；None 恢复系统时钟。"""
+    return _clock.set(clock)
+
+
+def reset_clock(token: contextvars.Token[Optional[VirtualClock]]) -> None:
+    _clock.reset(token)
+
+
+def current_clock() -> Optional[VirtualClock]:
+    return _clock.get()
+
+
+def now_ms() -> int:
+    clock = _clock.get()
+    if clock is not None:
+        return clock.now_ms
+    return int(time.time() * 1000)
+
+
+def monotonic() -> float:
+    clock = _clock.get()
+    if clock is not None:
+        return clock.now_ms / 1000
+    return time.monotonic()
+
+
+async def sleep(seconds: float) -> None:
+    clock = _clock.get()
+    if clock is not None:
+        await clock.sleep(seconds)
+        return
+    await asyncio.sleep(seconds)
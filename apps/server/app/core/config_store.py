@@ -3,9 +3,17 @@ from __future__ import annotations
 import json
 import os
 import threading
+import time
+from collections.abc import Mapping
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+# 外部直接改文件时，快照最多每隔该时长检查一次 mtime
+SNAPSHOT_STAT_INTERVAL_S = 1.0
 
 
 def _repo_root() -> Path:
@@ -29,6 +37,11 @@ def default_config() -> dict[str, Any]:
         "runtime": {
             "dry_run": True,
             "simulate_fill": False,
+            "sim_touch_size": 0.0,
+            "sim_queue_ahead": 0.0,
+            "sim_trade_cap": 100000,
+            "tape_enabled": False,
+            "tape_depth": 0,
             "status_refresh_ms": 10000,
             "auto_restart": True,
             "restart_delay_ms": 1000,
@@ -37,10 +50,17 @@ def default_config() -> dict[str, Any]:
             "stop_after_minutes": 0.0,
             "stop_after_volume": 0.0,
             "stop_check_interval_ms": 1000,
+            "tick_mode": "interval",
+            "tick_min_interval_ms": 50,
+            "tick_max_interval_ms": 1000,
+            "tick_debounce_ms": 20,
+            "log_level": "info",
+            "log_events": {},
         },
         "server": {
             "host": "0.0.0.0",
             "port": 9999,
+            "metrics_token": "",
         },
         "exchange": {
             "name": "lighter",
@@ -63,10 +83,49 @@ def default_config() -> dict[str, Any]:
     }
 
 
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+class ConfigSnapshot(Mapping):
+    """配置的只读快照，version 在每次写入或文件变化后递增；derive 结果按快照缓存。"""
+
+    def __init__(self, version: int, data: dict[str, Any]) -> None:
+        self.version = version
+        self._data: Mapping[str, Any] = _freeze(data)
+        self._derived: Dict[Hashable, Any] = {}
+
+    def __getitem__(self, key: str) -> Any:
+        return self._data[key]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def derive(self, key: Hashable, builder: Callable[["ConfigSnapshot"], T]) -> T:
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        value = builder(self)
+        self._derived[key] = value
+        return value
+
+
 @dataclass
 class ConfigStore:
     path: Path
     lock: threading.Lock = field(default_factory=threading.Lock)
+    _snapshot: Optional[ConfigSnapshot] = field(default=None, init=False, repr=False)
+    _snapshot_mtime_ns: int = field(default=-1, init=False, repr=False)
+    _snapshot_checked_at: float = field(default=0.0, init=False, repr=False)
+    _version: int = field(default=0, init=False, repr=False)
 
     def ensure(self) -> None:
         self.path.parent.mkdir(parents=True, exist_ok=True)
@@ -78,10 +137,26 @@ class ConfigStore:
         with self.lock:
             return json.loads(self.path.read_text(encoding="utf-8"))
 
+    def snapshot(self) -> ConfigSnapshot:
+        """返回共享的只读配置快照，热路径使用；需要修改时请用 read()。"""
+        current = self._snapshot
+        now = time.monotonic()
+        if current is not None and now - self._snapshot_checked_at < SNAPSHOT_STAT_INTERVAL_S:
+            return current
+        self.ensure()
+        with self.lock:
+            self._snapshot_checked_at = now
+            mtime_ns = self.path.stat().st_mtime_ns
+            if self._snapshot is not None and mtime_ns == self._snapshot_mtime_ns:
+                return self._snapshot
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            return self._publish(data, mtime_ns)
+
     def write(self, config: dict[str, Any]) -> None:
         self.ensure()
         with self.lock:
             self._write(config)
+            self._publish(config, self.path.stat().st_mtime_ns)
 
     def update(self, patch: dict[str, Any]) -> dict[str, Any]:
         current = self.read()
@@ -94,6 +169,14 @@ class ConfigStore:
         tmp_path.write_text(json.dumps(config, ensure_ascii=False, indent=2), encoding="utf-8")
         tmp_path.replace(self.path)
 
+    def _publish(self, config: dict[str, Any], mtime_ns: int) -> ConfigSnapshot:
+        self._version += 1
+        snapshot = ConfigSnapshot(self._version, config)
+        self._snapshot = snapshot
+        self._snapshot_mtime_ns = mtime_ns
+        self._snapshot_checked_at = time.monotonic()
+        return snapshot
+
 
 def _deep_merge(base: dict[str, Any], patch: dict[str, Any]) -> dict[str, Any]:
     merged: dict[str, Any] = dict(base)
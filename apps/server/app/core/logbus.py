@@ -1,43 +1,283 @@
 from __future__ import annotations
 
 import asyncio
+import time
 from collections import deque
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from typing import AsyncIterator, Deque, List
+from typing import Any, AsyncIterator, Deque, Dict, List, Mapping, Optional, Tuple
+
+LEVEL_DEBUG = 10
+LEVEL_INFO = 20
+LEVEL_WARNING = 30
+LEVEL_ERROR = 40
+
+LEVEL_NAMES: Dict[str, int] = {
+    "debug": LEVEL_DEBUG,
+    "info": LEVEL_INFO,
+    "warning": LEVEL_WARNING,
+    "error": LEVEL_ERROR,
+}
+
+
+def parse_level(value: Any, default: int = LEVEL_INFO) -> int:
+    if isinstance(value, bool):
+        return default
+    if isinstance(value, int):
+        return value
+    return LEVEL_NAMES.get(str(value or "").strip().lower(), default)
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).astimezone().isoformat(timespec="seconds")
 
 
-def _to_sse(data: str) -> str:
-    safe = data.replace("\r", "").replace("\n", "\\n")
-    return f"data: {safe}\n\n"
+def _iso(ts: float) -> str:
+    return datetime.fromtimestamp(ts, timezone.utc).astimezone().isoformat(timespec="seconds")
+
+
+def _sse_line(data: str) -> str:
+    return "data: " + data.replace("\r", "").replace("\n", "\\n")
+
+
+def _to_sse_batch(lines: List[str]) -> str:
+    # 一个 SSE 事件携带多行，浏览器端 ev.data 以 \n 拼接
+    return "\n".join(_sse_line(line) for line in lines) + "\n\n"
+
+
+def _format_value(value: Any) -> str:
+    if isinstance(value, BaseException):
+        return f"{type(value).__name__}:{value}"
+    return str(value)
+
+
+class LogRecord:
+    """结构化日志记录；文本只在首次被读取（SSE/recent）时渲染。"""
+
+    __slots__ = ("event", "fields", "level", "ts_mono", "ts", "_text", "_line")
+
+    def __init__(
+        self,
+        event: str,
+        fields: Optional[Dict[str, Any]] = None,
+        level: int = LEVEL_INFO,
+        text: Optional[str] = None,
+    ) -> None:
+        self.event = event
+        self.fields = fields or {}
+        self.level = level
+        self.ts_mono = time.monotonic()
+        self.ts = time.time()
+        self._text = text
+        self._line: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        text = self._text
+        if text is None:
+            parts = [self.event]
+            parts.extend(f"{key}={_format_value(value)}" for key, value in self.fields.items())
+            text = " ".join(parts)
+            self._text = text
+        return text
+
+    def render(self) -> str:
+        line = self._line
+        if line is None:
+            line = f"[{_iso(self.ts)}] {self.text}"
+            self._line = line
+        return line
+
+
+@dataclass(frozen=True)
+class EventPolicy:
+    """单个事件的输出策略：level 覆盖调用方级别，sample_every 每 N 条取 1，max_per_s 每秒上限（0 不限）。"""
+
+    level: Optional[int] = None
+    sample_every: int = 1
+    max_per_s: float = 0.0
+
+
+# 默认策略：逐次调用的延迟已直接计入指标（REST_LATENCY），只在 debug 级别写入文本日志
+DEFAULT_EVENT_POLICIES: Dict[str, EventPolicy] = {
+    "lighter.latency": EventPolicy(level=LEVEL_DEBUG),
+}
+
+
+class _EventGate:
+    __slots__ = ("seen", "window_start", "window_count", "suppressed")
+
+    def __init__(self) -> None:
+        self.seen = 0
+        self.window_start = 0.0
+        self.window_count = 0
+        self.suppressed = 0
+
+
+class LogSubscriber:
+    """单个订阅者的有界缓冲：写满时丢弃最旧的行并计数。"""
+
+    def __init__(self, capacity: int) -> None:
+        self._records: Deque[LogRecord] = deque(maxlen=max(1, int(capacity)))
+        self._event = asyncio.Event()
+        self.dropped = 0
+
+    def push(self, record: LogRecord) -> None:
+        if len(self._records) == self._records.maxlen:
+            self.dropped += 1
+        self._records.append(record)
+        self._event.set()
+
+    async def wait(self) -> None:
+        await self._event.wait()
+
+    def drain(self) -> Tuple[List[str], int]:
+        lines = [record.render() for record in self._records]
+        dropped = self.dropped
+        self._records.clear()
+        self.dropped = 0
+        self._event.clear()
+        return lines, dropped
 
 
 @dataclass
 class LogBus:
     max_items: int = 2000
-    _items: Deque[str] = field(default_factory=lambda: deque(maxlen=2000))
-    _queue: "asyncio.Queue[str]" = field(default_factory=asyncio.Queue)
+    subscriber_buffer: int = 1000
+    batch_interval_ms: int = 100
+    level: int = LEVEL_INFO
+    _items: Deque[LogRecord] = field(default_factory=lambda: deque(maxlen=2000))
+    _subscribers: List[LogSubscriber] = field(default_factory=list)
+    _policies: Dict[str, EventPolicy] = field(default_factory=lambda: dict(DEFAULT_EVENT_POLICIES))
+    _gates: Dict[str, _EventGate] = field(default_factory=dict)
 
-    def publish(self, message: str) -> None:
-        line = f"[{_now_iso()}] {message}"
-        self._items.append(line)
-        try:
-            self._queue.put_nowait(line)
-        except asyncio.QueueFull:
-            pass
+    def configure(
+        self,
+        event: str,
+        level: Optional[int] = None,
+        sample_every: int = 1,
+        max_per_s: float = 0.0,
+    ) -> None:
+        self._policies[event] = EventPolicy(
+            level=level,
+            sample_every=max(1, int(sample_every)),
+            max_per_s=max(0.0, float(max_per_s)),
+        )
+        self._gates.pop(event, None)
+
+    def apply_config(self, runtime: Mapping[str, Any]) -> None:
+        """从 runtime 配置读取 log_level 与 log_events（事件名 -> {level, sample_every, max_per_s}）。"""
+        self.level = parse_level(runtime.get("log_level"), LEVEL_INFO)
+        policies = dict(DEFAULT_EVENT_POLICIES)
+        events = runtime.get("log_events")
+        if isinstance(events, Mapping):
+            for name, raw in events.items():
+                if not isinstance(raw, Mapping):
+                    continue
+                level = raw.get("level")
+                try:
+                    policies[str(name)] = EventPolicy(
+                        level=None if level is None else parse_level(level),
+                        sample_every=max(1, int(raw.get("sample_every") or 1)),
+                        max_per_s=max(0.0, float(raw.get("max_per_s") or 0.0)),
+                    )
+                except (TypeError, ValueError):
+                    continue
+        self._policies = policies
+        self._gates.clear()
+
+    def enabled(self, event: str, level: int = LEVEL_INFO) -> bool:
+        """热路径可先判断，避免为不会输出的事件准备字段。"""
+        policy = self._policies.get(event)
+        if policy is not None and policy.level is not None:
+            level = policy.level
+        return level >= self.level
+
+    def event(self, event: str, level: int = LEVEL_INFO, **fields: Any) -> None:
+        policy = self._policies.get(event)
+        effective = policy.level if policy is not None and policy.level is not None else level
+        if effective < self.level:
+            return
+        record = LogRecord(event, fields, effective)
+        self._emit(record, policy)
+
+    def publish(self, message: str, level: int = LEVEL_INFO) -> None:
+        event = message.split(" ", 1)[0]
+        policy = self._policies.get(event)
+        effective = policy.level if policy is not None and policy.level is not None else level
+        if effective < self.level:
+            return
+        self._emit(LogRecord(event, None, effective, text=message), policy)
+
+    def _emit(self, record: LogRecord, policy: Optional[EventPolicy]) -> None:
+        if policy is not None and not self._admit(record, policy):
+            return
+        self._items.append(record)
+        for subscriber in self._subscribers:
+            subscriber.push(record)
+
+    def _admit(self, record: LogRecord, policy: EventPolicy) -> bool:
+        if policy.sample_every <= 1 and policy.max_per_s <= 0:
+            return True
+        gate = self._gates.get(record.event)
+        if gate is None:
+            gate = _EventGate()
+            self._gates[record.event] = gate
+        gate.seen += 1
+        if policy.sample_every > 1 and (gate.seen - 1) % policy.sample_every != 0:
+            return False
+        if policy.max_per_s > 0:
+            if record.ts_mono - gate.window_start >= 1.0:
+                gate.window_start = record.ts_mono
+                gate.window_count = 0
+            if gate.window_count >= policy.max_per_s:
+                gate.suppressed += 1
+                return False
+            gate.window_count += 1
+            if gate.suppressed:
+                # 附上被限流丢弃的条数，文本仍在读取时才渲染
+                if record._text is None:
+                    record.fields = {**record.fields, "suppressed": gate.suppressed}
+                else:
+                    record._text = f"{record._text} suppressed={gate.suppressed}"
+                gate.suppressed = 0
+        return True
 
     def recent(self, limit: int = 200) -> List[str]:
         if limit <= 0:
             return []
-        return list(self._items)[-limit:]
+        return [record.render() for record in list(self._items)[-limit:]]
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> LogSubscriber:
+        subscriber = LogSubscriber(self.subscriber_buffer)
+        self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: LogSubscriber) -> None:
+        try:
+            self._subscribers.remove(subscriber)
+        except ValueError:
+            pass
 
     async def stream(self) -> AsyncIterator[str]:
-        for line in self.recent():
-            yield _to_sse(line)
-        while True:
-            line = await self._queue.get()
-            yield _to_sse(line)
+        """广播给每个 SSE 连接：按批合并推送，连接断开时自动退订。"""
+        subscriber = self.subscribe()
+        try:
+            recent = self.recent()
+            if recent:
+                yield _to_sse_batch(recent)
+            while True:
+                await subscriber.wait()
+                if self.batch_interval_ms > 0:
+                    await asyncio.sleep(self.batch_interval_ms / 1000)
+                lines, dropped = subscriber.drain()
+                if dropped:
+                    lines.insert(0, f"[{_now_iso()}] logbus.dropped count={dropped}")
+                if lines:
+                    yield _to_sse_batch(lines)
+        finally:
+            self.unsubscribe(subscriber)
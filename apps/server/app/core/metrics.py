@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import math
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# 默认直方图分桶（秒），覆盖毫秒级调和到秒级 REST 超时
+DEFAULT_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _format_number(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.help = help_text
+        self.labelnames: Tuple[str, ...] = tuple(labelnames)
+
+    def _key(self, values: Sequence[object]) -> LabelValues:
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} 需要标签 {self.labelnames}")
+        return tuple(str(value) for value in values)
+
+    def remove(self, *values: object) -> None:
+        self._values.pop(self._key(values), None)  # type: ignore[attr-defined]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """单调递增计数；只在事件循环线程中更新，不加锁。"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, *values: object, amount: float = 1.0) -> None:
+        key = self._key(values)
+        self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *values: object) -> float:
+        return self._values.get(self._key(values), 0.0)
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_label_text(self.labelnames, key)} {_format_number(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def set(self, *values: object, value: float) -> None:
+        self._values[self._key(values)] = float(value)
+
+    def value(self, *values: object) -> Optional[float]:
+        return self._values.get(self._key(values))
+
+    def render(self) -> List[str]:
+        return [
+            f"{self.name}{_label_text(self.labelnames, key)} {_format_number(value)}"
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    """固定分桶直方图：observe 只做一次二分与两次加法。"""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help_text, labelnames)
+        self.buckets: Tuple[float, ...] = tuple(sorted(float(b) for b in buckets))
+        # 每组标签：[各桶计数（非累计）..., +Inf 桶计数, sum]
+        self._values: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, *values: object, value: float) -> None:
+        key = self._key(values)
+        slots = self._values.get(key)
+        if slots is None:
+            slots = [0.0] * (len(self.buckets) + 2)
+            self._values[key] = slots
+        slots[bisect.bisect_left(self.buckets, value)] += 1
+        slots[-1] += value
+
+    def count(self, *values: object) -> int:
+        slots = self._values.get(self._key(values))
+        return int(sum(slots[:-1])) if slots else 0
+
+    def render(self) -> List[str]:
+        lines: List[str] = []
+        for key, slots in sorted(self._values.items()):
+            cumulative = 0.0
+            for bound, count in zip(self.buckets + (math.inf,), slots[:-1]):
+                cumulative += count
+                le = f'le="{_format_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_label_text(self.labelnames, key, le)} {_format_number(cumulative)}")
+            lines.append(f"{self.name}_sum{_label_text(self.labelnames, key)} {_format_number(slots[-1])}")
+            lines.append(f"{self.name}_count{_label_text(self.labelnames, key)} {_format_number(cumulative)}")
+        return lines
+
+
+class MetricsRegistry:
+    """进程内指标注册表，按 Prometheus 文本格式输出；collector 在抓取时调用，用于计算型指标。"""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def _register(self, metric: _Metric) -> _Metric:
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                raise ValueError(f"指标 {metric.name} 已以不同类型或标签注册")
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help_text: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, help_text, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help_text: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, help_text, labelnames, buckets))  # type: ignore[return-value]
+
+    def add_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors.append(collector)
+
+    def remove_collector(self, collector: Callable[[], None]) -> None:
+        self._collectors = [item for item in self._collectors if item is not collector]
+
+    def render(self) -> str:
+        for collector in list(self._collectors):
+            try:
+                collector()
+            except Exception:
+                pass
+        lines: List[str] = []
+        for name in sorted(self._metrics):
+            metric = self._metrics[name]
+            lines.append(f"# HELP {name} {metric.help}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+
+# 引擎指标
+TICK_DURATION = METRICS.histogram("grid_tick_duration_seconds", "策略循环单轮耗时", ("symbol",))
+REST_LATENCY = METRICS.histogram("grid_rest_latency_seconds", "交易所 REST 调用耗时", ("exchange", "op"))
+REST_ERRORS = METRICS.counter("grid_rest_errors_total", "交易所 REST 调用失败次数", ("exchange", "op"))
+RATE_LIMITED = METRICS.counter("grid_rate_limited_total", "策略循环遇到限流（429）的次数", ("symbol",))
+RATE_LIMIT_COOLDOWN = METRICS.gauge("grid_rate_limit_cooldown_seconds", "最近一次限流后的退避时长", ("symbol",))
+QUOTE_AGE = METRICS.gauge("grid_quote_age_seconds", "WS 盘口最近一次推送距今时长", ("symbol",))
+ORDERS = METRICS.counter("grid_orders_total", "下单/撤单成功次数", ("symbol", "action"))
+RECONCILE_DIFF = METRICS.histogram(
+    "grid_reconcile_diff_orders",
+    "每轮调和的差异挂单数",
+    ("symbol", "kind"),
+    buckets=(0, 1, 2, 5, 10, 20, 50),
+)
+DELAY_COUNT = METRICS.gauge("grid_delay_count", "当前延迟挂单数", ("symbol",))
+PERSIST_ERRORS = METRICS.counter("grid_persist_errors_total", "后台落盘失败次数（重试/丢弃）", ("store", "action"))
+LOOP_LAG = METRICS.histogram(
+    "grid_event_loop_lag_seconds",
+    "事件循环调度延迟",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0),
+)
+
+EVENT_LOOP_LAG_INTERVAL_S = 0.5
+
+
+async def monitor_event_loop_lag(interval_s: float = EVENT_LOOP_LAG_INTERVAL_S) -> None:
+    """定时 sleep，实际唤醒时间与预期之差即事件循环延迟。"""
+    while True:
+        started = time.monotonic()
+        await asyncio.sleep(interval_s)
+        LOOP_LAG.observe(value=max(0.0, time.monotonic() - started - interval_s))
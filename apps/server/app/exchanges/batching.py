@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import asyncio
+from typing import Any, Awaitable, Callable, Sequence
+
+from app.exchanges.types import LimitOrderRequest, OrderResult
+
+DEFAULT_BATCH_CONCURRENCY = 4
+
+
+async def run_bounded(
+    items: Sequence[Any],
+    call: Callable[[Any], Awaitable[None]],
+    limit: int = DEFAULT_BATCH_CONCURRENCY,
+    key: Callable[[Any], Any] = lambda item: item,
+) -> list[OrderResult]:
+    """并发执行单笔请求（最多 limit 个同时在途），结果按 items 顺序返回。"""
+    if not items:
+        return []
+    sem = asyncio.Semaphore(max(1, int(limit)))
+
+    async def _one(item: Any) -> OrderResult:
+        async with sem:
+            try:
+                await call(item)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                return OrderResult(key=key(item), ok=False, error=exc)
+        return OrderResult(key=key(item), ok=True)
+
+    return list(await asyncio.gather(*(_one(item) for item in items)))
+
+
+async def create_limit_orders_concurrently(
+    trader: Any,
+    market_id: str | int,
+    orders: Sequence[LimitOrderRequest],
+    limit: int = DEFAULT_BATCH_CONCURRENCY,
+) -> list[OrderResult]:
+    async def _create(order: LimitOrderRequest) -> None:
+        await trader.create_limit_order(
+            market_id=market_id,
+            client_order_index=order.client_order_index,
+            base_amount=order.base_amount,
+            price=order.price,
+            is_ask=order.is_ask,
+            post_only=order.post_only,
+            reduce_only=order.reduce_only,
+        )
+
+    return await run_bounded(list(orders), _create, limit, key=lambda order: order.client_order_index)
+
+
+async def cancel_orders_concurrently(
+    trader: Any,
+    market_id: str | int,
+    order_indexes: Sequence[Any],
+    limit: int = DEFAULT_BATCH_CONCURRENCY,
+) -> list[OrderResult]:
+    async def _cancel(order_index: Any) -> None:
+        await trader.cancel_order(market_id, order_index)
+
+    return await run_bounded(list(order_indexes), _cancel, limit)
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Dict, Hashable, Optional
+
+
+class BookUpdateNotifier:
+    """按市场记录盘口版本号，供调度器等待最优买卖价变化。"""
+
+    def __init__(self) -> None:
+        self._versions: Dict[Hashable, int] = {}
+        self._waiters: Dict[Hashable, asyncio.Event] = {}
+        self._received_at: Dict[Hashable, float] = {}
+
+    def version(self, key: Hashable) -> int:
+        return self._versions.get(key, 0)
+
+    def touch(self, key: Hashable) -> None:
+        """记录收到盘口推送的时刻（无论价格是否变化）。"""
+        self._received_at[key] = time.monotonic()
+
+    def age(self, key: Hashable) -> Optional[float]:
+        received_at = self._received_at.get(key)
+        if received_at is None:
+            return None
+        return time.monotonic() - received_at
+
+    def notify(self, key: Hashable) -> None:
+        self._versions[key] = self._versions.get(key, 0) + 1
+        event = self._waiters.pop(key, None)
+        if event is not None:
+            event.set()
+
+    async def wait(self, key: Hashable, version: int, timeout_s: float) -> int:
+        current = self._versions.get(key, 0)
+        if current != version or timeout_s <= 0:
+            return current
+        event = self._waiters.get(key)
+        if event is None:
+            event = asyncio.Event()
+            self._waiters[key] = event
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout_s)
+        except asyncio.TimeoutError:
+            pass
+        return self._versions.get(key, 0)
@@ -3,7 +3,10 @@ from __future__ import annotations
 import asyncio
 import logging
 from decimal import Decimal
-from typing import Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.exchanges.book_events import BookUpdateNotifier
+from app.exchanges.tape import TAPE
 
 
 def _env_value(env: str):
@@ -39,8 +42,14 @@ def _parse_price(value: Optional[str | int | float | Decimal]) -> Optional[Decim
 class GrvtMarketData:
     """使用 WS 获取 GRVT 行情。"""
 
-    def __init__(self, env: str, logger: Optional[logging.Logger] = None) -> None:
+    def __init__(
+        self,
+        env: str,
+        logger: Optional[logging.Logger] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+    ) -> None:
         self._env_name = env
+        self._parameters = dict(parameters or {})
         self._logger = logger or logging.getLogger(__name__)
         self._ws = None
         self._ready = False
@@ -48,6 +57,7 @@ class GrvtMarketData:
         self._prices: Dict[str, Tuple[Optional[Decimal], Optional[Decimal]]] = {}
         self._events: Dict[str, asyncio.Event] = {}
         self._subscriptions: set[str] = set()
+        self._updates = BookUpdateNotifier()
 
     async def _ensure_ws(self) -> None:
         if self._ready:
@@ -61,7 +71,7 @@ class GrvtMarketData:
                 env=_env_value(self._env_name),
                 loop=asyncio.get_running_loop(),
                 logger=self._logger,
-                parameters={},
+                parameters=dict(self._parameters),
             )
             await self._ws.initialize()
             self._ready = True
@@ -87,7 +97,11 @@ class GrvtMarketData:
             ask = _parse_price(feed.get("best_ask_price") or feed.get("bestAskPrice"))
             if bid is None and ask is None:
                 return
-            self._prices[instrument_key] = (bid, ask)
+            self._updates.touch(instrument_key)
+            if self._prices.get(instrument_key) != (bid, ask):
+                self._prices[instrument_key] = (bid, ask)
+                self._updates.notify(instrument_key)
+                TAPE.quote("grvt", instrument_key, bid, ask)
             if instrument_key in self._events:
                 self._events[instrument_key].set()
 
@@ -98,6 +112,25 @@ class GrvtMarketData:
         )
         self._subscriptions.add(instrument)
 
+    async def subscribe_orders(self, callback: Callable[[dict], Awaitable[None]]) -> bool:
+        """订阅账户订单推送（需以交易账户凭据创建）。"""
+        account_id = self._parameters.get("trading_account_id")
+        if not account_id:
+            return False
+        await self._ensure_ws()
+        try:
+            from pysdk.grvt_ccxt_env import GrvtWSEndpointType
+
+            endpoint = GrvtWSEndpointType.TRADE_DATA_RPC_FULL
+        except Exception:
+            endpoint = None
+        params = {"sub_account_id": str(account_id)}
+        if endpoint is None:
+            await self._ws.subscribe("order", callback, params=params)
+        else:
+            await self._ws.subscribe("order", callback, ws_end_point_type=endpoint, params=params)
+        return True
+
     async def best_bid_ask(self, instrument: str) -> Tuple[Optional[Decimal], Optional[Decimal]]:
         await self._subscribe_mini(instrument)
         event = self._events.get(instrument)
@@ -108,6 +141,15 @@ class GrvtMarketData:
                 pass
         return self._prices.get(instrument, (None, None))
 
+    def book_version(self, instrument: str) -> int:
+        return self._updates.version(str(instrument))
+
+    def quote_age(self, instrument: str) -> Optional[float]:
+        return self._updates.age(str(instrument))
+
+    async def wait_update(self, instrument: str, version: int, timeout_s: float) -> int:
+        return await self._updates.wait(str(instrument), version, timeout_s)
+
     async def close(self) -> None:
         if not self._ws:
             return
@@ -4,8 +4,12 @@ import time
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.metrics import REST_ERRORS, REST_LATENCY
+from app.exchanges.batching import cancel_orders_concurrently, create_limit_orders_concurrently
 from app.exchanges.grvt.market_ws import GrvtMarketData, _parse_price
-from app.exchanges.types import MarketMeta
+from app.exchanges.order_mirror import ORDER_STREAM_STALE_S, OrderMirror
+from app.exchanges.rate_limit import PRIORITY_TRADE, is_rate_limited_error, rate_limiter
+from app.exchanges.types import FillRecord, LimitOrderRequest, MarketMeta, OrderResult
 
 
 def _env_value(env: str):
@@ -52,6 +56,49 @@ def _trade_ts_ms(value: Any) -> Optional[int]:
     return ts * 1000
 
 
+def _normalize_order(order: Dict[str, Any]) -> Dict[str, Any]:
+    """把 REST/WS 订单统一补齐 id、client_order_id、price、is_ask 字段。"""
+    raw = order.get("info") if isinstance(order.get("info"), dict) else {}
+    meta = order.get("metadata") if isinstance(order.get("metadata"), dict) else {}
+    if not meta and isinstance(raw.get("metadata"), dict):
+        meta = raw.get("metadata") or {}
+    if meta and meta.get("client_order_id") is not None:
+        order["client_order_id"] = meta.get("client_order_id")
+    if order.get("id") is None and raw.get("id") is not None:
+        order["id"] = raw.get("id")
+    if order.get("id") is None and order.get("order_id") is not None:
+        order["id"] = order.get("order_id")
+    if order.get("client_order_id") is None and raw.get("client_order_id") is not None:
+        order["client_order_id"] = raw.get("client_order_id")
+    if order.get("client_order_id") is None and raw.get("clientOrderId") is not None:
+        order["client_order_id"] = raw.get("clientOrderId")
+    legs = order.get("legs") if isinstance(order.get("legs"), list) else []
+    if not legs and isinstance(raw.get("legs"), list):
+        legs = raw.get("legs") or []
+    if legs:
+        leg = legs[0] if isinstance(legs[0], dict) else {}
+        if leg and leg.get("limit_price") is not None:
+            order["price"] = leg.get("limit_price")
+        if leg and isinstance(leg.get("is_buying_asset"), bool):
+            order["is_buying_asset"] = leg.get("is_buying_asset")
+            order["is_ask"] = not bool(leg.get("is_buying_asset"))
+    return order
+
+
+def _order_keys(order: Any) -> Tuple[Any, Any]:
+    if isinstance(order, dict):
+        return order.get("id"), order.get("client_order_id")
+    return getattr(order, "id", None), getattr(order, "client_order_id", None)
+
+
+# 订单推送中仍在簿上的状态；FILLED/CANCELLED/REJECTED 视为已关闭
+_OPEN_ORDER_STATUSES = {"PENDING", "OPEN"}
+
+
+# 收到限流响应后整个账户暂停放行的时长
+GRVT_RATE_LIMIT_BACKOFF_S = 1.0
+
+
 class GrvtTrader:
     def __init__(
         self,
@@ -76,14 +123,35 @@ class GrvtTrader:
         self._positions_cache: Dict[str, Decimal] = {}
         self._positions_cached_at = 0.0
         self._positions_ttl_s = 2.0
-        self._market_ws = GrvtMarketData(env)
+        self._market_ws = GrvtMarketData(
+            env,
+            parameters={"trading_account_id": str(trading_account_id), "api_key": str(api_key)},
+        )
+        self._orders = OrderMirror(_order_keys, stale_s=ORDER_STREAM_STALE_S)
+        self._orders_stream_started = False
+        self._limiter = rate_limiter("grvt", self.account_key)
 
     def check_client(self) -> Optional[str]:
         return None
 
+    async def _request(self, func, *args, priority: Optional[int] = None, weight: float = 1.0, **kwargs) -> Any:
+        """经账户共享令牌桶放行后调用 SDK；限流时整个账户退避。"""
+        await self._limiter.acquire(weight, priority)
+        op = getattr(func, "__name__", "call")
+        started = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        except Exception as exc:
+            REST_ERRORS.inc("grvt", op)
+            if is_rate_limited_error(exc):
+                self._limiter.backoff(GRVT_RATE_LIMIT_BACKOFF_S)
+            raise
+        finally:
+            REST_LATENCY.observe("grvt", op, value=time.perf_counter() - started)
+
     async def verify(self) -> Optional[str]:
         try:
-            await self._api.get_account_summary()
+            await self._request(self._api.get_account_summary)
         except Exception as exc:
             return f"{type(exc).__name__}:{exc}"
         return None
@@ -99,7 +167,7 @@ class GrvtTrader:
             return cached
 
         if not self._api.markets:
-            await self._api.load_markets()
+            await self._request(self._api.load_markets)
         item = self._api.markets.get(symbol)
         if not item:
             raise KeyError(f"未知 instrument: {symbol}")
@@ -133,44 +201,60 @@ class GrvtTrader:
         if bid is not None or ask is not None:
             return bid, ask
         try:
-            data = await self._api.fetch_mini_ticker(instrument)
+            data = await self._request(self._api.fetch_mini_ticker, instrument)
             bid = _parse_price(data.get("best_bid_price") or data.get("bestBidPrice"))
             ask = _parse_price(data.get("best_ask_price") or data.get("bestAskPrice"))
             return bid, ask
         except Exception:
             return None, None
 
+    def book_version(self, market_id: str | int) -> int:
+        return self._market_ws.book_version(str(market_id))
+
+    def quote_age(self, market_id: str | int) -> Optional[float]:
+        return self._market_ws.quote_age(str(market_id))
+
+    async def wait_book_update(self, market_id: str | int, version: int, timeout_s: float) -> int:
+        return await self._market_ws.wait_update(str(market_id), version, timeout_s)
+
+    async def _start_order_stream(self) -> None:
+        if self._orders_stream_started:
+            return
+        if await self._market_ws.subscribe_orders(self._on_order_message):
+            self._orders_stream_started = True
+            self._orders.set_live(True)
+
+    async def _on_order_message(self, message: dict) -> None:
+        self._orders.heartbeat()
+        feed = message.get("feed") if isinstance(message, dict) else None
+        if not isinstance(feed, dict):
+            return
+        order = _normalize_order(dict(feed))
+        legs = order.get("legs") if isinstance(order.get("legs"), list) else []
+        leg = legs[0] if legs and isinstance(legs[0], dict) else {}
+        instrument = str(leg.get("instrument") or "")
+        if not instrument:
+            return
+        state = order.get("state") if isinstance(order.get("state"), dict) else {}
+        status = str(state.get("status") or order.get("status") or "").upper()
+        self._orders.apply(instrument, order, status in _OPEN_ORDER_STATUSES)
+
+    def cached_orders(self, market_id: str | int) -> Optional[List[Any]]:
+        # SDK 不暴露断线回调：超过 ORDER_STREAM_STALE_S 没有订单推送即视为断线，回退 REST 并在恢复后重新校准
+        return self._orders.cached(str(market_id))
+
     async def active_orders(self, market_id: str | int) -> List[Any]:
         symbol = str(market_id)
-        orders = await self._api.fetch_open_orders(symbol)
+        try:
+            await self._start_order_stream()
+        except Exception:
+            pass
+        fetched_at = time.monotonic()
+        orders = await self._request(self._api.fetch_open_orders, symbol)
         results: List[Any] = []
         for order in orders or []:
-            if not isinstance(order, dict):
-                results.append(order)
-                continue
-            raw = order.get("info") if isinstance(order.get("info"), dict) else {}
-            meta = order.get("metadata") if isinstance(order.get("metadata"), dict) else {}
-            if not meta and isinstance(raw.get("metadata"), dict):
-                meta = raw.get("metadata") or {}
-            if meta and meta.get("client_order_id") is not None:
-                order["client_order_id"] = meta.get("client_order_id")
-            if order.get("id") is None and raw.get("id") is not None:
-                order["id"] = raw.get("id")
-            if order.get("client_order_id") is None and raw.get("client_order_id") is not None:
-                order["client_order_id"] = raw.get("client_order_id")
-            if order.get("client_order_id") is None and raw.get("clientOrderId") is not None:
-                order["client_order_id"] = raw.get("clientOrderId")
-            legs = order.get("legs") if isinstance(order.get("legs"), list) else []
-            if not legs and isinstance(raw.get("legs"), list):
-                legs = raw.get("legs") or []
-            if legs:
-                leg = legs[0] if isinstance(legs[0], dict) else {}
-                if leg and leg.get("limit_price") is not None:
-                    order["price"] = leg.get("limit_price")
-                if leg and isinstance(leg.get("is_buying_asset"), bool):
-                    order["is_buying_asset"] = leg.get("is_buying_asset")
-                    order["is_ask"] = not bool(leg.get("is_buying_asset"))
-            results.append(order)
+            results.append(_normalize_order(order) if isinstance(order, dict) else order)
+        self._orders.reset(symbol, results, fetched_at=fetched_at)
         return results
 
     async def position_base(self, market_id: str | int) -> Decimal:
@@ -179,7 +263,7 @@ class GrvtTrader:
         if (now - self._positions_cached_at) < self._positions_ttl_s:
             return self._positions_cache.get(symbol, Decimal(0))
 
-        positions = await self._api.fetch_positions([symbol])
+        positions = await self._request(self._api.fetch_positions, [symbol])
         cache: Dict[str, Decimal] = {}
         for item in positions or []:
             if not isinstance(item, dict):
@@ -194,7 +278,7 @@ class GrvtTrader:
         return cache.get(symbol, Decimal(0))
 
     async def positions_snapshot(self) -> Dict[str, Dict[str, Decimal]]:
-        positions = await self._api.fetch_positions()
+        positions = await self._request(self._api.fetch_positions)
         result: Dict[str, Dict[str, Decimal]] = {}
         for item in positions or []:
             if not isinstance(item, dict):
@@ -230,7 +314,9 @@ class GrvtTrader:
             "post_only": bool(post_only),
             "reduce_only": bool(reduce_only),
         }
-        await self._api.create_order(
+        await self._request(
+            self._api.create_order,
+            priority=PRIORITY_TRADE,
             symbol=str(market_id),
             order_type="limit",
             side="sell" if is_ask else "buy",
@@ -252,7 +338,9 @@ class GrvtTrader:
             "post_only": False,
             "reduce_only": bool(reduce_only),
         }
-        await self._api.create_order(
+        await self._request(
+            self._api.create_order,
+            priority=PRIORITY_TRADE,
             symbol=str(market_id),
             order_type="market",
             side="sell" if is_ask else "buy",
@@ -261,15 +349,15 @@ class GrvtTrader:
             params=params,
         )
 
-    async def fills_since(
+    async def fills_after(
         self,
         market_id: str | int,
         start_ms: int,
         end_ms: int,
-        max_pages: int = 5,
-    ) -> Tuple[Decimal, int]:
-        total = Decimal(0)
-        count = 0
+        max_pages: int = 200,
+    ) -> List[FillRecord]:
+        """返回 [start_ms, end_ms] 内的成交（含边界），供上层按游标增量累加。"""
+        fills: List[FillRecord] = []
         cursor = None
         pages = 0
         start_ns = int(start_ms) * 1_000_000
@@ -280,21 +368,21 @@ class GrvtTrader:
             params: Dict[str, Any] = {"end_time": end_ns}
             if cursor:
                 params = {"cursor": cursor}
-            resp = await self._api.fetch_my_trades(symbol=symbol, since=start_ns, limit=200, params=params)
+            resp = await self._request(self._api.fetch_my_trades, symbol=symbol, since=start_ns, limit=200, params=params)
             results = resp.get("result") if isinstance(resp, dict) else None
             results = results or []
             for item in results:
                 if not isinstance(item, dict):
                     continue
                 ts_ms = _trade_ts_ms(item.get("event_time") or item.get("timestamp") or item.get("time"))
-                if ts_ms is not None and (ts_ms < start_ms or ts_ms > end_ms):
+                if ts_ms is None or ts_ms < start_ms or ts_ms > end_ms:
                     continue
                 price = _parse_price(item.get("price") or item.get("fill_price"))
                 if price is None:
                     price = _safe_decimal(item.get("price") or 0)
                 size = _safe_decimal(item.get("size") or item.get("amount") or 0)
-                total += abs(price * size)
-                count += 1
+                key = item.get("trade_id") or item.get("id") or f"{item.get('event_time')}:{price}:{size}"
+                fills.append(FillRecord(ts_ms=ts_ms, key=str(key), notional=abs(price * size)))
 
             cursor = resp.get("next") if isinstance(resp, dict) else None
             if not cursor:
@@ -302,8 +390,19 @@ class GrvtTrader:
             if not cursor:
                 break
             pages += 1
-        return total, count
+        return fills
 
     async def cancel_order(self, market_id: str | int, order_index: Any) -> None:
         order_id = str(order_index)
-        await self._api.cancel_order(id=order_id)
+        await self._request(self._api.cancel_order, id=order_id, priority=PRIORITY_TRADE)
+
+    async def create_limit_orders(self, market_id: str | int, orders: List[LimitOrderRequest]) -> List[OrderResult]:
+        # SDK 无批量下单接口，限并发逐笔提交
+        results = await create_limit_orders_concurrently(self, market_id, orders)
+        self._orders.track_created(str(market_id), orders, results)
+        return results
+
+    async def cancel_orders(self, market_id: str | int, order_indexes: List[Any]) -> List[OrderResult]:
+        results = await cancel_orders_concurrently(self, market_id, order_indexes)
+        self._orders.track_canceled(str(market_id), results)
+        return results
@@ -1,13 +1,15 @@
 from __future__ import annotations
 
 import asyncio
-import inspect
+import json
 import logging
-from dataclasses import dataclass
+import time
 from decimal import Decimal
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
 
+from app.exchanges.book_events import BookUpdateNotifier
 from app.exchanges.lighter.public_api import base_url
+from app.exchanges.tape import TAPE
 
 
 def _parse_decimal(value: Any) -> Optional[Decimal]:
@@ -22,119 +24,325 @@ def _parse_decimal(value: Any) -> Optional[Decimal]:
         return None
 
 
-def _best_prices(order_book: Dict[str, Any]) -> Tuple[Optional[Decimal], Optional[Decimal]]:
-    bids = order_book.get("bids") if isinstance(order_book, dict) else None
-    asks = order_book.get("asks") if isinstance(order_book, dict) else None
-    best_bid: Optional[Decimal] = None
-    best_ask: Optional[Decimal] = None
+WS_PATH = "/stream"
+WS_RECONNECT_MAX_S = 30.0
+# 超过该时长未被读取的市场自动退订
+MARKET_IDLE_UNSUBSCRIBE_S = 300.0
 
-    for item in bids or []:
-        price = _parse_decimal(item.get("price") if isinstance(item, dict) else getattr(item, "price", None))
-        if price is None:
-            continue
-        if best_bid is None or price > best_bid:
-            best_bid = price
 
-    for item in asks or []:
-        price = _parse_decimal(item.get("price") if isinstance(item, dict) else getattr(item, "price", None))
-        if price is None:
-            continue
-        if best_ask is None or price < best_ask:
-            best_ask = price
+class LighterStream:
+    """单条多路复用的 Lighter WS 连接，支持动态订阅/退订频道，断线自动重连并重订阅。"""
+
+    def __init__(
+        self,
+        url: str,
+        on_message: Callable[[Dict[str, Any]], None],
+        logger: Optional[logging.Logger] = None,
+        on_reconnect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._url = url
+        self._on_message = on_message
+        self._on_reconnect = on_reconnect
+        self._logger = logger or logging.getLogger(__name__)
+        self._channels: set[str] = set()
+        self._auth: Dict[str, Callable[[], Awaitable[str]]] = {}
+        self._listeners: List[Tuple[Callable[[Dict[str, Any]], None], Optional[Callable[[], None]]]] = []
+        self._ws: Any = None
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def channels(self) -> set[str]:
+        return set(self._channels)
+
+    @property
+    def connected(self) -> bool:
+        return self._ws is not None
+
+    def _ensure_task(self) -> None:
+        task = self._task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return
+        self._task = asyncio.create_task(self._run())
+
+    def add_listener(
+        self,
+        on_message: Callable[[Dict[str, Any]], None],
+        on_disconnect: Optional[Callable[[], None]] = None,
+    ) -> None:
+        """额外的消息消费者（如账户订单镜像），与盘口共用同一连接。"""
+        self._listeners.append((on_message, on_disconnect))
+
+    def remove_listener(self, on_message: Callable[[Dict[str, Any]], None]) -> None:
+        self._listeners = [item for item in self._listeners if item[0] is not on_message]
+
+    async def subscribe(self, channel: str, auth: Optional[Callable[[], Awaitable[str]]] = None) -> None:
+        """订阅频道；auth 提供鉴权 token，私有频道每次（重新）订阅时调用以取得最新 token。"""
+        if auth is not None:
+            self._auth[channel] = auth
+        if channel in self._channels:
+            self._ensure_task()
+            return
+        self._channels.add(channel)
+        self._ensure_task()
+        ws = self._ws
+        if ws is not None:
+            await self._send_subscribe(ws, channel)
+
+    async def unsubscribe(self, channel: str) -> None:
+        if channel not in self._channels:
+            return
+        self._channels.discard(channel)
+        self._auth.pop(channel, None)
+        await self._send({"type": "unsubscribe", "channel": channel})
+        if not self._channels and self._ws is not None:
+            try:
+                await self._ws.close()
+            except Exception:
+                pass
+
+    async def _send(self, payload: Dict[str, Any]) -> None:
+        ws = self._ws
+        if ws is None:
+            return
+        try:
+            await ws.send(json.dumps(payload))
+        except Exception as exc:
+            self._logger.debug("lighter.ws.send.error payload=%s err=%s:%s", payload, type(exc).__name__, exc)
+
+    async def _send_subscribe(self, ws: Any, channel: str) -> None:
+        payload: Dict[str, Any] = {"type": "subscribe", "channel": channel}
+        auth = self._auth.get(channel)
+        try:
+            if auth is not None:
+                payload["auth"] = await auth()
+            await ws.send(json.dumps(payload))
+        except Exception as exc:
+            self._logger.debug("lighter.ws.subscribe.error channel=%s err=%s:%s", channel, type(exc).__name__, exc)
+
+    def _dispatch_disconnect(self) -> None:
+        if self._on_reconnect is not None:
+            self._on_reconnect()
+        for _, on_disconnect in list(self._listeners):
+            if on_disconnect is None:
+                continue
+            try:
+                on_disconnect()
+            except Exception as exc:
+                self._logger.debug("lighter.ws.listener.error err=%s:%s", type(exc).__name__, exc)
+
+    async def _handle_raw(self, ws: Any, raw: Any) -> None:
+        try:
+            message = json.loads(raw) if isinstance(raw, (str, bytes, bytearray)) else raw
+        except Exception:
+            return
+        if not isinstance(message, dict):
+            return
+        msg_type = message.get("type")
+        if msg_type == "connected":
+            for channel in sorted(self._channels):
+                await self._send_subscribe(ws, channel)
+            return
+        if msg_type == "ping":
+            await ws.send(json.dumps({"type": "pong"}))
+            return
+        self._on_message(message)
+        for on_message, _ in list(self._listeners):
+            try:
+                on_message(message)
+            except Exception as exc:
+                self._logger.debug("lighter.ws.listener.error err=%s:%s", type(exc).__name__, exc)
+
+    async def _run(self) -> None:
+        import websockets
 
-    return best_bid, best_ask
+        backoff_s = 1.0
+        while self._channels:
+            try:
+                async with websockets.connect(self._url) as ws:
+                    self._ws = ws
+                    backoff_s = 1.0
+                    async for raw in ws:
+                        await self._handle_raw(ws, raw)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self._logger.debug("lighter.ws.stream.error err=%s:%s", type(exc).__name__, exc)
+            finally:
+                self._ws = None
+                self._dispatch_disconnect()
+            if not self._channels:
+                break
+            await asyncio.sleep(backoff_s)
+            backoff_s = min(backoff_s * 2, WS_RECONNECT_MAX_S)
+
+    async def close(self) -> None:
+        self._channels.clear()
+        self._auth.clear()
+        self._listeners.clear()
+        task = self._task
+        self._task = None
+        ws = self._ws
+        if ws is not None:
+            try:
+                await ws.close()
+            except Exception:
+                pass
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+
+def _apply_levels(book_side: Dict[str, Decimal], levels: Any) -> None:
+    for item in levels or []:
+        price = item.get("price") if isinstance(item, dict) else getattr(item, "price", None)
+        size = _parse_decimal(item.get("size") if isinstance(item, dict) else getattr(item, "size", None))
+        if price is None or size is None:
+            continue
+        key = str(price)
+        if size > 0:
+            book_side[key] = size
+        else:
+            book_side.pop(key, None)
 
 
-@dataclass
-class _WsStream:
-    client: Any
-    task: asyncio.Task[None]
-    event: asyncio.Event
+def _channel_market_id(message: Dict[str, Any]) -> Optional[int]:
+    channel = str(message.get("channel") or "")
+    sep = ":" if ":" in channel else "/"
+    try:
+        return int(channel.split(sep, 1)[1])
+    except Exception:
+        return None
 
 
 class LighterMarketData:
-    """使用 Lighter WS 订阅盘口，失败时由上层回退 REST。"""
+    """所有市场共用一条 Lighter WS 连接订阅盘口，失败时由上层回退 REST。"""
+
+    _shared: Dict[str, "LighterMarketData"] = {}
 
     def __init__(self, env: str, logger: Optional[logging.Logger] = None) -> None:
         self._env = env
         self._host = base_url(env).replace("https://", "").replace("http://", "")
         self._logger = logger or logging.getLogger(__name__)
-        self._lock = asyncio.Lock()
-        self._streams: Dict[int, _WsStream] = {}
+        self._stream = LighterStream(
+            f"wss://{self._host}{WS_PATH}",
+            self._on_message,
+            logger=self._logger,
+            on_reconnect=self._on_disconnect,
+        )
+        self._books: Dict[int, Tuple[Dict[str, Decimal], Dict[str, Decimal]]] = {}
+        self._events: Dict[int, asyncio.Event] = {}
+        self._last_used: Dict[int, float] = {}
         self._prices: Dict[int, Tuple[Optional[Decimal], Optional[Decimal]]] = {}
+        self._updates = BookUpdateNotifier()
+        self._refs = 0
 
-    def _on_order_book_update(self, market_id: Any, order_book: Dict[str, Any]) -> None:
-        try:
-            mid = int(str(market_id))
-        except Exception:
-            return
-        bid, ask = _best_prices(order_book)
-        if bid is None and ask is None:
-            return
-        self._prices[mid] = (bid, ask)
-        stream = self._streams.get(mid)
-        if stream:
-            stream.event.set()
+    @classmethod
+    def shared(cls, env: str) -> "LighterMarketData":
+        """同一 env 的多个 trader 共享一个实例（一条连接）。"""
+        instance = cls._shared.get(env)
+        if instance is None:
+            instance = cls(env)
+            cls._shared[env] = instance
+        instance._refs += 1
+        return instance
 
-    async def _run_stream(self, market_id: int, ws_client: Any) -> None:
-        try:
-            await ws_client.run_async()
-        except asyncio.CancelledError:
-            raise
-        except Exception as exc:
-            self._logger.debug("lighter.ws.stream.error market_id=%s err=%s:%s", market_id, type(exc).__name__, exc)
+    @property
+    def stream(self) -> LighterStream:
+        return self._stream
 
-    async def _ensure_stream(self, market_id: int) -> _WsStream:
-        current = self._streams.get(market_id)
-        if current and not current.task.done():
-            return current
+    def _on_disconnect(self) -> None:
+        # 重连后服务端会重新推送快照，旧的增量状态作废
+        self._books.clear()
 
-        async with self._lock:
-            current = self._streams.get(market_id)
-            if current and not current.task.done():
-                return current
+    def _on_message(self, message: Dict[str, Any]) -> None:
+        msg_type = str(message.get("type") or "")
+        if msg_type not in {"subscribed/order_book", "update/order_book"}:
+            return
+        mid = _channel_market_id(message)
+        order_book = message.get("order_book")
+        if mid is None or not isinstance(order_book, dict):
+            return
+        if msg_type == "subscribed/order_book" or mid not in self._books:
+            self._books[mid] = ({}, {})
+        bids, asks = self._books[mid]
+        bid_levels = order_book.get("bids")
+        ask_levels = order_book.get("asks")
+        _apply_levels(bids, bid_levels)
+        _apply_levels(asks, ask_levels)
+        self._on_order_book_update(mid, bids, asks, changed=bool(bid_levels or ask_levels))
 
-            import lighter
+    def _on_order_book_update(
+        self,
+        mid: int,
+        bids: Dict[str, Decimal],
+        asks: Dict[str, Decimal],
+        changed: bool = True,
+    ) -> None:
+        bid = max((Decimal(price) for price in bids), default=None)
+        ask = min((Decimal(price) for price in asks), default=None)
+        if bid is None and ask is None:
+            return
+        self._updates.touch(mid)
+        if self._prices.get(mid) != (bid, ask):
+            self._prices[mid] = (bid, ask)
+            self._updates.notify(mid)
+            TAPE.quote("lighter", mid, bid, ask)
+        if changed:
+            # 回调里只复制原始档位，解析与取前 N 档由磁带后台写盘完成
+            TAPE.book_levels("lighter", mid, bids, asks)
+        event = self._events.get(mid)
+        if event:
+            event.set()
 
+    async def subscribe(self, market_id: int) -> asyncio.Event:
+        mid = int(market_id)
+        now = time.monotonic()
+        self._last_used[mid] = now
+        event = self._events.get(mid)
+        if event is None:
             event = asyncio.Event()
-            ws_client = lighter.WsClient(
-                host=self._host,
-                order_book_ids=[int(market_id)],
-                on_order_book_update=self._on_order_book_update,
-                on_account_update=None,
-            )
-            task = asyncio.create_task(self._run_stream(int(market_id), ws_client))
-            stream = _WsStream(client=ws_client, task=task, event=event)
-            self._streams[int(market_id)] = stream
-            return stream
+            self._events[mid] = event
+        await self._stream.subscribe(f"order_book/{mid}")
+        for idle_mid, used_at in list(self._last_used.items()):
+            if idle_mid != mid and now - used_at > MARKET_IDLE_UNSUBSCRIBE_S:
+                await self.unsubscribe(idle_mid)
+        return event
+
+    async def unsubscribe(self, market_id: int) -> None:
+        mid = int(market_id)
+        self._last_used.pop(mid, None)
+        self._events.pop(mid, None)
+        self._books.pop(mid, None)
+        self._prices.pop(mid, None)
+        await self._stream.unsubscribe(f"order_book/{mid}")
 
     async def best_bid_ask(self, market_id: int) -> Tuple[Optional[Decimal], Optional[Decimal]]:
         mid = int(market_id)
-        stream = await self._ensure_stream(mid)
-        if mid not in self._prices and not stream.event.is_set():
+        event = await self.subscribe(mid)
+        if mid not in self._prices and not event.is_set():
             try:
-                await asyncio.wait_for(stream.event.wait(), timeout=1.0)
+                await asyncio.wait_for(event.wait(), timeout=1.0)
             except Exception:
                 pass
         return self._prices.get(mid, (None, None))
 
+    def book_version(self, market_id: int) -> int:
+        return self._updates.version(int(market_id))
+
+    def quote_age(self, market_id: int) -> Optional[float]:
+        return self._updates.age(int(market_id))
+
+    async def wait_update(self, market_id: int, version: int, timeout_s: float) -> int:
+        return await self._updates.wait(int(market_id), version, timeout_s)
+
     async def close(self) -> None:
-        streams = list(self._streams.values())
-        self._streams.clear()
-        for stream in streams:
-            stream.task.cancel()
-        for stream in streams:
-            ws = getattr(stream.client, "ws", None)
-            if ws is None:
-                continue
-            close_fn = getattr(ws, "close", None)
-            if close_fn is None:
-                continue
-            try:
-                result = close_fn()
-                if inspect.isawaitable(result):
-                    await result
-            except Exception:
-                continue
-        if streams:
-            await asyncio.gather(*(s.task for s in streams), return_exceptions=True)
+        if self._refs > 1:
+            self._refs -= 1
+            return
+        self._refs = 0
+        if self._shared.get(self._env) is self:
+            self._shared.pop(self._env, None)
+        self._events.clear()
+        self._books.clear()
+        self._last_used.clear()
+        await self._stream.close()
@@ -5,10 +5,48 @@ import time
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.exchanges.batching import cancel_orders_concurrently, create_limit_orders_concurrently
 from app.exchanges.lighter.public_api import base_url
 from app.exchanges.lighter.market_ws import LighterMarketData
-from app.exchanges.types import MarketMeta
+from app.exchanges.order_mirror import OrderMirror
+from app.exchanges.rate_limit import PRIORITY_TRADE, is_rate_limited_error, is_rate_limited_text, rate_limiter
+from app.exchanges.types import LimitOrderRequest, MarketMeta, OrderResult
 from app.core.logbus import LogBus
+from app.core.metrics import REST_ERRORS, REST_LATENCY
+
+
+# 单次 send_tx_batch 最多携带的交易数
+TX_BATCH_LIMIT = 50
+TX_TYPE_CREATE_ORDER = 14
+TX_TYPE_CANCEL_ORDER = 15
+
+
+def _signed_tx(result: Any, default_type: int) -> Tuple[int, str]:
+    """兼容不同 SDK 版本 sign_* 的返回值，返回 (tx_type, tx_info)。"""
+    if isinstance(result, tuple) and len(result) == 4:
+        tx_type, tx_info, _tx_hash, err = result
+    elif isinstance(result, tuple) and len(result) == 2:
+        tx_info, err = result
+        tx_type = default_type
+    else:
+        raise RuntimeError(f"unexpected sign result: {type(result).__name__}")
+    if err is not None:
+        raise RuntimeError(err)
+    return int(tx_type if tx_type is not None else default_type), str(tx_info)
+
+
+def _order_attr(order: Any, name: str) -> Any:
+    if isinstance(order, dict):
+        return order.get(name)
+    return getattr(order, name, None)
+
+
+def _order_keys(order: Any) -> Tuple[Any, Any]:
+    return _order_attr(order, "order_index"), _order_attr(order, "client_order_index")
+
+
+# 账户订单推送中仍在簿上的状态，其余（filled/canceled*）视为已关闭
+_OPEN_ORDER_STATUSES = {"open", "pending", "in-progress"}
 
 
 def _parse_auth_expiry(auth_token: str) -> Optional[int]:
@@ -44,7 +82,10 @@ class LighterTrader:
         )
         self._order_api = self._signer.order_api
         self._account_api = lighter.AccountApi(self._signer.api_client)
-        self._market_ws = LighterMarketData(env=env)
+        self._market_ws = LighterMarketData.shared(env)
+        self._orders = OrderMirror(_order_keys)
+        self._orders_channel = f"account_all_orders/{self.account_index}"
+        self._orders_stream_started = False
 
         self._auth_token: Optional[str] = None
         self._auth_expiry_unix: int = 0
@@ -53,10 +94,7 @@ class LighterTrader:
         self._positions_cached_at = 0.0
         self._positions_cache: Dict[int, Decimal] = {}
         self._positions_ttl_s = 2.0
-        self._rate_lock = asyncio.Lock()
-        self._last_request_ts = 0.0
-        self._min_interval_s = 0.20
-        self._min_trade_interval_s = 0.12
+        self._limiter = rate_limiter("lighter", self.account_index)
         self._retry_limit = 4
         self._retry_base_s = 0.8
         self._trades_with_account_index = True
@@ -75,46 +113,50 @@ class LighterTrader:
         rate_limited: bool,
         err: Optional[object] = None,
     ) -> None:
+        REST_LATENCY.observe("lighter", name, value=ms / 1000)
+        if err is not None:
+            REST_ERRORS.inc("lighter", name)
+        logbus = self._logbus
+        if logbus is None or not logbus.enabled("lighter.latency"):
+            return
         if err is None:
-            self._log(f"lighter.latency name={name} ms={ms} attempt={attempt} rate_limited={rate_limited}")
+            logbus.event("lighter.latency", name=name, ms=ms, attempt=attempt, rate_limited=rate_limited)
             return
-        self._log(
-            f"lighter.latency name={name} ms={ms} attempt={attempt} rate_limited={rate_limited} err_type={type(err).__name__} err={err}"
+        logbus.event(
+            "lighter.latency",
+            name=name,
+            ms=ms,
+            attempt=attempt,
+            rate_limited=rate_limited,
+            err_type=type(err).__name__,
+            err=err,
         )
 
     def _rate_limit_delay(self, attempt: int) -> float:
         return min(self._retry_base_s * (2**attempt), 8.0)
 
-    def _is_rate_limited_text(self, text: str) -> bool:
-        lowered = text.lower()
-        return "429" in lowered or "rate limit" in lowered or "too many request" in lowered
-
-    def _is_rate_limited(self, exc: Exception) -> bool:
-        return self._is_rate_limited_text(str(exc))
-
     def _is_invalid_param(self, exc: Exception) -> bool:
         text = str(exc).lower()
         return "invalid param" in text or "code=20001" in text
 
     def _resp_rate_limited(self, err: Any, resp: Any) -> bool:
-        if err and self._is_rate_limited_text(str(err)):
+        if err and is_rate_limited_text(str(err)):
             return True
         code = getattr(resp, "code", None)
         if isinstance(code, int) and code == 429:
             return True
         msg = getattr(resp, "message", None)
-        if msg and self._is_rate_limited_text(str(msg)):
+        if msg and is_rate_limited_text(str(msg)):
             return True
         return False
 
-    async def _throttle(self, min_interval_s: Optional[float] = None) -> None:
-        interval_s = self._min_interval_s if min_interval_s is None else max(0.0, float(min_interval_s))
-        async with self._rate_lock:
-            now = time.monotonic()
-            wait = interval_s - (now - self._last_request_ts)
-            if wait > 0:
-                await asyncio.sleep(wait)
-            self._last_request_ts = time.monotonic()
+    async def _throttle(self, priority: Optional[int] = None, weight: float = 1.0) -> None:
+        """从账户共享令牌桶取令牌；priority 缺省取当前任务的优先级。"""
+        await self._limiter.acquire(weight, priority)
+
+    def _backoff(self, attempt: int) -> None:
+        # 限流时整个账户一起退避，避免其它策略/接口继续撞 429
+        self._limiter.backoff(self._rate_limit_delay(attempt))
 
     async def _call_with_retry(self, func, *args, **kwargs):
         for attempt in range(self._retry_limit):
@@ -127,11 +169,11 @@ class LighterTrader:
                 return result
             except Exception as exc:
                 elapsed_ms = int((time.monotonic() - started) * 1000)
-                rate_limited = self._is_rate_limited(exc)
+                rate_limited = is_rate_limited_error(exc)
                 self._log_latency(getattr(func, "__name__", "call"), elapsed_ms, attempt + 1, rate_limited, exc)
                 if not rate_limited or attempt >= self._retry_limit - 1:
                     raise
-                await asyncio.sleep(self._rate_limit_delay(attempt))
+                self._backoff(attempt)
 
     async def fetch_trades(self, **kwargs):
         query: Dict[str, Any] = dict(kwargs)
@@ -152,6 +194,7 @@ class LighterTrader:
 
     async def close(self) -> None:
         try:
+            await self._stop_order_stream()
             await self._market_ws.close()
         except Exception:
             pass
@@ -211,7 +254,66 @@ class LighterTrader:
         ask = Decimal(str(getattr(asks[0], "price"))) if asks else None
         return bid, ask
 
+    async def release_market(self, market_id: int) -> None:
+        """策略停止后退订该市场盘口。"""
+        await self._market_ws.unsubscribe(int(market_id))
+
+    def book_version(self, market_id: int) -> int:
+        return self._market_ws.book_version(int(market_id))
+
+    def quote_age(self, market_id: int) -> Optional[float]:
+        return self._market_ws.quote_age(int(market_id))
+
+    async def wait_book_update(self, market_id: int, version: int, timeout_s: float) -> int:
+        return await self._market_ws.wait_update(int(market_id), version, timeout_s)
+
+    async def _start_order_stream(self) -> None:
+        if self._orders_stream_started:
+            return
+        self._orders_stream_started = True
+        stream = self._market_ws.stream
+        stream.add_listener(self._on_order_message, self._on_order_stream_down)
+        await stream.subscribe(self._orders_channel, auth=self.auth_token)
+
+    async def _stop_order_stream(self) -> None:
+        if not self._orders_stream_started:
+            return
+        self._orders_stream_started = False
+        self._orders.set_live(False)
+        stream = self._market_ws.stream
+        stream.remove_listener(self._on_order_message)
+        await stream.unsubscribe(self._orders_channel)
+
+    def _on_order_stream_down(self) -> None:
+        self._orders.set_live(False)
+
+    def _on_order_message(self, message: Dict[str, Any]) -> None:
+        msg_type = str(message.get("type") or "")
+        if not msg_type.endswith("/account_all_orders"):
+            return
+        channel = str(message.get("channel") or "").replace(":", "/")
+        if channel != self._orders_channel:
+            return
+        self._orders.set_live(True)
+        orders = message.get("orders")
+        if not isinstance(orders, dict):
+            return
+        for market, items in orders.items():
+            for order in items or []:
+                if not isinstance(order, dict):
+                    continue
+                status = str(order.get("status") or "").lower()
+                self._orders.apply(market, order, status in _OPEN_ORDER_STATUSES)
+
+    def cached_orders(self, market_id: int) -> Optional[List[Any]]:
+        return self._orders.cached(int(market_id))
+
     async def active_orders(self, market_id: int) -> List[Any]:
+        try:
+            await self._start_order_stream()
+        except Exception as exc:
+            self._log(f"lighter.ws.orders.error err={type(exc).__name__}:{exc}")
+        fetched_at = time.monotonic()
         token = await self.auth_token()
         resp = await self._call_with_retry(
             self._order_api.account_active_orders,
@@ -219,7 +321,9 @@ class LighterTrader:
             market_id=int(market_id),
             auth=token,
         )
-        return list(getattr(resp, "orders", []) or [])
+        orders = list(getattr(resp, "orders", []) or [])
+        self._orders.reset(int(market_id), orders, fetched_at=fetched_at)
+        return orders
 
     async def position_base(self, market_id: int) -> Decimal:
         market_id = int(market_id)
@@ -296,7 +400,7 @@ class LighterTrader:
     ) -> None:
         tif = self._signer.ORDER_TIME_IN_FORCE_POST_ONLY if post_only else self._signer.ORDER_TIME_IN_FORCE_GOOD_TILL_TIME
         for attempt in range(self._retry_limit):
-            await self._throttle(self._min_trade_interval_s)
+            await self._throttle(PRIORITY_TRADE)
             async with self._nonce_lock:
                 started = time.monotonic()
                 _, resp, err = await self._signer.create_order(
@@ -315,7 +419,7 @@ class LighterTrader:
             if err is None and getattr(resp, "code", 0) in (0, 200):
                 return
             if self._resp_rate_limited(err, resp) and attempt < self._retry_limit - 1:
-                await asyncio.sleep(self._rate_limit_delay(attempt))
+                self._backoff(attempt)
                 continue
             if err is not None:
                 raise RuntimeError(err)
@@ -342,7 +446,7 @@ class LighterTrader:
         price_q = Decimal(str(avg_price)).quantize(q, rounding=ROUND_HALF_UP)
         price_int = int(price_q * (Decimal(10) ** int(meta.price_decimals)))
         for attempt in range(self._retry_limit):
-            await self._throttle(self._min_trade_interval_s)
+            await self._throttle(PRIORITY_TRADE)
             async with self._nonce_lock:
                 started = time.monotonic()
                 _, resp, err = await self._signer.create_market_order(
@@ -359,15 +463,150 @@ class LighterTrader:
             if err is None and getattr(resp, "code", 0) in (0, 200):
                 return
             if self._resp_rate_limited(err, resp) and attempt < self._retry_limit - 1:
-                await asyncio.sleep(self._rate_limit_delay(attempt))
+                self._backoff(attempt)
                 continue
             if err is not None:
                 raise RuntimeError(err)
             raise RuntimeError(f"send_tx code={getattr(resp, 'code', None)} msg={getattr(resp, 'message', None)}")
 
+    def _batch_supported(self) -> bool:
+        signer = self._signer
+        return (
+            callable(getattr(signer, "send_tx_batch", None))
+            and callable(getattr(signer, "sign_create_order", None))
+            and callable(getattr(signer, "sign_cancel_order", None))
+            and getattr(signer, "nonce_manager", None) is not None
+        )
+
+    async def _next_nonce(self) -> int:
+        manager = self._signer.nonce_manager
+        next_async = getattr(manager, "async_next_nonce", None)
+        if callable(next_async):
+            _, nonce = await next_async(self.api_key_index)
+        else:
+            _, nonce = manager.next_nonce()
+        return int(nonce)
+
+    async def _refresh_nonce(self) -> None:
+        manager = self._signer.nonce_manager
+        refresh_async = getattr(manager, "async_hard_refresh_nonce", None)
+        if callable(refresh_async):
+            await refresh_async(self.api_key_index)
+            return
+        refresh = getattr(manager, "hard_refresh_nonce", None)
+        if callable(refresh):
+            refresh(self.api_key_index)
+
+    async def _send_batch(self, name: str, items: List[Any], sign_one, key=lambda item: item) -> List[OrderResult]:
+        """在 nonce 锁内逐笔签名并通过 send_tx_batch 一次提交，整批共享结果。"""
+        for attempt in range(self._retry_limit):
+            await self._throttle(PRIORITY_TRADE)
+            err: Optional[object] = None
+            resp: Any = None
+            async with self._nonce_lock:
+                started = time.monotonic()
+                try:
+                    tx_types: List[int] = []
+                    tx_infos: List[str] = []
+                    for item in items:
+                        tx_type, tx_info = sign_one(item, await self._next_nonce())
+                        tx_types.append(tx_type)
+                        tx_infos.append(tx_info)
+                    resp = await self._signer.send_tx_batch(tx_types=tx_types, tx_infos=tx_infos)
+                except Exception as exc:
+                    err = exc
+                ok = err is None and getattr(resp, "code", 0) in (0, 200)
+                if not ok:
+                    try:
+                        await self._refresh_nonce()
+                    except Exception:
+                        pass
+            elapsed_ms = int((time.monotonic() - started) * 1000)
+            rate_limited = self._resp_rate_limited(err, resp)
+            self._log_latency(name, elapsed_ms, attempt + 1, rate_limited, err)
+            if ok:
+                return [OrderResult(key=key(item), ok=True) for item in items]
+            if rate_limited and attempt < self._retry_limit - 1:
+                self._backoff(attempt)
+                continue
+            if err is None:
+                err = RuntimeError(
+                    f"send_tx_batch code={getattr(resp, 'code', None)} msg={getattr(resp, 'message', None)}"
+                )
+            error = err if isinstance(err, BaseException) else RuntimeError(str(err))
+            return [OrderResult(key=key(item), ok=False, error=error) for item in items]
+        return []
+
+    async def create_limit_orders(self, market_id: int, orders: List[LimitOrderRequest]) -> List[OrderResult]:
+        results = await self._create_limit_orders(market_id, orders)
+        self._orders.track_created(int(market_id), orders, results)
+        return results
+
+    async def _create_limit_orders(self, market_id: int, orders: List[LimitOrderRequest]) -> List[OrderResult]:
+        if not orders:
+            return []
+        if len(orders) == 1 or not self._batch_supported():
+            return await create_limit_orders_concurrently(self, market_id, orders, limit=1)
+        signer = self._signer
+
+        def _sign(order: LimitOrderRequest, nonce: int) -> Tuple[int, str]:
+            tif = signer.ORDER_TIME_IN_FORCE_POST_ONLY if order.post_only else signer.ORDER_TIME_IN_FORCE_GOOD_TILL_TIME
+            result = signer.sign_create_order(
+                market_index=int(market_id),
+                client_order_index=int(order.client_order_index),
+                base_amount=int(order.base_amount),
+                price=int(order.price),
+                is_ask=int(bool(order.is_ask)),
+                order_type=signer.ORDER_TYPE_LIMIT,
+                time_in_force=tif,
+                reduce_only=bool(order.reduce_only),
+                nonce=nonce,
+                api_key_index=self.api_key_index,
+            )
+            return _signed_tx(result, getattr(signer, "TX_TYPE_CREATE_ORDER", TX_TYPE_CREATE_ORDER))
+
+        results: List[OrderResult] = []
+        for start in range(0, len(orders), TX_BATCH_LIMIT):
+            results.extend(
+                await self._send_batch(
+                    "create_limit_orders",
+                    list(orders[start : start + TX_BATCH_LIMIT]),
+                    _sign,
+                    key=lambda order: order.client_order_index,
+                )
+            )
+        return results
+
+    async def cancel_orders(self, market_id: int, order_indexes: List[Any]) -> List[OrderResult]:
+        results = await self._cancel_orders(market_id, order_indexes)
+        self._orders.track_canceled(int(market_id), results)
+        return results
+
+    async def _cancel_orders(self, market_id: int, order_indexes: List[Any]) -> List[OrderResult]:
+        if not order_indexes:
+            return []
+        if len(order_indexes) == 1 or not self._batch_supported():
+            return await cancel_orders_concurrently(self, market_id, order_indexes, limit=1)
+        signer = self._signer
+
+        def _sign(order_index: Any, nonce: int) -> Tuple[int, str]:
+            result = signer.sign_cancel_order(
+                market_index=int(market_id),
+                order_index=int(order_index),
+                nonce=nonce,
+                api_key_index=self.api_key_index,
+            )
+            return _signed_tx(result, getattr(signer, "TX_TYPE_CANCEL_ORDER", TX_TYPE_CANCEL_ORDER))
+
+        results: List[OrderResult] = []
+        keys = list(order_indexes)
+        for start in range(0, len(keys), TX_BATCH_LIMIT):
+            results.extend(await self._send_batch("cancel_orders", keys[start : start + TX_BATCH_LIMIT], _sign))
+        return results
+
     async def cancel_order(self, market_id: int, order_index: int) -> None:
         for attempt in range(self._retry_limit):
-            await self._throttle(self._min_trade_interval_s)
+            await self._throttle(PRIORITY_TRADE)
             async with self._nonce_lock:
                 started = time.monotonic()
                 _, resp, err = await self._signer.cancel_order(
@@ -380,7 +619,7 @@ class LighterTrader:
             if err is None and getattr(resp, "code", 0) in (0, 200):
                 return
             if self._resp_rate_limited(err, resp) and attempt < self._retry_limit - 1:
-                await asyncio.sleep(self._rate_limit_delay(attempt))
+                self._backoff(attempt)
                 continue
             if err is not None:
                 raise RuntimeError(err)
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.exchanges.types import LimitOrderRequest, OrderResult
+
+# 推送在线时，镜像超过该时长未经 REST 校准则视为过期，需重新拉取
+ORDER_MIRROR_RESYNC_S = 30.0
+# 已提交但尚未收到推送确认的订单，在镜像中最多保留的时长
+PENDING_ORDER_TTL_S = 5.0
+# 已关闭订单的墓碑保留时长，防止乱序推送或并发 REST 结果把它们复活
+CLOSED_ORDER_TTL_S = 60.0
+# 拿不到 SDK 断线回调的交易所：超过该时长没有任何推送即视为断线
+ORDER_STREAM_STALE_S = 15.0
+
+OrderKeys = Callable[[Any], Tuple[Any, Any]]
+
+
+def _key(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    text = str(value).strip()
+    return text or None
+
+
+def _cid(value: Any) -> Optional[int]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return value
+    if isinstance(value, str) and value.strip().isdigit():
+        return int(value.strip())
+    return None
+
+
+class OrderMirror:
+    """按市场维护的本地挂单镜像：账户订单推送增量更新，REST 结果定期校准。
+
+    cached() 仅在推送在线、且本次连接建立后已用 REST 校准过时返回挂单，否则返回 None 由调用方回退 REST。
+    stale_s 不为 None 时，超过该时长未收到 heartbeat()/set_live(True) 即按断线处理。
+    """
+
+    def __init__(
+        self,
+        order_keys: OrderKeys,
+        resync_s: float = ORDER_MIRROR_RESYNC_S,
+        pending_ttl_s: float = PENDING_ORDER_TTL_S,
+        stale_s: Optional[float] = None,
+    ) -> None:
+        self._order_keys = order_keys
+        self._resync_s = resync_s
+        self._pending_ttl_s = pending_ttl_s
+        self._orders: Dict[str, Dict[str, Tuple[float, Any]]] = {}
+        self._pending: Dict[str, Dict[int, Tuple[float, Dict[str, Any]]]] = {}
+        self._closed: Dict[str, Dict[str, float]] = {}
+        self._synced_at: Dict[str, float] = {}
+        self._live_since: Optional[float] = None
+        self._stale_s = stale_s
+        self._heard_at: Optional[float] = None
+
+    @property
+    def live(self) -> bool:
+        self._expire_stale(time.monotonic())
+        return self._live_since is not None
+
+    def set_live(self, live: bool) -> None:
+        if live:
+            now = time.monotonic()
+            self._heard_at = now
+            if self._live_since is None:
+                self._live_since = now
+            return
+        # 断线期间的推送已丢失，重连后必须重新用 REST 校准
+        self._live_since = None
+        self._heard_at = None
+        self._synced_at.clear()
+
+    def heartbeat(self, at: Optional[float] = None) -> None:
+        """推送连接仍在的信号（订单推送或同一连接上的其他消息），at 为收到消息的 monotonic 时刻。"""
+        now = time.monotonic()
+        at = now if at is None else at
+        if self._stale_s is not None and now - at >= self._stale_s:
+            return
+        if self._live_since is None:
+            self._live_since = now
+        if self._heard_at is None or at > self._heard_at:
+            self._heard_at = at
+
+    def _expire_stale(self, now: float) -> None:
+        if self._stale_s is None or self._live_since is None or self._heard_at is None:
+            return
+        if now - self._heard_at >= self._stale_s:
+            self.set_live(False)
+
+    def cached(self, market: Any) -> Optional[List[Any]]:
+        key = str(market)
+        now = time.monotonic()
+        self._expire_stale(now)
+        live_since = self._live_since
+        synced_at = self._synced_at.get(key)
+        if live_since is None or synced_at is None or synced_at < live_since:
+            return None
+        if now - synced_at >= self._resync_s:
+            return None
+        orders: List[Any] = [order for _, order in self._orders.get(key, {}).values()]
+        pending = self._pending.get(key)
+        if pending:
+            for cid, (added_at, order) in list(pending.items()):
+                if now - added_at >= self._pending_ttl_s:
+                    pending.pop(cid, None)
+                    continue
+                orders.append(order)
+        return orders
+
+    def reset(self, market: Any, orders: Iterable[Any], fetched_at: Optional[float] = None) -> None:
+        """用 REST 拉到的全量挂单覆盖镜像；fetched_at 为发起请求的时刻。"""
+        key = str(market)
+        started = time.monotonic() if fetched_at is None else fetched_at
+        closed = self._prune_closed(key)
+        current: Dict[str, Tuple[float, Any]] = {}
+        pending = self._pending.get(key, {})
+        for order in orders:
+            oid, cid = self._order_keys(order)
+            oid_key = _key(oid)
+            if oid_key is None or oid_key in closed:
+                continue
+            current[oid_key] = (started, order)
+            cid_value = _cid(cid)
+            if cid_value is not None:
+                pending.pop(cid_value, None)
+        # 请求期间经推送新增的挂单 REST 结果里可能还没有，保留
+        for oid_key, (seen_at, order) in self._orders.get(key, {}).items():
+            if seen_at > started and oid_key not in current:
+                current[oid_key] = (seen_at, order)
+        self._orders[key] = current
+        # 以请求发起时刻为准，避免请求期间的推送被视作已校准
+        self._synced_at[key] = started
+
+    def apply(self, market: Any, order: Any, is_open: bool) -> None:
+        """应用一条订单推送：挂单中则写入，已成交/撤销/拒绝则移除。"""
+        key = str(market)
+        oid, cid = self._order_keys(order)
+        cid_value = _cid(cid)
+        if cid_value is not None:
+            self._pending.get(key, {}).pop(cid_value, None)
+        oid_key = _key(oid)
+        if oid_key is None:
+            return
+        if not is_open:
+            self._mark_closed(key, oid_key)
+            return
+        if oid_key in self._prune_closed(key):
+            return
+        self._orders.setdefault(key, {})[oid_key] = (time.monotonic(), order)
+
+    def track_created(self, market: Any, orders: List[LimitOrderRequest], results: List[OrderResult]) -> None:
+        """下单成功后先登记为待确认挂单，避免推送到达前下一轮重复补单。"""
+        ok = {result.key for result in results if result.ok}
+        if not ok:
+            return
+        now = time.monotonic()
+        pending = self._pending.setdefault(str(market), {})
+        for req in orders:
+            if req.client_order_index not in ok:
+                continue
+            pending[int(req.client_order_index)] = (
+                now,
+                {
+                    "client_order_index": int(req.client_order_index),
+                    "base_price": int(req.price),
+                    "is_ask": bool(req.is_ask),
+                    "pending": True,
+                },
+            )
+
+    def track_canceled(self, market: Any, results: List[OrderResult]) -> None:
+        key = str(market)
+        for result in results:
+            oid_key = _key(result.key)
+            if result.ok and oid_key is not None:
+                self._mark_closed(key, oid_key)
+
+    def _mark_closed(self, key: str, oid_key: str) -> None:
+        orders = self._orders.get(key)
+        if orders is not None:
+            orders.pop(oid_key, None)
+        self._closed.setdefault(key, {})[oid_key] = time.monotonic()
+
+    def _prune_closed(self, key: str) -> Dict[str, float]:
+        closed = self._closed.get(key)
+        if not closed:
+            return {}
+        cutoff = time.monotonic() - CLOSED_ORDER_TTL_S
+        for oid_key, closed_at in list(closed.items()):
+            if closed_at < cutoff:
+                closed.pop(oid_key, None)
+        return closed
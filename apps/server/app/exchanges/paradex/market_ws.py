@@ -3,8 +3,12 @@ from __future__ import annotations
 import asyncio
 from contextlib import suppress
 import logging
+import time
 from decimal import Decimal
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.exchanges.book_events import BookUpdateNotifier
+from app.exchanges.tape import TAPE
 
 
 def _parse_decimal(value: Any) -> Optional[Decimal]:
@@ -30,10 +34,14 @@ class ParadexMarketData:
         self._events: Dict[str, asyncio.Event] = {}
         self._subscriptions: set[str] = set()
         self._connected = False
+        self._updates = BookUpdateNotifier()
+        # 同一（已鉴权）连接上最后收到消息的 monotonic 时刻，订单镜像据此判断推送是否在线
+        self.last_message_at: Optional[float] = None
 
     async def _on_message(self, _ws_channel: Any, message: Dict[str, Any]) -> None:
         if not isinstance(message, dict):
             return
+        self.last_message_at = time.monotonic()
         params = message.get("params")
         if not isinstance(params, dict):
             return
@@ -50,7 +58,11 @@ class ParadexMarketData:
         ask = _parse_decimal(data.get("ask"))
         if bid is None and ask is None:
             return
-        self._prices[market] = (bid, ask)
+        self._updates.touch(market)
+        if self._prices.get(market) != (bid, ask):
+            self._prices[market] = (bid, ask)
+            self._updates.notify(market)
+            TAPE.quote("paradex", market, bid, ask)
         event = self._events.get(market)
         if event:
             event.set()
@@ -63,10 +75,7 @@ class ParadexMarketData:
         async with self._lock:
             if market in self._subscriptions:
                 return
-            if not self._connected:
-                connected = await self._ws_client.connect()
-                self._connected = bool(connected)
-            if not self._connected:
+            if not await self._ensure_connected():
                 return
             from paradex_py.api.ws_client import ParadexWebsocketChannel
 
@@ -78,6 +87,28 @@ class ParadexMarketData:
             )
             self._subscriptions.add(market)
 
+    async def _ensure_connected(self) -> bool:
+        if not self._connected:
+            connected = await self._ws_client.connect()
+            self._connected = bool(connected)
+        return self._connected
+
+    async def subscribe_orders(self, callback: Callable[[Any, Dict[str, Any]], Awaitable[None]]) -> bool:
+        """复用同一条（已鉴权）连接订阅账户全部市场的订单推送。"""
+        if self._ws_client is None:
+            return False
+        async with self._lock:
+            if not await self._ensure_connected():
+                return False
+            from paradex_py.api.ws_client import ParadexWebsocketChannel
+
+            await self._ws_client.subscribe(
+                channel=ParadexWebsocketChannel.ORDERS,
+                callback=callback,
+                params={"market": "ALL"},
+            )
+            return True
+
     async def best_bid_ask(self, market: str) -> Tuple[Optional[Decimal], Optional[Decimal]]:
         market_key = str(market)
         await self._ensure_subscribed(market_key)
@@ -89,6 +120,15 @@ class ParadexMarketData:
                 pass
         return self._prices.get(market_key, (None, None))
 
+    def book_version(self, market: str) -> int:
+        return self._updates.version(str(market))
+
+    def quote_age(self, market: str) -> Optional[float]:
+        return self._updates.age(str(market))
+
+    async def wait_update(self, market: str, version: int, timeout_s: float) -> int:
+        return await self._updates.wait(str(market), version, timeout_s)
+
     async def close(self) -> None:
         if self._ws_client is None:
             return
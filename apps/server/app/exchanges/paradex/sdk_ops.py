@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import asyncio
 from decimal import Decimal
 from typing import Any, Dict, List, Optional
 
@@ -27,8 +28,11 @@ def _get_fee(item: Dict[str, Any], key: str) -> Optional[str]:
 async def fetch_perp_markets(env: str) -> List[Dict[str, Any]]:
     from paradex_py.api.api_client import ParadexApiClient
 
+    from app.exchanges.paradex.trader import paradex_executor
+
+    loop = asyncio.get_running_loop()
     api = ParadexApiClient(env=_env_value(env))
-    data = api.fetch_markets()
+    data = await loop.run_in_executor(paradex_executor(), api.fetch_markets)
     items = list(data.get("results") or [])
     results: List[Dict[str, Any]] = []
     for item in items:
@@ -71,7 +75,7 @@ async def test_connection(
         l2_private_key=l2_private_key,
     )
     try:
-        summary = trader._api.fetch_account_summary()
+        summary = await trader.call(trader._api.fetch_account_summary)
         if hasattr(summary, "model_dump"):
             data = summary.model_dump()
         elif hasattr(summary, "to_dict"):
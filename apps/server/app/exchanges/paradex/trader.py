@@ -1,12 +1,35 @@
 from __future__ import annotations
 
 import asyncio
+import functools
 import time
+from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
 from typing import Any, Dict, List, Optional, Tuple
 
+from app.core.metrics import REST_ERRORS, REST_LATENCY
+from app.exchanges.batching import cancel_orders_concurrently, create_limit_orders_concurrently
+from app.exchanges.order_mirror import ORDER_STREAM_STALE_S, OrderMirror
 from app.exchanges.paradex.market_ws import ParadexMarketData
-from app.exchanges.types import MarketMeta
+from app.exchanges.rate_limit import PRIORITY_TRADE, is_rate_limited_error, rate_limiter
+from app.exchanges.types import LimitOrderRequest, MarketMeta, OrderResult
+
+# orders/batch 单次最多订单数
+ORDER_BATCH_LIMIT = 10
+# paradex_py 为同步 SDK，统一放到专用线程池执行，避免阻塞事件循环
+PARADEX_IO_WORKERS = 8
+PARADEX_CALL_TIMEOUT_S = 10.0
+# 收到限流响应后整个账户暂停放行的时长
+PARADEX_RATE_LIMIT_BACKOFF_S = 1.0
+
+_io_executor: Optional[ThreadPoolExecutor] = None
+
+
+def paradex_executor() -> ThreadPoolExecutor:
+    global _io_executor
+    if _io_executor is None:
+        _io_executor = ThreadPoolExecutor(max_workers=PARADEX_IO_WORKERS, thread_name_prefix="paradex-io")
+    return _io_executor
 
 
 def _env_value(env: str) -> str:
@@ -28,6 +51,52 @@ def _safe_decimal(value: Any) -> Decimal:
         return Decimal(0)
 
 
+def _batch_create_results(chunk: List[LimitOrderRequest], resp: Any) -> List[OrderResult]:
+    if not isinstance(resp, dict):
+        return [OrderResult(key=order.client_order_index, ok=True) for order in chunk]
+    accepted = {
+        str(item.get("client_id"))
+        for item in (resp.get("orders") or [])
+        if isinstance(item, dict) and item.get("client_id") is not None
+    }
+    errors = list(resp.get("errors") or [])
+    aligned = len(errors) == len(chunk)
+    results: List[OrderResult] = []
+    for i, order in enumerate(chunk):
+        err = errors[i] if aligned else None
+        if err is None and (not errors or aligned or str(order.client_order_index) in accepted):
+            results.append(OrderResult(key=order.client_order_index, ok=True))
+        else:
+            results.append(OrderResult(key=order.client_order_index, ok=False, error=RuntimeError(str(err or errors))))
+    return results
+
+
+def _batch_cancel_results(order_ids: List[str], keys: List[Any], resp: Any) -> List[OrderResult]:
+    failed: Dict[str, str] = {}
+    if isinstance(resp, dict):
+        for item in resp.get("results") or []:
+            if not isinstance(item, dict):
+                continue
+            oid = str(item.get("id") or item.get("order_id") or "")
+            err = item.get("error")
+            if oid and err:
+                failed[oid] = str(err)
+    return [
+        OrderResult(key=key, ok=oid not in failed, error=RuntimeError(failed[oid]) if oid in failed else None)
+        for oid, key in zip(order_ids, keys)
+    ]
+
+
+def _order_keys(order: Any) -> Tuple[Any, Any]:
+    if isinstance(order, dict):
+        return order.get("id"), order.get("client_id")
+    return getattr(order, "id", None), getattr(order, "client_id", None)
+
+
+# 订单推送中仍在簿上的状态；CLOSED 表示已成交/撤销/拒绝
+_OPEN_ORDER_STATUSES = {"NEW", "UNTRIGGERED", "OPEN"}
+
+
 class ParadexTrader:
     def __init__(
         self,
@@ -54,11 +123,40 @@ class ParadexTrader:
 
         self._api = self._client.api_client
         self._market_ws = ParadexMarketData(getattr(self._client, "ws_client", None))
+        self._orders = OrderMirror(_order_keys, stale_s=ORDER_STREAM_STALE_S)
+        self._orders_stream_started = False
+        self._limiter = rate_limiter("paradex", self.account_key)
         self._positions_lock = asyncio.Lock()
         self._positions_cached_at = 0.0
         self._positions_cache: Dict[str, Decimal] = {}
         self._positions_ttl_s = 2.0
 
+    async def call(
+        self,
+        func,
+        *args,
+        timeout_s: Optional[float] = None,
+        weight: float = 1.0,
+        priority: Optional[int] = None,
+        **kwargs,
+    ) -> Any:
+        """经账户令牌桶放行后在 Paradex 线程池中执行同步 SDK 调用；超时抛 TimeoutError（线程内请求仍会自然结束）。"""
+        await self._limiter.acquire(weight, priority)
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(paradex_executor(), functools.partial(func, *args, **kwargs))
+        timeout = PARADEX_CALL_TIMEOUT_S if timeout_s is None else timeout_s
+        op = getattr(func, "__name__", "call")
+        started = time.perf_counter()
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except Exception as exc:
+            REST_ERRORS.inc("paradex", op)
+            if is_rate_limited_error(exc):
+                self._limiter.backoff(PARADEX_RATE_LIMIT_BACKOFF_S)
+            raise
+        finally:
+            REST_LATENCY.observe("paradex", op, value=time.perf_counter() - started)
+
     def check_client(self) -> Optional[str]:
         try:
             self._api.fetch_account_summary()
@@ -79,10 +177,10 @@ class ParadexTrader:
         if cached:
             return cached
 
-        data = self._api.fetch_markets({"market": market})
+        data = await self.call(self._api.fetch_markets, {"market": market})
         items = list(data.get("results") or [])
         if not items:
-            data = self._api.fetch_markets()
+            data = await self.call(self._api.fetch_markets)
             items = list(data.get("results") or [])
 
         target = None
@@ -114,17 +212,58 @@ class ParadexTrader:
                 return bid_ws, ask_ws
         except Exception:
             pass
-        data = self._api.fetch_bbo(market)
+        data = await self.call(self._api.fetch_bbo, market)
         bid = data.get("bid")
         ask = data.get("ask")
         bid_v = _safe_decimal(bid) if bid is not None else None
         ask_v = _safe_decimal(ask) if ask is not None else None
         return bid_v, ask_v
 
+    def book_version(self, market_id: str | int) -> int:
+        return self._market_ws.book_version(str(market_id))
+
+    def quote_age(self, market_id: str | int) -> Optional[float]:
+        return self._market_ws.quote_age(str(market_id))
+
+    async def wait_book_update(self, market_id: str | int, version: int, timeout_s: float) -> int:
+        return await self._market_ws.wait_update(str(market_id), version, timeout_s)
+
+    async def _start_order_stream(self) -> None:
+        if self._orders_stream_started:
+            return
+        if await self._market_ws.subscribe_orders(self._on_order_message):
+            self._orders_stream_started = True
+            self._orders.set_live(True)
+
+    async def _on_order_message(self, _ws_channel: Any, message: Dict[str, Any]) -> None:
+        self._orders.heartbeat()
+        params = message.get("params") if isinstance(message, dict) else None
+        data = params.get("data") if isinstance(params, dict) else None
+        if not isinstance(data, dict):
+            return
+        market = str(data.get("market") or "")
+        if not market:
+            return
+        status = str(data.get("status") or "").upper()
+        self._orders.apply(market, data, status in _OPEN_ORDER_STATUSES)
+
+    def cached_orders(self, market_id: str | int) -> Optional[List[Any]]:
+        # SDK 不暴露断线回调：订单推送与 BBO 共用一条连接，任一消息都算心跳，超时即回退 REST
+        if self._orders_stream_started and self._market_ws.last_message_at is not None:
+            self._orders.heartbeat(self._market_ws.last_message_at)
+        return self._orders.cached(str(market_id))
+
     async def active_orders(self, market_id: str | int) -> List[Any]:
         market = str(market_id)
-        data = self._api.fetch_orders({"market": market})
-        return list(data.get("results") or [])
+        try:
+            await self._start_order_stream()
+        except Exception:
+            pass
+        fetched_at = time.monotonic()
+        data = await self.call(self._api.fetch_orders, {"market": market})
+        orders = list(data.get("results") or [])
+        self._orders.reset(market, orders, fetched_at=fetched_at)
+        return orders
 
     async def position_base(self, market_id: str | int) -> Decimal:
         market = str(market_id)
@@ -137,7 +276,7 @@ class ParadexTrader:
             if (now - self._positions_cached_at) < self._positions_ttl_s:
                 return self._positions_cache.get(market, Decimal(0))
 
-            data = self._api.fetch_positions()
+            data = await self.call(self._api.fetch_positions)
             results = list(data.get("results") or [])
             cache: Dict[str, Decimal] = {}
             for item in results:
@@ -153,6 +292,24 @@ class ParadexTrader:
             self._positions_cached_at = now
             return cache.get(market, Decimal(0))
 
+    def _limit_order(self, market_id: str | int, meta: MarketMeta, req: LimitOrderRequest) -> Any:
+        from paradex_py.common.order import Order, OrderSide, OrderType
+
+        price_dec = Decimal(int(req.price)) / (Decimal(10) ** int(meta.price_decimals))
+        size_dec = Decimal(int(req.base_amount)) / (Decimal(10) ** int(meta.size_decimals))
+        instruction = "POST_ONLY" if req.post_only else "GTC"
+        side = OrderSide.Sell if req.is_ask else OrderSide.Buy
+        return Order(
+            market=str(market_id),
+            order_type=OrderType.Limit,
+            order_side=side,
+            size=size_dec,
+            limit_price=price_dec,
+            client_id=str(req.client_order_index),
+            instruction=instruction,
+            reduce_only=req.reduce_only,
+        )
+
     async def create_limit_order(
         self,
         market_id: str | int,
@@ -163,24 +320,42 @@ class ParadexTrader:
         post_only: bool = True,
         reduce_only: bool = False,
     ) -> None:
-        from paradex_py.common.order import Order, OrderSide, OrderType
-
         meta = await self.market_meta(market_id)
-        price_dec = Decimal(int(price)) / (Decimal(10) ** int(meta.price_decimals))
-        size_dec = Decimal(int(base_amount)) / (Decimal(10) ** int(meta.size_decimals))
-        instruction = "POST_ONLY" if post_only else "GTC"
-        side = OrderSide.Sell if is_ask else OrderSide.Buy
-        order = Order(
-            market=str(market_id),
-            order_type=OrderType.Limit,
-            order_side=side,
-            size=size_dec,
-            limit_price=price_dec,
-            client_id=str(client_order_index),
-            instruction=instruction,
+        req = LimitOrderRequest(
+            client_order_index=client_order_index,
+            base_amount=base_amount,
+            price=price,
+            is_ask=is_ask,
+            post_only=post_only,
             reduce_only=reduce_only,
         )
-        self._api.submit_order(order)
+        await self.call(self._api.submit_order, self._limit_order(market_id, meta, req), priority=PRIORITY_TRADE)
+
+    async def create_limit_orders(self, market_id: str | int, orders: List[LimitOrderRequest]) -> List[OrderResult]:
+        results = await self._create_limit_orders(market_id, orders)
+        self._orders.track_created(str(market_id), orders, results)
+        return results
+
+    async def _create_limit_orders(self, market_id: str | int, orders: List[LimitOrderRequest]) -> List[OrderResult]:
+        submit_batch = getattr(self._api, "submit_orders_batch", None)
+        if len(orders) <= 1 or not callable(submit_batch):
+            return await create_limit_orders_concurrently(self, market_id, orders)
+        meta = await self.market_meta(market_id)
+        results: List[OrderResult] = []
+        for start in range(0, len(orders), ORDER_BATCH_LIMIT):
+            chunk = list(orders[start : start + ORDER_BATCH_LIMIT])
+            try:
+                resp = await self.call(
+                    submit_batch,
+                    [self._limit_order(market_id, meta, req) for req in chunk],
+                    weight=len(chunk),
+                    priority=PRIORITY_TRADE,
+                )
+            except Exception as exc:
+                results.extend(OrderResult(key=req.client_order_index, ok=False, error=exc) for req in chunk)
+                continue
+            results.extend(_batch_create_results(chunk, resp))
+        return results
 
     async def create_market_order(
         self,
@@ -211,7 +386,24 @@ class ParadexTrader:
         except TypeError:
             order_kwargs["instruction"] = "IOC"
             order = Order(**order_kwargs)
-        self._api.submit_order(order)
+        await self.call(self._api.submit_order, order, priority=PRIORITY_TRADE)
 
     async def cancel_order(self, market_id: str | int, order_index: Any) -> None:
-        self._api.cancel_order(str(order_index))
+        await self.call(self._api.cancel_order, str(order_index), priority=PRIORITY_TRADE)
+
+    async def cancel_orders(self, market_id: str | int, order_indexes: List[Any]) -> List[OrderResult]:
+        results = await self._cancel_orders(market_id, order_indexes)
+        self._orders.track_canceled(str(market_id), results)
+        return results
+
+    async def _cancel_orders(self, market_id: str | int, order_indexes: List[Any]) -> List[OrderResult]:
+        cancel_batch = getattr(self._api, "cancel_orders_batch", None)
+        if len(order_indexes) <= 1 or not callable(cancel_batch):
+            return await cancel_orders_concurrently(self, market_id, order_indexes)
+        keys = list(order_indexes)
+        order_ids = [str(key) for key in keys]
+        try:
+            resp = await self.call(cancel_batch, order_ids=order_ids, weight=len(order_ids), priority=PRIORITY_TRADE)
+        except Exception as exc:
+            return [OrderResult(key=key, ok=False, error=exc) for key in keys]
+        return _batch_cancel_results(order_ids, keys, resp)
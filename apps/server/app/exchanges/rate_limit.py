@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import heapq
+import itertools
+import re
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# 优先级数值越小越先放行：下单/撤单 > 策略循环查询 > 状态/统计/界面读取
+PRIORITY_TRADE = 0
+PRIORITY_QUERY = 1
+PRIORITY_BACKGROUND = 2
+
+
+@dataclass(frozen=True)
+class RateLimit:
+    rate_per_s: float
+    burst: float
+
+
+# 每个交易所账户的令牌桶参数（按权重计），略低于交易所公布的限额
+EXCHANGE_RATE_LIMITS: Dict[str, RateLimit] = {
+    "lighter": RateLimit(rate_per_s=5.0, burst=5.0),
+    "paradex": RateLimit(rate_per_s=15.0, burst=30.0),
+    "grvt": RateLimit(rate_per_s=10.0, burst=20.0),
+}
+DEFAULT_RATE_LIMIT = RateLimit(rate_per_s=5.0, burst=5.0)
+
+_priority: contextvars.ContextVar[int] = contextvars.ContextVar("rate_priority", default=PRIORITY_QUERY)
+
+
+# 单独出现的 429（HTTP 状态码），不匹配订单号等更长数字中的 429
+_HTTP_429 = re.compile(r"(?<!\d)429(?!\d)")
+
+
+def is_rate_limited_text(text: str) -> bool:
+    """各交易所限流报错的统一匹配（异常文本、响应 message 等）。"""
+    lowered = text.lower()
+    return (
+        "too many request" in lowered
+        or "rate limit" in lowered
+        or "code=23000" in lowered
+        or "\"code\": 23000" in lowered
+        or _HTTP_429.search(lowered) is not None
+    )
+
+
+def is_rate_limited_error(exc: BaseException) -> bool:
+    return is_rate_limited_text(str(exc))
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+def set_priority(priority: int) -> None:
+    """设置当前任务（及其后创建的子任务）的默认优先级。"""
+    _priority.set(int(priority))
+
+
+@contextmanager
+def rate_priority(priority: int) -> Iterator[None]:
+    token = _priority.set(int(priority))
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+class TokenBucket:
+    """按权重计的令牌桶；令牌不足时按优先级、先来先到排队放行。"""
+
+    def __init__(self, rate_per_s: float, burst: float) -> None:
+        self.rate_per_s = max(1e-6, float(rate_per_s))
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: List[Tuple[int, int, float, asyncio.Future[None]]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def tokens(self) -> float:
+        self._refill(time.monotonic())
+        return self._tokens
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for *_, fut in self._waiters if not fut.done())
+
+    def _refill(self, now: float) -> None:
+        if now > self._updated:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate_per_s)
+            self._updated = now
+
+    async def acquire(self, weight: float = 1.0, priority: Optional[int] = None) -> None:
+        cost = min(float(weight), self.burst)
+        prio = current_priority() if priority is None else int(priority)
+        now = time.monotonic()
+        self._refill(now)
+        if not self._waiters and now >= self._paused_until and self._tokens >= cost:
+            self._tokens -= cost
+            return
+        fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (prio, next(self._seq), cost, fut))
+        self._drain()
+        await fut
+
+    def backoff(self, delay_s: float) -> None:
+        """交易所返回限流时调用：清空令牌并暂停放行 delay_s 秒。"""
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens = 0.0
+        self._paused_until = max(self._paused_until, now + max(0.0, float(delay_s)))
+        self._schedule(self._paused_until - now)
+
+    def _drain(self) -> None:
+        self._wakeup = None
+        now = time.monotonic()
+        self._refill(now)
+        waiters = self._waiters
+        while waiters and waiters[0][3].done():
+            heapq.heappop(waiters)
+        if not waiters:
+            return
+        if now < self._paused_until:
+            self._schedule(self._paused_until - now)
+            return
+        while waiters:
+            _, _, cost, fut = waiters[0]
+            if fut.done():
+                heapq.heappop(waiters)
+                continue
+            if self._tokens < cost:
+                self._schedule((cost - self._tokens) / self.rate_per_s)
+                return
+            heapq.heappop(waiters)
+            self._tokens -= cost
+            fut.set_result(None)
+
+    def _schedule(self, delay_s: float) -> None:
+        if self._wakeup is not None:
+            self._wakeup.cancel()
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        self._wakeup = loop.call_later(max(0.0, delay_s), self._drain)
+
+
+_limiters: Dict[Tuple[str, str], TokenBucket] = {}
+
+
+def rate_limiter(exchange: str, account_key: Any) -> TokenBucket:
+    """同一交易所账户在所有 trader、策略与接口间共享一个令牌桶。"""
+    key = (str(exchange).lower(), str(account_key))
+    limiter = _limiters.get(key)
+    if limiter is None:
+        limit = EXCHANGE_RATE_LIMITS.get(key[0], DEFAULT_RATE_LIMIT)
+        limiter = TokenBucket(limit.rate_per_s, limit.burst)
+        _limiters[key] = limiter
+    return limiter
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import asyncio
+import heapq
+import logging
+import re
+import struct
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from app.core.metrics import PERSIST_ERRORS
+
+# 行情磁带：按 交易所/市场/UTC 日期 追加写入的二进制分段文件。
+# 文件以 TAPE_MAGIC 开头，之后每条记录为 头部(kind, ts_ms, payload 长度) + payload；
+# 价格与数量按 (int64 尾数, int8 指数) 精确保存 Decimal。
+
+TAPE_MAGIC = b"GTAPE1\n"
+TAPE_SUFFIX = ".tape"
+KIND_QUOTE = 1
+KIND_DEPTH = 2
+KIND_FILL = 3
+# 仅在内存缓冲中使用：原始盘口副本，写盘时再取前 N 档编码为 KIND_DEPTH
+_KIND_BOOK_RAW = -1
+DEFAULT_FLUSH_INTERVAL_S = 1.0
+# 写盘跟不上时内存中最多积压的记录数，超出的丢弃并计数
+DEFAULT_MAX_BUFFER = 200_000
+
+_HEADER = struct.Struct("<BqH")
+_NUM = struct.Struct("<qb")
+_COUNTS = struct.Struct("<HH")
+_SIDE = struct.Struct("<B")
+_NONE_EXP = -128
+_INT64_MAX = 2**63 - 1
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]")
+
+Level = Tuple[Decimal, Decimal]
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class TapeRecord:
+    kind: int
+    ts_ms: int
+    bid: Optional[Decimal] = None
+    ask: Optional[Decimal] = None
+    bids: Tuple[Level, ...] = ()
+    asks: Tuple[Level, ...] = ()
+    side: str = ""
+    price: Optional[Decimal] = None
+    size: Optional[Decimal] = None
+
+
+def _pack_num(value: Optional[Decimal]) -> bytes:
+    if value is None:
+        return _NUM.pack(0, _NONE_EXP)
+    sign, digits, exponent = value.as_tuple()
+    if not isinstance(exponent, int):
+        return _NUM.pack(0, _NONE_EXP)
+    units = int("".join(map(str, digits)) or "0")
+    # 尾数超出 int64 或指数超出 int8 时先去掉末尾 0，再降低精度
+    if units > _INT64_MAX or not -127 <= exponent <= 127:
+        value = value.normalize()
+        sign, digits, exponent = value.as_tuple()
+        if len(digits) > 18:
+            value = value.quantize(Decimal(1).scaleb(exponent + len(digits) - 18))
+            sign, digits, exponent = value.as_tuple()
+        units = int("".join(map(str, digits)) or "0")
+        exponent = max(-127, min(127, int(exponent)))
+    return _NUM.pack(-units if sign else units, exponent)
+
+
+def _unpack_num(buf: bytes, offset: int) -> Optional[Decimal]:
+    units, exponent = _NUM.unpack_from(buf, offset)
+    if exponent == _NONE_EXP:
+        return None
+    return Decimal(units).scaleb(exponent)
+
+
+def encode_record(kind: int, ts_ms: int, payload: Any) -> bytes:
+    if kind == KIND_QUOTE:
+        bid, ask = payload
+        body = _pack_num(bid) + _pack_num(ask)
+    elif kind == KIND_DEPTH:
+        bids, asks = payload
+        parts = [_COUNTS.pack(len(bids), len(asks))]
+        for price, size in list(bids) + list(asks):
+            parts.append(_pack_num(price))
+            parts.append(_pack_num(size))
+        body = b"".join(parts)
+    elif kind == KIND_FILL:
+        side, price, size = payload
+        body = _SIDE.pack(1 if side == "ask" else 0) + _pack_num(price) + _pack_num(size)
+    else:
+        raise ValueError(f"unknown tape record kind: {kind}")
+    return _HEADER.pack(kind, int(ts_ms), len(body)) + body
+
+
+def _decode(kind: int, ts_ms: int, body: bytes) -> Optional[TapeRecord]:
+    step = _NUM.size
+    if kind == KIND_QUOTE:
+        return TapeRecord(kind, ts_ms, bid=_unpack_num(body, 0), ask=_unpack_num(body, step))
+    if kind == KIND_DEPTH:
+        n_bids, n_asks = _COUNTS.unpack_from(body, 0)
+        offset = _COUNTS.size
+        levels: list[Level] = []
+        for _ in range(n_bids + n_asks):
+            price = _unpack_num(body, offset)
+            size = _unpack_num(body, offset + step)
+            offset += 2 * step
+            levels.append((price or Decimal(0), size or Decimal(0)))
+        return TapeRecord(kind, ts_ms, bids=tuple(levels[:n_bids]), asks=tuple(levels[n_bids:]))
+    if kind == KIND_FILL:
+        (side,) = _SIDE.unpack_from(body, 0)
+        return TapeRecord(
+            kind,
+            ts_ms,
+            side="ask" if side else "bid",
+            price=_unpack_num(body, _SIDE.size),
+            size=_unpack_num(body, _SIDE.size + step),
+        )
+    return None
+
+
+def read_tape(path: Path) -> Iterator[TapeRecord]:
+    """顺序读取一个分段；未知类型跳过，末尾写了一半的记录忽略。"""
+    data = Path(path).read_bytes()
+    if not data.startswith(TAPE_MAGIC):
+        return
+    offset = len(TAPE_MAGIC)
+    end = len(data)
+    while offset + _HEADER.size <= end:
+        kind, ts_ms, length = _HEADER.unpack_from(data, offset)
+        offset += _HEADER.size
+        if offset + length > end:
+            return
+        record = _decode(kind, ts_ms, data[offset : offset + length])
+        offset += length
+        if record is not None:
+            yield record
+
+
+def market_dir(root: Path, exchange: str, market: Any) -> Path:
+    return Path(root) / _UNSAFE.sub("_", str(exchange)) / _UNSAFE.sub("_", str(market))
+
+
+def tape_files(root: Path, exchange: str, market: Any) -> list[Path]:
+    """某市场的全部分段，按日期升序。"""
+    folder = market_dir(root, exchange, market)
+    if not folder.exists():
+        return []
+    return sorted(folder.glob(f"*{TAPE_SUFFIX}"))
+
+
+def top_levels(book_side: Mapping[str, Decimal], depth: int, is_bid: bool) -> List[Level]:
+    """取最优的 depth 档 (价格, 数量)，买盘降序、卖盘升序；book_side 以价格字符串为键。"""
+    levels = ((Decimal(price), size) for price, size in book_side.items())
+    pick = heapq.nlargest if is_bid else heapq.nsmallest
+    return pick(depth, levels, key=lambda level: level[0])
+
+
+def _day(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime("%Y%m%d")
+
+
+class TapeRecorder:
+    """行情录制：回调中只做一次追加，编码与写盘由后台任务在线程中批量完成。默认关闭。"""
+
+    def __init__(self, max_buffer: int = DEFAULT_MAX_BUFFER) -> None:
+        self.enabled = False
+        self.depth = 0
+        self.dropped = 0
+        # 写盘失败而丢失的记录数
+        self.write_errors = 0
+        self._root: Optional[Path] = None
+        self._max_buffer = int(max_buffer)
+        self._buffer: list[tuple[str, str, int, int, Any]] = []
+        self._files: Dict[tuple[str, str], tuple[str, BinaryIO]] = {}
+        self._flush_interval_s = DEFAULT_FLUSH_INTERVAL_S
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._task: Optional[asyncio.Task[None]] = None
+
+    @property
+    def root(self) -> Optional[Path]:
+        return self._root
+
+    def configure(self, root: Path, runtime: Mapping[str, Any]) -> None:
+        """读取 runtime.tape_enabled / tape_depth / tape_flush_ms；root 为磁带根目录。"""
+        self._root = Path(root)
+        self.depth = max(0, int(runtime.get("tape_depth") or 0))
+        flush_ms = runtime.get("tape_flush_ms")
+        self._flush_interval_s = max(0.05, float(flush_ms) / 1000) if flush_ms else DEFAULT_FLUSH_INTERVAL_S
+        self.enabled = bool(runtime.get("tape_enabled", False))
+
+    def _append(self, exchange: str, market: Any, kind: int, ts_ms: Optional[int], payload: Any) -> None:
+        if len(self._buffer) >= self._max_buffer:
+            self.dropped += 1
+            return
+        if ts_ms is None:
+            ts_ms = int(time.time() * 1000)
+        self._buffer.append((exchange, str(market), kind, ts_ms, payload))
+
+    def quote(self, exchange: str, market: Any, bid: Optional[Decimal], ask: Optional[Decimal]) -> None:
+        if self.enabled:
+            self._append(exchange, market, KIND_QUOTE, None, (bid, ask))
+
+    def book(self, exchange: str, market: Any, bids: Sequence[Level], asks: Sequence[Level]) -> None:
+        if self.enabled and self.depth:
+            self._append(exchange, market, KIND_DEPTH, None, (tuple(bids), tuple(asks)))
+
+    def book_levels(
+        self,
+        exchange: str,
+        market: Any,
+        bids: Mapping[str, Decimal],
+        asks: Mapping[str, Decimal],
+    ) -> None:
+        """记录原始盘口（价格字符串 -> 数量）的副本；解析价格与取前 N 档留给后台写盘。"""
+        if self.enabled and self.depth:
+            self._append(exchange, market, _KIND_BOOK_RAW, None, (dict(bids), dict(asks), self.depth))
+
+    def fill(
+        self,
+        exchange: str,
+        market: Any,
+        side: str,
+        price: Decimal,
+        size: Decimal,
+        ts_ms: Optional[int] = None,
+    ) -> None:
+        if self.enabled:
+            self._append(exchange, market, KIND_FILL, ts_ms, (side, price, size))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._flush_lock = asyncio.Lock()
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self._flush_interval_s)
+            try:
+                await self.flush()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                # 写盘失败不影响行情回调；本批已计入 write_errors，下一轮继续写新的数据
+                logger.warning("tape.write.error lost=%s err=%s:%s", self.write_errors, type(exc).__name__, exc)
+
+    async def flush(self) -> None:
+        if not self._buffer or self._root is None:
+            return
+        lock = self._flush_lock or asyncio.Lock()
+        async with lock:
+            batch, self._buffer = self._buffer, []
+            try:
+                await asyncio.to_thread(self._write, batch)
+            except Exception:
+                self.write_errors += len(batch)
+                PERSIST_ERRORS.inc("tape", "dropped", amount=len(batch))
+                raise
+
+    def _write(self, batch: Iterable[tuple[str, str, int, int, Any]]) -> None:
+        chunks: Dict[tuple[str, str, str], list[bytes]] = {}
+        for exchange, market, kind, ts_ms, payload in batch:
+            if kind == _KIND_BOOK_RAW:
+                bids, asks, depth = payload
+                kind, payload = KIND_DEPTH, (top_levels(bids, depth, True), top_levels(asks, depth, False))
+            chunks.setdefault((exchange, market, _day(ts_ms)), []).append(encode_record(kind, ts_ms, payload))
+        for (exchange, market, day), parts in chunks.items():
+            handle = self._handle(exchange, market, day)
+            handle.write(b"".join(parts))
+            handle.flush()
+
+    def _handle(self, exchange: str, market: str, day: str) -> BinaryIO:
+        key = (exchange, market)
+        current = self._files.get(key)
+        if current is not None and current[0] == day:
+            return current[1]
+        if current is not None:
+            current[1].close()
+        assert self._root is not None
+        folder = market_dir(self._root, exchange, market)
+        folder.mkdir(parents=True, exist_ok=True)
+        path = folder / f"{day}{TAPE_SUFFIX}"
+        handle: BinaryIO = open(path, "ab")
+        if handle.tell() == 0:
+            handle.write(TAPE_MAGIC)
+        self._files[key] = (day, handle)
+        return handle
+
+    async def close(self) -> None:
+        task, self._task = self._task, None
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+        for _, handle in self._files.values():
+            handle.close()
+        self._files.clear()
+
+
+TAPE = TapeRecorder()
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from decimal import Decimal
-from typing import Any, Protocol, Tuple
+from typing import Any, Optional, Protocol, Tuple
 
 
 @dataclass
@@ -15,6 +15,34 @@ class MarketMeta:
     min_quote_amount: Decimal
 
 
+@dataclass
+class LimitOrderRequest:
+    client_order_index: int
+    base_amount: int
+    price: int
+    is_ask: bool
+    post_only: bool = True
+    reduce_only: bool = False
+
+
+@dataclass
+class OrderResult:
+    """批量下单/撤单中单笔的结果；key 为下单的 client_order_index 或撤单的 order_index。"""
+
+    key: Any
+    ok: bool
+    error: Optional[BaseException] = None
+
+
+@dataclass(frozen=True)
+class FillRecord:
+    """单笔成交：key 用于同一毫秒内去重，notional 为成交额绝对值。"""
+
+    ts_ms: int
+    key: str
+    notional: Decimal
+
+
 class Trader(Protocol):
     env: str
     account_key: str | int
@@ -29,6 +57,8 @@ class Trader(Protocol):
 
     async def active_orders(self, market_id: str | int) -> list[Any]: ...
 
+    def cached_orders(self, market_id: str | int) -> Optional[list[Any]]: ...
+
     async def position_base(self, market_id: str | int) -> Decimal: ...
 
     async def create_limit_order(
@@ -51,3 +81,17 @@ class Trader(Protocol):
     ) -> None: ...
 
     async def cancel_order(self, market_id: str | int, order_index: Any) -> None: ...
+
+    async def create_limit_orders(
+        self,
+        market_id: str | int,
+        orders: list[LimitOrderRequest],
+    ) -> list[OrderResult]: ...
+
+    async def cancel_orders(self, market_id: str | int, order_indexes: list[Any]) -> list[OrderResult]: ...
+
+    def book_version(self, market_id: str | int) -> int: ...
+
+    def quote_age(self, market_id: str | int) -> Optional[float]: ...
+
+    async def wait_book_update(self, market_id: str | int, version: int, timeout_s: float) -> int: ...
@@ -1,24 +1,25 @@
 from __future__ import annotations
 
+import asyncio
 import hashlib
+import hmac
 import secrets
 import time
-from datetime import datetime, timezone
 from decimal import Decimal, ROUND_HALF_UP
 from pathlib import Path
 from typing import Any, Dict, Optional
 
 from cryptography.fernet import Fernet
 from fastapi import Body, Depends, FastAPI, HTTPException, Request, Response
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from starlette.responses import StreamingResponse
 
 from app.core.config_store import ConfigStore, default_data_dir
 from app.core.logbus import LogBus
+from app.core.metrics import METRICS, monitor_event_loop_lag
 from app.core.security import decrypt_str, derive_fernet, encrypt_str, new_salt_b64, password_hash_b64, verify_password
-from app.exchanges.grvt.market_ws import _parse_price as grvt_parse_price
 from app.exchanges.grvt.sdk_ops import fetch_perp_markets as grvt_fetch_perp_markets, test_connection as grvt_test_connection
 from app.exchanges.grvt.trader import GrvtTrader
 from app.exchanges.lighter.public_api import LighterPublicClient, base_url as lighter_base_url
@@ -26,16 +27,17 @@ from app.exchanges.lighter.sdk_ops import fetch_perp_markets as lighter_fetch_pe
 from app.exchanges.lighter.trader import LighterTrader
 from app.exchanges.paradex.sdk_ops import fetch_perp_markets as paradex_fetch_perp_markets, test_connection as paradex_test_connection
 from app.exchanges.paradex.trader import ParadexTrader
+from app.exchanges.rate_limit import PRIORITY_BACKGROUND, set_priority
+from app.exchanges.tape import TAPE
 from app.exchanges.types import Trader
 from app.services.bot_manager import BotManager
-from app.services.history_store import HistoryStore
 from app.services.market_indicators import TradingViewIndicatorService
+from app.services.runtime_metrics import RuntimeMetricsService, RuntimeStatusCalculator
+from app.services.status_stream import StatusBroadcaster
 from app.strategies.grid.ids import grid_prefix, is_grid_client_order
 
 
 WEB_DIR = Path(__file__).resolve().parent / "web"
-RUNTIME_LIGHTER_POSITIONS_CACHE_MS = 2000
-RUNTIME_LIGHTER_METRICS_CACHE_MS = 5000
 
 
 class PasswordBody(BaseModel):
@@ -65,6 +67,18 @@ def require_auth(request: Request) -> str:
     return token
 
 
+def require_metrics_access(request: Request) -> None:
+    # 不按来源地址放行：反向代理在同机时所有外部请求都来自本机。
+    # 需要免登录抓取时在 server.metrics_token 配置令牌，抓取端带 Authorization: Bearer <token>
+    server_cfg = request.app.state.config.snapshot().get("server", {}) or {}
+    token = str(server_cfg.get("metrics_token") or "")
+    if token:
+        scheme, _, presented = (request.headers.get("authorization") or "").partition(" ")
+        if scheme.lower() == "bearer" and hmac.compare_digest(presented.strip().encode(), token.encode()):
+            return
+    require_auth(request)
+
+
 def require_unlocked(request: Request) -> Fernet:
     require_auth(request)
     fernet: Optional[Fernet] = request.app.state.fernet
@@ -274,29 +288,6 @@ def _now_ms() -> int:
     return int(time.time() * 1000)
 
 
-def _is_rate_limited_error(exc: Exception) -> bool:
-    text = str(exc).lower()
-    return (
-        "too many requests" in text
-        or "rate limit" in text
-        or "code=23000" in text
-        or "\"code\": 23000" in text
-        or "(429)" in text
-    )
-
-
-def _parse_iso_ms(value: Optional[str]) -> Optional[int]:
-    if not value:
-        return None
-    try:
-        dt = datetime.fromisoformat(value)
-        if dt.tzinfo is None:
-            dt = dt.replace(tzinfo=timezone.utc)
-        return int(dt.timestamp() * 1000)
-    except Exception:
-        return None
-
-
 def _safe_decimal(value: Any) -> Decimal:
     try:
         return Decimal(str(value))
@@ -470,18 +461,8 @@ def _order_to_dict(order: Any) -> Dict[str, Any]:
     return data
 
 
-def _trade_ts_ms(value: Any) -> Optional[int]:
-    try:
-        ts = int(value)
-    except Exception:
-        return None
-    if ts < 10_000_000_000:
-        return ts * 1000
-    return ts
-
-
 async def _lighter_positions_map(trader: LighterTrader) -> Dict[int, Dict[str, Decimal]]:
-    resp = await trader._account_api.account(by="index", value=str(int(trader.account_index)))
+    resp = await trader._call_with_retry(trader._account_api.account, by="index", value=str(int(trader.account_index)))
     if hasattr(resp, "model_dump"):
         data = resp.model_dump()
     elif hasattr(resp, "to_dict"):
@@ -532,8 +513,8 @@ async def _lighter_positions_map(trader: LighterTrader) -> Dict[int, Dict[str, D
     return result
 
 
-def _paradex_positions_map(trader: ParadexTrader) -> Dict[str, Dict[str, Decimal]]:
-    data = trader._api.fetch_positions()
+async def _paradex_positions_map(trader: ParadexTrader) -> Dict[str, Dict[str, Decimal]]:
+    data = await trader.call(trader._api.fetch_positions)
     results = list(data.get("results") or [])
     result: Dict[str, Dict[str, Decimal]] = {}
     for item in results:
@@ -552,136 +533,6 @@ async def _grvt_positions_map(trader: GrvtTrader) -> Dict[str, Dict[str, Decimal
     return await trader.positions_snapshot()
 
 
-async def _grvt_trades_since(
-    trader: GrvtTrader,
-    market: str,
-    start_ms: int,
-    end_ms: int,
-    max_pages: int = 5,
-) -> tuple[Decimal, int]:
-    total = Decimal(0)
-    count = 0
-    cursor = None
-    pages = 0
-    start_ns = int(start_ms) * 1_000_000
-    end_ns = int(end_ms) * 1_000_000
-
-    while pages < max_pages:
-        params: Dict[str, Any] = {"end_time": end_ns}
-        if cursor:
-            params = {"cursor": cursor}
-        resp = await trader._api.fetch_my_trades(symbol=str(market), since=start_ns, limit=200, params=params)
-        results = resp.get("result") if isinstance(resp, dict) else None
-        results = results or []
-        for item in results:
-            if not isinstance(item, dict):
-                continue
-            ts_raw = item.get("event_time") or item.get("timestamp") or item.get("time")
-            try:
-                ts_val = int(ts_raw)
-            except Exception:
-                ts_val = None
-            ts_ms = None
-            if ts_val is not None:
-                if ts_val > 10_000_000_000_000:
-                    ts_ms = ts_val // 1_000_000
-                elif ts_val > 10_000_000_000:
-                    ts_ms = ts_val
-                else:
-                    ts_ms = ts_val * 1000
-            if ts_ms is not None and (ts_ms < start_ms or ts_ms > end_ms):
-                continue
-            price = grvt_parse_price(item.get("price") or item.get("fill_price"))
-            if price is None:
-                price = _safe_decimal(item.get("price") or 0)
-            size = _safe_decimal(item.get("size") or item.get("amount") or 0)
-            total += abs(price * size)
-            count += 1
-
-        cursor = resp.get("next") if isinstance(resp, dict) else None
-        if not cursor:
-            cursor = resp.get("next_cursor") if isinstance(resp, dict) else None
-        if not cursor:
-            break
-        pages += 1
-    return total, count
-
-
-async def _lighter_trades_since(
-    trader: LighterTrader,
-    market_id: int,
-    start_ms: int,
-    max_pages: int = 5,
-) -> tuple[Decimal, int]:
-    total = Decimal(0)
-    count = 0
-    auth_token = await trader.auth_token()
-    cursor = None
-    pages = 0
-    reached_old = False
-    while pages < max_pages and not reached_old:
-        resp = await trader.fetch_trades(
-            sort_by="timestamp",
-            limit=100,
-            market_id=int(market_id),
-            sort_dir="desc",
-            cursor=cursor,
-            auth=auth_token,
-        )
-        trades = getattr(resp, "trades", None)
-        if trades is None and isinstance(resp, dict):
-            trades = resp.get("trades")
-        trades = trades or []
-        for t in trades:
-            ts = _trade_ts_ms(_order_field(t, "timestamp"))
-            if ts is not None and ts < start_ms:
-                reached_old = True
-                break
-            usd_amount = _safe_decimal(_order_field(t, "usd_amount") or 0)
-            if usd_amount == 0:
-                price = _safe_decimal(_order_field(t, "price") or 0)
-                size = _safe_decimal(_order_field(t, "size") or 0)
-                usd_amount = price * size
-            total += abs(usd_amount)
-            count += 1
-        cursor = getattr(resp, "next_cursor", None) if not isinstance(resp, dict) else resp.get("next_cursor")
-        if not cursor:
-            break
-        pages += 1
-    return total, count
-
-
-def _paradex_fills_since(
-    trader: ParadexTrader,
-    market: str,
-    start_ms: int,
-    end_ms: int,
-    max_pages: int = 5,
-) -> tuple[Decimal, int]:
-    total = Decimal(0)
-    count = 0
-    cursor = None
-    pages = 0
-    while pages < max_pages:
-        params = {"market": market, "start_at": int(start_ms), "end_at": int(end_ms), "page_size": 200}
-        if cursor:
-            params["cursor"] = cursor
-        data = trader._api.fetch_fills(params)
-        results = list(data.get("results") or [])
-        for item in results:
-            if not isinstance(item, dict):
-                continue
-            price = _safe_decimal(item.get("price") or 0)
-            size = _safe_decimal(item.get("size") or 0)
-            total += abs(price * size)
-            count += 1
-        cursor = data.get("next") or data.get("next_cursor")
-        if not cursor:
-            break
-        pages += 1
-    return total, count
-
-
 def _mask_config(config: Dict[str, Any]) -> Dict[str, Any]:
     exchange = dict(config.get("exchange", {}))
     runtime = dict(config.get("runtime", {}))
@@ -708,14 +559,39 @@ app = FastAPI(title="Grid", version="0.1.0")
 app.mount("/static", StaticFiles(directory=str(WEB_DIR)), name="static")
 
 
+class _BackgroundRatePriority:
+    """接口触发的交易所查询让位于策略循环；下单/撤单在 trader 内部固定为最高优先级。"""
+
+    def __init__(self, app: Any) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Dict[str, Any], receive: Any, send: Any) -> None:
+        if scope.get("type") == "http":
+            set_priority(PRIORITY_BACKGROUND)
+        await self.app(scope, receive, send)
+
+
+app.add_middleware(_BackgroundRatePriority)
+
+
 @app.on_event("startup")
 async def _startup() -> None:
     data_dir = default_data_dir()
     config_path = data_dir / "config.json"
     app.state.config = ConfigStore(path=config_path)
     app.state.logbus = LogBus()
+    app.state.logbus.apply_config(app.state.config.snapshot().get("runtime") or {})
+    TAPE.configure(data_dir / "tape", app.state.config.snapshot().get("runtime") or {})
+    TAPE.start()
     app.state.bot_manager = BotManager(app.state.logbus, app.state.config)
-    app.state.history_store = HistoryStore(path=data_dir / "runtime_history.jsonl")
+    try:
+        imported = await asyncio.to_thread(
+            app.state.bot_manager.runtime_db.import_history_jsonl, data_dir / "runtime_history.jsonl"
+        )
+        if imported:
+            app.state.logbus.publish(f"db.history.import count={imported}")
+    except Exception as exc:
+        app.state.logbus.publish(f"db.history.import.error err={type(exc).__name__}:{exc}")
     app.state.sessions = {}
     app.state.fernet = None
     app.state.runtime_secrets = {}
@@ -725,21 +601,51 @@ async def _startup() -> None:
     app.state.paradex_trader_sig = None
     app.state.grvt_trader = None
     app.state.grvt_trader_sig = None
-    app.state.runtime_stats = {}
-    app.state.runtime_metrics_cache = {}
-    app.state.runtime_lighter_positions_cache = {"ts_ms": 0, "data": {}}
     app.state.market_indicators = TradingViewIndicatorService(app.state.logbus)
+    app.state.loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
+    app.state.runtime_status = RuntimeStatusCalculator(
+        app.state.bot_manager,
+        app.state.config,
+        _runtime_trader,
+        _runtime_positions,
+        row_fields=_runtime_filter_fields,
+        decorate=_runtime_decorate,
+        logbus=app.state.logbus,
+    )
+    app.state.runtime_metrics = RuntimeMetricsService(
+        _compute_runtime_metrics, _status_refresh_s, _active_runtime_exchanges, app.state.logbus
+    )
+    app.state.runtime_metrics.start()
+    app.state.bot_manager.set_runtime_metrics(app.state.runtime_metrics.refresh)
+    app.state.status_broadcaster = StatusBroadcaster(app.state.runtime_metrics.get, _status_refresh_s, app.state.logbus)
     app.state.logbus.publish("server.start")
 
 
 @app.on_event("shutdown")
 async def _shutdown() -> None:
+    lag_task: Optional[asyncio.Task[None]] = getattr(app.state, "loop_lag_task", None)
+    if lag_task:
+        lag_task.cancel()
+    broadcaster: Optional[StatusBroadcaster] = getattr(app.state, "status_broadcaster", None)
+    if broadcaster:
+        await broadcaster.close()
+    runtime_metrics: Optional[RuntimeMetricsService] = getattr(app.state, "runtime_metrics", None)
+    if runtime_metrics:
+        await runtime_metrics.close()
+    try:
+        await TAPE.close()
+    except Exception as exc:
+        app.state.logbus.publish(f"shutdown.tape.error err={type(exc).__name__}:{exc}")
     manager: Optional[BotManager] = getattr(app.state, "bot_manager", None)
     if manager:
         try:
             await manager.stop_all()
         except Exception as exc:
             app.state.logbus.publish(f"shutdown.stop_all.error err={type(exc).__name__}:{exc}")
+        try:
+            await manager.close()
+        except Exception as exc:
+            app.state.logbus.publish(f"shutdown.db.error err={type(exc).__name__}:{exc}")
 
     trader: Optional[LighterTrader] = getattr(app.state, "lighter_trader", None)
     if trader:
@@ -767,6 +673,11 @@ async def health() -> Dict[str, Any]:
     return {"ok": True}
 
 
+@app.get("/metrics")
+async def metrics(_: None = Depends(require_metrics_access)) -> PlainTextResponse:
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/auth/status")
 async def auth_status(request: Request) -> Dict[str, Any]:
     config: Dict[str, Any] = request.app.state.config.read()
@@ -958,17 +869,16 @@ async def update_config(
 
     request.app.state.config.write(merged)
     if removed_symbols:
-        runtime_stats: Dict[str, Any] = request.app.state.runtime_stats
-        runtime_metrics_cache: Dict[str, Any] = request.app.state.runtime_metrics_cache
         for symbol in removed_symbols:
             try:
                 await request.app.state.bot_manager.stop(symbol)
             except Exception:
                 pass
-            runtime_stats.pop(symbol, None)
-            runtime_metrics_cache.pop(f"lighter:{symbol}", None)
-            runtime_metrics_cache.pop(f"paradex:{symbol}", None)
-            runtime_metrics_cache.pop(f"grvt:{symbol}", None)
+        request.app.state.runtime_status.forget(removed_symbols)
+        request.app.state.runtime_metrics.invalidate()
+    request.app.state.logbus.apply_config(merged.get("runtime") or {})
+    if TAPE.root is not None:
+        TAPE.configure(TAPE.root, merged.get("runtime") or {})
     request.app.state.logbus.publish("config.update")
     return {"ok": True, "config": _mask_config(merged)}
 
@@ -986,8 +896,7 @@ async def bots_start(body: BotSymbolsBody, request: Request, _: str = Depends(re
     symbols = [s for s in (_normalize_symbol(x) for x in body.symbols) if s]
     if await _fill_strategy_market_ids(request, config, symbols=set(symbols)):
         request.app.state.config.write(config)
-    runtime_stats: Dict[str, Any] = request.app.state.runtime_stats
-    runtime_metrics_cache: Dict[str, Any] = request.app.state.runtime_metrics_cache
+    runtime_status: RuntimeStatusCalculator = request.app.state.runtime_status
     trader_cache: Dict[str, Trader] = {}
     now_ms = _now_ms()
     for sym in symbols:
@@ -997,9 +906,9 @@ async def bots_start(body: BotSymbolsBody, request: Request, _: str = Depends(re
         if trader is None:
             trader = await _ensure_trader(request, exchange_name)
             trader_cache[exchange_name] = trader
-        runtime_stats[sym] = {"exchange": exchange_name, "start_ms": now_ms, "base_pnl": None}
-        runtime_metrics_cache.pop(f"{exchange_name}:{sym}", None)
+        runtime_status.track(sym, exchange_name, now_ms)
         await request.app.state.bot_manager.start(sym, trader)
+        request.app.state.runtime_metrics.invalidate(exchange_name)
     return {"ok": True, "bots": request.app.state.bot_manager.snapshot()}
 
 
@@ -1012,15 +921,10 @@ async def bots_stop(body: BotSymbolsBody, request: Request, _: str = Depends(req
         await request.app.state.bot_manager.capture_history(trader, body.symbols, "manual_stop")
     except Exception as exc:
         request.app.state.logbus.publish(f"history.capture.error err={type(exc).__name__}:{exc}")
-    runtime_stats: Dict[str, Any] = request.app.state.runtime_stats
-    runtime_metrics_cache: Dict[str, Any] = request.app.state.runtime_metrics_cache
     for symbol in body.symbols:
-        sym = symbol.upper()
-        await request.app.state.bot_manager.stop(sym)
-        runtime_stats.pop(sym, None)
-        runtime_metrics_cache.pop(f"lighter:{sym}", None)
-        runtime_metrics_cache.pop(f"paradex:{sym}", None)
-        runtime_metrics_cache.pop(f"grvt:{sym}", None)
+        await request.app.state.bot_manager.stop(symbol.upper())
+    request.app.state.runtime_status.forget(body.symbols)
+    request.app.state.runtime_metrics.invalidate()
     return {"ok": True, "bots": request.app.state.bot_manager.snapshot()}
 
 
@@ -1073,9 +977,8 @@ async def bots_emergency_stop(request: Request, _: str = Depends(require_auth))
             request.app.state.logbus.publish(f"history.capture.error err={type(exc).__name__}:{exc}")
 
     await manager.stop_all()
-    request.app.state.runtime_stats = {}
-    request.app.state.runtime_metrics_cache = {}
-    request.app.state.runtime_lighter_positions_cache = {"ts_ms": 0, "data": {}}
+    request.app.state.runtime_status.forget()
+    request.app.state.runtime_metrics.invalidate()
     canceled: Dict[str, int] = {}
     flattened: list[str] = []
     failed: Dict[str, str] = {}
@@ -1130,10 +1033,14 @@ async def logs_stream(request: Request, _: str = Depends(require_auth)) -> Strea
 async def runtime_history(
     request: Request,
     limit: int = 200,
+    symbol: Optional[str] = None,
+    start_ms: Optional[int] = None,
+    end_ms: Optional[int] = None,
     _: str = Depends(require_auth),
 ) -> Dict[str, Any]:
-    store: HistoryStore = request.app.state.history_store
-    return {"items": store.read(limit=limit)}
+    manager: BotManager = request.app.state.bot_manager
+    items = await manager.runtime_db.history(limit=limit, symbol=symbol, start_ms=start_ms, end_ms=end_ms)
+    return {"items": items}
 
 
 @app.get("/api/runtime/status")
@@ -1142,335 +1049,72 @@ async def runtime_status(
     exchange: Optional[str] = None,
     _: str = Depends(require_auth),
 ) -> Dict[str, Any]:
+    # 只读取后台聚合的最新快照，交易所请求量与打开的页面数无关
     config: Dict[str, Any] = request.app.state.config.read()
-    runtime = config.get("runtime", {}) or {}
-    simulate = bool(runtime.get("dry_run", True))
     name = _exchange_name(config, exchange)
-    bots = request.app.state.bot_manager.snapshot()
-    runtime_stats: Dict[str, Any] = request.app.state.runtime_stats
-    runtime_metrics_cache: Dict[str, Dict[str, Any]] = request.app.state.runtime_metrics_cache
-    now_ms = _now_ms()
-    refresh_raw = runtime.get("status_metrics_refresh_ms")
-    if refresh_raw is None or str(refresh_raw).strip() == "":
-        refresh_raw = runtime.get("status_refresh_ms")
-    metrics_refresh_ms = max(1000, _safe_int(refresh_raw, RUNTIME_LIGHTER_METRICS_CACHE_MS))
-    updated_at = datetime.now(timezone.utc).astimezone().isoformat(timespec="seconds")
-    strategies = config.get("strategies", {}) or {}
+    metrics: RuntimeMetricsService = request.app.state.runtime_metrics
+    return await metrics.get(name)
+
+
+@app.get("/api/runtime/stream")
+async def runtime_stream(
+    request: Request,
+    exchange: Optional[str] = None,
+    _: str = Depends(require_auth),
+) -> StreamingResponse:
+    config: Dict[str, Any] = request.app.state.config.read()
+    name = _exchange_name(config, exchange)
+    broadcaster: StatusBroadcaster = request.app.state.status_broadcaster
+    return StreamingResponse(
+        broadcaster.stream(name),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _status_refresh_s() -> float:
+    runtime = app.state.config.snapshot().get("runtime") or {}
+    return max(200, _safe_int(runtime.get("status_refresh_ms"), 10000)) / 1000
 
-    running_symbols: list[str] = []
-    for symbol, data in bots.items():
+
+def _active_runtime_exchanges() -> list[str]:
+    config: Dict[str, Any] = app.state.config.read()
+    strategies = config.get("strategies", {}) or {}
+    names: set[str] = set()
+    for symbol, data in app.state.bot_manager.snapshot().items():
         if not (isinstance(data, dict) and data.get("running")):
             continue
-        sym = _normalize_symbol(symbol)
-        strat = strategies.get(sym) or strategies.get(symbol)
-        if isinstance(strat, dict):
-            symbol_exchange = _strategy_exchange(config, strat)
-            if symbol_exchange != name:
-                continue
-        running_symbols.append(sym)
-
-    if not running_symbols:
-        return {
-            "exchange": name,
-            "updated_at": updated_at,
-            "totals": {
-                "profit": "0",
-                "volume": "0",
-                "trade_count": 0,
-                "position_notional": "0",
-                "open_orders": 0,
-                "reduce_symbols": [],
-                "running": 0,
-            },
-            "symbols": {},
-        }
+        strat = strategies.get(_normalize_symbol(symbol)) or strategies.get(symbol)
+        names.add(_strategy_exchange(config, strat if isinstance(strat, dict) else {}))
+    return sorted(names)
 
-    if simulate:
-        totals_profit = Decimal(0)
-        totals_volume = Decimal(0)
-        totals_trades = 0
-        totals_position = Decimal(0)
-        totals_orders = 0
-        reduce_symbols: list[str] = []
-        symbols_data: Dict[str, Any] = {}
-        bot_manager = request.app.state.bot_manager
-
-        for symbol in sorted(running_symbols):
-            status = bots.get(symbol) or {}
-            if not isinstance(status, dict):
-                continue
-            started_at = status.get("started_at")
-            start_ms = _parse_iso_ms(started_at) or now_ms
-            entry = runtime_stats.get(symbol)
-            if not isinstance(entry, dict) or entry.get("exchange") != name:
-                entry = {"exchange": name, "start_ms": start_ms, "base_pnl": None}
-                runtime_stats[symbol] = entry
-            if entry.get("start_ms") is None:
-                entry["start_ms"] = start_ms
-            start_ms = int(entry.get("start_ms") or start_ms)
-
-            mid_value = _safe_decimal(status.get("mid") or 0)
-            if mid_value <= 0:
-                mid_value = bot_manager.sim_last_mid(symbol)
-
-            sim_pnl = bot_manager.sim_pnl(symbol, mid_value)
-            if entry.get("base_pnl") is None:
-                entry["base_pnl"] = sim_pnl
-            profit = sim_pnl - _safe_decimal(entry.get("base_pnl") or 0)
-
-            volume, trade_count = bot_manager.sim_trade_stats(symbol, start_ms, now_ms)
-            pos_base = bot_manager.sim_position_base(symbol)
-            position_notional = abs(pos_base * mid_value) if mid_value > 0 else Decimal(0)
-            open_orders = bot_manager.sim_open_orders(symbol)
-            reduce_mode = bool(status.get("reduce_mode"))
-            if reduce_mode:
-                reduce_symbols.append(symbol)
-
-            symbols_data[symbol] = {
-                "symbol": symbol,
-                "market_id": status.get("market_id"),
-                "started_at": started_at,
-                "profit": _fmt_decimal(profit),
-                "volume": _fmt_decimal(volume),
-                "trade_count": trade_count,
-                "position_notional": _fmt_decimal(position_notional),
-                "open_orders": open_orders,
-                "delay_count": int(status.get("delay_count") or 0),
-                "reduce_mode": reduce_mode,
-                **_runtime_filter_fields(status),
-            }
 
-            totals_profit += profit
-            totals_volume += volume
-            totals_trades += trade_count
-            totals_position += position_notional
-            totals_orders += open_orders
-
-        await _attach_market_indicators(request, symbols_data)
-        return {
-            "exchange": name,
-            "updated_at": updated_at,
-            "totals": {
-                "profit": _fmt_decimal(totals_profit),
-                "volume": _fmt_decimal(totals_volume),
-                "trade_count": totals_trades,
-                "position_notional": _fmt_decimal(totals_position),
-                "open_orders": totals_orders,
-                "reduce_symbols": reduce_symbols,
-                "running": len(symbols_data),
-            },
-            "symbols": symbols_data,
-        }
+def _background_request() -> Request:
+    # 后台计算不依附于某个页面请求，只需要 app.state
+    return Request({"type": "http", "app": app, "headers": []})
 
-    try:
-        trader = await _ensure_trader(request, name)
-    except Exception as exc:
-        request.app.state.logbus.publish(f"runtime.status.error err={type(exc).__name__}:{exc}")
-        return {"exchange": name, "updated_at": updated_at, "error": "无法建立交易所连接"}
-
-    positions_map: Dict[Any, Dict[str, Decimal]]
-    if name == "paradex" and isinstance(trader, ParadexTrader):
-        positions_map = _paradex_positions_map(trader)
-    elif name == "grvt" and isinstance(trader, GrvtTrader):
-        positions_map = await _grvt_positions_map(trader)
-    elif isinstance(trader, LighterTrader):
-        cache = request.app.state.runtime_lighter_positions_cache
-        if not isinstance(cache, dict):
-            cache = {"ts_ms": 0, "data": {}}
-            request.app.state.runtime_lighter_positions_cache = cache
-        cached_ts = _safe_int(cache.get("ts_ms"), 0)
-        cached_data = cache.get("data")
-        if not isinstance(cached_data, dict):
-            cached_data = {}
-        if (now_ms - cached_ts) >= RUNTIME_LIGHTER_POSITIONS_CACHE_MS:
-            try:
-                cached_data = await _lighter_positions_map(trader)
-                cache["data"] = cached_data
-                cache["ts_ms"] = now_ms
-            except Exception as exc:
-                if _is_rate_limited_error(exc):
-                    request.app.state.logbus.publish("runtime.positions.rate_limited exchange=lighter")
-                else:
-                    request.app.state.logbus.publish(
-                        f"runtime.positions.error exchange=lighter err={type(exc).__name__}:{exc}"
-                    )
-        positions_map = cached_data
-    else:
-        positions_map = {}
-
-    totals_profit = Decimal(0)
-    totals_volume = Decimal(0)
-    totals_trades = 0
-    totals_position = Decimal(0)
-    totals_orders = 0
-    reduce_symbols: list[str] = []
-    symbols_data: Dict[str, Any] = {}
-
-    for symbol in sorted(running_symbols):
-        status = bots.get(symbol) or {}
-        if not isinstance(status, dict):
-            continue
-        started_at = status.get("started_at")
-        start_ms = _parse_iso_ms(started_at) or now_ms
-        entry = runtime_stats.get(symbol)
-        if not isinstance(entry, dict) or entry.get("exchange") != name:
-            entry = {"exchange": name, "start_ms": start_ms, "base_pnl": None}
-            runtime_stats[symbol] = entry
-        if entry.get("start_ms") is None:
-            entry["start_ms"] = start_ms
-        start_ms = int(entry.get("start_ms") or start_ms)
-
-        strat = (config.get("strategies", {}) or {}).get(symbol, {}) or {}
-        market_id = strat.get("market_id")
-        if market_id is None or (isinstance(market_id, str) and not market_id.strip()):
-            market_id = status.get("market_id")
-        if name in {"paradex", "grvt"} and market_id is not None:
-            market_id = str(market_id)
-        if name == "lighter" and isinstance(market_id, str):
-            try:
-                market_id = int(market_id)
-            except Exception:
-                pass
 
-        mid_value = _safe_decimal(status.get("mid") or 0)
-        if mid_value <= 0 and market_id is not None and not isinstance(trader, LighterTrader):
-            try:
-                bid, ask = await trader.best_bid_ask(market_id)
-                if bid is not None and ask is not None:
-                    mid_value = (bid + ask) / 2
-            except Exception:
-                mid_value = Decimal(0)
-
-        cache_key = f"{name}:{symbol}"
-        cache_item_raw = runtime_metrics_cache.get(cache_key)
-        cache_item = cache_item_raw if isinstance(cache_item_raw, dict) else {}
-        cache_updated_ms = _safe_int(cache_item.get("updated_ms"), 0)
-        cache_fresh = (now_ms - cache_updated_ms) < metrics_refresh_ms
-        cache_profit = _safe_decimal(cache_item.get("profit"))
-        cache_volume = _safe_decimal(cache_item.get("volume"))
-        cache_trade_count = _safe_int(cache_item.get("trade_count"), 0)
-
-        pnl_now = Decimal(0)
-        pos_base = Decimal(0)
-        use_base = True
-        if market_id is not None:
-            pnl_item = positions_map.get(market_id)
-            if pnl_item:
-                pnl_now = _safe_decimal(pnl_item.get("pnl"))
-                pos_base = _safe_decimal(pnl_item.get("base"))
-
-        if name == "lighter" and isinstance(trader, LighterTrader) and isinstance(market_id, int):
-            use_base = False
-            if cache_fresh:
-                pnl_now = cache_profit
-            else:
-                try:
-                    pnl_now = await request.app.state.bot_manager.lighter_trade_pnl(
-                        trader,
-                        symbol,
-                        int(market_id),
-                        start_ms,
-                        now_ms,
-                        mid_value,
-                    )
-                except Exception as exc:
-                    if _is_rate_limited_error(exc):
-                        request.app.state.logbus.publish(
-                            f"runtime.pnl.rate_limited symbol={symbol} market_id={market_id} cached=1"
-                        )
-                    else:
-                        request.app.state.logbus.publish(
-                            f"runtime.pnl.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}"
-                        )
-                    pnl_now = cache_profit
-
-        if use_base:
-            if entry.get("base_pnl") is None:
-                entry["base_pnl"] = pnl_now
-            profit = pnl_now - _safe_decimal(entry.get("base_pnl") or 0)
-        else:
-            profit = pnl_now
-
-        volume = Decimal(0)
-        trade_count = 0
-        if isinstance(trader, LighterTrader) and isinstance(market_id, int):
-            if cache_fresh:
-                volume = cache_volume
-                trade_count = cache_trade_count
-            else:
-                try:
-                    volume, trade_count = await _lighter_trades_since(trader, int(market_id), start_ms)
-                except Exception as exc:
-                    if _is_rate_limited_error(exc):
-                        request.app.state.logbus.publish(
-                            f"runtime.trades.rate_limited symbol={symbol} market_id={market_id} cached=1"
-                        )
-                    else:
-                        request.app.state.logbus.publish(
-                            f"runtime.trades.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}"
-                        )
-                    volume = cache_volume
-                    trade_count = cache_trade_count
-        else:
-            try:
-                if name == "paradex" and isinstance(trader, ParadexTrader) and market_id is not None:
-                    volume, trade_count = _paradex_fills_since(trader, str(market_id), start_ms, now_ms)
-                elif name == "grvt" and isinstance(trader, GrvtTrader) and market_id is not None:
-                    volume, trade_count = await _grvt_trades_since(trader, str(market_id), start_ms, now_ms)
-            except Exception as exc:
-                request.app.state.logbus.publish(
-                    f"runtime.trades.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}"
-                )
+async def _compute_runtime_metrics(name: str) -> Dict[str, Any]:
+    set_priority(PRIORITY_BACKGROUND)
+    return await app.state.runtime_status(name)
 
-        if name == "lighter":
-            runtime_metrics_cache[cache_key] = {
-                "updated_ms": now_ms,
-                "profit": str(profit),
-                "volume": str(volume),
-                "trade_count": int(trade_count),
-            }
 
-        position_notional = abs(pos_base * mid_value) if mid_value > 0 else Decimal(0)
-        open_orders = int(status.get("existing") or 0)
-        reduce_mode = bool(status.get("reduce_mode"))
-        if reduce_mode:
-            reduce_symbols.append(symbol)
-
-        symbols_data[symbol] = {
-            "symbol": symbol,
-            "market_id": market_id,
-            "started_at": started_at,
-            "profit": _fmt_decimal(profit),
-            "volume": _fmt_decimal(volume),
-            "trade_count": trade_count,
-            "position_notional": _fmt_decimal(position_notional),
-            "open_orders": open_orders,
-            "delay_count": int(status.get("delay_count") or 0),
-            "reduce_mode": reduce_mode,
-            **_runtime_filter_fields(status),
-        }
-
-        totals_profit += profit
-        totals_volume += volume
-        totals_trades += trade_count
-        totals_position += position_notional
-        totals_orders += open_orders
-
-    await _attach_market_indicators(request, symbols_data)
-    return {
-        "exchange": name,
-        "updated_at": updated_at,
-        "totals": {
-            "profit": _fmt_decimal(totals_profit),
-            "volume": _fmt_decimal(totals_volume),
-            "trade_count": totals_trades,
-            "position_notional": _fmt_decimal(totals_position),
-            "open_orders": totals_orders,
-            "reduce_symbols": reduce_symbols,
-            "running": len(symbols_data),
-        },
-        "symbols": symbols_data,
-    }
+async def _runtime_trader(name: str) -> Trader:
+    return await _ensure_trader(_background_request(), name)
+
+
+async def _runtime_positions(trader: Trader) -> Dict[Any, Dict[str, Decimal]]:
+    if isinstance(trader, ParadexTrader):
+        return await _paradex_positions_map(trader)
+    if isinstance(trader, GrvtTrader):
+        return await _grvt_positions_map(trader)
+    if isinstance(trader, LighterTrader):
+        return await _lighter_positions_map(trader)
+    return {}
+
+
+async def _runtime_decorate(rows: Dict[str, Dict[str, Any]]) -> None:
+    await _attach_market_indicators(_background_request(), rows)
 
 
 @app.get("/api/exchange/markets")
@@ -1597,7 +1241,7 @@ async def exchange_account_snapshot(
     ex = config.get("exchange", {}) or {}
     if name == "paradex":
         trader = await _ensure_paradex_trader(request)
-        summary = trader._api.fetch_account_summary()
+        summary = await trader.call(trader._api.fetch_account_summary)
         if hasattr(summary, "model_dump"):
             data = summary.model_dump()
         elif hasattr(summary, "to_dict"):
@@ -1608,7 +1252,7 @@ async def exchange_account_snapshot(
 
     if name == "grvt":
         trader = await _ensure_grvt_trader(request)
-        summary = await trader._api.get_account_summary()
+        summary = await trader._request(trader._api.get_account_summary)
         if hasattr(summary, "model_dump"):
             data = summary.model_dump()
         elif hasattr(summary, "to_dict"):
@@ -1807,7 +1451,7 @@ async def _ensure_paradex_trader(request: Request) -> ParadexTrader:
         l2_address=l2_address,
         l2_private_key=l2_private_key,
     )
-    err = trader.check_client()
+    err = await trader.call(trader.check_client)
     if err is not None:
         await trader.close()
         raise HTTPException(status_code=400, detail=f"API Key 校验失败：{err}")
@@ -0,0 +1,393 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence
+
+import numpy as np
+
+from app.exchanges.types import MarketMeta
+from app.services.bot_manager import (
+    DEFAULT_AS_GAMMA,
+    DEFAULT_AS_K,
+    DEFAULT_AS_STEP_MULT,
+    DEFAULT_AS_TAU_SECONDS,
+    DEFAULT_AS_VOL_POINTS,
+    GRID_MODE_AS,
+    GRID_MODE_DYNAMIC,
+    MAX_LEVEL_PER_SIDE,
+    _as_param_decimal,
+    _as_param_int,
+    _normalize_grid_mode,
+    _safe_decimal,
+)
+from app.strategies.grid.ticks import SizeRule, pow10, to_ticks
+
+# 向量化网格回测：用 NumPy 预处理整段行情（整数价格刻度、网格坐标、事件压缩、AS 波动率、权益曲线），
+# 再只在"可能发生变化"的 tick 上按生产规则调和挂单与撮合。
+# 模拟规则与 BotManager 的模拟盘一致：挂单按价格被穿越（含相等）整单成交，sim_touch_size/sim_queue_ahead 视为 0；
+# 不模拟行情过滤、停止条件与 AS 回撤停止。
+
+
+@dataclass(frozen=True)
+class BacktestParams:
+    grid_mode: str = GRID_MODE_DYNAMIC
+    grid_step: Decimal = Decimal(0)
+    levels_up: int = 0
+    levels_down: int = 0
+    order_size_mode: str = "notional"
+    order_size_value: Decimal = Decimal(0)
+    max_position_notional: Decimal = Decimal(0)
+    reduce_position_notional: Decimal = Decimal(0)
+    reduce_order_size_multiplier: Decimal = Decimal(1)
+    max_open_orders: int = 0
+    as_gamma: Decimal = DEFAULT_AS_GAMMA
+    as_k: Decimal = DEFAULT_AS_K
+    as_tau_seconds: Decimal = DEFAULT_AS_TAU_SECONDS
+    as_vol_points: int = DEFAULT_AS_VOL_POINTS
+    as_step_multiplier: Decimal = DEFAULT_AS_STEP_MULT
+
+    @classmethod
+    def from_strategy(cls, strat: Mapping[str, Any]) -> "BacktestParams":
+        """按策略配置解析，缺省与校验规则同 BotManager。"""
+        return cls(
+            grid_mode=_normalize_grid_mode(strat.get("grid_mode")),
+            grid_step=_safe_decimal(strat.get("grid_step") or 0),
+            levels_up=int(strat.get("levels_up") or 0),
+            levels_down=int(strat.get("levels_down") or 0),
+            order_size_mode=str(strat.get("order_size_mode") or "notional"),
+            order_size_value=_safe_decimal(strat.get("order_size_value") or 0),
+            max_position_notional=_safe_decimal(strat.get("max_position_notional") or 0),
+            reduce_position_notional=_safe_decimal(strat.get("reduce_position_notional") or 0),
+            reduce_order_size_multiplier=_safe_decimal(strat.get("reduce_order_size_multiplier") or 1),
+            max_open_orders=int(strat.get("max_open_orders") or 0),
+            as_gamma=_as_param_decimal(strat, "as_gamma", DEFAULT_AS_GAMMA),
+            as_k=_as_param_decimal(strat, "as_k", DEFAULT_AS_K),
+            as_tau_seconds=_as_param_decimal(strat, "as_tau_seconds", DEFAULT_AS_TAU_SECONDS),
+            as_vol_points=_as_param_int(strat, "as_vol_points", DEFAULT_AS_VOL_POINTS, 5),
+            as_step_multiplier=_as_param_decimal(strat, "as_step_multiplier", DEFAULT_AS_STEP_MULT),
+        )
+
+
+@dataclass(frozen=True)
+class MarketSeries:
+    """按 tick 对齐的行情：每一行对应策略循环的一轮；价格为整数刻度。"""
+
+    ts_ms: np.ndarray
+    bid: np.ndarray
+    ask: np.ndarray
+    price_decimals: int
+
+    def __len__(self) -> int:
+        return int(self.bid.shape[0])
+
+    @classmethod
+    def from_quotes(cls, quotes: Iterable[Any], price_decimals: int) -> "MarketSeries":
+        """quotes 为带 ts_ms/bid/ask(Decimal) 的对象（如回放的 Quote）；缺一侧报价的行跳过，同策略循环。"""
+        ts: list[int] = []
+        bids: list[int] = []
+        asks: list[int] = []
+        for quote in quotes:
+            if quote.bid is None or quote.ask is None:
+                continue
+            ts.append(int(quote.ts_ms))
+            bids.append(to_ticks(quote.bid, price_decimals))
+            asks.append(to_ticks(quote.ask, price_decimals))
+        return cls(
+            ts_ms=np.asarray(ts, dtype=np.int64),
+            bid=np.asarray(bids, dtype=np.int64),
+            ask=np.asarray(asks, dtype=np.int64),
+            price_decimals=int(price_decimals),
+        )
+
+    @classmethod
+    def from_arrays(cls, ts_ms: Any, bid: Any, ask: Any, price_decimals: int) -> "MarketSeries":
+        scale = float(pow10(price_decimals))
+        return cls(
+            ts_ms=np.asarray(ts_ms, dtype=np.int64),
+            bid=np.rint(np.asarray(bid, dtype=np.float64) * scale).astype(np.int64),
+            ask=np.rint(np.asarray(ask, dtype=np.float64) * scale).astype(np.int64),
+            price_decimals=int(price_decimals),
+        )
+
+
+@dataclass(frozen=True)
+class BacktestResult:
+    params: BacktestParams
+    pnl: float
+    realized_pnl: float
+    volume: float
+    trades: int
+    position_base: float
+    max_position_base: float
+    max_drawdown: float
+    ticks: int
+    events: int
+
+
+@dataclass
+class _Account:
+    """与模拟盘 _sim_apply_trade 相同的持仓/成本/已实现盈亏记账（浮点）。"""
+
+    position: float = 0.0
+    cost: float = 0.0
+    realized: float = 0.0
+    trades: int = 0
+    volume: float = 0.0
+    max_position: float = 0.0
+
+    def apply(self, is_ask: bool, price: float, size: float) -> None:
+        self.trades += 1
+        self.volume += abs(price * size)
+        if not is_ask:
+            if self.position >= 0:
+                self.position += size
+                self.cost += price * size
+            else:
+                cover = min(size, -self.position)
+                avg_entry = abs(self.cost / self.position)
+                self.realized += (avg_entry - price) * cover
+                remaining = size - cover
+                self.position += cover
+                if self.position < 0:
+                    self.cost = avg_entry * self.position
+                else:
+                    self.cost = 0.0
+                    if remaining > 0:
+                        self.position = remaining
+                        self.cost = price * remaining
+        else:
+            if self.position <= 0:
+                self.position -= size
+                self.cost -= price * size
+            else:
+                cover = min(size, self.position)
+                avg_entry = abs(self.cost / self.position)
+                self.realized += (price - avg_entry) * cover
+                remaining = size - cover
+                self.position -= cover
+                if self.position > 0:
+                    self.cost = avg_entry * self.position
+                else:
+                    self.cost = 0.0
+                    if remaining > 0:
+                        self.position = -remaining
+                        self.cost = -price * remaining
+        self.max_position = max(self.max_position, abs(self.position))
+
+
+@dataclass
+class _Book:
+    """单个参数组的挂单：价格刻度 -> 数量刻度。"""
+
+    asks: Dict[int, int] = field(default_factory=dict)
+    bids: Dict[int, int] = field(default_factory=dict)
+
+    def match(self, bid: int, ask: int, account: _Account, price_scale: float, size_scale: float) -> None:
+        # 顺序同 SimOrderBook.match：卖单价格升序，再买单价格降序
+        if self.asks:
+            for price in sorted(p for p in self.asks if p <= bid):
+                account.apply(True, price / price_scale, self.asks.pop(price) / size_scale)
+        if self.bids:
+            for price in sorted((p for p in self.bids if p >= ask), reverse=True):
+                account.apply(False, price / price_scale, self.bids.pop(price) / size_scale)
+
+
+def _scan_reduce(flag: bool, notional: np.ndarray, max_pos: float, exit_pos: float) -> bool:
+    """按 tick 顺序推进减仓模式的迟滞开关（持仓不变的区间）。"""
+    while notional.size:
+        if not flag:
+            hits = np.flatnonzero(notional >= max_pos)
+            if not hits.size:
+                return False
+            flag = True
+        else:
+            hits = np.flatnonzero(notional <= exit_pos)
+            if not hits.size:
+                return True
+            flag = False
+        notional = notional[hits[0] + 1 :]
+    return flag
+
+
+def _as_sigma(series: MarketSeries, vol_points: int) -> np.ndarray:
+    """每个 tick 的 AS 波动率：最近 vol_points 段中间价变化按 sqrt(dt) 归一后的样本标准差。"""
+    n = len(series)
+    sigma = np.zeros(n, dtype=np.float64)
+    if n < 3:
+        return sigma
+    scale = float(pow10(series.price_decimals)) * 2
+    mid = (series.bid + series.ask).astype(np.float64) / scale
+    dt = np.diff(series.ts_ms).astype(np.float64) / 1000.0
+    if np.any(dt <= 0):
+        raise ValueError("AS 回测要求 ts_ms 严格递增")
+    norm = np.diff(mid) / np.sqrt(dt)
+    # 先去掉整体均值再做前缀和，减小大样本下的抵消误差
+    centered = norm - norm.mean()
+    s1 = np.concatenate(([0.0], np.cumsum(centered)))
+    s2 = np.concatenate(([0.0], np.cumsum(centered * centered)))
+    t = np.arange(1, n)
+    count = np.minimum(t, vol_points)
+    lo = t - count
+    sum1 = s1[t] - s1[lo]
+    sum2 = s2[t] - s2[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (sum2 - sum1 * sum1 / count) / (count - 1)
+    var = np.where(count >= 2, np.maximum(var, 0.0), 0.0)
+    sigma[1:] = np.sqrt(var)
+    return sigma
+
+
+def _events_dynamic(series: MarketSeries, step: int) -> np.ndarray:
+    """只有中心档位或买一/卖一所在网格坐标变化的 tick 才可能改变挂单与持仓。"""
+    bid, ask = series.bid, series.ask
+    center = (bid + ask + step) // (2 * step)
+    bid_level = bid // step
+    ask_level = -((-ask) // step)
+    changed = (np.diff(center) != 0) | (np.diff(bid_level) != 0) | (np.diff(ask_level) != 0)
+    return np.concatenate(([0], np.flatnonzero(changed) + 1)).astype(np.int64)
+
+
+def run_backtest(series: MarketSeries, params: BacktestParams, meta: MarketMeta) -> BacktestResult:
+    n = len(series)
+    if n == 0:
+        raise ValueError("回测行情为空")
+    pd = int(meta.price_decimals)
+    sd = int(meta.size_decimals)
+    if pd != series.price_decimals:
+        raise ValueError("行情与市场的价格精度不一致")
+    price_scale = float(pow10(pd))
+    size_scale = float(pow10(sd))
+    is_as = params.grid_mode == GRID_MODE_AS
+
+    if is_as:
+        levels_up = levels_down = 1
+        step_ticks = 0
+        events = np.arange(n, dtype=np.int64)
+        sigma = _as_sigma(series, params.as_vol_points)
+        gamma = float(params.as_gamma)
+        tau = float(params.as_tau_seconds)
+        step_mult = float(params.as_step_multiplier) if float(params.as_step_multiplier) > 0 else 1.0
+        spread = gamma * sigma * sigma * tau + (2.0 / gamma) * math.log(1.0 + gamma / float(params.as_k))
+        step_f = np.maximum(spread / 2.0 * step_mult, 1.0 / price_scale)
+        skew_f = gamma * sigma * sigma * tau
+    else:
+        if params.grid_step <= 0:
+            raise ValueError("grid_step 必须大于 0")
+        step_ticks = to_ticks(params.grid_step, pd)
+        if step_ticks <= 0 or Decimal(step_ticks).scaleb(-pd) != params.grid_step:
+            raise ValueError("grid_step 需对齐价格精度")
+        levels_up = max(0, min(params.levels_up, MAX_LEVEL_PER_SIDE))
+        levels_down = max(0, min(params.levels_down, MAX_LEVEL_PER_SIDE))
+        events = _events_dynamic(series, step_ticks)
+
+    size_rule = SizeRule.build(
+        params.order_size_mode, params.order_size_value, pd, sd, meta.min_base_amount, meta.min_quote_amount
+    )
+    max_pos = 0.0 if is_as else float(params.max_position_notional)
+    reduce_mult = params.reduce_order_size_multiplier if params.reduce_order_size_multiplier >= 1 else Decimal(1)
+    reduce_rule = size_rule
+    if max_pos > 0 and reduce_mult > 1:
+        reduce_rule = SizeRule.build(
+            params.order_size_mode,
+            params.order_size_value * reduce_mult,
+            pd,
+            sd,
+            meta.min_base_amount,
+            meta.min_quote_amount,
+        )
+    reduce_exit = float(params.reduce_position_notional)
+    if reduce_exit <= 0 or reduce_exit >= max_pos:
+        reduce_exit = max_pos * 0.8
+    mid_f = (series.bid + series.ask).astype(np.float64) / (2 * price_scale)
+
+    bids = series.bid.tolist()
+    asks = series.ask.tolist()
+    book = _Book()
+    account = _Account()
+    reduce_mode = False
+    positions = np.zeros(events.shape[0], dtype=np.float64)
+    costs = np.zeros(events.shape[0], dtype=np.float64)
+    realized = np.zeros(events.shape[0], dtype=np.float64)
+    prev = 0
+
+    for k, i in enumerate(events.tolist()):
+        if max_pos > 0 and i > prev + 1:
+            # 上一事件到本事件之间持仓不变，只需推进减仓开关
+            reduce_mode = _scan_reduce(reduce_mode, abs(account.position) * mid_f[prev + 1 : i], max_pos, reduce_exit)
+        bid, ask = bids[i], asks[i]
+        book.match(bid, ask, account, price_scale, size_scale)
+        reduce_side: Optional[bool] = None
+        if max_pos > 0:
+            reduce_mode = _scan_reduce(reduce_mode, np.array([abs(account.position) * mid_f[i]]), max_pos, reduce_exit)
+            if reduce_mode and account.position != 0:
+                reduce_side = account.position > 0
+
+        if is_as:
+            center_f = float(mid_f[i]) - account.position * float(skew_f[i])
+            center = to_ticks(Decimal(str(center_f)), pd)
+            step = to_ticks(Decimal(str(float(step_f[i]))), pd)
+            ask_targets = [center + step]
+            bid_targets = [center - step] if center - step > 0 else []
+            for side_orders, targets in ((book.asks, ask_targets), (book.bids, bid_targets)):
+                for price in [p for p in side_orders if p not in targets]:
+                    del side_orders[price]
+        else:
+            step = step_ticks
+            center = ((bid + ask + step) // (2 * step)) * step
+            ask_targets = [center + step * j for j in range(1, levels_up + 1)]
+            bid_targets = [p for p in (center - step * j for j in range(1, levels_down + 1)) if p > 0]
+            # 目标档位保留；远端边界以外撤单；其余（中心附近未被穿越的）保留
+            if ask_targets:
+                for price in [p for p in book.asks if p > ask_targets[-1]]:
+                    del book.asks[price]
+            else:
+                book.asks.clear()
+            if bid_targets:
+                for price in [p for p in book.bids if p < bid_targets[-1]]:
+                    del book.bids[price]
+            else:
+                book.bids.clear()
+
+        missing = [(abs(p - center), 0, p) for p in ask_targets if p not in book.asks]
+        missing += [(abs(p - center), 1, p) for p in bid_targets if p not in book.bids]
+        if missing:
+            slots = len(missing)
+            if params.max_open_orders > 0:
+                slots = max(0, params.max_open_orders - len(book.asks) - len(book.bids))
+            missing.sort()
+            for _, side, price in missing[:slots]:
+                is_ask = side == 0
+                rule = reduce_rule if reduce_mode and reduce_side is is_ask else size_rule
+                size = rule.size_ticks(price)
+                if size <= 0 or rule.below_min_base(size) or rule.below_min_quote(size, price):
+                    continue
+                (book.asks if is_ask else book.bids)[price] = size
+
+        positions[k] = account.position
+        costs[k] = account.cost
+        realized[k] = account.realized
+        prev = i
+
+    # 事件之间持仓/成本不变：按 tick 展开得到逐 tick 权益曲线
+    owner = np.searchsorted(events, np.arange(n), side="right") - 1
+    equity = realized[owner] + mid_f * positions[owner] - costs[owner]
+    drawdown = float(np.max(np.maximum.accumulate(equity) - equity)) if n else 0.0
+    return BacktestResult(
+        params=params,
+        pnl=float(equity[-1]),
+        realized_pnl=account.realized,
+        volume=account.volume,
+        trades=account.trades,
+        position_base=account.position,
+        max_position_base=account.max_position,
+        max_drawdown=drawdown,
+        ticks=n,
+        events=int(events.shape[0]),
+    )
+
+
+def sweep(series: MarketSeries, params_list: Sequence[BacktestParams], meta: MarketMeta) -> list[BacktestResult]:
+    """逐组参数回测同一段行情。"""
+    return [run_backtest(series, params, meta) for params in params_list]
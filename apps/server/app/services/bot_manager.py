@@ -5,21 +5,37 @@ import math
 import time
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from decimal import Decimal, ROUND_DOWN, ROUND_HALF_UP
-from typing import Any, Dict, Optional
-
-from app.core.config_store import ConfigStore
-from app.core.logbus import LogBus
+from decimal import Decimal, ROUND_CEILING, ROUND_FLOOR, ROUND_HALF_UP
+from typing import AbstractSet, Any, Awaitable, Callable, Dict, Mapping, Optional, Sequence, TypeVar
+
+from app.core import clock
+from app.core.config_store import ConfigSnapshot, ConfigStore
+from app.core.logbus import LEVEL_WARNING, LogBus
+from app.core.metrics import (
+    DELAY_COUNT,
+    ORDERS,
+    QUOTE_AGE,
+    RATE_LIMIT_COOLDOWN,
+    RATE_LIMITED,
+    RECONCILE_DIFF,
+    TICK_DURATION,
+)
 from app.exchanges.grvt.sdk_ops import fetch_perp_markets as grvt_fetch_perp_markets
 from app.exchanges.grvt.trader import GrvtTrader
 from app.exchanges.lighter.sdk_ops import fetch_perp_markets as lighter_fetch_perp_markets
 from app.exchanges.lighter.trader import LighterTrader
 from app.exchanges.paradex.sdk_ops import fetch_perp_markets as paradex_fetch_perp_markets
 from app.exchanges.paradex.trader import ParadexTrader
-from app.exchanges.types import MarketMeta, Trader
-from app.services.history_store import HistoryStore
+from app.exchanges.rate_limit import PRIORITY_QUERY, is_rate_limited_error as _is_rate_limited_error, set_priority
+from app.exchanges.tape import TAPE
+from app.exchanges.types import FillRecord, LimitOrderRequest, MarketMeta, Trader
+from app.services.runtime_db import RuntimeDB
+from app.services.sim_book import SimOrder, SimOrderBook
+from app.services.sim_trades import DEFAULT_SIM_TRADE_CAP, SimTradeLog
+from app.services.tick_scheduler import TickScheduler
 from app.strategies.grid.ids import (
     CLIENT_ORDER_MAX,
+    GridLevelAllocator,
     MAX_LEVEL_PER_SIDE,
     grid_client_order_id,
     grid_client_order_side_level,
@@ -27,14 +43,17 @@ from app.strategies.grid.ids import (
     is_grid_client_order,
 )
 from app.strategies.grid.market_filter import (
+    IncrementalIndicators,
     MarketFilterConfig,
     MarketFilterDecision,
     MarketFilterRuntime,
     OhlcBar,
-    completed_bars,
     evaluate_market_filter,
+    evaluate_market_filter_values,
     update_ohlc_bars,
 )
+from app.strategies.grid.ladder import LadderCache, OrderIndex
+from app.strategies.grid.ticks import SizeRule, from_ticks, text_to_ticks, to_ticks
 
 GRID_MODE_DYNAMIC = "dynamic"
 GRID_MODE_AS = "as"
@@ -52,10 +71,30 @@ DEFAULT_FILTER_RECOVER_PASS_COUNT = 3
 DEFAULT_FILTER_BLOCK_TIMEOUT_MINUTES = Decimal("30")
 FILTER_CLOSE_ONLY_COOLDOWN_MS = 3000
 FILTER_MAX_BARS = 1200
+# 单次增量同步成交最多翻页数（正常运行时每次只有少量新成交）
+FILL_SYNC_MAX_PAGES = 200
+# 持仓盈亏写入本地库的最小间隔
+PNL_SNAPSHOT_INTERVAL_MS = 60_000
+# 历史记录中每个交易对保留的字段
+HISTORY_SYMBOL_FIELDS = (
+    "symbol",
+    "market_id",
+    "started_at",
+    "profit",
+    "volume",
+    "trade_count",
+    "position_notional",
+    "open_orders",
+    "reduce_mode",
+)
+
+RuntimeMetricsProvider = Callable[[str], Awaitable[Dict[str, Any]]]
+# 挂单按价格分组的键：规划中为整数刻度
+PriceKey = TypeVar("PriceKey", int, Decimal)
 
 
 def _now_iso() -> str:
-    return datetime.now(timezone.utc).astimezone().isoformat(timespec="seconds")
+    return datetime.fromtimestamp(clock.now_ms() / 1000, tz=timezone.utc).astimezone().isoformat(timespec="seconds")
 
 
 def _fmt_decimal(value: Decimal, digits: int = 4) -> str:
@@ -103,15 +142,12 @@ def _safe_bool(v: Any, default: bool = False) -> bool:
     return default
 
 
-def _is_rate_limited_error(exc: Exception) -> bool:
-    text = str(exc).lower()
-    return (
-        "too many requests" in text
-        or "rate limit" in text
-        or "code=23000" in text
-        or "\"code\": 23000" in text
-        or "(429)" in text
-    )
+def _trader_exchange(trader: Any) -> str:
+    if isinstance(trader, ParadexTrader):
+        return "paradex"
+    if isinstance(trader, GrvtTrader):
+        return "grvt"
+    return "lighter"
 
 
 def _exchange_name(value: Any) -> str:
@@ -214,7 +250,7 @@ def _market_id_matches_symbol(exchange: str, symbol: str, market_id: Any) -> boo
 
 
 def _now_ms() -> int:
-    return int(time.time() * 1000)
+    return clock.now_ms()
 
 
 def _parse_iso_ms(value: Optional[str]) -> Optional[int]:
@@ -255,14 +291,14 @@ def _normalize_grid_mode(value: Any) -> str:
     return GRID_MODE_DYNAMIC
 
 
-def _as_param_decimal(strat: Dict[str, Any], key: str, default: Decimal) -> Decimal:
+def _as_param_decimal(strat: Mapping[str, Any], key: str, default: Decimal) -> Decimal:
     value = _safe_decimal(strat.get(key))
     if value <= 0:
         return default
     return value
 
 
-def _as_param_int(strat: Dict[str, Any], key: str, default: int, min_value: int) -> int:
+def _as_param_int(strat: Mapping[str, Any], key: str, default: int, min_value: int) -> int:
     value = _safe_int(strat.get(key), default)
     if value < min_value:
         return default
@@ -273,51 +309,46 @@ def _min_price_step(meta: MarketMeta) -> Decimal:
     return Decimal(1) / (Decimal(10) ** int(meta.price_decimals))
 
 
-def _calc_base_qty(mode: str, value: Decimal, price: Decimal) -> Decimal:
-    if mode == "base":
-        return value
-    if price <= 0:
-        return Decimal(0)
-    return value / price
-
-
 def _order_field(order: Any, name: str) -> Any:
     if isinstance(order, dict):
         return order.get(name)
     return getattr(order, name, None)
 
 
-def _order_price_decimal(order: Any, meta: MarketMeta) -> Decimal:
+GridOrderInfo = tuple[int, Optional[str], int, Optional[tuple[str, int]]]
+
+
+def _parse_grid_order(order: Any, prefix: int, price_decimals: int) -> Optional[GridOrderInfo]:
+    """解析本网格的挂单：(client_id, 方向, 价格刻度, 档位)；非本网格订单返回 None。"""
+    cid = _order_client_id(order)
+    if cid is None or cid <= 0 or not is_grid_client_order(prefix, cid):
+        return None
+    side = _order_side(order)
+    if side is None:
+        return cid, None, 0, None
+    return cid, side, _order_price_ticks(order, price_decimals), grid_client_order_side_level(cid)
+
+
+def _order_price_ticks(order: Any, price_decimals: int) -> int:
     price = _order_field(order, "price")
     if price is not None:
         try:
-            return Decimal(str(price))
+            return text_to_ticks(price, price_decimals)
         except Exception:
             pass
     base_price = _order_field(order, "base_price") or 0
     try:
-        return Decimal(int(base_price)) / (Decimal(10) ** int(meta.price_decimals))
+        return int(base_price)
     except Exception:
-        return Decimal(0)
-
-
-def _unique_prices(values: list[Decimal]) -> list[Decimal]:
-    seen: set[Decimal] = set()
-    result: list[Decimal] = []
-    for v in values:
-        if v in seen:
-            continue
-        seen.add(v)
-        result.append(v)
-    return result
+        return 0
 
 
 def _split_cancel_keep_by_target(
-    orders_by_price: Dict[Decimal, list[Any]],
-    target_prices: set[Decimal],
-) -> tuple[list[tuple[Any, Decimal]], set[Decimal]]:
-    cancel_orders: list[tuple[Any, Decimal]] = []
-    keep_prices: set[Decimal] = set()
+    orders_by_price: Dict[PriceKey, list[Any]],
+    target_prices: set[PriceKey],
+) -> tuple[list[tuple[Any, PriceKey]], set[PriceKey]]:
+    cancel_orders: list[tuple[Any, PriceKey]] = []
+    keep_prices: set[PriceKey] = set()
     for price, orders in orders_by_price.items():
         if price in target_prices and orders:
             keep_prices.add(price)
@@ -331,20 +362,25 @@ def _split_cancel_keep_by_target(
 
 
 def _split_cancel_keep_dynamic(
-    orders_by_price: Dict[Decimal, list[Any]],
-    target_prices: list[Decimal],
+    orders_by_price: Dict[PriceKey, list[Any]],
+    target_prices: Sequence[PriceKey],
     side: str,
-) -> tuple[list[tuple[Any, Decimal]], set[Decimal]]:
-    cancel_orders: list[tuple[Any, Decimal]] = []
-    keep_prices: set[Decimal] = set()
+    target_set: Optional[AbstractSet[PriceKey]] = None,
+    boundary: Optional[PriceKey] = None,
+) -> tuple[list[tuple[Any, PriceKey]], set[PriceKey]]:
+    cancel_orders: list[tuple[Any, PriceKey]] = []
+    keep_prices: set[PriceKey] = set()
     if not target_prices:
         for price, orders in orders_by_price.items():
             for order in orders:
                 cancel_orders.append((order, price))
         return cancel_orders, keep_prices
 
-    target_set = set(target_prices)
-    boundary = max(target_prices) if side == "ask" else min(target_prices)
+    # 缓存的档位可直接传入集合与远端边界，避免每轮重新构建
+    if target_set is None:
+        target_set = set(target_prices)
+    if boundary is None:
+        boundary = max(target_prices) if side == "ask" else min(target_prices)
     for price, orders in orders_by_price.items():
         if price in target_set and orders:
             keep_prices.add(price)
@@ -470,32 +506,10 @@ class BotStatus:
         }
 
 
-@dataclass
-class SimOrder:
-    order_index: int
-    client_order_index: int
-    price: Decimal
-    base_qty: Decimal
-    is_ask: bool
-    created_at_ms: int
-
-    @property
-    def side(self) -> str:
-        return "ask" if self.is_ask else "bid"
-
-
-@dataclass
-class SimTrade:
-    ts_ms: int
-    price: Decimal
-    size: Decimal
-    side: str
-
-
 @dataclass
 class SimState:
-    orders: Dict[int, SimOrder] = field(default_factory=dict)
-    trades: list[SimTrade] = field(default_factory=list)
+    orders: SimOrderBook = field(default_factory=SimOrderBook)
+    trades: SimTradeLog = field(default_factory=SimTradeLog)
     position_base: Decimal = Decimal(0)
     position_cost: Decimal = Decimal(0)
     realized_pnl: Decimal = Decimal(0)
@@ -510,6 +524,60 @@ class TradePnlState:
     realized_pnl: Decimal = Decimal(0)
 
 
+@dataclass
+class TradeVolumeState:
+    """本轮运行的成交累加器：游标 last_ts_ms 及该毫秒内已计入的成交 key。"""
+
+    start_ms: int = 0
+    last_ts_ms: int = 0
+    last_keys: set[str] = field(default_factory=set)
+    volume: Decimal = Decimal(0)
+    count: int = 0
+    restored: bool = False
+
+
+def _apply_fills(state: TradeVolumeState, fills: list[FillRecord]) -> None:
+    newest = state.last_ts_ms
+    newest_keys = set(state.last_keys)
+    for fill in fills:
+        if fill.ts_ms < state.last_ts_ms:
+            continue
+        if fill.ts_ms == state.last_ts_ms and fill.key in state.last_keys:
+            continue
+        state.volume += fill.notional
+        state.count += 1
+        if fill.ts_ms > newest:
+            newest = fill.ts_ms
+            newest_keys = {fill.key}
+        elif fill.ts_ms == newest:
+            newest_keys.add(fill.key)
+    state.last_ts_ms = newest
+    state.last_keys = newest_keys
+
+
+@dataclass(frozen=True)
+class GridStrategyParams:
+    """单个币对的策略参数（按配置快照预解析，循环内不再重复转换）。"""
+
+    raw: Mapping[str, Any]
+    enabled: bool
+    grid_mode: str
+    exchange_name: str
+    market_id: Optional[str | int]
+    grid_step: Decimal
+    as_max_drawdown: Decimal
+    max_position_notional: Decimal
+    reduce_position_notional: Decimal
+    reduce_order_size_multiplier: Decimal
+    levels_up: int
+    levels_down: int
+    order_size_mode: str
+    order_size_value: Decimal
+    post_only: bool
+    max_open_orders: int
+    filter_config: MarketFilterConfig
+
+
 class BotManager:
     def __init__(self, logbus: LogBus, config: ConfigStore) -> None:
         self._logbus = logbus
@@ -531,14 +599,20 @@ class BotManager:
         self._peak_pnl: Dict[str, Decimal] = {}
         self._sim_states: Dict[str, SimState] = {}
         self._mid_history: Dict[str, list[tuple[int, Decimal]]] = {}
-        self._history = HistoryStore(self._config.path.parent / "runtime_history.jsonl")
+        self._db = RuntimeDB(self._config.path.parent / "runtime.sqlite3", logbus=self._logbus)
+        self._pnl_snapshot_at: Dict[str, int] = {}
         self._history_recorded: set[str] = set()
         self._trade_pnl: Dict[str, TradePnlState] = {}
+        self._trade_volume: Dict[str, TradeVolumeState] = {}
+        self._trade_volume_locks: Dict[str, asyncio.Lock] = {}
         self._delay_counts: Dict[str, int] = {}
         self._delay_price_marks: Dict[str, set[str]] = {}
         self._create_block_notice: Dict[str, tuple[int, str]] = {}
-        self._cid_level_cursor: Dict[str, Dict[str, int]] = {}
+        self._level_allocators: Dict[str, GridLevelAllocator] = {}
+        self._ladders: Dict[str, LadderCache] = {}
+        self._order_indexes: Dict[str, OrderIndex[GridOrderInfo]] = {}
         self._filter_bars: Dict[str, list[OhlcBar]] = {}
+        self._filter_indicators: Dict[str, IncrementalIndicators] = {}
         self._filter_runtime: Dict[str, MarketFilterRuntime] = {}
         self._filter_close_only_at: Dict[str, int] = {}
         self._markets_cache: Dict[tuple[str, str], tuple[float, list[Dict[str, Any]]]] = {}
@@ -547,6 +621,32 @@ class BotManager:
         self._market_resolve_cooldown_s = 20.0
         self._rate_limit_streak: Dict[str, int] = {}
         self._rate_limit_cooldown_until_ms: Dict[str, int] = {}
+        self._runtime_metrics: Optional[RuntimeMetricsProvider] = None
+
+    @property
+    def runtime_db(self) -> RuntimeDB:
+        return self._db
+
+    async def close(self) -> None:
+        await self._db.close()
+
+    def task(self, symbol: str) -> Optional[asyncio.Task[None]]:
+        return self._tasks.get(symbol.upper())
+
+    def set_runtime_metrics(self, provider: Optional[RuntimeMetricsProvider]) -> None:
+        """历史记录复用运行指标聚合的结果，避免与状态页重复请求交易所。"""
+        self._runtime_metrics = provider
+
+    async def _shared_runtime_symbols(self, exchange: str) -> Dict[str, Any]:
+        if self._runtime_metrics is None:
+            return {}
+        try:
+            snapshot = await self._runtime_metrics(exchange)
+        except Exception as exc:
+            self._logbus.publish(f"history.metrics.error exchange={exchange} err={type(exc).__name__}:{exc}")
+            return {}
+        symbols = snapshot.get("symbols") if isinstance(snapshot, dict) else None
+        return symbols if isinstance(symbols, dict) else {}
 
     async def start(self, symbol: str, trader: Trader, manual: bool = True) -> None:
         symbol = symbol.upper()
@@ -565,12 +665,17 @@ class BotManager:
                 self._delay_counts.pop(symbol, None)
                 self._delay_price_marks.pop(symbol, None)
                 self._create_block_notice.pop(symbol, None)
+                self._ladders.pop(symbol, None)
+                self._order_indexes.pop(symbol, None)
                 self._filter_bars.pop(symbol, None)
+                self._filter_indicators.pop(symbol, None)
                 self._filter_runtime.pop(symbol, None)
                 self._filter_close_only_at.pop(symbol, None)
                 self._rate_limit_streak.pop(symbol, None)
                 self._rate_limit_cooldown_until_ms.pop(symbol, None)
                 self._history_recorded.discard(symbol)
+                for gauge in (DELAY_COUNT, QUOTE_AGE, RATE_LIMIT_COOLDOWN):
+                    gauge.remove(symbol)
                 self._start_ms[symbol] = _now_ms()
             elif symbol not in self._start_ms:
                 self._start_ms[symbol] = _now_ms()
@@ -589,6 +694,7 @@ class BotManager:
             )
             self._task_traders[symbol] = trader
             self._tasks[symbol] = asyncio.create_task(self._run(symbol, trader))
+        self._db.add_status(symbol, _now_ms(), True, reason="manual" if manual else "restart", message="启动中")
         self._logbus.publish(f"bot.start symbol={symbol}")
 
     async def _load_markets(self, exchange: str, env: str) -> list[Dict[str, Any]]:
@@ -639,7 +745,7 @@ class BotManager:
         if not items and isinstance(trader, GrvtTrader):
             try:
                 if not trader._api.markets:
-                    await trader._api.load_markets()
+                    await trader._request(trader._api.load_markets)
                 items = [{"symbol": key, "market_id": key} for key in trader._api.markets.keys()]
             except Exception as exc:
                 self._logbus.publish(
@@ -717,10 +823,13 @@ class BotManager:
             self._start_ms.pop(symbol, None)
             self._trade_pnl_reset(symbol)
             self._filter_bars.pop(symbol, None)
+            self._filter_indicators.pop(symbol, None)
             self._filter_runtime.pop(symbol, None)
             self._filter_close_only_at.pop(symbol, None)
             self._rate_limit_streak.pop(symbol, None)
             self._rate_limit_cooldown_until_ms.pop(symbol, None)
+            self._ladders.pop(symbol, None)
+            self._order_indexes.pop(symbol, None)
             restart_task = self._restart_tasks.pop(symbol, None)
             if restart_task and not restart_task.done():
                 restart_task.cancel()
@@ -745,12 +854,22 @@ class BotManager:
 
         await self._force_flatten_on_stop(symbol, trader, market_id)
 
+        release_market = getattr(trader, "release_market", None)
+        if callable(release_market) and market_id is not None:
+            try:
+                await release_market(market_id)
+            except Exception as exc:
+                self._logbus.publish(
+                    f"bot.release_market.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}"
+                )
+
         async with self._lock:
             self._tasks.pop(symbol, None)
             self._task_traders.pop(symbol, None)
             self._restart_times.pop(symbol, None)
             prev = self._status.get(symbol)
             self._status[symbol] = BotStatus(symbol=symbol, running=False, message='stopped', started_at=prev.started_at if prev else None)
+        self._db.add_status(symbol, _now_ms(), False, reason="manual", message="stopped")
         self._logbus.publish(f'bot.stop symbol={symbol}')
 
     async def stop_all(self) -> None:
@@ -848,10 +967,13 @@ class BotManager:
         self._rate_limit_streak[symbol] = streak
         delay_ms = min(10_000, 500 * (2 ** (streak - 1)))
         self._rate_limit_cooldown_until_ms[symbol] = now_ms + delay_ms
+        RATE_LIMITED.inc(symbol)
+        RATE_LIMIT_COOLDOWN.set(symbol, value=delay_ms / 1000)
         return delay_ms, streak
 
     def _clear_rate_limited(self, symbol: str) -> None:
-        self._rate_limit_streak.pop(symbol, None)
+        if self._rate_limit_streak.pop(symbol, None) is not None:
+            RATE_LIMIT_COOLDOWN.set(symbol, value=0)
         self._rate_limit_cooldown_until_ms.pop(symbol, None)
 
     @staticmethod
@@ -866,12 +988,17 @@ class BotManager:
         sym = symbol.upper()
         state = self._sim_states.get(sym)
         if state is None:
-            state = SimState()
+            runtime = self._config.snapshot().get("runtime", {}) or {}
+            cap = _safe_int(runtime.get("sim_trade_cap"), DEFAULT_SIM_TRADE_CAP)
+            spill_path = self._config.path.parent / "sim_trades" / f"{sym}.jsonl"
+            state = SimState(trades=SimTradeLog(cap, spill_path))
             self._sim_states[sym] = state
         return state
 
     def _sim_reset(self, symbol: str) -> None:
-        self._sim_states.pop(symbol.upper(), None)
+        state = self._sim_states.pop(symbol.upper(), None)
+        if state is not None:
+            state.trades.discard()
 
     def _trade_pnl_state(self, symbol: str) -> TradePnlState:
         sym = symbol.upper()
@@ -883,9 +1010,10 @@ class BotManager:
 
     def _trade_pnl_reset(self, symbol: str) -> None:
         self._trade_pnl.pop(symbol.upper(), None)
+        self._trade_volume.pop(symbol.upper(), None)
 
     def sim_orders(self, symbol: str) -> list[SimOrder]:
-        return list(self._sim_state(symbol).orders.values())
+        return self._sim_state(symbol).orders.values()
 
     def sim_open_orders(self, symbol: str) -> int:
         return len(self._sim_state(symbol).orders)
@@ -902,15 +1030,7 @@ class BotManager:
         return state.realized_pnl + (mid * state.position_base - state.position_cost)
 
     def sim_trade_stats(self, symbol: str, start_ms: int, end_ms: int) -> tuple[Decimal, int]:
-        state = self._sim_state(symbol)
-        total = Decimal(0)
-        count = 0
-        for trade in state.trades:
-            if trade.ts_ms < start_ms or trade.ts_ms > end_ms:
-                continue
-            total += abs(trade.price * trade.size)
-            count += 1
-        return total, count
+        return self._sim_state(symbol).trades.stats(start_ms, end_ms)
 
     def _sim_update_mid(self, symbol: str, mid: Decimal) -> None:
         self._sim_state(symbol).last_mid = mid
@@ -945,7 +1065,7 @@ class BotManager:
             self._filter_runtime[sym] = runtime
         return runtime
 
-    def _market_filter_config(self, strat: Dict[str, Any], grid_mode: str) -> MarketFilterConfig:
+    def _market_filter_config(self, strat: Mapping[str, Any], grid_mode: str) -> MarketFilterConfig:
         enabled = grid_mode == GRID_MODE_DYNAMIC and _safe_bool(strat.get("market_filter_enabled"), False)
 
         atr_period_raw = strat.get("market_filter_atr_period")
@@ -1016,22 +1136,51 @@ class BotManager:
             block_timeout_minutes=timeout_minutes,
         )
 
+    def _strategy_params(self, snapshot: ConfigSnapshot, symbol: str) -> GridStrategyParams:
+        return snapshot.derive(("grid_strategy", symbol), lambda snap: self._build_strategy_params(snap, symbol))
+
+    def _build_strategy_params(self, cfg: Mapping[str, Any], symbol: str) -> GridStrategyParams:
+        strat = (cfg.get("strategies", {}) or {}).get(symbol, {}) or {}
+        grid_mode = _normalize_grid_mode(strat.get("grid_mode"))
+        exchange_name = _exchange_name(strat.get("exchange") or (cfg.get("exchange", {}) or {}).get("name"))
+        market_id = _normalize_market_id(exchange_name, strat.get("market_id"))
+        if market_id is not None and not _market_id_matches_symbol(exchange_name, symbol, market_id):
+            market_id = None
+        return GridStrategyParams(
+            raw=strat,
+            enabled=bool(strat.get("enabled", True)),
+            grid_mode=grid_mode,
+            exchange_name=exchange_name,
+            market_id=market_id,
+            grid_step=_safe_decimal(strat.get("grid_step") or 0),
+            as_max_drawdown=_safe_decimal(strat.get("as_max_drawdown") or 0),
+            max_position_notional=_safe_decimal(strat.get("max_position_notional") or 0),
+            reduce_position_notional=_safe_decimal(strat.get("reduce_position_notional") or 0),
+            reduce_order_size_multiplier=_safe_decimal(strat.get("reduce_order_size_multiplier") or 1),
+            levels_up=int(strat.get("levels_up") or 0),
+            levels_down=int(strat.get("levels_down") or 0),
+            order_size_mode=str(strat.get("order_size_mode") or "notional"),
+            order_size_value=_safe_decimal(strat.get("order_size_value") or 0),
+            post_only=bool(strat.get("post_only", True)),
+            max_open_orders=int(strat.get("max_open_orders") or 0),
+            filter_config=self._market_filter_config(strat, grid_mode),
+        )
+
     def _evaluate_filter(
         self,
         symbol: str,
-        strat: Dict[str, Any],
-        grid_mode: str,
+        cfg: MarketFilterConfig,
         now_ms: int,
         mid: Decimal,
     ) -> MarketFilterDecision:
         sym = symbol.upper()
-        cfg = self._market_filter_config(strat, grid_mode)
         runtime = self._market_filter_runtime_state(sym)
         prev_state = runtime.state
         prev_reason = runtime.reason
 
         if not cfg.enabled:
             self._filter_bars.pop(sym, None)
+            self._filter_indicators.pop(sym, None)
             self._filter_close_only_at.pop(sym, None)
             decision = evaluate_market_filter(cfg, runtime, [], now_ms)
             return decision
@@ -1041,8 +1190,19 @@ class BotManager:
             bars = []
             self._filter_bars[sym] = bars
         update_ohlc_bars(bars, now_ms, mid, FILTER_MAX_BARS)
-        ready_bars = completed_bars(bars, now_ms)
-        decision = evaluate_market_filter(cfg, runtime, ready_bars, now_ms)
+        indicators = self._filter_indicators.get(sym)
+        if indicators is None or (indicators.atr_period, indicators.adx_period) != (cfg.atr_period, cfg.adx_period):
+            indicators = IncrementalIndicators(cfg.atr_period, cfg.adx_period)
+            self._filter_indicators[sym] = indicators
+        bar_count = indicators.update(bars, now_ms)
+        decision = evaluate_market_filter_values(
+            cfg,
+            runtime,
+            bar_count,
+            indicators.atr_pct,
+            indicators.adx,
+            now_ms,
+        )
 
         if decision.state != prev_state or decision.reason != prev_reason:
             self._logbus.publish(
@@ -1089,33 +1249,17 @@ class BotManager:
         await self._market_close_position(symbol, trader, market_id, pos_base, meta)
         self._logbus.publish(f"filter.close_only symbol={symbol}")
 
-    def _pick_level_with_cursor(self, symbol: str, side: str, free_levels: list[int]) -> Optional[int]:
-        if not free_levels:
-            return None
+    def _level_allocator(self, symbol: str, trader: Trader) -> GridLevelAllocator:
         sym = symbol.upper()
-        side_key = "ask" if side == "ask" else "bid"
-        cursor = self._cid_level_cursor.get(sym)
-        if cursor is None:
-            seed = (_now_ms() % MAX_LEVEL_PER_SIDE) + 1
-            cursor = {
-                "ask": int(seed),
-                "bid": int((seed % MAX_LEVEL_PER_SIDE) + 1),
-            }
-            self._cid_level_cursor[sym] = cursor
-        start = int(cursor.get(side_key, 1))
-        levels = sorted(free_levels)
-        picked: Optional[int] = None
-        for lvl in levels:
-            if lvl >= start:
-                picked = lvl
-                break
-        if picked is None:
-            picked = levels[0]
-        next_level = int(picked) + 1
-        if next_level > MAX_LEVEL_PER_SIDE:
-            next_level = 1
-        cursor[side_key] = next_level
-        return picked
+        allocator = self._level_allocators.get(sym)
+        if allocator is None:
+            # GRVT 要求 client_order_id 不复用，按游标轮转档位
+            allocator = GridLevelAllocator(
+                rotate=isinstance(trader, GrvtTrader),
+                seed=(_now_ms() % MAX_LEVEL_PER_SIDE) + 1,
+            )
+            self._level_allocators[sym] = allocator
+        return allocator
 
     def _append_mid_history(self, symbol: str, ts_ms: int, mid: Decimal, max_points: int) -> list[tuple[int, Decimal]]:
         history = self._mid_history.get(symbol)
@@ -1151,7 +1295,7 @@ class BotManager:
         symbol: str,
         mid: Decimal,
         pos_base: Decimal,
-        strat: Dict[str, Any],
+        strat: Mapping[str, Any],
         meta: MarketMeta,
         now_ms: int,
     ) -> tuple[Decimal, Decimal]:
@@ -1196,20 +1340,24 @@ class BotManager:
         base_qty: Decimal,
         is_ask: bool,
         created_at_ms: int,
+        queue_ahead: Decimal = Decimal(0),
     ) -> None:
         state = self._sim_state(symbol)
-        state.orders[order_index] = SimOrder(
-            order_index=order_index,
-            client_order_index=client_order_index,
-            price=price,
-            base_qty=base_qty,
-            is_ask=is_ask,
-            created_at_ms=created_at_ms,
+        state.orders.add(
+            SimOrder(
+                order_index=order_index,
+                client_order_index=client_order_index,
+                price=price,
+                base_qty=base_qty,
+                is_ask=is_ask,
+                created_at_ms=created_at_ms,
+                queue_ahead=max(Decimal(0), queue_ahead),
+            )
         )
 
     def _sim_cancel_order(self, symbol: str, order_index: int) -> None:
         state = self._sim_state(symbol)
-        state.orders.pop(order_index, None)
+        state.orders.pop(order_index)
 
     def _sim_apply_trade(self, symbol: str, side: str, price: Decimal, size: Decimal, ts_ms: int) -> None:
         state = self._sim_state(symbol)
@@ -1252,7 +1400,7 @@ class BotManager:
                         state.position_base = -remaining
                         state.position_cost = -price * remaining
 
-        state.trades.append(SimTrade(ts_ms=ts_ms, price=price, size=size, side=side))
+        state.trades.append(ts_ms, price, size, side)
 
     def _apply_trade_pnl(self, state: TradePnlState, side: str, price: Decimal, size: Decimal) -> None:
         size = abs(size)
@@ -1311,26 +1459,27 @@ class BotManager:
         state = await self._lighter_update_trade_pnl(trader, symbol, market_id, start_ms, end_ms)
         return self._trade_pnl_value(state, mid)
 
-    def _sim_match_orders(self, symbol: str, bid: Decimal, ask: Decimal, now_ms: int) -> None:
+    def _sim_match_orders(
+        self,
+        symbol: str,
+        bid: Decimal,
+        ask: Decimal,
+        now_ms: int,
+        touch_size: Decimal = Decimal(0),
+    ) -> None:
         state = self._sim_state(symbol)
         if not state.orders:
             return
-        filled: list[SimOrder] = []
-        for order in state.orders.values():
-            if order.is_ask:
-                if bid >= order.price:
-                    filled.append(order)
+        for fill in state.orders.match(bid, ask, touch_size):
+            order = fill.order
+            self._sim_apply_trade(symbol, order.side, order.price, fill.size, now_ms)
+            TAPE.fill("sim", symbol, order.side, order.price, fill.size, now_ms)
+            if fill.done:
+                self._logbus.publish(f"sim.fill symbol={symbol} side={order.side} price={order.price} size={fill.size}")
             else:
-                if ask <= order.price:
-                    filled.append(order)
-        if not filled:
-            return
-        for order in filled:
-            self._sim_apply_trade(symbol, order.side, order.price, order.base_qty, now_ms)
-            state.orders.pop(order.order_index, None)
-            self._logbus.publish(
-                f"sim.fill symbol={symbol} side={order.side} price={order.price} size={order.base_qty}"
-            )
+                self._logbus.publish(
+                    f"sim.fill symbol={symbol} side={order.side} price={order.price} size={fill.size} remaining={order.base_qty}"
+                )
 
     def _sim_market_close(self, symbol: str, price: Decimal) -> None:
         state = self._sim_state(symbol)
@@ -1341,15 +1490,24 @@ class BotManager:
         self._sim_apply_trade(symbol, side, price, size, _now_ms())
 
     async def _run(self, symbol: str, trader: Trader) -> None:
-        interval_s = 0.5
+        # 策略任务可能由 HTTP 请求创建，显式恢复为策略查询优先级
+        set_priority(PRIORITY_QUERY)
+        scheduler = TickScheduler()
+        tick_started: Optional[float] = None
         try:
             while True:
-                await asyncio.sleep(interval_s)
-                cfg = self._config.read()
+                if tick_started is not None:
+                    TICK_DURATION.observe(symbol, value=time.perf_counter() - tick_started)
+                await scheduler.wait(trader)
+                tick_started = time.perf_counter()
+                cfg = self._config.snapshot()
                 runtime = cfg.get("runtime", {}) or {}
+                scheduler.configure(runtime)
                 dry_run = bool(runtime.get("dry_run", True))
                 simulate = self._sim_enabled(runtime)
                 simulate_fill = self._sim_fill_enabled(runtime)
+                sim_touch_size = _safe_decimal(runtime.get("sim_touch_size") or 0)
+                sim_queue_ahead = _safe_decimal(runtime.get("sim_queue_ahead") or 0)
                 stop_after_minutes = _safe_decimal(runtime.get("stop_after_minutes") or 0)
                 stop_after_volume = _safe_decimal(runtime.get("stop_after_volume") or 0)
                 stop_check_interval_ms = _safe_int(runtime.get("stop_check_interval_ms"), 1000)
@@ -1364,10 +1522,11 @@ class BotManager:
                         **self._filter_off_patch("rate_limit_cooldown"),
                     )
                     continue
-                strat = (cfg.get("strategies", {}) or {}).get(symbol, {}) or {}
-                grid_mode = _normalize_grid_mode(strat.get("grid_mode"))
+                params = self._strategy_params(cfg, symbol)
+                strat = params.raw
+                grid_mode = params.grid_mode
 
-                if not bool(strat.get("enabled", True)):
+                if not params.enabled:
                     await self._update_status(
                         symbol,
                         running=True,
@@ -1377,12 +1536,9 @@ class BotManager:
                     )
                     continue
 
-                exchange_name = _exchange_name(strat.get("exchange") or (cfg.get("exchange", {}) or {}).get("name"))
-                market_id = _normalize_market_id(exchange_name, strat.get("market_id"))
-                if market_id is not None and not _market_id_matches_symbol(exchange_name, symbol, market_id):
-                    market_id = None
+                market_id = params.market_id
                 if market_id is None:
-                    market_id = await self._resolve_market_id(symbol, trader, cfg, strat)
+                    market_id = await self._resolve_market_id(symbol, trader, self._config.read(), dict(strat))
                 if market_id is None:
                     await self._update_status(
                         symbol,
@@ -1392,6 +1548,7 @@ class BotManager:
                         **self._filter_off_patch("missing_market_id"),
                     )
                     continue
+                scheduler.bind(market_id)
 
                 if symbol not in self._base_pnl:
                     try:
@@ -1407,6 +1564,10 @@ class BotManager:
                     meta = await trader.market_meta(market_id)
                     bid, ask = await trader.best_bid_ask(market_id)
                     self._clear_rate_limited(symbol)
+                    quote_age = getattr(trader, "quote_age", None)
+                    age_s = quote_age(market_id) if callable(quote_age) else None
+                    if age_s is not None:
+                        QUOTE_AGE.set(symbol, value=age_s)
                 except Exception as exc:
                     if _is_rate_limited_error(exc):
                         delay_ms, streak = self._mark_rate_limited(symbol, _now_ms())
@@ -1440,17 +1601,17 @@ class BotManager:
                 if simulate:
                     self._sim_update_mid(symbol, mid)
                     if simulate_fill:
-                        self._sim_match_orders(symbol, bid, ask, now_ms)
+                        self._sim_match_orders(symbol, bid, ask, now_ms, sim_touch_size)
                 start_ms = self._start_ms.get(symbol)
                 if start_ms is None:
                     status = self._status.get(symbol)
                     start_ms = _parse_iso_ms(status.started_at if status else None) or now_ms
                     self._start_ms[symbol] = start_ms
 
-                filter_decision = self._evaluate_filter(symbol, strat, grid_mode, now_ms, mid)
+                filter_decision = self._evaluate_filter(symbol, params.filter_config, now_ms, mid)
                 filter_patch = self._filter_status_patch(filter_decision)
 
-                step_input = _safe_decimal(strat.get("grid_step") or 0)
+                step_input = params.grid_step
                 if grid_mode == GRID_MODE_AS:
                     min_step = _min_price_step(meta)
                 else:
@@ -1480,7 +1641,7 @@ class BotManager:
                     )
 
                 if grid_mode == GRID_MODE_AS:
-                    max_drawdown = _safe_decimal(strat.get("as_max_drawdown") or 0)
+                    max_drawdown = params.as_max_drawdown
                     if max_drawdown > 0:
                         pnl_now = await self._position_pnl(trader, market_id, symbol, simulate=simulate)
                         if pnl_now is None:
@@ -1528,9 +1689,9 @@ class BotManager:
                 reduce_side: Optional[str] = None
                 pos_notional: Optional[Decimal] = None
                 pos_base: Optional[Decimal] = None
-                max_pos = _safe_decimal(strat.get("max_position_notional") or 0)
-                reduce_exit = _safe_decimal(strat.get("reduce_position_notional") or 0)
-                reduce_mult = _safe_decimal(strat.get("reduce_order_size_multiplier") or 1)
+                max_pos = params.max_position_notional
+                reduce_exit = params.reduce_position_notional
+                reduce_mult = params.reduce_order_size_multiplier
                 if grid_mode != GRID_MODE_AS:
                     reduce_mode = self._reduce_mode.get(symbol, False)
                     if reduce_mult < 1:
@@ -1619,7 +1780,7 @@ class BotManager:
                                 if simulate:
                                     volume, _ = self.sim_trade_stats(symbol, start_ms, now_ms)
                                 else:
-                                    volume, _ = await self._trade_stats_since(trader, market_id, start_ms, now_ms)
+                                    volume, _ = await self.trade_stats(trader, symbol, market_id, start_ms, now_ms)
                                 if volume >= stop_after_volume:
                                     reason_parts.append("成交量达到")
                             except Exception as exc:
@@ -1714,7 +1875,7 @@ class BotManager:
                     existing_orders = self.sim_orders(symbol)
                 else:
                     try:
-                        existing_orders = await trader.active_orders(market_id)
+                        existing_orders = await self._open_orders(trader, market_id)
                         self._clear_rate_limited(symbol)
                     except Exception as exc:
                         if _is_rate_limited_error(exc):
@@ -1740,36 +1901,38 @@ class BotManager:
                             continue
                         raise
                 existing: Dict[int, Any] = {}
-                asks_by_price: Dict[Decimal, list[Any]] = {}
-                bids_by_price: Dict[Decimal, list[Any]] = {}
+                price_decimals = int(meta.price_decimals)
+                size_decimals = int(meta.size_decimals)
+                asks_by_price: Dict[int, list[Any]] = {}
+                bids_by_price: Dict[int, list[Any]] = {}
                 ask_used_levels: set[int] = set()
                 bid_used_levels: set[int] = set()
 
-                for o in existing_orders:
-                    cid = _order_client_id(o)
-                    if cid is None or cid <= 0:
-                        continue
-                    if not is_grid_client_order(prefix, cid):
-                        continue
+                order_index = self._order_indexes.get(symbol)
+                if order_index is None:
+                    order_index = OrderIndex()
+                    self._order_indexes[symbol] = order_index
+                parsed_orders = order_index.parse(
+                    existing_orders,
+                    (prefix, price_decimals),
+                    lambda o: _parse_grid_order(o, prefix, price_decimals),
+                )
+                for o, (cid, side, price_ticks, lvl) in parsed_orders:
                     existing[cid] = o
-                    side = _order_side(o)
                     if side is None:
                         continue
-                    price = _order_price_decimal(o, meta)
-                    price_q = _quantize(price, meta.price_decimals, ROUND_HALF_UP)
                     if side == "ask":
-                        asks_by_price.setdefault(price_q, []).append(o)
+                        asks_by_price.setdefault(price_ticks, []).append(o)
                     else:
-                        bids_by_price.setdefault(price_q, []).append(o)
-                    lvl = grid_client_order_side_level(cid)
+                        bids_by_price.setdefault(price_ticks, []).append(o)
                     if lvl:
                         if lvl[0] == "ask":
                             ask_used_levels.add(lvl[1])
                         elif lvl[0] == "bid":
                             bid_used_levels.add(lvl[1])
 
-                levels_up = int(strat.get("levels_up") or 0)
-                levels_down = int(strat.get("levels_down") or 0)
+                levels_up = params.levels_up
+                levels_down = params.levels_down
                 if grid_mode == GRID_MODE_AS:
                     levels_up = 1
                     levels_down = 1
@@ -1780,32 +1943,27 @@ class BotManager:
                     levels_up = 0
                     levels_down = 0
 
-                size_mode = str(strat.get("order_size_mode") or "notional")
-                size_value = _safe_decimal(strat.get("order_size_value") or 0)
-                post_only = bool(strat.get("post_only", True))
-                max_open_orders = int(strat.get("max_open_orders") or 0)
+                size_mode = params.order_size_mode
+                size_value = params.order_size_value
+                post_only = params.post_only
+                max_open_orders = params.max_open_orders
 
                 ask_count = sum(len(v) for v in asks_by_price.values())
                 bid_count = sum(len(v) for v in bids_by_price.values())
                 total_existing = ask_count + bid_count
 
-                desired_asks: list[Decimal] = []
-                desired_bids: list[Decimal] = []
-                for i in range(1, levels_up + 1):
-                    p = center + (step * i)
-                    p = _quantize(p, meta.price_decimals, ROUND_HALF_UP)
-                    if p > 0:
-                        desired_asks.append(p)
-                for i in range(1, levels_down + 1):
-                    p = center - (step * i)
-                    p = _quantize(p, meta.price_decimals, ROUND_HALF_UP)
-                    if p > 0:
-                        desired_bids.append(p)
-                desired_asks = _unique_prices(desired_asks)
-                desired_bids = _unique_prices(desired_bids)
-
-                cancel_orders: list[tuple[Any, Decimal]] = []
-                keep_ask_prices: set[Decimal] = set()
+                # 挂单规划全程使用整数价格刻度，只在下单/模拟成交时换回 Decimal；
+                # 目标档位按交易对缓存，中心价移动 k 档时只平移 k 档
+                ladder_cache = self._ladders.get(symbol)
+                if ladder_cache is None:
+                    ladder_cache = LadderCache()
+                    self._ladders[symbol] = ladder_cache
+                ladder = ladder_cache.update(center, step, levels_up, levels_down, price_decimals)
+                desired_asks = ladder.asks
+                desired_bids = ladder.bids
+
+                cancel_orders: list[tuple[Any, int]] = []
+                keep_ask_prices: set[int] = set()
                 if grid_mode == GRID_MODE_AS:
                     target = desired_asks[0] if desired_asks else None
                     for price, orders in asks_by_price.items():
@@ -1822,10 +1980,12 @@ class BotManager:
                         asks_by_price,
                         desired_asks,
                         "ask",
+                        target_set=ladder.ask_set,
+                        boundary=ladder.ask_boundary,
                     )
                     cancel_orders.extend(dynamic_cancel)
 
-                keep_bid_prices: set[Decimal] = set()
+                keep_bid_prices: set[int] = set()
                 if grid_mode == GRID_MODE_AS:
                     target = desired_bids[0] if desired_bids else None
                     for price, orders in bids_by_price.items():
@@ -1842,6 +2002,8 @@ class BotManager:
                         bids_by_price,
                         desired_bids,
                         "bid",
+                        target_set=ladder.bid_set,
+                        boundary=ladder.bid_boundary,
                     )
                     cancel_orders.extend(dynamic_cancel)
 
@@ -1857,18 +2019,19 @@ class BotManager:
                         delay_marks = set()
                         self._delay_price_marks[symbol] = delay_marks
                     active_missing: set[str] = set()
-                    for price in missing_ask_prices:
-                        price_q = _quantize(price, meta.price_decimals, ROUND_HALF_UP)
-                        key = f"ask:{price_q}"
+                    # mid >= 刻度价 等价于 floor(mid) >= 刻度；mid <= 刻度价 等价于 ceil(mid) <= 刻度
+                    mid_floor_ticks = to_ticks(mid, price_decimals, ROUND_FLOOR)
+                    mid_ceil_ticks = to_ticks(mid, price_decimals, ROUND_CEILING)
+                    for price_ticks in missing_ask_prices:
+                        key = f"ask:{price_ticks}"
                         active_missing.add(key)
-                        if mid >= price_q and key not in delay_marks:
+                        if mid_floor_ticks >= price_ticks and key not in delay_marks:
                             delay_marks.add(key)
                             delay_count += 1
-                    for price in missing_bid_prices:
-                        price_q = _quantize(price, meta.price_decimals, ROUND_HALF_UP)
-                        key = f"bid:{price_q}"
+                    for price_ticks in missing_bid_prices:
+                        key = f"bid:{price_ticks}"
                         active_missing.add(key)
-                        if mid <= price_q and key not in delay_marks:
+                        if mid_ceil_ticks <= price_ticks and key not in delay_marks:
                             delay_marks.add(key)
                             delay_count += 1
                     if delay_marks:
@@ -1876,10 +2039,19 @@ class BotManager:
                     self._delay_counts[symbol] = delay_count
                 else:
                     self._delay_price_marks.pop(symbol, None)
+                DELAY_COUNT.set(symbol, value=delay_count)
+                RECONCILE_DIFF.observe(symbol, "cancel", value=len(cancel_orders))
+                RECONCILE_DIFF.observe(symbol, "missing", value=missing_asks + missing_bids)
 
                 if cancel_orders or (missing_asks + missing_bids) > 0:
-                    self._logbus.publish(
-                        f"grid.reconcile symbol={symbol} market_id={market_id} existing={total_existing} cancel={len(cancel_orders)} missing_asks={missing_asks} missing_bids={missing_bids}"
+                    self._logbus.event(
+                        "grid.reconcile",
+                        symbol=symbol,
+                        market_id=market_id,
+                        existing=total_existing,
+                        cancel=len(cancel_orders),
+                        missing_asks=missing_asks,
+                        missing_bids=missing_bids,
                     )
 
                 remaining_after_cancel = max(0, total_existing - len(cancel_orders))
@@ -1888,10 +2060,14 @@ class BotManager:
                     available_slots = max(0, max_open_orders - remaining_after_cancel)
 
                 if cancel_orders:
-                    for o, price_q in cancel_orders:
+                    live_cancels: list[tuple[Any, int]] = []
+                    for o, price_ticks in cancel_orders:
                         order_index = _order_id(o)
                         client_index = _order_client_id(o) or 0
                         if order_index is None or (isinstance(order_index, int) and order_index <= 0):
+                            if _order_field(o, "pending"):
+                                # 刚提交、尚未收到推送确认，下一轮再处理
+                                continue
                             self._logbus.publish(
                                 f"order.cancel.error symbol={symbol} market_id={market_id} client_id={client_index} err=missing_order_index"
                             )
@@ -1905,83 +2081,107 @@ class BotManager:
                                 )
                                 continue
                             self._sim_cancel_order(symbol, order_id)
-                            self._logbus.publish(
-                                f"sim.cancel symbol={symbol} market_id={market_id} order={order_id} client_id={client_index} price={price_q}"
+                            ORDERS.inc(symbol, "cancel")
+                            self._logbus.event(
+                                "sim.cancel",
+                                symbol=symbol,
+                                market_id=market_id,
+                                order=order_id,
+                                client_id=client_index,
+                                price=from_ticks(price_ticks, price_decimals),
                             )
                         elif dry_run:
-                            self._logbus.publish(
-                                f"dry_run cancel symbol={symbol} market_id={market_id} order={order_index} client_id={client_index} price={price_q}"
+                            self._logbus.event(
+                                "dry_run.cancel",
+                                symbol=symbol,
+                                market_id=market_id,
+                                order=order_index,
+                                client_id=client_index,
+                                price=from_ticks(price_ticks, price_decimals),
                             )
                         else:
-                            try:
-                                await trader.cancel_order(market_id, order_index)
-                                self._logbus.publish(
-                                    f"order.cancel symbol={symbol} market_id={market_id} order={order_index} client_id={client_index}"
+                            live_cancels.append((order_index, client_index))
+                    if live_cancels:
+                        client_by_order = {str(order_index): client_index for order_index, client_index in live_cancels}
+                        cancel_results = await trader.cancel_orders(
+                            market_id, [order_index for order_index, _ in live_cancels]
+                        )
+                        for result in cancel_results:
+                            if result.ok:
+                                ORDERS.inc(symbol, "cancel")
+                                self._logbus.event(
+                                    "order.cancel",
+                                    symbol=symbol,
+                                    market_id=market_id,
+                                    order=result.key,
+                                    client_id=client_by_order.get(str(result.key), 0),
                                 )
-                            except Exception as exc:
-                                self._logbus.publish(
-                                    f"order.cancel.error symbol={symbol} market_id={market_id} order={order_index} err={type(exc).__name__}:{exc}"
+                            else:
+                                self._logbus.event(
+                                    "order.cancel.error",
+                                    LEVEL_WARNING,
+                                    symbol=symbol,
+                                    market_id=market_id,
+                                    order=result.key,
+                                    err=result.error,
                                 )
 
                 created_attempts = 0
                 create_block_reasons: set[str] = set()
                 create_block_tip = ""
                 if available_slots > 0 and (missing_asks + missing_bids) > 0:
-                    plan_candidates: list[tuple[Decimal, str, Decimal]] = []
-                    for price in missing_ask_prices:
-                        plan_candidates.append((abs(price - center), "ask", price))
-                    for price in missing_bid_prices:
-                        plan_candidates.append((abs(price - center), "bid", price))
+                    plan_candidates: list[tuple[int, str, int]] = []
+                    for price_ticks in missing_ask_prices:
+                        plan_candidates.append((ladder.distance(price_ticks), "ask", price_ticks))
+                    for price_ticks in missing_bid_prices:
+                        plan_candidates.append((ladder.distance(price_ticks), "bid", price_ticks))
                     plan_candidates.sort(key=lambda item: (item[0], 0 if item[1] == "ask" else 1))
-                    create_plan: list[tuple[str, Decimal]] = [
-                        (side, price) for _, side, price in plan_candidates[:available_slots]
+                    create_plan: list[tuple[str, int]] = [
+                        (side, price_ticks) for _, side, price_ticks in plan_candidates[:available_slots]
                     ]
+                    size_rule = SizeRule.build(
+                        size_mode,
+                        size_value,
+                        price_decimals,
+                        size_decimals,
+                        meta.min_base_amount,
+                        meta.min_quote_amount,
+                    )
+                    reduce_size_rule = size_rule
+                    if reduce_mode and reduce_mult > 1:
+                        reduce_size_rule = SizeRule.build(
+                            size_mode,
+                            size_value * reduce_mult,
+                            price_decimals,
+                            size_decimals,
+                            meta.min_base_amount,
+                            meta.min_quote_amount,
+                        )
 
-                    free_ask_levels = [i for i in range(1, MAX_LEVEL_PER_SIDE + 1) if i not in ask_used_levels]
-                    free_bid_levels = [i for i in range(1, MAX_LEVEL_PER_SIDE + 1) if i not in bid_used_levels]
+                    allocator = self._level_allocator(symbol, trader)
+                    live_creates: list[LimitOrderRequest] = []
+                    allocator.sync("ask", ask_used_levels)
+                    allocator.sync("bid", bid_used_levels)
 
-                    for side, price in create_plan:
-                        if price <= 0:
+                    for side, price_int in create_plan:
+                        if price_int <= 0:
                             continue
-                        if side == "ask":
-                            if not free_ask_levels:
-                                self._logbus.publish(f"grid.no_free_id symbol={symbol} side=ask")
-                                continue
-                            if isinstance(trader, GrvtTrader):
-                                level = self._pick_level_with_cursor(symbol, "ask", free_ask_levels)
-                                if level is None:
-                                    self._logbus.publish(f"grid.no_free_id symbol={symbol} side=ask")
-                                    continue
-                                free_ask_levels.remove(level)
-                            else:
-                                level = free_ask_levels.pop(0)
-                        else:
-                            if not free_bid_levels:
-                                self._logbus.publish(f"grid.no_free_id symbol={symbol} side=bid")
-                                continue
-                            if isinstance(trader, GrvtTrader):
-                                level = self._pick_level_with_cursor(symbol, "bid", free_bid_levels)
-                                if level is None:
-                                    self._logbus.publish(f"grid.no_free_id symbol={symbol} side=bid")
-                                    continue
-                                free_bid_levels.remove(level)
-                            else:
-                                level = free_bid_levels.pop(0)
-
-                        price_q = _quantize(price, meta.price_decimals, ROUND_HALF_UP)
-                        size_value_effective = size_value
-                        if reduce_mode and reduce_side == side and reduce_mult > 1:
-                            size_value_effective = size_value * reduce_mult
-                        base_qty = _calc_base_qty(size_mode, size_value_effective, price_q)
-                        base_qty_q = _quantize(base_qty, meta.size_decimals, ROUND_DOWN)
-                        if base_qty_q <= 0:
+                        level = allocator.allocate(side)
+                        if level is None:
+                            self._logbus.publish(f"grid.no_free_id symbol={symbol} side={side}")
+                            continue
+
+                        rule = reduce_size_rule if reduce_mode and reduce_side == side else size_rule
+                        base_int = rule.size_ticks(price_int)
+                        if base_int <= 0:
                             create_block_reasons.add("qty_non_positive")
                             continue
-                        if base_qty_q < meta.min_base_amount:
+                        if rule.below_min_base(base_int):
+                            base_qty_q = from_ticks(base_int, size_decimals)
                             create_block_reasons.add(f"below_min_base[{base_qty_q}<{meta.min_base_amount}]")
                             continue
-                        quote_notional = base_qty_q * price_q
-                        if quote_notional < meta.min_quote_amount:
+                        if rule.below_min_quote(base_int, price_int):
+                            quote_notional = from_ticks(base_int * price_int, price_decimals + size_decimals)
                             create_block_reasons.add(f"below_min_quote[{quote_notional}<{meta.min_quote_amount}]")
                             continue
 
@@ -1992,42 +2192,65 @@ class BotManager:
                         if oid > CLIENT_ORDER_MAX:
                             create_block_reasons.add("client_id_overflow")
                             continue
-                        price_int = _to_scaled_int(price_q, meta.price_decimals, ROUND_HALF_UP)
-                        base_int = _to_scaled_int(base_qty_q, meta.size_decimals, ROUND_DOWN)
 
                         if simulate:
                             self._sim_create_order(
                                 symbol,
                                 order_index=int(oid),
                                 client_order_index=int(oid),
-                                price=price_q,
-                                base_qty=base_qty_q,
+                                price=from_ticks(price_int, price_decimals),
+                                base_qty=from_ticks(base_int, size_decimals),
                                 is_ask=(side == "ask"),
                                 created_at_ms=now_ms,
+                                queue_ahead=sim_queue_ahead,
                             )
-                            self._logbus.publish(
-                                f"sim.create symbol={symbol} market_id={market_id} id={oid} ask={side == 'ask'} price={price_int} size={base_int}"
+                            ORDERS.inc(symbol, "create")
+                            self._logbus.event(
+                                "sim.create",
+                                symbol=symbol,
+                                market_id=market_id,
+                                id=oid,
+                                ask=side == "ask",
+                                price=price_int,
+                                size=base_int,
                             )
                             created_attempts += 1
                         elif dry_run:
-                            self._logbus.publish(
-                                f"dry_run create symbol={symbol} market_id={market_id} id={oid} ask={side == 'ask'} price={price_int} size={base_int}"
+                            self._logbus.event(
+                                "dry_run.create",
+                                symbol=symbol,
+                                market_id=market_id,
+                                id=oid,
+                                ask=side == "ask",
+                                price=price_int,
+                                size=base_int,
                             )
                             created_attempts += 1
                         else:
-                            try:
-                                await trader.create_limit_order(
-                                    market_id=market_id,
+                            live_creates.append(
+                                LimitOrderRequest(
                                     client_order_index=oid,
                                     base_amount=int(base_int),
                                     price=int(price_int),
                                     is_ask=(side == "ask"),
                                     post_only=post_only,
                                 )
-                                self._logbus.publish(f"order.create symbol={symbol} market_id={market_id} id={oid}")
+                            )
+                    if live_creates:
+                        create_results = await trader.create_limit_orders(market_id, live_creates)
+                        for result in create_results:
+                            if result.ok:
+                                ORDERS.inc(symbol, "create")
+                                self._logbus.event("order.create", symbol=symbol, market_id=market_id, id=result.key)
                                 created_attempts += 1
-                            except Exception as exc:
-                                self._logbus.publish(f"order.create.error symbol={symbol} id={oid} err={type(exc).__name__}:{exc}")
+                            else:
+                                self._logbus.event(
+                                    "order.create.error",
+                                    LEVEL_WARNING,
+                                    symbol=symbol,
+                                    id=result.key,
+                                    err=result.error,
+                                )
                 if created_attempts > 0:
                     self._create_block_notice.pop(symbol, None)
                 elif create_block_reasons:
@@ -2050,8 +2273,12 @@ class BotManager:
                     self._create_block_notice[symbol] = (now_ms, reason_text)
 
                 if cancel_orders or created_attempts > 0:
-                    self._logbus.publish(
-                        f"grid.reconcile.done symbol={symbol} market_id={market_id} canceled={len(cancel_orders)} created={created_attempts}"
+                    self._logbus.event(
+                        "grid.reconcile.done",
+                        symbol=symbol,
+                        market_id=market_id,
+                        canceled=len(cancel_orders),
+                        created=created_attempts,
                     )
 
                 if simulate_fill:
@@ -2103,26 +2330,60 @@ class BotManager:
             )
             await self._schedule_restart(symbol, trader)
 
-    async def _trade_stats_since(
-        self, trader: Trader, market_id: str | int, start_ms: int, end_ms: int
+    def _trade_volume_state(self, symbol: str, start_ms: int) -> TradeVolumeState:
+        sym = symbol.upper()
+        state = self._trade_volume.get(sym)
+        if state is None or state.start_ms != start_ms:
+            state = TradeVolumeState(start_ms=start_ms, last_ts_ms=start_ms)
+            self._trade_volume[sym] = state
+        return state
+
+    async def trade_stats(
+        self, trader: Trader, symbol: str, market_id: str | int, start_ms: int, end_ms: int
     ) -> tuple[Decimal, int]:
+        """本轮运行的累计成交额与笔数：按游标只拉取上次之后的新成交，策略循环、历史快照与状态接口共用。"""
+        sym = symbol.upper()
+        anchor = int(self._start_ms.get(sym) or start_ms)
+        lock = self._trade_volume_locks.setdefault(sym, asyncio.Lock())
+        exchange = _trader_exchange(trader)
+        async with lock:
+            state = self._trade_volume_state(sym, anchor)
+            if not state.restored:
+                # 进程内首次统计：先从本地库恢复已落盘的成交，只向交易所补拉之后的部分
+                state.restored = True
+                try:
+                    volume, count, last_ts_ms, last_keys = await self._db.fill_stats(exchange, sym, anchor)
+                except Exception as exc:
+                    self._logbus.publish(f"db.fills.error symbol={sym} err={type(exc).__name__}:{exc}")
+                else:
+                    if count and last_ts_ms >= state.last_ts_ms:
+                        state.volume, state.count = volume, count
+                        state.last_ts_ms, state.last_keys = last_ts_ms, set(last_keys)
+            fills = await self._fills_after(trader, market_id, state.last_ts_ms, end_ms)
+            _apply_fills(state, fills)
+            if fills:
+                self._db.add_fills(exchange, sym, fills)
+            return state.volume, state.count
+
+    async def _fills_after(
+        self, trader: Trader, market_id: str | int, since_ms: int, end_ms: int
+    ) -> list[FillRecord]:
         if isinstance(trader, LighterTrader):
-            return await self._lighter_trades_since(trader, int(market_id), start_ms)
+            return await self._lighter_fills_after(trader, int(market_id), since_ms)
         if isinstance(trader, ParadexTrader):
-            return self._paradex_fills_since(trader, str(market_id), start_ms, end_ms)
+            return await self._paradex_fills_after(trader, str(market_id), since_ms, end_ms)
         if isinstance(trader, GrvtTrader):
-            return await trader.fills_since(str(market_id), start_ms, end_ms)
-        return Decimal(0), 0
+            return await trader.fills_after(str(market_id), since_ms, end_ms, max_pages=FILL_SYNC_MAX_PAGES)
+        return []
 
-    async def _lighter_trades_since(
+    async def _lighter_fills_after(
         self,
         trader: LighterTrader,
         market_id: int,
-        start_ms: int,
-        max_pages: int = 5,
-    ) -> tuple[Decimal, int]:
-        total = Decimal(0)
-        count = 0
+        since_ms: int,
+        max_pages: int = FILL_SYNC_MAX_PAGES,
+    ) -> list[FillRecord]:
+        fills: list[FillRecord] = []
         auth_token = await trader.auth_token()
         cursor = None
         pages = 0
@@ -2142,7 +2403,9 @@ class BotManager:
             trades = trades or []
             for t in trades:
                 ts = _trade_ts_ms(_order_field(t, "timestamp"))
-                if ts is not None and ts < start_ms:
+                if ts is None:
+                    continue
+                if ts < since_ms:
                     reached_old = True
                     break
                 usd_amount = _safe_decimal(_order_field(t, "usd_amount") or 0)
@@ -2150,13 +2413,15 @@ class BotManager:
                     price = _safe_decimal(_order_field(t, "price") or 0)
                     size = _safe_decimal(_order_field(t, "size") or 0)
                     usd_amount = price * size
-                total += abs(usd_amount)
-                count += 1
+                key = _order_field(t, "trade_id") or f"{ts}:{_order_field(t, 'tx_hash')}"
+                fills.append(FillRecord(ts_ms=ts, key=str(key), notional=abs(usd_amount)))
             cursor = getattr(resp, "next_cursor", None) if not isinstance(resp, dict) else resp.get("next_cursor")
             if not cursor:
                 break
             pages += 1
-        return total, count
+        if pages >= max_pages and cursor and not reached_old:
+            self._logbus.publish(f"lighter.fills.truncated market_id={market_id} since_ms={since_ms}")
+        return fills
 
     async def _lighter_update_trade_pnl(
         self,
@@ -2220,36 +2485,38 @@ class BotManager:
             )
         return state
 
-    def _paradex_fills_since(
+    async def _paradex_fills_after(
         self,
         trader: ParadexTrader,
         market: str,
-        start_ms: int,
+        since_ms: int,
         end_ms: int,
-        max_pages: int = 5,
-    ) -> tuple[Decimal, int]:
-        total = Decimal(0)
-        count = 0
+        max_pages: int = FILL_SYNC_MAX_PAGES,
+    ) -> list[FillRecord]:
+        fills: list[FillRecord] = []
         cursor = None
         pages = 0
         while pages < max_pages:
-            params: Dict[str, Any] = {"market": market, "start_at": int(start_ms), "end_at": int(end_ms), "page_size": 200}
+            params: Dict[str, Any] = {"market": market, "start_at": int(since_ms), "end_at": int(end_ms), "page_size": 200}
             if cursor:
                 params["cursor"] = cursor
-            data = trader._api.fetch_fills(params)
+            data = await trader.call(trader._api.fetch_fills, params)
             results = list(data.get("results") or [])
             for item in results:
                 if not isinstance(item, dict):
                     continue
+                ts = _trade_ts_ms(item.get("created_at"))
+                if ts is None or ts < since_ms:
+                    continue
                 price = _safe_decimal(item.get("price") or 0)
                 size = _safe_decimal(item.get("size") or 0)
-                total += abs(price * size)
-                count += 1
+                key = item.get("id") or f"{ts}:{price}:{size}"
+                fills.append(FillRecord(ts_ms=ts, key=str(key), notional=abs(price * size)))
             cursor = data.get("next") or data.get("next_cursor")
             if not cursor:
                 break
             pages += 1
-        return total, count
+        return fills
 
     async def _position_pnl(
         self,
@@ -2268,7 +2535,9 @@ class BotManager:
         if simulate:
             pnl = self.sim_pnl(symbol)
         elif isinstance(trader, LighterTrader):
-            resp = await trader._account_api.account(by="index", value=str(int(trader.account_index)))
+            resp = await trader._call_with_retry(
+                trader._account_api.account, by="index", value=str(int(trader.account_index))
+            )
             if hasattr(resp, "model_dump"):
                 data = resp.model_dump()
             elif hasattr(resp, "to_dict"):
@@ -2300,7 +2569,7 @@ class BotManager:
                 pnl = _safe_decimal(pos.get("realized_pnl") or 0) + _safe_decimal(pos.get("unrealized_pnl") or 0)
                 break
         elif isinstance(trader, ParadexTrader):
-            data = trader._api.fetch_positions()
+            data = await trader.call(trader._api.fetch_positions)
             results = list(data.get("results") or [])
             target = str(market_id)
             for item in results:
@@ -2318,6 +2587,9 @@ class BotManager:
 
         if pnl is not None and not simulate:
             self._pnl_cache[symbol] = (now_ms, pnl)
+            if now_ms - self._pnl_snapshot_at.get(symbol, 0) >= PNL_SNAPSHOT_INTERVAL_MS:
+                self._pnl_snapshot_at[symbol] = now_ms
+                self._db.add_pnl(_trader_exchange(trader), symbol, now_ms, pnl)
         return pnl
 
     async def _market_close_position(
@@ -2348,6 +2620,13 @@ class BotManager:
                 f"order.market_close.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}"
             )
 
+    async def _open_orders(self, trader: Trader, market_id: str | int) -> list[Any]:
+        """优先读取 trader 的本地挂单镜像，未就绪或到期校准时回退 REST（同时刷新镜像）。"""
+        cached = trader.cached_orders(market_id)
+        if cached is not None:
+            return cached
+        return await trader.active_orders(market_id)
+
     async def _cancel_grid_orders(
         self,
         symbol: str,
@@ -2365,12 +2644,16 @@ class BotManager:
 
         prefix = grid_prefix(trader.account_key, market_id, symbol)
         try:
-            orders = await trader.active_orders(market_id)
+            orders = await self._open_orders(trader, market_id)
+            if any(_order_field(o, "pending") for o in orders):
+                # 镜像里有尚未确认的新单（没有订单号无法撤），以 REST 为准
+                orders = await trader.active_orders(market_id)
         except Exception as exc:
             self._logbus.publish(f"stop.cancel.list.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}")
             return
 
-        canceled = 0
+        cid_by_oid: Dict[str, int] = {}
+        targets: list[Any] = []
         for o in orders:
             cid = _order_client_id(o)
             if cid is None or cid <= 0:
@@ -2382,13 +2665,18 @@ class BotManager:
                 continue
             if isinstance(oid, int) and oid <= 0:
                 continue
-            try:
-                await trader.cancel_order(market_id, oid)
+            targets.append(oid)
+            cid_by_oid[str(oid)] = cid
+
+        canceled = 0
+        for result in await trader.cancel_orders(market_id, targets):
+            if result.ok:
                 canceled += 1
-            except Exception as exc:
-                self._logbus.publish(
-                    f"stop.cancel.error symbol={symbol} market_id={market_id} id={cid} err={type(exc).__name__}:{exc}"
-                )
+                continue
+            exc = result.error
+            self._logbus.publish(
+                f"stop.cancel.error symbol={symbol} market_id={market_id} id={cid_by_oid.get(str(result.key))} err={type(exc).__name__}:{exc}"
+            )
         if canceled:
             self._logbus.publish(f"stop.cancel.done symbol={symbol} market_id={market_id} canceled={canceled}")
 
@@ -2406,7 +2694,7 @@ class BotManager:
         if not record:
             return
         try:
-            self._history.append(record)
+            self._db.add_history(record)
         except Exception as exc:
             self._logbus.publish(f"history.append.error err={type(exc).__name__}:{exc}")
             return
@@ -2421,11 +2709,8 @@ class BotManager:
         reason: str,
         stop_reason: str,
     ) -> tuple[Optional[Dict[str, Any]], list[str]]:
-        cfg = self._config.read()
-        simulate = self._sim_enabled(cfg.get("runtime", {}) or {})
-        exchange = "paradex" if isinstance(trader, ParadexTrader) else "lighter"
+        exchange = _trader_exchange(trader)
         now_iso = _now_iso()
-        now_ms = _now_ms()
         totals_profit = Decimal(0)
         totals_volume = Decimal(0)
         totals_trades = 0
@@ -2434,6 +2719,7 @@ class BotManager:
         reduce_symbols: list[str] = []
         symbols_data: Dict[str, Any] = {}
         recorded_symbols: list[str] = []
+        shared: Optional[Dict[str, Any]] = None
 
         for symbol in symbols:
             sym = symbol.upper()
@@ -2443,13 +2729,14 @@ class BotManager:
                 status = self._status.get(sym)
                 if not status or not status.running:
                     continue
-                started_at = status.started_at
-                start_ms = self._start_ms.get(sym) or _parse_iso_ms(started_at) or now_ms
-                self._start_ms[sym] = int(start_ms)
 
-            data = await self._symbol_runtime_snapshot(trader, sym, status, int(start_ms), now_ms, simulate)
-            if not data:
+            if shared is None:
+                shared = await self._shared_runtime_symbols(exchange)
+            row = shared.get(sym)
+            if not isinstance(row, dict):
+                self._logbus.publish(f"history.metrics.missing symbol={sym} exchange={exchange}")
                 continue
+            data = {key: row.get(key) for key in HISTORY_SYMBOL_FIELDS}
             symbols_data[sym] = data
             recorded_symbols.append(sym)
 
@@ -2485,114 +2772,8 @@ class BotManager:
         }
         return record, recorded_symbols
 
-    async def _symbol_runtime_snapshot(
-        self,
-        trader: Trader,
-        symbol: str,
-        status: BotStatus,
-        start_ms: int,
-        now_ms: int,
-        simulate: bool = False,
-    ) -> Optional[Dict[str, Any]]:
-        cfg = self._config.read()
-        strat = (cfg.get("strategies", {}) or {}).get(symbol, {}) or {}
-        market_id = strat.get("market_id")
-        if market_id is None or (isinstance(market_id, str) and not market_id.strip()):
-            market_id = status.market_id
-        if market_id is None or (isinstance(market_id, str) and not str(market_id).strip()):
-            return None
-
-        if isinstance(trader, ParadexTrader):
-            market_id = str(market_id)
-        elif isinstance(trader, LighterTrader) and isinstance(market_id, str):
-            try:
-                market_id = int(market_id)
-            except Exception:
-                pass
-
-        pnl_now: Optional[Decimal] = None
-        use_base = True
-        if simulate:
-            pnl_now = self.sim_pnl(symbol)
-            use_base = False
-        elif isinstance(trader, LighterTrader):
-            use_base = False
-        else:
-            pnl_now = await self._position_pnl(trader, market_id, symbol, simulate=simulate)
-        if pnl_now is None:
-            pnl_now = Decimal(0)
-
-        volume = Decimal(0)
-        trade_count = 0
-        try:
-            if simulate:
-                volume, trade_count = self.sim_trade_stats(symbol, start_ms, now_ms)
-            else:
-                volume, trade_count = await self._trade_stats_since(trader, market_id, start_ms, now_ms)
-        except Exception as exc:
-            self._logbus.publish(
-                f"history.trades.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}"
-            )
-
-        pos_base = Decimal(0)
-        if simulate:
-            pos_base = self.sim_position_base(symbol)
-        else:
-            try:
-                pos_base = await trader.position_base(market_id)
-            except Exception:
-                pos_base = Decimal(0)
-
-        mid_value = _safe_decimal(status.mid or 0)
-        if mid_value <= 0 and simulate:
-            mid_value = self.sim_last_mid(symbol)
-        if mid_value <= 0:
-            try:
-                bid, ask = await trader.best_bid_ask(market_id)
-                if bid is not None and ask is not None:
-                    mid_value = (bid + ask) / 2
-            except Exception:
-                mid_value = Decimal(0)
-
-        if isinstance(trader, LighterTrader) and not simulate:
-            try:
-                state = await self._lighter_update_trade_pnl(trader, symbol, int(market_id), start_ms, now_ms)
-                pnl_now = self._trade_pnl_value(state, mid_value)
-            except Exception as exc:
-                self._logbus.publish(
-                    f"lighter.trade_pnl.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}"
-                )
-                fallback = await self._position_pnl(trader, market_id, symbol, simulate=simulate)
-                if fallback is not None:
-                    pnl_now = fallback
-
-        if use_base:
-            base_pnl = self._base_pnl.get(symbol)
-            if base_pnl is None:
-                self._base_pnl[symbol] = pnl_now
-                base_pnl = pnl_now
-            profit = pnl_now - _safe_decimal(base_pnl)
-        else:
-            profit = pnl_now
-
-        position_notional = abs(pos_base * mid_value) if mid_value > 0 else Decimal(0)
-        open_orders = self.sim_open_orders(symbol) if simulate else int(status.existing or 0)
-        reduce_mode = bool(status.reduce_mode)
-
-        return {
-            "symbol": symbol,
-            "market_id": market_id,
-            "started_at": status.started_at,
-            "profit": _fmt_decimal(profit),
-            "volume": _fmt_decimal(volume),
-            "trade_count": trade_count,
-            "position_notional": _fmt_decimal(position_notional),
-            "open_orders": open_orders,
-            "reduce_mode": reduce_mode,
-        }
-
     async def _schedule_restart(self, symbol: str, trader: Trader) -> None:
-        cfg = self._config.read()
+        cfg = self._config.snapshot()
         runtime = cfg.get("runtime", {}) or {}
         if not bool(runtime.get("auto_restart", True)):
             return
@@ -2639,7 +2820,7 @@ class BotManager:
     async def _restart_after_delay(self, symbol: str, trader: Trader, delay_s: float) -> None:
         try:
             await asyncio.sleep(delay_s)
-            cfg = self._config.read()
+            cfg = self._config.snapshot()
             runtime = cfg.get("runtime", {}) or {}
             if not bool(runtime.get("auto_restart", True)):
                 return
@@ -2664,5 +2845,19 @@ class BotManager:
             current = self._status.get(symbol) or BotStatus(symbol=symbol, running=False)
             data = current.to_dict()
             data.update(patch)
-            self._status[symbol] = BotStatus(**data)
+            updated = BotStatus(**data)
+            self._status[symbol] = updated
+        if (
+            updated.running != current.running
+            or updated.filter_state != current.filter_state
+            or updated.stop_signal != current.stop_signal
+        ):
+            self._db.add_status(
+                symbol,
+                _now_ms(),
+                updated.running,
+                state=updated.filter_state,
+                reason=updated.stop_reason or updated.filter_reason,
+                message=updated.message,
+            )
 
@@ -1,39 +1,47 @@
 from __future__ import annotations
 
 import json
-import threading
-from dataclasses import dataclass, field
+from datetime import datetime
 from pathlib import Path
-from typing import Any
-
-
-@dataclass
-class HistoryStore:
-    path: Path
-    lock: threading.Lock = field(default_factory=threading.Lock)
-
-    def append(self, record: dict[str, Any]) -> None:
-        self.path.parent.mkdir(parents=True, exist_ok=True)
-        line = json.dumps(record, ensure_ascii=False)
-        with self.lock:
-            with self.path.open("a", encoding="utf-8") as fp:
-                fp.write(line + "\n")
-
-    def read(self, limit: int = 200) -> list[dict[str, Any]]:
-        if limit == 0:
-            limit = -1
-        if not self.path.exists():
-            return []
-        with self.lock:
-            lines = self.path.read_text(encoding="utf-8").splitlines()
-        if limit > 0:
-            lines = lines[-limit:]
-        items: list[dict[str, Any]] = []
-        for line in lines:
+from typing import Any, Tuple
+
+# 旧版运行历史（runtime_history.jsonl）的读取与记录字段解析。
+# 运行历史已改存 runtime.sqlite3，这里只供 RuntimeDB.import_history_jsonl 首次启动时导入旧文件。
+
+
+def record_ts_ms(record: dict[str, Any]) -> int:
+    """记录的 created_at 转为毫秒时间戳，缺失或无法解析时为 0。"""
+    raw = record.get("created_at")
+    if not raw:
+        return 0
+    try:
+        return int(datetime.fromisoformat(str(raw).replace("Z", "+00:00")).timestamp() * 1000)
+    except Exception:
+        return 0
+
+
+def record_symbols(record: dict[str, Any]) -> Tuple[str, ...]:
+    """记录涉及的交易对（大写）。"""
+    symbols = record.get("symbols")
+    if isinstance(symbols, dict):
+        return tuple(str(sym).upper() for sym in symbols)
+    return ()
+
+
+def read_history_jsonl(path: Path) -> list[dict[str, Any]]:
+    """按文件顺序读取全部记录，跳过空行与损坏行；文件不存在时返回空列表。"""
+    path = Path(path)
+    if not path.exists():
+        return []
+    items: list[dict[str, Any]] = []
+    with path.open("r", encoding="utf-8") as fp:
+        for line in fp:
             if not line.strip():
                 continue
             try:
-                items.append(json.loads(line))
+                record = json.loads(line)
             except Exception:
                 continue
-        return items
+            if isinstance(record, dict):
+                items.append(record)
+    return items
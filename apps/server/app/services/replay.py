@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import asyncio
+import bisect
+import time
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+from app.core.clock import VirtualClock, reset_clock, use_clock
+from app.core.config_store import ConfigStore
+from app.core.logbus import LogBus
+from app.exchanges.tape import KIND_QUOTE, read_tape
+from app.exchanges.types import LimitOrderRequest, MarketMeta, OrderResult
+from app.services.bot_manager import BotManager
+
+# 回放强制走模拟盘；出错直接结束，不自动重启
+REPLAY_RUNTIME: Dict[str, Any] = {
+    "dry_run": True,
+    "simulate_fill": True,
+    "auto_restart": False,
+}
+
+
+@dataclass(frozen=True)
+class Quote:
+    ts_ms: int
+    bid: Optional[Decimal]
+    ask: Optional[Decimal]
+
+
+@dataclass(frozen=True)
+class ReplayResult:
+    symbol: str
+    quotes: int
+    ticks: int
+    trades: int
+    volume: Decimal
+    position_base: Decimal
+    pnl: Decimal
+    virtual_s: float
+    wall_s: float
+
+
+def load_quotes(paths: Iterable[Path]) -> list[Quote]:
+    """按给定顺序读取磁带分段中的最优价记录。"""
+    quotes: list[Quote] = []
+    for path in paths:
+        for record in read_tape(path):
+            if record.kind == KIND_QUOTE:
+                quotes.append(Quote(record.ts_ms, record.bid, record.ask))
+    return quotes
+
+
+class ReplayTrader:
+    """按虚拟时钟从录制的行情返回盘口的 Trader；只服务一个市场，下单走 BotManager 的模拟盘。"""
+
+    env = "replay"
+
+    def __init__(self, quotes: Sequence[Quote], meta: MarketMeta, clock: VirtualClock, account_key: int = 0) -> None:
+        self.account_key = account_key
+        self.meta = meta
+        self.reads = 0
+        self._clock = clock
+        self._quotes = list(quotes)
+        self._ts = [quote.ts_ms for quote in self._quotes]
+
+    def _index(self) -> int:
+        return bisect.bisect_right(self._ts, self._clock.now_ms) - 1
+
+    def check_client(self) -> str | None:
+        return None
+
+    async def close(self) -> None:
+        return None
+
+    async def market_meta(self, market_id: str | int) -> MarketMeta:
+        return self.meta
+
+    async def best_bid_ask(self, market_id: str | int) -> Tuple[Decimal | None, Decimal | None]:
+        self.reads += 1
+        idx = self._index()
+        if idx < 0:
+            return None, None
+        quote = self._quotes[idx]
+        return quote.bid, quote.ask
+
+    async def active_orders(self, market_id: str | int) -> list[Any]:
+        return []
+
+    def cached_orders(self, market_id: str | int) -> Optional[list[Any]]:
+        return None
+
+    async def position_base(self, market_id: str | int) -> Decimal:
+        return Decimal(0)
+
+    async def create_limit_order(
+        self,
+        market_id: str | int,
+        client_order_index: int,
+        base_amount: int,
+        price: int,
+        is_ask: bool,
+        post_only: bool = True,
+        reduce_only: bool = False,
+    ) -> None:
+        raise RuntimeError("回放只支持模拟下单")
+
+    async def create_market_order(
+        self,
+        market_id: str | int,
+        base_amount: int,
+        is_ask: bool,
+        reduce_only: bool = False,
+    ) -> None:
+        raise RuntimeError("回放只支持模拟下单")
+
+    async def cancel_order(self, market_id: str | int, order_index: Any) -> None:
+        raise RuntimeError("回放只支持模拟下单")
+
+    async def create_limit_orders(self, market_id: str | int, orders: list[LimitOrderRequest]) -> list[OrderResult]:
+        raise RuntimeError("回放只支持模拟下单")
+
+    async def cancel_orders(self, market_id: str | int, order_indexes: list[Any]) -> list[OrderResult]:
+        raise RuntimeError("回放只支持模拟下单")
+
+    def book_version(self, market_id: str | int) -> int:
+        return self._index() + 1
+
+    def quote_age(self, market_id: str | int) -> Optional[float]:
+        idx = self._index()
+        if idx < 0:
+            return None
+        return (self._clock.now_ms - self._ts[idx]) / 1000
+
+    async def wait_book_update(self, market_id: str | int, version: int, timeout_s: float) -> int:
+        """把虚拟时钟拨到下一条行情（不超过 timeout），返回新的版本号。"""
+        current = self.book_version(market_id)
+        if current != version:
+            return current
+        deadline = self._clock.now_ms + max(0, int(timeout_s * 1000))
+        if current < len(self._ts):
+            deadline = min(deadline, self._ts[current])
+        await self._clock.sleep_until(deadline)
+        return self.book_version(market_id)
+
+
+async def run_replay(
+    quotes: Sequence[Quote],
+    meta: MarketMeta,
+    strategy: Dict[str, Any],
+    workdir: Path,
+    runtime: Optional[Dict[str, Any]] = None,
+    symbol: str = "REPLAY",
+    logbus: Optional[LogBus] = None,
+) -> ReplayResult:
+    """用生产策略循环在虚拟时钟上跑完整段行情；workdir 存放回放专用的配置与数据库。"""
+    if not quotes:
+        raise ValueError("回放行情为空")
+    symbol = symbol.upper()
+    config = ConfigStore(Path(workdir) / "config.json")
+    config.update(
+        {
+            "runtime": {**(runtime or {}), **REPLAY_RUNTIME},
+            "strategies": {symbol: {**strategy, "enabled": True, "market_id": meta.market_id}},
+        }
+    )
+    manager = BotManager(logbus or LogBus(), config)
+    clock = VirtualClock(quotes[0].ts_ms, end_ms=quotes[-1].ts_ms)
+    trader = ReplayTrader(quotes, meta, clock)
+    started = time.perf_counter()
+    token = use_clock(clock)
+    try:
+        await manager.start(symbol, trader)
+        task = manager.task(symbol)
+        finished = asyncio.create_task(clock.finished.wait())
+        waiters = {finished} if task is None else {finished, task}
+        await asyncio.wait(waiters, return_when=asyncio.FIRST_COMPLETED)
+        for pending in waiters:
+            pending.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        start_ms = quotes[0].ts_ms
+        volume, trades = manager.sim_trade_stats(symbol, start_ms, clock.now_ms)
+        return ReplayResult(
+            symbol=symbol,
+            quotes=len(quotes),
+            ticks=trader.reads,
+            trades=trades,
+            volume=volume,
+            position_base=manager.sim_position_base(symbol),
+            pnl=manager.sim_pnl(symbol),
+            virtual_s=(clock.now_ms - start_ms) / 1000,
+            wall_s=time.perf_counter() - started,
+        )
+    finally:
+        reset_clock(token)
+        await manager.close()
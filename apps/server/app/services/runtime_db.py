@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+import threading
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from app.core.logbus import LEVEL_WARNING, LogBus
+from app.core.metrics import PERSIST_ERRORS
+from app.exchanges.types import FillRecord
+from app.services.history_store import read_history_jsonl, record_symbols, record_ts_ms
+
+# 后台写入：攒批间隔与单批上限
+DB_FLUSH_INTERVAL_S = 0.5
+DB_MAX_BATCH = 500
+# 写入失败的批次重新排队的次数上限；最后一次逐条写入，只丢弃写不进去的条目
+DB_MAX_ATTEMPTS = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts_ms INTEGER NOT NULL,
+    exchange TEXT NOT NULL DEFAULT '',
+    reason TEXT NOT NULL DEFAULT '',
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_history_ts ON history (ts_ms);
+CREATE TABLE IF NOT EXISTS history_symbols (
+    history_id INTEGER NOT NULL REFERENCES history (id),
+    symbol TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    PRIMARY KEY (symbol, ts_ms, history_id)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS fills (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    fill_key TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    notional TEXT NOT NULL,
+    PRIMARY KEY (exchange, symbol, fill_key)
+);
+CREATE INDEX IF NOT EXISTS idx_fills_symbol_ts ON fills (exchange, symbol, ts_ms);
+CREATE TABLE IF NOT EXISTS pnl_snapshots (
+    exchange TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    pnl TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pnl_symbol_ts ON pnl_snapshots (symbol, ts_ms);
+CREATE TABLE IF NOT EXISTS status_transitions (
+    symbol TEXT NOT NULL,
+    ts_ms INTEGER NOT NULL,
+    running INTEGER NOT NULL,
+    state TEXT NOT NULL DEFAULT '',
+    reason TEXT NOT NULL DEFAULT '',
+    message TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_status_symbol_ts ON status_transitions (symbol, ts_ms);
+"""
+
+# 待写入项：(sql, 参数) 或 ("history", record) 这类需多表写入的特殊项
+_Write = Tuple[str, Any]
+
+
+class RuntimeDB:
+    """嵌入式 SQLite（WAL）运行数据库：写入先入内存队列，由后台任务攒批落盘；读取在线程中执行。"""
+
+    def __init__(
+        self,
+        path: Path,
+        flush_interval_s: float = DB_FLUSH_INTERVAL_S,
+        max_batch: int = DB_MAX_BATCH,
+        logbus: Optional[LogBus] = None,
+    ) -> None:
+        self.path = path
+        self._logbus = logbus
+        self._flush_interval_s = flush_interval_s
+        self._max_batch = max_batch
+        self._conn: Optional[sqlite3.Connection] = None
+        self._conn_lock = threading.Lock()
+        self._pending: List[_Write] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task[None]] = None
+        self._flush_lock = asyncio.Lock()
+        self._failed_attempts = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = self._conn
+        if conn is not None:
+            return conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        self._conn = conn
+        return conn
+
+    # ---- 写入 ----
+
+    def _enqueue(self, item: _Write) -> None:
+        self._pending.append(item)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        task = self._task
+        if task is None or task.done() or task.get_loop() is not loop:
+            self._wakeup = asyncio.Event()
+            self._task = loop.create_task(self._writer())
+        if len(self._pending) >= self._max_batch and self._wakeup is not None:
+            self._wakeup.set()
+
+    def add_history(self, record: Dict[str, Any]) -> None:
+        self._enqueue(("history", record))
+
+    def add_fills(self, exchange: str, symbol: str, fills: Sequence[FillRecord]) -> None:
+        sql = "INSERT OR IGNORE INTO fills (exchange, symbol, fill_key, ts_ms, notional) VALUES (?, ?, ?, ?, ?)"
+        for fill in fills:
+            self._enqueue((sql, (exchange, symbol.upper(), str(fill.key), int(fill.ts_ms), str(fill.notional))))
+
+    def add_pnl(self, exchange: str, symbol: str, ts_ms: int, pnl: Decimal) -> None:
+        sql = "INSERT INTO pnl_snapshots (exchange, symbol, ts_ms, pnl) VALUES (?, ?, ?, ?)"
+        self._enqueue((sql, (exchange, symbol.upper(), int(ts_ms), str(pnl))))
+
+    def add_status(
+        self,
+        symbol: str,
+        ts_ms: int,
+        running: bool,
+        state: str = "",
+        reason: str = "",
+        message: str = "",
+    ) -> None:
+        sql = (
+            "INSERT INTO status_transitions (symbol, ts_ms, running, state, reason, message) "
+            "VALUES (?, ?, ?, ?, ?, ?)"
+        )
+        self._enqueue((sql, (symbol.upper(), int(ts_ms), 1 if running else 0, state, reason, message)))
+
+    async def _writer(self) -> None:
+        wakeup = self._wakeup
+        while True:
+            if wakeup is not None:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), timeout=self._flush_interval_s)
+                except asyncio.TimeoutError:
+                    pass
+                wakeup.clear()
+            try:
+                await self.flush()
+            except Exception:
+                # flush 已记录并重新排队，下一轮再试
+                pass
+
+    async def flush(self) -> None:
+        async with self._flush_lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, []
+            if self._failed_attempts >= DB_MAX_ATTEMPTS - 1:
+                dropped = await asyncio.to_thread(self._write_each, batch)
+                self._failed_attempts = 0
+                if dropped:
+                    PERSIST_ERRORS.inc("runtime_db", "dropped", amount=len(dropped))
+                    self._warn("runtime_db.write.dropped", rows=len(dropped), err=dropped[0])
+                return
+            try:
+                await asyncio.to_thread(self._write_batch, batch)
+            except Exception as exc:
+                self._failed_attempts += 1
+                # 失败的批次放回队首，保持写入顺序
+                self._pending[:0] = batch
+                PERSIST_ERRORS.inc("runtime_db", "retry")
+                self._warn(
+                    "runtime_db.write.error",
+                    rows=len(batch),
+                    attempt=self._failed_attempts,
+                    err=f"{type(exc).__name__}:{exc}",
+                )
+                raise
+            self._failed_attempts = 0
+
+    def _warn(self, event: str, **fields: Any) -> None:
+        if self._logbus is not None:
+            self._logbus.event(event, LEVEL_WARNING, path=self.path.name, **fields)
+
+    def _write_each(self, batch: List[_Write]) -> List[str]:
+        """逐条各自提交，返回写入失败条目的错误信息。"""
+        errors: List[str] = []
+        for item in batch:
+            try:
+                self._write_batch([item])
+            except Exception as exc:
+                errors.append(f"{type(exc).__name__}:{exc}")
+        return errors
+
+    def _write_batch(self, batch: List[_Write]) -> None:
+        with self._conn_lock:
+            conn = self._connect()
+            conn.execute("BEGIN")
+            try:
+                for sql, params in batch:
+                    if sql == "history":
+                        self._insert_history(conn, params)
+                    else:
+                        conn.execute(sql, params)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+    @staticmethod
+    def _insert_history(conn: sqlite3.Connection, record: Dict[str, Any]) -> None:
+        ts_ms = record_ts_ms(record)
+        cur = conn.execute(
+            "INSERT INTO history (ts_ms, exchange, reason, record) VALUES (?, ?, ?, ?)",
+            (ts_ms, str(record.get("exchange") or ""), str(record.get("reason") or ""), json.dumps(record, ensure_ascii=False)),
+        )
+        history_id = cur.lastrowid
+        conn.executemany(
+            "INSERT OR IGNORE INTO history_symbols (history_id, symbol, ts_ms) VALUES (?, ?, ?)",
+            [(history_id, symbol, ts_ms) for symbol in record_symbols(record)],
+        )
+
+    async def close(self) -> None:
+        task = self._task
+        self._task = None
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+        await self.flush()
+        with self._conn_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---- 查询 ----
+
+    def _query(self, sql: str, params: Sequence[Any]) -> List[Tuple[Any, ...]]:
+        with self._conn_lock:
+            return list(self._connect().execute(sql, params).fetchall())
+
+    async def _read(self, sql: str, params: Sequence[Any]) -> List[Tuple[Any, ...]]:
+        # 先落盘已排队的写入，保证读到自己的写
+        await self.flush()
+        return await asyncio.to_thread(self._query, sql, params)
+
+    async def history(
+        self,
+        limit: int = 200,
+        symbol: Optional[str] = None,
+        start_ms: Optional[int] = None,
+        end_ms: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        """按时间正序返回最近 limit 条（0 表示全部）历史记录。"""
+        where: List[str] = []
+        params: List[Any] = []
+        if symbol:
+            table = "history_symbols s JOIN history h ON h.id = s.history_id"
+            where.append("s.symbol = ?")
+            params.append(str(symbol).upper())
+            ts_col = "s.ts_ms"
+        else:
+            table = "history h"
+            ts_col = "h.ts_ms"
+        if start_ms is not None:
+            where.append(f"{ts_col} >= ?")
+            params.append(int(start_ms))
+        if end_ms is not None:
+            where.append(f"{ts_col} <= ?")
+            params.append(int(end_ms))
+        sql = f"SELECT h.record FROM {table}"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {ts_col} DESC, h.id DESC"
+        if limit > 0:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        rows = await self._read(sql, params)
+        items: List[Dict[str, Any]] = []
+        for (raw,) in reversed(rows):
+            try:
+                items.append(json.loads(raw))
+            except Exception:
+                continue
+        return items
+
+    async def fill_stats(
+        self, exchange: str, symbol: str, start_ms: int, end_ms: Optional[int] = None
+    ) -> Tuple[Decimal, int, int, List[str]]:
+        """区间内成交额、笔数、最新成交时间及该毫秒内的成交 key（用于恢复增量游标）。"""
+        params: List[Any] = [exchange, symbol.upper(), int(start_ms)]
+        # notional 以文本存储，逐条按 Decimal 累加；SQL 的 TOTAL/SUM 走浮点会引入误差
+        sql = "SELECT notional, ts_ms, fill_key FROM fills WHERE exchange = ? AND symbol = ? AND ts_ms >= ?"
+        if end_ms is not None:
+            sql += " AND ts_ms <= ?"
+            params.append(int(end_ms))
+        rows = await self._read(sql, params)
+        total = Decimal(0)
+        last_ts = 0
+        keys: List[str] = []
+        for notional, ts_ms, fill_key in rows:
+            total += Decimal(notional)
+            ts_ms = int(ts_ms)
+            if ts_ms > last_ts:
+                last_ts = ts_ms
+                keys = [fill_key]
+            elif ts_ms == last_ts:
+                keys.append(fill_key)
+        if not rows:
+            return Decimal(0), 0, 0, []
+        return total, len(rows), last_ts, keys
+
+    async def pnl_snapshots(
+        self, symbol: str, start_ms: Optional[int] = None, limit: int = 500
+    ) -> List[Tuple[int, Decimal]]:
+        params: List[Any] = [symbol.upper()]
+        sql = "SELECT ts_ms, pnl FROM pnl_snapshots WHERE symbol = ?"
+        if start_ms is not None:
+            sql += " AND ts_ms >= ?"
+            params.append(int(start_ms))
+        sql += " ORDER BY ts_ms DESC LIMIT ?"
+        params.append(int(limit))
+        rows = await self._read(sql, params)
+        return [(int(ts), Decimal(str(pnl))) for ts, pnl in reversed(rows)]
+
+    async def status_transitions(
+        self, symbol: str, start_ms: Optional[int] = None, limit: int = 200
+    ) -> List[Dict[str, Any]]:
+        params: List[Any] = [symbol.upper()]
+        sql = "SELECT ts_ms, running, state, reason, message FROM status_transitions WHERE symbol = ?"
+        if start_ms is not None:
+            sql += " AND ts_ms >= ?"
+            params.append(int(start_ms))
+        sql += " ORDER BY ts_ms DESC LIMIT ?"
+        params.append(int(limit))
+        rows = await self._read(sql, params)
+        return [
+            {"ts_ms": int(ts), "running": bool(running), "state": state, "reason": reason, "message": message}
+            for ts, running, state, reason, message in reversed(rows)
+        ]
+
+    # ---- 迁移 ----
+
+    def import_history_jsonl(self, path: Path) -> int:
+        """首次启用时导入旧的 runtime_history.jsonl，只执行一次；此后 JSONL 不再写入。"""
+        with self._conn_lock:
+            conn = self._connect()
+            done = conn.execute("SELECT value FROM meta WHERE key = 'history_jsonl_imported'").fetchone()
+            if done is not None:
+                return 0
+            records = read_history_jsonl(Path(path))
+            conn.execute("BEGIN")
+            try:
+                for record in records:
+                    self._insert_history(conn, record)
+                conn.execute("INSERT INTO meta (key, value) VALUES ('history_jsonl_imported', ?)", (str(len(records)),))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            return len(records)
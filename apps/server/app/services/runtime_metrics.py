@@ -0,0 +1,450 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from decimal import Decimal, ROUND_HALF_UP
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional
+
+from app.core import clock
+from app.core.config_store import ConfigStore
+from app.core.logbus import LogBus
+from app.exchanges.lighter.trader import LighterTrader
+from app.exchanges.rate_limit import is_rate_limited_error
+from app.exchanges.types import Trader
+from app.services.bot_manager import BotManager
+
+MetricsCompute = Callable[[str], Awaitable[Dict[str, Any]]]
+# 计算所需的应用层依赖：按名称取交易所连接、拉取持仓 {market_id: {"base", "pnl"}}、补充展示字段
+TraderLoader = Callable[[str], Awaitable[Trader]]
+PositionsLoader = Callable[[Trader], Awaitable[Dict[Any, Dict[str, Decimal]]]]
+RowFields = Callable[[Dict[str, Any]], Dict[str, Any]]
+RowsDecorator = Callable[[Dict[str, Dict[str, Any]]], Awaitable[None]]
+
+# 最近被读取过的交易所在这段时间内继续后台刷新
+DEFAULT_WATCH_S = 60.0
+
+
+@dataclass
+class _Entry:
+    snapshot: Optional[Dict[str, Any]] = None
+    updated_at: float = 0.0
+    read_at: float = 0.0
+    inflight: Optional[asyncio.Task[Dict[str, Any]]] = None
+    # invalidate 时递增；早于当前代的计算结果不再写回
+    generation: int = 0
+    inflight_generation: int = 0
+
+
+class RuntimeMetricsService:
+    """运行指标聚合：后台按周期刷新各交易所快照，同一交易所同时只有一次计算（single-flight），
+    HTTP、状态推送与历史记录都读取同一份结果。"""
+
+    def __init__(
+        self,
+        compute: MetricsCompute,
+        interval_s: Callable[[], float],
+        active_exchanges: Callable[[], Iterable[str]],
+        logbus: Optional[LogBus] = None,
+        watch_s: float = DEFAULT_WATCH_S,
+    ) -> None:
+        self._compute = compute
+        self._interval_s = interval_s
+        self._active_exchanges = active_exchanges
+        self._logbus = logbus
+        self._watch_s = float(watch_s)
+        self._entries: Dict[str, _Entry] = {}
+        self._task: Optional[asyncio.Task[None]] = None
+
+    def _entry(self, exchange: str) -> _Entry:
+        entry = self._entries.get(exchange)
+        if entry is None:
+            entry = _Entry()
+            self._entries[exchange] = entry
+        return entry
+
+    def latest(self, exchange: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(exchange)
+        return entry.snapshot if entry else None
+
+    def age_s(self, exchange: str) -> Optional[float]:
+        entry = self._entries.get(exchange)
+        if entry is None or entry.snapshot is None:
+            return None
+        return time.monotonic() - entry.updated_at
+
+    async def refresh(self, exchange: str) -> Dict[str, Any]:
+        """立即刷新；已有同一代的计算在进行时复用其结果。"""
+        entry = self._entry(exchange)
+        task = entry.inflight
+        if task is None or task.done() or entry.inflight_generation != entry.generation:
+            task = asyncio.create_task(self._compute_into(exchange, entry, entry.generation))
+            # 等待者都已取消时也要取走异常，避免未处理异常告警
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            entry.inflight = task
+            entry.inflight_generation = entry.generation
+        # shield：单个调用方取消不影响其它等待者
+        return await asyncio.shield(task)
+
+    async def _compute_into(self, exchange: str, entry: _Entry, generation: int) -> Dict[str, Any]:
+        snapshot = await self._compute(exchange)
+        # 计算期间发生过启停或配置变更，结果已过期，不覆盖当前快照
+        if entry.generation == generation:
+            entry.snapshot = snapshot
+            entry.updated_at = time.monotonic()
+        return snapshot
+
+    async def get(self, exchange: str) -> Dict[str, Any]:
+        """读取最新快照（O(1)）；尚无快照时等待首次计算。"""
+        entry = self._entry(exchange)
+        entry.read_at = time.monotonic()
+        if entry.snapshot is not None:
+            return entry.snapshot
+        return await self.refresh(exchange)
+
+    def invalidate(self, exchange: Optional[str] = None) -> None:
+        """丢弃快照（启停后），下次读取重新计算；进行中的旧计算不再写回。"""
+        entries = self._entries.values() if exchange is None else [self._entries.get(exchange)]
+        for entry in entries:
+            if entry is not None:
+                entry.snapshot = None
+                entry.generation += 1
+
+    def _due(self, now: float) -> list[str]:
+        names = set(self._active_exchanges())
+        for name, entry in self._entries.items():
+            if entry.read_at and now - entry.read_at <= self._watch_s:
+                names.add(name)
+        return sorted(names)
+
+    async def _run(self) -> None:
+        while True:
+            names = self._due(time.monotonic())
+            results = await asyncio.gather(*(self.refresh(name) for name in names), return_exceptions=True)
+            for name, result in zip(names, results):
+                if isinstance(result, BaseException) and not isinstance(result, asyncio.CancelledError):
+                    if self._logbus is not None:
+                        self._logbus.publish(
+                            f"runtime.metrics.error exchange={name} err={type(result).__name__}:{result}"
+                        )
+            await asyncio.sleep(max(0.2, float(self._interval_s())))
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        tasks = [entry.inflight for entry in self._entries.values() if entry.inflight is not None]
+        if self._task is not None:
+            tasks.append(self._task)
+            self._task = None
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def _exchange_name(value: Any) -> str:
+    name = str(value or "lighter").strip().lower()
+    return name if name in {"paradex", "grvt"} else "lighter"
+
+
+def _now_ms() -> int:
+    return clock.now_ms()
+
+
+def _safe_decimal(value: Any) -> Decimal:
+    try:
+        return Decimal(str(value))
+    except Exception:
+        return Decimal(0)
+
+
+def _fmt_decimal(value: Decimal, digits: int = 4) -> str:
+    q = Decimal(1) / (Decimal(10) ** int(digits))
+    return str(value.quantize(q, rounding=ROUND_HALF_UP))
+
+
+def _parse_iso_ms(value: Optional[str]) -> Optional[int]:
+    if not value:
+        return None
+    try:
+        dt = datetime.fromisoformat(value)
+        if dt.tzinfo is None:
+            dt = dt.replace(tzinfo=timezone.utc)
+        return int(dt.timestamp() * 1000)
+    except Exception:
+        return None
+
+
+def _empty_totals() -> Dict[str, Any]:
+    return {
+        "profit": "0",
+        "volume": "0",
+        "trade_count": 0,
+        "position_notional": "0",
+        "open_orders": 0,
+        "reduce_symbols": [],
+        "running": 0,
+    }
+
+
+@dataclass
+class _SymbolState:
+    exchange: str
+    start_ms: int
+    base_pnl: Optional[Decimal] = None
+    # 最近一次成功计算的值，交易所查询失败（如限流）时沿用
+    profit: Decimal = Decimal(0)
+    volume: Decimal = Decimal(0)
+    trade_count: int = 0
+
+
+class RuntimeStatusCalculator:
+    """按交易所计算运行指标快照（盈亏、成交量、持仓、挂单），作为 RuntimeMetricsService 的计算函数。
+
+    各交易对的统计起点与 PnL 基准只在这里维护；查询失败时沿用上一次成功的数值。
+    """
+
+    def __init__(
+        self,
+        bot_manager: BotManager,
+        config: ConfigStore,
+        trader: TraderLoader,
+        positions: PositionsLoader,
+        row_fields: Optional[RowFields] = None,
+        decorate: Optional[RowsDecorator] = None,
+        logbus: Optional[LogBus] = None,
+    ) -> None:
+        self._bots = bot_manager
+        self._config = config
+        self._trader = trader
+        self._positions = positions
+        self._row_fields = row_fields
+        self._decorate = decorate
+        self._logbus = logbus
+        self._symbols: Dict[str, _SymbolState] = {}
+        self._last_positions: Dict[str, Dict[Any, Dict[str, Decimal]]] = {}
+
+    def track(self, symbol: str, exchange: str, start_ms: int) -> None:
+        """启动时重置统计起点与 PnL 基准。"""
+        self._symbols[symbol.upper()] = _SymbolState(exchange=exchange, start_ms=int(start_ms))
+
+    def forget(self, symbols: Optional[Iterable[str]] = None) -> None:
+        """停止后丢弃统计状态；symbols 为 None 时全部丢弃。"""
+        if symbols is None:
+            self._symbols.clear()
+            self._last_positions.clear()
+            return
+        for symbol in symbols:
+            self._symbols.pop(str(symbol).upper(), None)
+
+    def _publish(self, message: str) -> None:
+        if self._logbus is not None:
+            self._logbus.publish(message)
+
+    def _state(self, symbol: str, exchange: str, start_ms: int) -> _SymbolState:
+        state = self._symbols.get(symbol)
+        if state is None or state.exchange != exchange:
+            state = _SymbolState(exchange=exchange, start_ms=start_ms)
+            self._symbols[symbol] = state
+        return state
+
+    def _running_symbols(self, config: Dict[str, Any], name: str, bots: Dict[str, Any]) -> list[str]:
+        default = (config.get("exchange", {}) or {}).get("name")
+        strategies = config.get("strategies", {}) or {}
+        running: list[str] = []
+        for symbol, data in bots.items():
+            if not (isinstance(data, dict) and data.get("running")):
+                continue
+            sym = str(symbol or "").strip().upper()
+            strat = strategies.get(sym) or strategies.get(symbol)
+            if isinstance(strat, dict):
+                if _exchange_name(str(strat.get("exchange") or "").strip() or default) != name:
+                    continue
+            running.append(sym)
+        return sorted(running)
+
+    async def __call__(self, exchange: str) -> Dict[str, Any]:
+        config = self._config.read()
+        runtime = config.get("runtime", {}) or {}
+        name = _exchange_name(exchange or (config.get("exchange", {}) or {}).get("name"))
+        bots = self._bots.snapshot()
+        updated_at = datetime.now(timezone.utc).astimezone().isoformat(timespec="seconds")
+        running = self._running_symbols(config, name, bots)
+        if not running:
+            return {"exchange": name, "updated_at": updated_at, "totals": _empty_totals(), "symbols": {}}
+
+        if bool(runtime.get("dry_run", True)):
+            rows = await self._sim_rows(name, running, bots)
+        else:
+            try:
+                trader = await self._trader(name)
+            except Exception as exc:
+                self._publish(f"runtime.status.error err={type(exc).__name__}:{exc}")
+                return {"exchange": name, "updated_at": updated_at, "error": "无法建立交易所连接"}
+            rows = await self._live_rows(name, trader, running, bots, config)
+
+        if self._decorate is not None:
+            await self._decorate(rows)
+        return {"exchange": name, "updated_at": updated_at, "totals": self._totals(rows), "symbols": rows}
+
+    def _row(
+        self,
+        status: Dict[str, Any],
+        symbol: str,
+        market_id: Any,
+        state: _SymbolState,
+        position_notional: Decimal,
+        open_orders: int,
+    ) -> Dict[str, Any]:
+        row = {
+            "symbol": symbol,
+            "market_id": market_id,
+            "started_at": status.get("started_at"),
+            "profit": _fmt_decimal(state.profit),
+            "volume": _fmt_decimal(state.volume),
+            "trade_count": state.trade_count,
+            "position_notional": _fmt_decimal(position_notional),
+            "open_orders": open_orders,
+            "delay_count": int(status.get("delay_count") or 0),
+            "reduce_mode": bool(status.get("reduce_mode")),
+        }
+        if self._row_fields is not None:
+            row.update(self._row_fields(status))
+        return row
+
+    @staticmethod
+    def _totals(rows: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            "profit": _fmt_decimal(sum((_safe_decimal(r["profit"]) for r in rows.values()), Decimal(0))),
+            "volume": _fmt_decimal(sum((_safe_decimal(r["volume"]) for r in rows.values()), Decimal(0))),
+            "trade_count": sum(int(r["trade_count"]) for r in rows.values()),
+            "position_notional": _fmt_decimal(
+                sum((_safe_decimal(r["position_notional"]) for r in rows.values()), Decimal(0))
+            ),
+            "open_orders": sum(int(r["open_orders"]) for r in rows.values()),
+            "reduce_symbols": [symbol for symbol, r in rows.items() if r.get("reduce_mode")],
+            "running": len(rows),
+        }
+
+    async def _sim_rows(self, name: str, running: list[str], bots: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        now_ms = _now_ms()
+        rows: Dict[str, Dict[str, Any]] = {}
+        for symbol in running:
+            status = bots.get(symbol) or {}
+            if not isinstance(status, dict):
+                continue
+            state = self._state(symbol, name, _parse_iso_ms(status.get("started_at")) or now_ms)
+
+            mid_value = _safe_decimal(status.get("mid") or 0)
+            if mid_value <= 0:
+                mid_value = self._bots.sim_last_mid(symbol)
+            pnl_now = self._bots.sim_pnl(symbol, mid_value)
+            if state.base_pnl is None:
+                state.base_pnl = pnl_now
+            state.profit = pnl_now - state.base_pnl
+            state.volume, state.trade_count = self._bots.sim_trade_stats(symbol, state.start_ms, now_ms)
+
+            pos_base = self._bots.sim_position_base(symbol)
+            position_notional = abs(pos_base * mid_value) if mid_value > 0 else Decimal(0)
+            rows[symbol] = self._row(
+                status, symbol, status.get("market_id"), state, position_notional, self._bots.sim_open_orders(symbol)
+            )
+        return rows
+
+    async def _load_positions(self, name: str, trader: Trader) -> Dict[Any, Dict[str, Decimal]]:
+        try:
+            positions = await self._positions(trader)
+        except Exception as exc:
+            if is_rate_limited_error(exc):
+                self._publish(f"runtime.positions.rate_limited exchange={name}")
+            else:
+                self._publish(f"runtime.positions.error exchange={name} err={type(exc).__name__}:{exc}")
+            return self._last_positions.get(name, {})
+        self._last_positions[name] = positions
+        return positions
+
+    async def _live_rows(
+        self,
+        name: str,
+        trader: Trader,
+        running: list[str],
+        bots: Dict[str, Any],
+        config: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
+        now_ms = _now_ms()
+        strategies = config.get("strategies", {}) or {}
+        lighter = isinstance(trader, LighterTrader)
+        positions = await self._load_positions(name, trader)
+        rows: Dict[str, Dict[str, Any]] = {}
+        for symbol in running:
+            status = bots.get(symbol) or {}
+            if not isinstance(status, dict):
+                continue
+            state = self._state(symbol, name, _parse_iso_ms(status.get("started_at")) or now_ms)
+
+            market_id = (strategies.get(symbol, {}) or {}).get("market_id")
+            if market_id is None or (isinstance(market_id, str) and not market_id.strip()):
+                market_id = status.get("market_id")
+            if name in {"paradex", "grvt"} and market_id is not None:
+                market_id = str(market_id)
+            if name == "lighter" and isinstance(market_id, str):
+                try:
+                    market_id = int(market_id)
+                except Exception:
+                    pass
+
+            mid_value = _safe_decimal(status.get("mid") or 0)
+            if mid_value <= 0 and market_id is not None and not lighter:
+                try:
+                    bid, ask = await trader.best_bid_ask(market_id)
+                    if bid is not None and ask is not None:
+                        mid_value = (bid + ask) / 2
+                except Exception:
+                    mid_value = Decimal(0)
+
+            pnl_now = Decimal(0)
+            pos_base = Decimal(0)
+            item = positions.get(market_id) if market_id is not None else None
+            if item:
+                pnl_now = _safe_decimal(item.get("pnl"))
+                pos_base = _safe_decimal(item.get("base"))
+
+            if lighter and isinstance(market_id, int):
+                # Lighter 按成交重算本轮盈亏，不需要基准
+                try:
+                    state.profit = await self._bots.lighter_trade_pnl(
+                        trader, symbol, market_id, state.start_ms, now_ms, mid_value
+                    )
+                except Exception as exc:
+                    self._query_error("pnl", symbol, market_id, exc)
+                try:
+                    state.volume, state.trade_count = await self._bots.trade_stats(
+                        trader, symbol, market_id, state.start_ms, now_ms
+                    )
+                except Exception as exc:
+                    self._query_error("trades", symbol, market_id, exc)
+            else:
+                if state.base_pnl is None:
+                    state.base_pnl = pnl_now
+                state.profit = pnl_now - state.base_pnl
+                if name in {"paradex", "grvt"} and market_id is not None:
+                    try:
+                        state.volume, state.trade_count = await self._bots.trade_stats(
+                            trader, symbol, str(market_id), state.start_ms, now_ms
+                        )
+                    except Exception as exc:
+                        self._query_error("trades", symbol, market_id, exc)
+
+            position_notional = abs(pos_base * mid_value) if mid_value > 0 else Decimal(0)
+            rows[symbol] = self._row(
+                status, symbol, market_id, state, position_notional, int(status.get("existing") or 0)
+            )
+        return rows
+
+    def _query_error(self, kind: str, symbol: str, market_id: Any, exc: BaseException) -> None:
+        if is_rate_limited_error(exc):
+            self._publish(f"runtime.{kind}.rate_limited symbol={symbol} market_id={market_id} cached=1")
+        else:
+            self._publish(f"runtime.{kind}.error symbol={symbol} market_id={market_id} err={type(exc).__name__}:{exc}")
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+import heapq
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterator, Optional
+
+# 失效堆条目超过该数量且多于有效挂单时重建堆
+_COMPACT_MIN_STALE = 64
+
+
+@dataclass
+class SimOrder:
+    order_index: int
+    client_order_index: int
+    price: Decimal
+    base_qty: Decimal
+    is_ask: bool
+    created_at_ms: int
+    # 同价位排在本单之前的数量（base），成交量先消耗它
+    queue_ahead: Decimal = Decimal(0)
+
+    @property
+    def side(self) -> str:
+        return "ask" if self.is_ask else "bid"
+
+
+@dataclass
+class SimFill:
+    order: SimOrder
+    size: Decimal
+    done: bool
+
+
+class SimOrderBook:
+    """模拟挂单簿：卖单按价格升序、买单按价格降序放在堆里，撮合只触及被穿越的价位。
+
+    撤单采用惰性删除，堆顶遇到已失效的条目时丢弃；失效条目过多时整体重建。
+    """
+
+    def __init__(self) -> None:
+        self._orders: Dict[int, SimOrder] = {}
+        self._asks: list[tuple[Decimal, int, SimOrder]] = []
+        self._bids: list[tuple[Decimal, int, SimOrder]] = []
+        self._seq = 0
+        self._stale = 0
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __iter__(self) -> Iterator[SimOrder]:
+        return iter(self._orders.values())
+
+    def values(self) -> list[SimOrder]:
+        return list(self._orders.values())
+
+    def get(self, order_index: int) -> Optional[SimOrder]:
+        return self._orders.get(order_index)
+
+    def add(self, order: SimOrder) -> None:
+        if order.order_index in self._orders:
+            self.pop(order.order_index)
+        self._orders[order.order_index] = order
+        self._push(order)
+
+    def _push(self, order: SimOrder) -> None:
+        self._seq += 1
+        if order.is_ask:
+            heapq.heappush(self._asks, (order.price, self._seq, order))
+        else:
+            heapq.heappush(self._bids, (-order.price, self._seq, order))
+
+    def pop(self, order_index: int) -> Optional[SimOrder]:
+        order = self._orders.pop(order_index, None)
+        if order is not None:
+            self._stale += 1
+            if self._stale >= _COMPACT_MIN_STALE and self._stale > len(self._orders):
+                self._compact()
+        return order
+
+    def clear(self) -> None:
+        self._orders.clear()
+        self._asks.clear()
+        self._bids.clear()
+        self._stale = 0
+
+    def _compact(self) -> None:
+        orders = self._orders
+        self._asks = [item for item in self._asks if orders.get(item[2].order_index) is item[2]]
+        self._bids = [item for item in self._bids if orders.get(item[2].order_index) is item[2]]
+        heapq.heapify(self._asks)
+        heapq.heapify(self._bids)
+        self._stale = 0
+
+    def match(self, bid: Decimal, ask: Decimal, touch_size: Decimal = Decimal(0)) -> list[SimFill]:
+        """按最优价撮合：价格被穿越的挂单全部成交；恰好在最优价上的挂单按 touch_size（每轮该价位可成交数量，
+        0 为不限）先消耗排队数量再部分成交。"""
+        fills: list[SimFill] = []
+        self._match_side(self._asks, bid, 1, touch_size, fills)
+        self._match_side(self._bids, ask, -1, touch_size, fills)
+        return fills
+
+    def _match_side(
+        self,
+        heap: list[tuple[Decimal, int, SimOrder]],
+        touch: Decimal,
+        sign: int,
+        touch_size: Decimal,
+        fills: list[SimFill],
+    ) -> None:
+        orders = self._orders
+        budget = touch_size if touch_size > 0 else None
+        while heap:
+            key, _, order = heap[0]
+            if orders.get(order.order_index) is not order:
+                heapq.heappop(heap)
+                self._stale = max(0, self._stale - 1)
+                continue
+            price = key * sign
+            # 卖单：买一 >= 挂单价才可能成交；买单：卖一 <= 挂单价
+            crossed = touch - price if sign > 0 else price - touch
+            if crossed < 0:
+                return
+            if crossed > 0 or budget is None:
+                heapq.heappop(heap)
+                orders.pop(order.order_index, None)
+                fills.append(SimFill(order=order, size=order.base_qty, done=True))
+                continue
+            # 只在最优价上：同价位的挂单按先后顺序分享本轮可成交量
+            if budget <= 0:
+                return
+            used = min(budget, order.queue_ahead)
+            order.queue_ahead -= used
+            budget -= used
+            size = min(budget, order.base_qty)
+            if size <= 0:
+                return
+            budget -= size
+            if size >= order.base_qty:
+                heapq.heappop(heap)
+                orders.pop(order.order_index, None)
+                fills.append(SimFill(order=order, size=size, done=True))
+                continue
+            order.base_qty -= size
+            fills.append(SimFill(order=order, size=size, done=False))
+            return
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import bisect
+import json
+from array import array
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+# 内存中最多保留的模拟成交笔数；超过后把最早的一块写入溢出文件
+DEFAULT_SIM_TRADE_CAP = 100_000
+# 每次溢出的最大笔数：写入与读回都在事件循环上同步进行，块小才能把单次停顿控制在毫秒级
+SPILL_BLOCK = 512
+# 落在溢出块内的区间边界读盘后缓存的数量上限
+_BOUNDARY_CACHE_MAX = 64
+
+
+@dataclass(slots=True)
+class SimTrade:
+    ts_ms: int
+    price: Decimal
+    size: Decimal
+    side: str
+
+
+@dataclass(frozen=True)
+class _SpillBlock:
+    first_ts: int
+    last_ts: int
+    count_before: int
+    volume_before: Decimal
+    offset: int
+    count: int
+
+
+class SimTradeLog:
+    """模拟成交流水：按时间追加，同时维护累计成交额与时间索引，区间统计用二分查找。
+
+    cap>0 且给了 spill_path 时，内存超过 cap 笔就把最早的至多 SPILL_BLOCK 笔追加写入 JSONL，只保留块索引；
+    区间边界落在已溢出的块内时才读回该块（至多 SPILL_BLOCK 行）。
+    """
+
+    def __init__(self, cap: int = 0, spill_path: Optional[Path] = None) -> None:
+        self.cap = max(0, int(cap))
+        self.spill_path = spill_path
+        self._trades: list[SimTrade] = []
+        self._ts = array("q")
+        # 截至每笔（含）的累计成交额，含已溢出部分
+        self._cum: list[Decimal] = []
+        self._spilled_count = 0
+        self._spilled_volume = Decimal(0)
+        self._blocks: list[_SpillBlock] = []
+        self._block_last_ts = array("q")
+        self._last_ts: Optional[int] = None
+        self._boundaries: Dict[Tuple[int, bool], Tuple[int, Decimal]] = {}
+
+    def __len__(self) -> int:
+        return self._spilled_count + len(self._trades)
+
+    @property
+    def volume(self) -> Decimal:
+        return self._cum[-1] if self._cum else self._spilled_volume
+
+    @property
+    def spilled(self) -> int:
+        return self._spilled_count
+
+    def recent(self) -> list[SimTrade]:
+        """仍在内存中的成交（按时间升序）。"""
+        return list(self._trades)
+
+    def append(self, ts_ms: int, price: Decimal, size: Decimal, side: str) -> None:
+        # 时间索引要求非递减：系统时钟回拨时沿用上一笔的时间
+        if self._last_ts is not None and ts_ms < self._last_ts:
+            ts_ms = self._last_ts
+        self._last_ts = ts_ms
+        self._trades.append(SimTrade(ts_ms=ts_ms, price=price, size=size, side=side))
+        self._ts.append(ts_ms)
+        self._cum.append(self.volume + abs(price * size))
+        if self.cap > 0 and self.spill_path is not None and len(self._trades) > self.cap:
+            self._spill(max(1, min(SPILL_BLOCK, len(self._trades) // 2)))
+
+    def stats(self, start_ms: int, end_ms: int) -> tuple[Decimal, int]:
+        """[start_ms, end_ms] 内的成交额与笔数。"""
+        if end_ms < start_ms or not len(self):
+            return Decimal(0), 0
+        lo_count, lo_volume = self._prefix(start_ms, inclusive=False)
+        hi_count, hi_volume = self._prefix(end_ms, inclusive=True)
+        return hi_volume - lo_volume, hi_count - lo_count
+
+    def discard(self) -> None:
+        """丢弃全部成交并删除溢出文件。"""
+        if self.spill_path is not None and self._blocks:
+            self.spill_path.unlink(missing_ok=True)
+        self.__init__(self.cap, self.spill_path)
+
+    def _prefix(self, ts_ms: int, inclusive: bool) -> Tuple[int, Decimal]:
+        """时间早于 ts_ms（inclusive 时不晚于）的成交笔数与累计成交额。"""
+        search = bisect.bisect_right if inclusive else bisect.bisect_left
+        idx = search(self._ts, ts_ms)
+        if idx > 0:
+            return self._spilled_count + idx, self._cum[idx - 1]
+        # 边界早于内存中的第一笔，落在已溢出部分
+        pos = search(self._block_last_ts, ts_ms)
+        if pos >= len(self._blocks):
+            return self._spilled_count, self._spilled_volume
+        block = self._blocks[pos]
+        if block.first_ts > ts_ms or (not inclusive and block.first_ts == ts_ms):
+            return block.count_before, block.volume_before
+        key = (ts_ms, inclusive)
+        cached = self._boundaries.get(key)
+        if cached is None:
+            cached = self._prefix_in_block(block, ts_ms, inclusive)
+            if len(self._boundaries) >= _BOUNDARY_CACHE_MAX:
+                self._boundaries.clear()
+            self._boundaries[key] = cached
+        return cached
+
+    def _prefix_in_block(self, block: _SpillBlock, ts_ms: int, inclusive: bool) -> Tuple[int, Decimal]:
+        assert self.spill_path is not None
+        count = block.count_before
+        volume = block.volume_before
+        with self.spill_path.open("rb") as fp:
+            fp.seek(block.offset)
+            for _ in range(block.count):
+                ts, price, size, _side = json.loads(fp.readline())
+                if ts > ts_ms or (not inclusive and ts == ts_ms):
+                    break
+                count += 1
+                volume += abs(Decimal(price) * Decimal(size))
+        return count, volume
+
+    def _spill(self, n: int) -> None:
+        assert self.spill_path is not None
+        head = self._trades[:n]
+        self.spill_path.parent.mkdir(parents=True, exist_ok=True)
+        # 首次溢出时截断，避免接上一轮遗留的文件
+        with self.spill_path.open("ab" if self._blocks else "wb") as fp:
+            offset = fp.tell()
+            fp.write(
+                b"".join(
+                    json.dumps([t.ts_ms, str(t.price), str(t.size), t.side]).encode() + b"\n" for t in head
+                )
+            )
+        self._blocks.append(
+            _SpillBlock(
+                first_ts=head[0].ts_ms,
+                last_ts=head[-1].ts_ms,
+                count_before=self._spilled_count,
+                volume_before=self._spilled_volume,
+                offset=offset,
+                count=n,
+            )
+        )
+        self._block_last_ts.append(head[-1].ts_ms)
+        self._spilled_count += n
+        self._spilled_volume = self._cum[n - 1]
+        del self._trades[:n]
+        del self._ts[:n]
+        del self._cum[:n]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional
+
+from app.core.logbus import LogBus
+
+StatusCompute = Callable[[str], Awaitable[Dict[str, Any]]]
+
+_UNCHANGED = object()
+
+# 状态无变化时发送 SSE 注释保活的间隔，避免代理关闭空闲连接后重连拉全量快照
+SSE_KEEPALIVE_S = 15.0
+SSE_PING = ": ping\n\n"
+
+
+def merge_patch(old: Any, new: Any) -> Any:
+    """生成 JSON Merge Patch（RFC 7386）：删除的键为 null，列表整体替换；无变化返回 _UNCHANGED。"""
+    if not isinstance(old, dict) or not isinstance(new, dict):
+        return _UNCHANGED if old == new else new
+    patch: Dict[str, Any] = {}
+    for key, value in new.items():
+        if key not in old:
+            patch[key] = value
+            continue
+        sub = merge_patch(old[key], value)
+        if sub is not _UNCHANGED:
+            patch[key] = sub
+    for key in old:
+        if key not in new:
+            patch[key] = None
+    return patch if patch else _UNCHANGED
+
+
+def _sse(event: str, payload: str) -> str:
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+class _Channel:
+    """单个交易所的状态频道：只保存最新快照与上一版本的差异，序列化结果在订阅者间共享。"""
+
+    def __init__(self) -> None:
+        self.version = 0
+        self.snapshot: Optional[Dict[str, Any]] = None
+        self.snapshot_frame = ""
+        self.patch_frame = ""
+        self.changed = asyncio.Event()
+        self.subscribers = 0
+        self.task: Optional[asyncio.Task[None]] = None
+
+    def publish(self, snapshot: Dict[str, Any]) -> None:
+        previous = self.snapshot
+        patch = merge_patch(previous, snapshot) if previous is not None else snapshot
+        if patch is _UNCHANGED:
+            return
+        self.snapshot = snapshot
+        self.version += 1
+        self.snapshot_frame = _sse("snapshot", json.dumps(snapshot, ensure_ascii=False, separators=(",", ":")))
+        self.patch_frame = _sse("diff", json.dumps(patch, ensure_ascii=False, separators=(",", ":")))
+        changed, self.changed = self.changed, asyncio.Event()
+        changed.set()
+
+
+class StatusBroadcaster:
+    """运行状态推送：每个交易所每个周期只计算一次，增量推送给所有连接的页面。"""
+
+    def __init__(
+        self,
+        compute: StatusCompute,
+        interval_s: Callable[[], float],
+        logbus: Optional[LogBus] = None,
+        keepalive_s: float = SSE_KEEPALIVE_S,
+    ) -> None:
+        self._compute = compute
+        self._interval_s = interval_s
+        self._logbus = logbus
+        self._keepalive_s = keepalive_s
+        self._channels: Dict[str, _Channel] = {}
+
+    def subscriber_count(self, key: str) -> int:
+        channel = self._channels.get(key)
+        return channel.subscribers if channel else 0
+
+    async def _refresh(self, key: str, channel: _Channel) -> None:
+        while True:
+            try:
+                channel.publish(await self._compute(key))
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                if self._logbus is not None:
+                    self._logbus.publish(f"runtime.stream.error exchange={key} err={type(exc).__name__}:{exc}")
+            await asyncio.sleep(max(0.2, float(self._interval_s())))
+
+    def _acquire(self, key: str) -> _Channel:
+        channel = self._channels.get(key)
+        if channel is None:
+            channel = _Channel()
+            self._channels[key] = channel
+        channel.subscribers += 1
+        if channel.task is None or channel.task.done():
+            channel.task = asyncio.create_task(self._refresh(key, channel))
+        return channel
+
+    def _release(self, key: str, channel: _Channel) -> None:
+        channel.subscribers -= 1
+        if channel.subscribers > 0:
+            return
+        # 没有订阅者时停止计算，下次订阅从新快照开始
+        if channel.task is not None:
+            channel.task.cancel()
+        if self._channels.get(key) is channel:
+            self._channels.pop(key, None)
+
+    async def stream(self, key: str) -> AsyncIterator[str]:
+        """首帧为完整快照（event: snapshot），之后为 JSON Merge Patch（event: diff）；跟不上时补发快照。
+
+        超过 keepalive_s 没有变化时发送注释行 `: ping` 保活。
+        """
+        channel = self._acquire(key)
+        sent = 0
+        try:
+            while True:
+                if channel.version == sent:
+                    try:
+                        await asyncio.wait_for(channel.changed.wait(), timeout=self._keepalive_s)
+                    except asyncio.TimeoutError:
+                        yield SSE_PING
+                    continue
+                if sent and channel.version == sent + 1:
+                    frame = channel.patch_frame
+                else:
+                    frame = channel.snapshot_frame
+                sent = channel.version
+                yield frame
+        finally:
+            self._release(key, channel)
+
+    async def close(self) -> None:
+        tasks = [channel.task for channel in self._channels.values() if channel.task is not None]
+        self._channels.clear()
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import math
+import os
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, fields
+from decimal import Decimal
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from app.exchanges.types import MarketMeta
+from app.services.backtest import BacktestParams, BacktestResult, MarketSeries, run_backtest
+
+# 回测语义变化时递增，使旧缓存失效
+BACKTEST_VERSION = 1
+# 单个进程任务最多携带的参数组数
+SWEEP_CHUNK = 16
+
+_RESULT_FIELDS = [f.name for f in fields(BacktestResult) if f.name != "params"]
+_PARAM_FIELDS = [f.name for f in fields(BacktestParams)]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    digest TEXT PRIMARY KEY,
+    tape TEXT NOT NULL,
+    symbol TEXT NOT NULL,
+    params TEXT NOT NULL,
+    result TEXT NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class SweepJob:
+    symbol: str
+    series: MarketSeries
+    meta: MarketMeta
+    params: Sequence[BacktestParams]
+
+
+@dataclass(frozen=True)
+class SweepRow:
+    symbol: str
+    digest: str
+    cached: bool
+    result: BacktestResult
+
+
+def series_hash(series: MarketSeries) -> str:
+    """按内容计算行情摘要，与文件路径无关。"""
+    h = hashlib.sha256()
+    h.update(str(series.price_decimals).encode())
+    for arr in (series.ts_ms, series.bid, series.ask):
+        h.update(np.ascontiguousarray(arr, dtype=np.int64).tobytes())
+    return h.hexdigest()
+
+
+def _canonical(value: Any) -> str:
+    # 数值相等的 Decimal（如 1 与 1.0）得到相同文本，避免摘要不同
+    if isinstance(value, Decimal):
+        return format(value.normalize(), "f")
+    return str(value)
+
+
+def _params_json(params: BacktestParams) -> str:
+    return json.dumps({k: _canonical(v) for k, v in asdict(params).items()}, sort_keys=True)
+
+
+def result_digest(tape_hash: str, meta: MarketMeta, params: BacktestParams) -> str:
+    payload = json.dumps(
+        {
+            "v": BACKTEST_VERSION,
+            "tape": tape_hash,
+            "meta": [
+                meta.price_decimals,
+                meta.size_decimals,
+                _canonical(meta.min_base_amount),
+                _canonical(meta.min_quote_amount),
+            ],
+            "params": _params_json(params),
+        },
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def publish_series(series: MarketSeries, root: Path) -> Tuple[str, Path]:
+    """把行情写成 (3, n) int64 的 .npy，供工作进程以 mmap 只读打开；按内容寻址，已存在则复用。"""
+    tape_hash = series_hash(series)
+    path = Path(root) / "series" / f"{tape_hash}.npy"
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+        np.save(tmp, np.stack([series.ts_ms, series.bid, series.ask]).astype(np.int64))
+        os.replace(tmp, path)
+    return tape_hash, path
+
+
+# 工作进程内按路径缓存已映射的行情，同一进程的后续任务直接复用
+_MAPPED: Dict[str, MarketSeries] = {}
+
+
+def _mapped_series(path: str, price_decimals: int) -> MarketSeries:
+    series = _MAPPED.get(path)
+    if series is None:
+        data = np.load(path, mmap_mode="r")
+        series = MarketSeries(ts_ms=data[0], bid=data[1], ask=data[2], price_decimals=price_decimals)
+        _MAPPED[path] = series
+    return series
+
+
+def _run_chunk(path: str, meta: MarketMeta, params: Sequence[BacktestParams]) -> List[BacktestResult]:
+    series = _mapped_series(path, int(meta.price_decimals))
+    return [run_backtest(series, p, meta) for p in params]
+
+
+class SweepCache:
+    """回测结果缓存（SQLite）：以 (行情摘要, 市场精度, 参数) 的摘要为键。"""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def get_many(self, digests: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+        keys = list(dict.fromkeys(digests))
+        found: Dict[str, Dict[str, Any]] = {}
+        for start in range(0, len(keys), 500):
+            batch = keys[start : start + 500]
+            marks = ",".join("?" * len(batch))
+            rows = self._conn.execute(f"SELECT digest, result FROM results WHERE digest IN ({marks})", batch)
+            for digest, text in rows:
+                found[digest] = json.loads(text)
+        return found
+
+    def put_many(self, tape_hash: str, symbol: str, items: Sequence[Tuple[str, BacktestResult]]) -> None:
+        rows = [
+            (
+                digest,
+                tape_hash,
+                symbol,
+                _params_json(result.params),
+                json.dumps({name: getattr(result, name) for name in _RESULT_FIELDS}),
+            )
+            for digest, result in items
+        ]
+        with self._conn:
+            self._conn.executemany("INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def _rank_key(row: SweepRow) -> Tuple[float, float]:
+    return (-row.result.pnl, row.result.max_drawdown)
+
+
+def write_report(rows: Sequence[SweepRow], path: Path) -> None:
+    """按收益降序（同收益回撤小者优先）写出 CSV 排名。"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", newline="", encoding="utf-8") as fp:
+        writer = csv.writer(fp)
+        writer.writerow(["rank", "symbol", *_RESULT_FIELDS, *_PARAM_FIELDS, "digest"])
+        for rank, row in enumerate(sorted(rows, key=_rank_key), start=1):
+            result = row.result
+            writer.writerow(
+                [
+                    rank,
+                    row.symbol,
+                    *(getattr(result, name) for name in _RESULT_FIELDS),
+                    *(getattr(result.params, name) for name in _PARAM_FIELDS),
+                    row.digest,
+                ]
+            )
+
+
+def _store(
+    cache: SweepCache,
+    job: SweepJob,
+    tape_hash: str,
+    part: Sequence[Tuple[str, BacktestParams]],
+    results: Sequence[BacktestResult],
+) -> List[SweepRow]:
+    symbol = job.symbol.upper()
+    items = [(digest, result) for (digest, _), result in zip(part, results)]
+    cache.put_many(tape_hash, symbol, items)
+    return [SweepRow(symbol, digest, False, result) for digest, result in items]
+
+
+def run_sweep(
+    jobs: Sequence[SweepJob],
+    root: Path,
+    workers: Optional[int] = None,
+    report_path: Optional[Path] = None,
+) -> List[SweepRow]:
+    """多进程批量回测；行情经 mmap 共享，命中缓存的参数组不再计算。返回按收益排名的结果。
+
+    workers<=1 时在当前进程内顺序执行。
+    """
+    root = Path(root)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    cache = SweepCache(root / "sweep.sqlite3")
+    rows: List[SweepRow] = []
+    try:
+        tasks: List[Tuple[SweepJob, str, Path, List[Tuple[str, BacktestParams]]]] = []
+        for job in jobs:
+            symbol = job.symbol.upper()
+            tape_hash, path = publish_series(job.series, root)
+            unique: Dict[str, BacktestParams] = {}
+            for params in job.params:
+                unique.setdefault(result_digest(tape_hash, job.meta, params), params)
+            hits = cache.get_many(unique)
+            for digest, stored in hits.items():
+                result = BacktestResult(params=unique[digest], **stored)
+                rows.append(SweepRow(symbol, digest, True, result))
+            missing = [(digest, params) for digest, params in unique.items() if digest not in hits]
+            if missing:
+                tasks.append((job, tape_hash, path, missing))
+
+        pending = sum(len(missing) for *_, missing in tasks)
+        if pending:
+            chunk = max(1, min(SWEEP_CHUNK, math.ceil(pending / (max(1, workers) * 4))))
+            if workers <= 1:
+                for job, tape_hash, path, missing in tasks:
+                    for start in range(0, len(missing), chunk):
+                        part = missing[start : start + chunk]
+                        results = [run_backtest(job.series, p, job.meta) for _, p in part]
+                        rows.extend(_store(cache, job, tape_hash, part, results))
+            else:
+                with ProcessPoolExecutor(max_workers=workers) as pool:
+                    futures = {}
+                    for job, tape_hash, path, missing in tasks:
+                        for start in range(0, len(missing), chunk):
+                            part = missing[start : start + chunk]
+                            future = pool.submit(_run_chunk, str(path), job.meta, [p for _, p in part])
+                            futures[future] = (job, tape_hash, part)
+                    # 每完成一块就落缓存，中断后重跑只补剩余部分
+                    for future in as_completed(futures):
+                        job, tape_hash, part = futures[future]
+                        rows.extend(_store(cache, job, tape_hash, part, future.result()))
+    finally:
+        cache.close()
+
+    rows.sort(key=_rank_key)
+    if report_path is not None:
+        write_report(rows, report_path)
+    return rows
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from app.core import clock
+
+TICK_MODE_INTERVAL = "interval"
+TICK_MODE_EVENT = "event"
+
+DEFAULT_TICK_INTERVAL_MS = 500
+DEFAULT_TICK_MIN_INTERVAL_MS = 50
+DEFAULT_TICK_MAX_INTERVAL_MS = 1000
+DEFAULT_TICK_DEBOUNCE_MS = 20
+
+
+def _ms(value: Any, default: int, minimum: int = 0) -> int:
+    try:
+        parsed = int(value)
+    except Exception:
+        return default
+    return max(minimum, parsed)
+
+
+def normalize_tick_mode(value: Any) -> str:
+    mode = str(value or "").strip().lower()
+    if mode == TICK_MODE_EVENT:
+        return TICK_MODE_EVENT
+    return TICK_MODE_INTERVAL
+
+
+@dataclass(frozen=True)
+class TickSchedulerConfig:
+    mode: str = TICK_MODE_INTERVAL
+    min_interval_ms: int = DEFAULT_TICK_MIN_INTERVAL_MS
+    max_interval_ms: int = DEFAULT_TICK_MAX_INTERVAL_MS
+    debounce_ms: int = DEFAULT_TICK_DEBOUNCE_MS
+
+    @classmethod
+    def from_runtime(cls, runtime: Optional[Dict[str, Any]]) -> "TickSchedulerConfig":
+        runtime = runtime or {}
+        min_ms = _ms(runtime.get("tick_min_interval_ms"), DEFAULT_TICK_MIN_INTERVAL_MS)
+        max_ms = _ms(runtime.get("tick_max_interval_ms"), DEFAULT_TICK_MAX_INTERVAL_MS, minimum=1)
+        return cls(
+            mode=normalize_tick_mode(runtime.get("tick_mode")),
+            min_interval_ms=min(min_ms, max_ms),
+            max_interval_ms=max_ms,
+            debounce_ms=_ms(runtime.get("tick_debounce_ms"), DEFAULT_TICK_DEBOUNCE_MS),
+        )
+
+
+class TickScheduler:
+    """决定策略循环何时进入下一轮：固定间隔或盘口变化驱动（带最小间隔、防抖与心跳兜底）。"""
+
+    def __init__(self, config: Optional[TickSchedulerConfig] = None) -> None:
+        self.config = config or TickSchedulerConfig()
+        self.market_id: Any = None
+        self.last_tick_s: Optional[float] = None
+        self.last_reason = ""
+        self._book_version = 0
+
+    def configure(self, runtime: Optional[Dict[str, Any]]) -> None:
+        self.config = TickSchedulerConfig.from_runtime(runtime)
+
+    def bind(self, market_id: Any) -> None:
+        if market_id == self.market_id:
+            return
+        self.market_id = market_id
+        self._book_version = 0
+
+    def _event_capable(self, trader: Any) -> bool:
+        return (
+            self.market_id is not None
+            and callable(getattr(trader, "book_version", None))
+            and callable(getattr(trader, "wait_book_update", None))
+        )
+
+    async def wait(self, trader: Any) -> str:
+        """阻塞到下一轮应执行的时刻，返回触发原因：interval/book/heartbeat。"""
+        cfg = self.config
+        if cfg.mode != TICK_MODE_EVENT or not self._event_capable(trader):
+            await clock.sleep(DEFAULT_TICK_INTERVAL_MS / 1000)
+            return self._mark("interval")
+
+        last = self.last_tick_s if self.last_tick_s is not None else clock.monotonic()
+        elapsed = clock.monotonic() - last
+        min_s = cfg.min_interval_ms / 1000
+        if elapsed < min_s:
+            await clock.sleep(min_s - elapsed)
+
+        try:
+            current = trader.book_version(self.market_id)
+            if current == self._book_version:
+                remaining = cfg.max_interval_ms / 1000 - (clock.monotonic() - last)
+                if remaining > 0:
+                    current = await trader.wait_book_update(self.market_id, self._book_version, remaining)
+        except Exception:
+            await clock.sleep(DEFAULT_TICK_INTERVAL_MS / 1000)
+            return self._mark("interval")
+
+        if current == self._book_version:
+            return self._mark("heartbeat")
+        if cfg.debounce_ms > 0:
+            # 盘口连续推送时合并为一次调和
+            await clock.sleep(cfg.debounce_ms / 1000)
+            try:
+                current = trader.book_version(self.market_id)
+            except Exception:
+                pass
+        self._book_version = current
+        return self._mark("book")
+
+    def _mark(self, reason: str) -> str:
+        self.last_tick_s = clock.monotonic()
+        self.last_reason = reason
+        return reason
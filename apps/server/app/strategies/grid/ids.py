@@ -42,3 +42,53 @@ def grid_client_order_side_level(client_order_index: int) -> tuple[str, int] | N
             return "ask", level
         return None
     return None
+
+
+class GridLevelAllocator:
+    """按方向维护已占用档位的位图，增量同步活动订单并分配空闲档位。"""
+
+    def __init__(self, rotate: bool = False, seed: int = 1) -> None:
+        self._rotate = bool(rotate)
+        self._used = {
+            "ask": bytearray(MAX_LEVEL_PER_SIDE + 1),
+            "bid": bytearray(MAX_LEVEL_PER_SIDE + 1),
+        }
+        self._marked: dict[str, set[int]] = {"ask": set(), "bid": set()}
+        seed = (int(seed) - 1) % MAX_LEVEL_PER_SIDE + 1
+        self._cursor = {"ask": seed, "bid": seed % MAX_LEVEL_PER_SIDE + 1}
+        # 档位 0 不可用
+        self._used["ask"][0] = 1
+        self._used["bid"][0] = 1
+
+    def sync(self, side: str, used_levels: set[int]) -> None:
+        """以活动订单占用的档位为准，只改动与上次不同的位。"""
+        key = "ask" if side == "ask" else "bid"
+        bitmap = self._used[key]
+        marked = self._marked[key]
+        for level in marked - used_levels:
+            bitmap[level] = 0
+        for level in used_levels - marked:
+            if 1 <= level <= MAX_LEVEL_PER_SIDE:
+                bitmap[level] = 1
+        self._marked[key] = {level for level in used_levels if 1 <= level <= MAX_LEVEL_PER_SIDE}
+
+    def allocate(self, side: str) -> int | None:
+        key = "ask" if side == "ask" else "bid"
+        bitmap = self._used[key]
+        start = self._cursor[key] if self._rotate else 1
+        level = bitmap.find(0, start)
+        if level < 0 and start > 1:
+            level = bitmap.find(0, 1, start)
+        if level < 0:
+            return None
+        bitmap[level] = 1
+        self._marked[key].add(level)
+        if self._rotate:
+            self._cursor[key] = level + 1 if level < MAX_LEVEL_PER_SIDE else 1
+        return level
+
+    def release(self, side: str, level: int) -> None:
+        key = "ask" if side == "ask" else "bid"
+        if 1 <= level <= MAX_LEVEL_PER_SIDE:
+            self._used[key][level] = 0
+            self._marked[key].discard(level)
@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+from collections import deque
+from decimal import Decimal
+from typing import Any, Callable, Dict, Generic, Hashable, Iterable, Optional, TypeVar
+
+from app.strategies.grid.ticks import GridLadder, build_ladder, to_ticks
+
+T = TypeVar("T")
+
+
+def _aligned(value: Decimal, decimals: int) -> bool:
+    exponent = value.as_tuple().exponent
+    return isinstance(exponent, int) and -exponent <= int(decimals)
+
+
+class LadderCache:
+    """按交易对缓存的目标档位。
+
+    参数不变时：中心价不动直接复用；中心价移动 step 的 k 倍时只平移 k 档（远端移除、近端补齐）。
+    价格与 step 未对齐到最小价位、或档位接近 0 价时回退为整体重建。
+    """
+
+    def __init__(self) -> None:
+        self._params: Optional[tuple[Decimal, int, int, int]] = None
+        self._center: Optional[Decimal] = None
+        self._ladder: Optional[GridLadder] = None
+        self._incremental = False
+        self._center_ticks = 0
+        self._step_ticks = 0
+        self._asks: deque[int] = deque()
+        self._bids: deque[int] = deque()
+        self._ask_set: set[int] = set()
+        self._bid_set: set[int] = set()
+        self._center_units = 0
+        self._unit_shift = 0
+        # 最近一次更新：0 表示复用，正负 k 表示平移档数，None 表示整体重建
+        self.last_shift: Optional[int] = None
+
+    def update(self, center: Decimal, step: Decimal, levels_up: int, levels_down: int, decimals: int) -> GridLadder:
+        params = (step, int(levels_up), int(levels_down), int(decimals))
+        if self._ladder is not None and params == self._params:
+            if center == self._center:
+                self.last_shift = 0
+                return self._ladder
+            if self._incremental and _aligned(center, decimals):
+                delta = to_ticks(center, decimals) - self._center_ticks
+                shift, rem = divmod(delta, self._step_ticks)
+                if rem == 0 and abs(shift) < max(params[1], params[2], 1) and self._shift(shift, params[1], params[2]):
+                    self._center = center
+                    self.last_shift = shift
+                    self._ladder = self._view()
+                    return self._ladder
+        return self._rebuild(center, step, params)
+
+    def _rebuild(self, center: Decimal, step: Decimal, params: tuple[Decimal, int, int, int]) -> GridLadder:
+        _, levels_up, levels_down, decimals = params
+        ladder = build_ladder(center, step, levels_up, levels_down, decimals)
+        self._params = params
+        self._center = center
+        self.last_shift = None
+        self._incremental = (
+            _aligned(center, decimals)
+            and _aligned(step, decimals)
+            and step > 0
+            and len(ladder.asks) == levels_up
+            and len(ladder.bids) == levels_down
+        )
+        if self._incremental:
+            self._center_ticks = to_ticks(center, decimals)
+            self._step_ticks = to_ticks(step, decimals)
+        self._center_units = ladder.center_units
+        self._unit_shift = ladder.unit_shift
+        self._asks = deque(ladder.asks)
+        self._bids = deque(ladder.bids)
+        self._ask_set = set(ladder.asks)
+        self._bid_set = set(ladder.bids)
+        self._ladder = self._view()
+        return self._ladder
+
+    def _shift(self, k: int, levels_up: int, levels_down: int) -> bool:
+        """中心价上移 k 档（k<0 为下移）；会产生非正价格时放弃平移。"""
+        step = self._step_ticks
+        center = self._center_ticks + k * step
+        if levels_down and center - step * levels_down <= 0:
+            return False
+        asks, bids = self._asks, self._bids
+        ask_set, bid_set = self._ask_set, self._bid_set
+        if k > 0:
+            for _ in range(min(k, len(asks))):
+                ask_set.discard(asks.popleft())
+            for i in range(levels_up - len(asks), 0, -1):
+                price = center + step * (levels_up - i + 1)
+                asks.append(price)
+                ask_set.add(price)
+            for i in range(min(k, levels_down)):
+                price = center - step * (min(k, levels_down) - i)
+                bids.appendleft(price)
+                bid_set.add(price)
+            while len(bids) > levels_down:
+                bid_set.discard(bids.pop())
+        else:
+            n = -k
+            for _ in range(min(n, len(bids))):
+                bid_set.discard(bids.popleft())
+            for i in range(levels_down - len(bids), 0, -1):
+                price = center - step * (levels_down - i + 1)
+                bids.append(price)
+                bid_set.add(price)
+            for i in range(min(n, levels_up)):
+                price = center + step * (min(n, levels_up) - i)
+                asks.appendleft(price)
+                ask_set.add(price)
+            while len(asks) > levels_up:
+                ask_set.discard(asks.pop())
+        self._center_ticks = center
+        # 已对齐时精细单位即价格刻度
+        self._center_units = center
+        return True
+
+    def _view(self) -> GridLadder:
+        return GridLadder(
+            asks=self._asks,
+            bids=self._bids,
+            center_units=self._center_units,
+            unit_shift=self._unit_shift,
+            ask_set=self._ask_set,
+            bid_set=self._bid_set,
+        )
+
+
+class OrderIndex(Generic[T]):
+    """挂单解析缓存：镜像/模拟盘中未变化的订单对象直接复用上一轮的解析结果。"""
+
+    def __init__(self) -> None:
+        self._key: Optional[Hashable] = None
+        self._entries: Dict[int, tuple[Any, Optional[T]]] = {}
+
+    def parse(self, orders: Iterable[Any], key: Hashable, parse: Callable[[Any], Optional[T]]) -> list[tuple[Any, T]]:
+        """key 变化（如前缀、价格精度）时丢弃缓存；返回解析成功的 (订单, 结果)。"""
+        previous = self._entries if key == self._key else {}
+        entries: Dict[int, tuple[Any, Optional[T]]] = {}
+        result: list[tuple[Any, T]] = []
+        for order in orders:
+            cached = previous.get(id(order))
+            if cached is not None and cached[0] is order:
+                parsed = cached[1]
+            else:
+                parsed = parse(order)
+            entries[id(order)] = (order, parsed)
+            if parsed is not None:
+                result.append((order, parsed))
+        self._key = key
+        self._entries = entries
+        return result
@@ -94,19 +94,31 @@ def required_bar_count(atr_period: int, adx_period: int) -> int:
     return max(int(atr_period) + 1, int(adx_period) * 2)
 
 
+def _true_range(prev: OhlcBar, curr: OhlcBar) -> Decimal:
+    return max(
+        curr.high - curr.low,
+        abs(curr.high - prev.close),
+        abs(curr.low - prev.close),
+    )
+
+
+def _directional_index(tr_sum: Decimal, pdm_sum: Decimal, mdm_sum: Decimal) -> Decimal:
+    if tr_sum <= 0:
+        return Decimal(0)
+    plus_di = (Decimal(100) * pdm_sum) / tr_sum
+    minus_di = (Decimal(100) * mdm_sum) / tr_sum
+    denom = plus_di + minus_di
+    if denom <= 0:
+        return Decimal(0)
+    return (Decimal(100) * abs(plus_di - minus_di)) / denom
+
+
 def calc_atr_pct(bars: list[OhlcBar], period: int) -> Optional[Decimal]:
     if period <= 0 or len(bars) < period + 1:
         return None
     trs: list[Decimal] = []
     for i in range(1, len(bars)):
-        prev_close = bars[i - 1].close
-        curr = bars[i]
-        tr = max(
-            curr.high - curr.low,
-            abs(curr.high - prev_close),
-            abs(curr.low - prev_close),
-        )
-        trs.append(tr)
+        trs.append(_true_range(bars[i - 1], bars[i]))
     if len(trs) < period:
         return None
 
@@ -136,12 +148,7 @@ def calc_adx(bars: list[OhlcBar], period: int) -> Optional[Decimal]:
 
         pdm = up_move if up_move > 0 and up_move > down_move else Decimal(0)
         mdm = down_move if down_move > 0 and down_move > up_move else Decimal(0)
-        tr = max(
-            curr.high - curr.low,
-            abs(curr.high - prev.close),
-            abs(curr.low - prev.close),
-        )
-        trs.append(tr)
+        trs.append(_true_range(prev, curr))
         plus_dm.append(pdm)
         minus_dm.append(mdm)
 
@@ -152,25 +159,13 @@ def calc_adx(bars: list[OhlcBar], period: int) -> Optional[Decimal]:
     pdm_s = sum(plus_dm[:period], Decimal(0))
     mdm_s = sum(minus_dm[:period], Decimal(0))
 
-    dx_values: list[Decimal] = []
-
-    def _dx(tr_sum: Decimal, pdm_sum: Decimal, mdm_sum: Decimal) -> Decimal:
-        if tr_sum <= 0:
-            return Decimal(0)
-        plus_di = (Decimal(100) * pdm_sum) / tr_sum
-        minus_di = (Decimal(100) * mdm_sum) / tr_sum
-        denom = plus_di + minus_di
-        if denom <= 0:
-            return Decimal(0)
-        return (Decimal(100) * abs(plus_di - minus_di)) / denom
-
-    dx_values.append(_dx(tr_s, pdm_s, mdm_s))
+    dx_values: list[Decimal] = [_directional_index(tr_s, pdm_s, mdm_s)]
 
     for i in range(period, len(trs)):
         tr_s = tr_s - (tr_s / Decimal(period)) + trs[i]
         pdm_s = pdm_s - (pdm_s / Decimal(period)) + plus_dm[i]
         mdm_s = mdm_s - (mdm_s / Decimal(period)) + minus_dm[i]
-        dx_values.append(_dx(tr_s, pdm_s, mdm_s))
+        dx_values.append(_directional_index(tr_s, pdm_s, mdm_s))
 
     if len(dx_values) < period:
         return None
@@ -181,11 +176,144 @@ def calc_adx(bars: list[OhlcBar], period: int) -> Optional[Decimal]:
     return adx
 
 
+class IncrementalIndicators:
+    """按已完成 K 线增量维护 ATR% / ADX（Wilder 平滑），运算顺序与 calc_atr_pct / calc_adx 完全一致。
+
+    K 线窗口被裁剪（最早一根被丢弃）时从新窗口重新起算，以保证与批量计算结果相同。
+    """
+
+    def __init__(self, atr_period: int, adx_period: int) -> None:
+        self.atr_period = int(atr_period)
+        self.adx_period = int(adx_period)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._first_ts = -1
+        self._last_ts = -1
+        self.bar_count = 0
+        self._prev: Optional[OhlcBar] = None
+        self._last_close = Decimal(0)
+        # ATR
+        self._atr_n = 0
+        self._atr_seed = Decimal(0)
+        self._atr: Optional[Decimal] = None
+        # ADX
+        self._adx_n = 0
+        self._tr_s = Decimal(0)
+        self._pdm_s = Decimal(0)
+        self._mdm_s = Decimal(0)
+        self._dx_n = 0
+        self._dx_seed = Decimal(0)
+        self._adx: Optional[Decimal] = None
+
+    @property
+    def atr_pct(self) -> Optional[Decimal]:
+        if self._atr is None or self._last_close <= 0:
+            return None
+        return self._atr / self._last_close
+
+    @property
+    def adx(self) -> Optional[Decimal]:
+        return self._adx
+
+    def update(self, bars: list[OhlcBar], now_ms: int) -> int:
+        """吸收 bars 中新完成的 K 线，返回已完成 K 线数量；未收线时为 O(1)。"""
+        count = len(bars)
+        if count:
+            current_bucket = int(now_ms) - (int(now_ms) % BAR_INTERVAL_MS)
+            if bars[-1].ts_ms == current_bucket:
+                count -= 1
+        if count <= 0:
+            if self.bar_count:
+                self._reset()
+            return 0
+        if (
+            bars[0].ts_ms != self._first_ts
+            or count < self.bar_count
+            or (self.bar_count and bars[self.bar_count - 1].ts_ms != self._last_ts)
+        ):
+            self._reset()
+            self._first_ts = bars[0].ts_ms
+        for i in range(self.bar_count, count):
+            self._push(bars[i])
+        self.bar_count = count
+        self._last_ts = bars[count - 1].ts_ms
+        return count
+
+    def _push(self, curr: OhlcBar) -> None:
+        prev = self._prev
+        self._prev = curr
+        self._last_close = curr.close
+        if prev is None:
+            return
+        tr = _true_range(prev, curr)
+        self._push_atr(tr)
+        self._push_adx(prev, curr, tr)
+
+    def _push_atr(self, tr: Decimal) -> None:
+        period = self.atr_period
+        if period <= 0:
+            return
+        self._atr_n += 1
+        if self._atr_n < period:
+            self._atr_seed = self._atr_seed + tr
+        elif self._atr_n == period:
+            self._atr_seed = self._atr_seed + tr
+            self._atr = self._atr_seed / Decimal(period)
+        else:
+            self._atr = ((self._atr * Decimal(period - 1)) + tr) / Decimal(period)
+
+    def _push_adx(self, prev: OhlcBar, curr: OhlcBar, tr: Decimal) -> None:
+        period = self.adx_period
+        if period <= 0:
+            return
+        up_move = curr.high - prev.high
+        down_move = prev.low - curr.low
+        pdm = up_move if up_move > 0 and up_move > down_move else Decimal(0)
+        mdm = down_move if down_move > 0 and down_move > up_move else Decimal(0)
+        self._adx_n += 1
+        if self._adx_n <= period:
+            self._tr_s = self._tr_s + tr
+            self._pdm_s = self._pdm_s + pdm
+            self._mdm_s = self._mdm_s + mdm
+            if self._adx_n < period:
+                return
+        else:
+            self._tr_s = self._tr_s - (self._tr_s / Decimal(period)) + tr
+            self._pdm_s = self._pdm_s - (self._pdm_s / Decimal(period)) + pdm
+            self._mdm_s = self._mdm_s - (self._mdm_s / Decimal(period)) + mdm
+        dx = _directional_index(self._tr_s, self._pdm_s, self._mdm_s)
+        self._dx_n += 1
+        if self._dx_n < period:
+            self._dx_seed = self._dx_seed + dx
+        elif self._dx_n == period:
+            self._dx_seed = self._dx_seed + dx
+            self._adx = self._dx_seed / Decimal(period)
+        else:
+            self._adx = ((self._adx * Decimal(period - 1)) + dx) / Decimal(period)
+
+
 def evaluate_market_filter(
     cfg: MarketFilterConfig,
     runtime: MarketFilterRuntime,
     bars: list[OhlcBar],
     now_ms: int,
+) -> MarketFilterDecision:
+    atr_pct: Optional[Decimal] = None
+    adx: Optional[Decimal] = None
+    if cfg.enabled and len(bars) >= required_bar_count(cfg.atr_period, cfg.adx_period):
+        atr_pct = calc_atr_pct(bars, cfg.atr_period)
+        adx = calc_adx(bars, cfg.adx_period)
+    return evaluate_market_filter_values(cfg, runtime, len(bars), atr_pct, adx, now_ms)
+
+
+def evaluate_market_filter_values(
+    cfg: MarketFilterConfig,
+    runtime: MarketFilterRuntime,
+    bar_count: int,
+    atr_pct: Optional[Decimal],
+    adx: Optional[Decimal],
+    now_ms: int,
 ) -> MarketFilterDecision:
     def _decision_from_runtime(reason: str) -> MarketFilterDecision:
         state = runtime.state
@@ -240,11 +368,9 @@ def evaluate_market_filter(
         )
 
     need = required_bar_count(cfg.atr_period, cfg.adx_period)
-    if len(bars) < need:
-        return _decision_from_runtime(f"use_prev_data:{len(bars)}/{need}")
+    if bar_count < need:
+        return _decision_from_runtime(f"use_prev_data:{bar_count}/{need}")
 
-    atr_pct = calc_atr_pct(bars, cfg.atr_period)
-    adx = calc_adx(bars, cfg.adx_period)
     if atr_pct is None or adx is None:
         return _decision_from_runtime("use_prev_indicator")
 
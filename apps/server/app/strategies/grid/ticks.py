@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from decimal import ROUND_CEILING, ROUND_HALF_UP, Decimal
+from typing import AbstractSet, Any, Optional, Sequence
+
+# 价格/数量统一用整数刻度表示：price_ticks = price × 10^price_decimals，size_ticks = size × 10^size_decimals。
+# 只在读取配置、交易所返回值以及提交订单时与 Decimal 互转，挂单规划全程整数运算。
+
+_POW10 = [10**i for i in range(40)]
+
+
+def pow10(n: int) -> int:
+    return _POW10[n] if 0 <= n < len(_POW10) else 10**n
+
+
+def to_ticks(value: Decimal, decimals: int, rounding: str = ROUND_HALF_UP) -> int:
+    return int(value.scaleb(int(decimals)).to_integral_value(rounding=rounding))
+
+
+def from_ticks(ticks: int, decimals: int) -> Decimal:
+    return Decimal(int(ticks)).scaleb(-int(decimals))
+
+
+def _exact_units(value: Decimal) -> tuple[int, int]:
+    """精确拆成 (整数, 小数位数)，value = units / 10^scale。"""
+    exponent = value.as_tuple().exponent
+    if not isinstance(exponent, int):
+        raise ValueError(f"non-finite decimal: {value}")
+    scale = max(0, -exponent)
+    return int(value.scaleb(scale)), scale
+
+
+def _round_half_up_div(numerator: int, denominator: int) -> int:
+    # 四舍五入（远离零），与 Decimal ROUND_HALF_UP 一致
+    q, r = divmod(abs(numerator), denominator)
+    if r * 2 >= denominator:
+        q += 1
+    return q if numerator >= 0 else -q
+
+
+def text_to_ticks(value: Any, decimals: int) -> int:
+    """交易所返回的价格（字符串/Decimal/数字）转为刻度，按 ROUND_HALF_UP 取整。"""
+    if isinstance(value, Decimal):
+        return to_ticks(value, decimals)
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value * pow10(decimals)
+    text = str(value).strip()
+    body = text[1:] if text[:1] in "+-" else text
+    whole, _, frac = body.partition(".")
+    if (whole or frac) and (not whole or (whole.isascii() and whole.isdigit())) and (
+        not frac or (frac.isascii() and frac.isdigit())
+    ):
+        ticks = int(whole or "0") * pow10(decimals)
+        if frac:
+            head = frac[:decimals]
+            ticks += int(head) * pow10(decimals - len(head)) if head else 0
+            if len(frac) > decimals and frac[decimals] >= "5":
+                ticks += 1
+        return -ticks if text.startswith("-") else ticks
+    return to_ticks(Decimal(text), decimals)
+
+
+@dataclass(frozen=True)
+class GridLadder:
+    """一轮的目标挂单价格（刻度，按档位由近到远、去重、只含正价）。"""
+
+    asks: Sequence[int]
+    bids: Sequence[int]
+    center_units: int
+    unit_shift: int
+    ask_set: AbstractSet[int]
+    bid_set: AbstractSet[int]
+
+    @property
+    def ask_boundary(self) -> Optional[int]:
+        return self.asks[-1] if self.asks else None
+
+    @property
+    def bid_boundary(self) -> Optional[int]:
+        return self.bids[-1] if self.bids else None
+
+    def distance(self, ticks: int) -> int:
+        """与中心价的距离（精细单位，仅用于排序比较）。"""
+        return abs(ticks * pow10(self.unit_shift) - self.center_units)
+
+
+def build_ladder(center: Decimal, step: Decimal, levels_up: int, levels_down: int, decimals: int) -> GridLadder:
+    center_units, center_scale = _exact_units(center)
+    step_units, step_scale = _exact_units(step)
+    # center 与 step 换算到同一精细单位后逐档整数累加，再四舍五入到价格刻度
+    scale = max(center_scale, step_scale, int(decimals))
+    center_units *= pow10(scale - center_scale)
+    step_units *= pow10(scale - step_scale)
+    shift = scale - int(decimals)
+    divisor = pow10(shift)
+
+    def _side(levels: int, sign: int) -> list[int]:
+        result: list[int] = []
+        seen: set[int] = set()
+        units = center_units
+        for _ in range(levels):
+            units += sign * step_units
+            ticks = _round_half_up_div(units, divisor) if shift else units
+            if ticks <= 0 or ticks in seen:
+                continue
+            seen.add(ticks)
+            result.append(ticks)
+        return result
+
+    asks = _side(max(0, int(levels_up)), 1)
+    bids = _side(max(0, int(levels_down)), -1)
+    return GridLadder(
+        asks=asks,
+        bids=bids,
+        center_units=center_units,
+        unit_shift=shift,
+        ask_set=set(asks),
+        bid_set=set(bids),
+    )
+
+
+@dataclass(frozen=True)
+class SizeRule:
+    """下单数量规则（刻度）：固定数量或按报价金额折算，附带最小数量/金额门槛。"""
+
+    mode: str
+    value_units: int
+    value_scale: int
+    price_decimals: int
+    size_decimals: int
+    min_base_ticks: int
+    min_quote_units: int
+
+    @classmethod
+    def build(
+        cls,
+        mode: str,
+        value: Decimal,
+        price_decimals: int,
+        size_decimals: int,
+        min_base_amount: Decimal,
+        min_quote_amount: Decimal,
+    ) -> "SizeRule":
+        value_units, value_scale = _exact_units(value)
+        return cls(
+            mode=mode,
+            value_units=value_units,
+            value_scale=value_scale,
+            price_decimals=int(price_decimals),
+            size_decimals=int(size_decimals),
+            # 整数刻度 < 门槛 等价于 < 向上取整后的门槛
+            min_base_ticks=to_ticks(min_base_amount, size_decimals, ROUND_CEILING),
+            min_quote_units=to_ticks(min_quote_amount, int(price_decimals) + int(size_decimals), ROUND_CEILING),
+        )
+
+    def size_ticks(self, price_ticks: int) -> int:
+        """数量刻度，向零取整（ROUND_DOWN）。"""
+        if self.mode == "base":
+            return _truncate_div(self.value_units * pow10(self.size_decimals), pow10(self.value_scale))
+        if price_ticks <= 0:
+            return 0
+        numerator = self.value_units * pow10(self.size_decimals + self.price_decimals)
+        return _truncate_div(numerator, price_ticks * pow10(self.value_scale))
+
+    def below_min_base(self, size_ticks: int) -> bool:
+        return size_ticks < self.min_base_ticks
+
+    def below_min_quote(self, size_ticks: int, price_ticks: int) -> bool:
+        return size_ticks * price_ticks < self.min_quote_units
+
+
+def _truncate_div(numerator: int, denominator: int) -> int:
+    q = abs(numerator) // denominator
+    return q if numerator >= 0 else -q
@@ -91,7 +91,9 @@ let authState = { setup_required: true, authenticated: false, unlocked: false };
 let logSource = null;
 let currentStrategies = [];
 let lastBots = {};
-let runtimeTimer = null;
+let runtimeSource = null;
+let runtimeSourceExchange = "";
+let runtimeState = {};
 let accountResolveTimer = null;
 let accountResolving = false;
 let logAutoScroll = true;
@@ -601,10 +603,11 @@ function redirectToLogin() {
   }
 }
 
-function appendLog(line) {
+function appendLog(text) {
   const maxLines = 400;
   const current = els.logs.textContent.split("\n").filter((x) => x.length);
-  current.push(line);
+  // 服务端按批推送，一个事件可能包含多行
+  current.push(...String(text).split("\n").filter((x) => x.length));
   const sliced = current.slice(-maxLines);
   els.logs.textContent = sliced.join("\n") + "\n";
   if (logAutoScroll) {
@@ -674,28 +677,19 @@ async function refreshAuth() {
     setAuthCardInfo(s);
     if (authState.setup_required) {
       showApp(false);
-      if (runtimeTimer) {
-        clearInterval(runtimeTimer);
-        runtimeTimer = null;
-      }
+      stopRuntimeStream();
       redirectToLogin();
       return;
     }
     if (!authState.authenticated) {
       showApp(false);
-      if (runtimeTimer) {
-        clearInterval(runtimeTimer);
-        runtimeTimer = null;
-      }
+      stopRuntimeStream();
       redirectToLogin();
       return;
     }
     if (!authState.unlocked) {
       showApp(false);
-      if (runtimeTimer) {
-        clearInterval(runtimeTimer);
-        runtimeTimer = null;
-      }
+      stopRuntimeStream();
       redirectToLogin();
       return;
     }
@@ -705,7 +699,7 @@ async function refreshAuth() {
     await refreshBots();
     await refreshRuntimeStatus();
     await refreshHistory();
-    startRuntimeLoop();
+    startRuntimeStream();
   } catch (e) {
     showApp(false);
   }
@@ -719,10 +713,7 @@ async function logout() {
     logSource.close();
     logSource = null;
   }
-  if (runtimeTimer) {
-    clearInterval(runtimeTimer);
-    runtimeTimer = null;
-  }
+  stopRuntimeStream();
   await refreshAuth();
 }
 
@@ -732,10 +723,7 @@ async function lock() {
     logSource.close();
     logSource = null;
   }
-  if (runtimeTimer) {
-    clearInterval(runtimeTimer);
-    runtimeTimer = null;
-  }
+  stopRuntimeStream();
   await refreshAuth();
 }
 
@@ -881,7 +869,7 @@ async function saveStrategies() {
 
   const resp = await apiFetch("/api/config", { method: "POST", body: { runtime, strategies } });
   fillConfig(resp.config || {});
-  startRuntimeLoop();
+  startRuntimeStream();
 }
 
 async function resolveAccountIndex() {
@@ -1139,19 +1127,45 @@ async function refreshHistory() {
   renderHistory(resp.items || []);
 }
 
-function startRuntimeLoop() {
-  if (runtimeTimer) {
-    clearInterval(runtimeTimer);
-    runtimeTimer = null;
-  }
-  const interval = Math.max(200, Math.floor(numOrZero(els.runtimeStatusInterval ? els.runtimeStatusInterval.value : 10000)));
-  runtimeTimer = setInterval(async () => {
-    if (authState.authenticated && authState.unlocked) {
-      try {
-        await refreshRuntimeStatus();
-      } catch {}
+function applyMergePatch(target, patch) {
+  if (patch === null || typeof patch !== "object" || Array.isArray(patch)) return patch;
+  const out = target && typeof target === "object" && !Array.isArray(target) ? { ...target } : {};
+  Object.keys(patch).forEach((key) => {
+    if (patch[key] === null) {
+      delete out[key];
+    } else {
+      out[key] = applyMergePatch(out[key], patch[key]);
     }
-  }, interval);
+  });
+  return out;
+}
+
+function stopRuntimeStream() {
+  if (runtimeSource) {
+    runtimeSource.close();
+    runtimeSource = null;
+  }
+}
+
+function startRuntimeStream() {
+  // 服务端按刷新间隔统一计算并推送，首帧为完整快照，之后为增量
+  const exchange = currentExchange();
+  if (runtimeSource && runtimeSourceExchange === exchange) return;
+  stopRuntimeStream();
+  runtimeSourceExchange = exchange;
+  runtimeSource = new EventSource(`/api/runtime/stream?exchange=${encodeURIComponent(exchange)}`);
+  runtimeSource.addEventListener("snapshot", (ev) => {
+    try {
+      runtimeState = JSON.parse(ev.data) || {};
+      renderRuntimeStatus(runtimeState);
+    } catch {}
+  });
+  runtimeSource.addEventListener("diff", (ev) => {
+    try {
+      runtimeState = applyMergePatch(runtimeState, JSON.parse(ev.data)) || {};
+      renderRuntimeStatus(runtimeState);
+    } catch {}
+  });
 }
 
 function renderBots(bots) {
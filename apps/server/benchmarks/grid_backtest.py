@@ -0,0 +1,61 @@
+"""向量化回测基准：同一天行情上扫描网格间距 × 档位数，统计每组参数的耗时。
+
+在 apps/server 目录下运行（需要 requirements-backtest.txt 中的 numpy）：
+  python -m benchmarks.grid_backtest [--hours 24] [--steps 1,2,5,10] [--levels 5,10,20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import time
+from decimal import Decimal
+
+from app.exchanges.types import MarketMeta
+from app.services.backtest import BacktestParams, MarketSeries, sweep
+from benchmarks.replay_day import synthetic_quotes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--steps", default="1,2,5,10")
+    parser.add_argument("--levels", default="5,10,20")
+    parser.add_argument("--size", default="0.001")
+    args = parser.parse_args()
+
+    meta = MarketMeta(1, "BTC", 4, 1, Decimal("0.0001"), Decimal("1"))
+    # 默认 500ms 一轮：按轮次取样，与策略循环看到的盘口一致
+    quotes = synthetic_quotes(args.hours)[::2]
+    started = time.perf_counter()
+    series = MarketSeries.from_quotes(quotes, meta.price_decimals)
+    load_s = time.perf_counter() - started
+
+    grid = [
+        BacktestParams.from_strategy(
+            {
+                "grid_step": step,
+                "levels_up": int(levels),
+                "levels_down": int(levels),
+                "order_size_mode": "base",
+                "order_size_value": args.size,
+            }
+        )
+        for step, levels in itertools.product(args.steps.split(","), args.levels.split(","))
+    ]
+    started = time.perf_counter()
+    results = sweep(series, grid, meta)
+    wall_s = time.perf_counter() - started
+
+    print(f"ticks={len(series)} combos={len(results)} load={load_s:.2f}s")
+    for result in results:
+        p = result.params
+        print(
+            f"step={p.grid_step:>4} levels={p.levels_up:>3} events={result.events:>7} trades={result.trades:>6} "
+            f"pnl={result.pnl:10.2f} dd={result.max_drawdown:8.2f}"
+        )
+    print(f"sweep    {wall_s:9.2f} s ({wall_s / max(1, len(results)) * 1000:.0f} ms/combo)")
+
+
+if __name__ == "__main__":
+    main()
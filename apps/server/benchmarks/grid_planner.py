@@ -0,0 +1,129 @@
+"""挂单规划基准：对比 Decimal 逐档计算、整数刻度规划与缓存档位（稳态）的单轮 CPU 耗时。
+
+在 apps/server 目录下运行：python -m benchmarks.grid_planner [--levels 200] [--rounds 500]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+from typing import Any, Callable, Dict
+
+from app.services.bot_manager import _order_price_ticks
+from app.strategies.grid.ladder import LadderCache, OrderIndex
+from app.strategies.grid.ticks import GridLadder, SizeRule, build_ladder
+
+PRICE_DECIMALS = 2
+SIZE_DECIMALS = 4
+MIN_BASE = Decimal("0.001")
+MIN_QUOTE = Decimal("10")
+
+
+def _q(value: Decimal, decimals: int, rounding) -> Decimal:
+    return value.quantize(Decimal(1) / (Decimal(10) ** decimals), rounding=rounding)
+
+
+def _orders(center: Decimal, step: Decimal, levels: int) -> list[Dict[str, Any]]:
+    # 模拟交易所返回：价格为字符串，一半档位已挂单
+    orders: list[Dict[str, Any]] = []
+    for i in range(1, levels + 1, 2):
+        orders.append({"price": str(center + step * i), "is_ask": True})
+        orders.append({"price": str(center - step * i), "is_ask": False})
+    return orders
+
+
+def plan_decimal(orders: list[Dict[str, Any]], center: Decimal, step: Decimal, levels: int, size: Decimal) -> int:
+    asks: Dict[Decimal, list[Any]] = {}
+    bids: Dict[Decimal, list[Any]] = {}
+    for o in orders:
+        price = _q(Decimal(str(o["price"])), PRICE_DECIMALS, ROUND_HALF_UP)
+        (asks if o["is_ask"] else bids).setdefault(price, []).append(o)
+    desired_asks: Dict[Decimal, None] = {}
+    desired_bids: Dict[Decimal, None] = {}
+    for i in range(1, levels + 1):
+        p = _q(center + step * i, PRICE_DECIMALS, ROUND_HALF_UP)
+        if p > 0:
+            desired_asks.setdefault(p)
+        p = _q(center - step * i, PRICE_DECIMALS, ROUND_HALF_UP)
+        if p > 0:
+            desired_bids.setdefault(p)
+    missing = [("ask", p) for p in desired_asks if p not in asks] + [("bid", p) for p in desired_bids if p not in bids]
+    missing.sort(key=lambda item: (abs(item[1] - center), item[0]))
+    created = 0
+    for _, price in missing:
+        qty = _q(size / price, SIZE_DECIMALS, ROUND_DOWN)
+        if qty <= 0 or qty < MIN_BASE or qty * price < MIN_QUOTE:
+            continue
+        _ = int(price * (Decimal(10) ** PRICE_DECIMALS)), int(qty * (Decimal(10) ** SIZE_DECIMALS))
+        created += 1
+    return created
+
+
+def plan_ticks(orders: list[Dict[str, Any]], center: Decimal, step: Decimal, levels: int, size: Decimal) -> int:
+    asks: Dict[int, list[Any]] = {}
+    bids: Dict[int, list[Any]] = {}
+    for o in orders:
+        (asks if o["is_ask"] else bids).setdefault(_order_price_ticks(o, PRICE_DECIMALS), []).append(o)
+    return _create_count(asks, bids, build_ladder(center, step, levels, levels, PRICE_DECIMALS), size)
+
+
+_LADDER = LadderCache()
+_INDEX: OrderIndex[tuple[bool, int]] = OrderIndex()
+
+
+def plan_cached(orders: list[Dict[str, Any]], center: Decimal, step: Decimal, levels: int, size: Decimal) -> int:
+    # 稳态：挂单对象与中心价不变，只剩分组与集合查找
+    asks: Dict[int, list[Any]] = {}
+    bids: Dict[int, list[Any]] = {}
+    parsed = _INDEX.parse(orders, PRICE_DECIMALS, lambda o: (bool(o["is_ask"]), _order_price_ticks(o, PRICE_DECIMALS)))
+    for o, (is_ask, price_ticks) in parsed:
+        (asks if is_ask else bids).setdefault(price_ticks, []).append(o)
+    return _create_count(asks, bids, _LADDER.update(center, step, levels, levels, PRICE_DECIMALS), size)
+
+
+def _create_count(asks: Dict[int, list[Any]], bids: Dict[int, list[Any]], ladder: GridLadder, size: Decimal) -> int:
+    missing = [(ladder.distance(p), "ask", p) for p in ladder.asks if p not in asks]
+    missing += [(ladder.distance(p), "bid", p) for p in ladder.bids if p not in bids]
+    missing.sort()
+    rule = SizeRule.build("quote", size, PRICE_DECIMALS, SIZE_DECIMALS, MIN_BASE, MIN_QUOTE)
+    created = 0
+    for _, _, price_ticks in missing:
+        size_ticks = rule.size_ticks(price_ticks)
+        if size_ticks <= 0 or rule.below_min_base(size_ticks) or rule.below_min_quote(size_ticks, price_ticks):
+            continue
+        created += 1
+    return created
+
+
+def _bench(fn: Callable[..., int], rounds: int, *args: Any) -> tuple[float, int]:
+    result = fn(*args)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(*args)
+    return (time.perf_counter() - started) / rounds, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=500)
+    args = parser.parse_args()
+
+    center = Decimal("64123.45")
+    step = Decimal("2.50")
+    size = Decimal("500")
+    orders = _orders(center, step, args.levels)
+    dec_s, dec_created = _bench(plan_decimal, args.rounds, orders, center, step, args.levels, size)
+    tick_s, tick_created = _bench(plan_ticks, args.rounds, orders, center, step, args.levels, size)
+    cached_s, cached_created = _bench(plan_cached, args.rounds, orders, center, step, args.levels, size)
+    assert dec_created == tick_created == cached_created, (dec_created, tick_created, cached_created)
+    print(f"levels={args.levels} existing={len(orders)} creates={tick_created}")
+    print(f"decimal  {dec_s * 1e6:9.1f} us/tick")
+    print(f"ticks    {tick_s * 1e6:9.1f} us/tick")
+    print(f"cached   {cached_s * 1e6:9.1f} us/tick")
+    print(f"speedup  {dec_s / tick_s:9.2f}x ticks, {dec_s / cached_s:.2f}x cached")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""多进程参数扫描基准：多个交易对 × 网格间距 × 档位数，行情经 mmap 共享给各进程，结果按摘要缓存。
+
+在 apps/server 目录下运行（需要 requirements-backtest.txt 中的 numpy）：
+  python -m benchmarks.grid_sweep [--symbols 4] [--hours 24] [--workers 8] [--root data/sweep]
+同一 root 再跑一次只计算新增的参数组；排名写到 <root>/report.csv。
+"""
+
+from __future__ import annotations
+
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from decimal import Decimal
+from pathlib import Path
+
+from app.exchanges.types import MarketMeta
+from app.services.backtest import BacktestParams, MarketSeries
+from app.services.sweep import SweepJob, run_sweep
+from benchmarks.replay_day import synthetic_quotes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--symbols", type=int, default=4)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--steps", default="1,2,3,5,8,10")
+    parser.add_argument("--levels", default="5,10,20")
+    parser.add_argument("--sizes", default="0.001,0.002")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--root", type=Path, default=None)
+    args = parser.parse_args()
+
+    meta = MarketMeta(1, "BTC", 4, 1, Decimal("0.0001"), Decimal("1"))
+    grid = [
+        BacktestParams.from_strategy(
+            {
+                "grid_step": step,
+                "levels_up": int(levels),
+                "levels_down": int(levels),
+                "order_size_mode": "base",
+                "order_size_value": size,
+            }
+        )
+        for step, levels, size in itertools.product(
+            args.steps.split(","), args.levels.split(","), args.sizes.split(",")
+        )
+    ]
+    jobs = [
+        SweepJob(
+            f"SYM{i}",
+            MarketSeries.from_quotes(synthetic_quotes(args.hours, seed=7 + i)[::2], meta.price_decimals),
+            meta,
+            grid,
+        )
+        for i in range(args.symbols)
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.root or Path(tmp)
+        for label in ("cold", "warm"):
+            started = time.perf_counter()
+            rows = run_sweep(jobs, root, workers=args.workers, report_path=root / "report.csv")
+            wall_s = time.perf_counter() - started
+            computed = sum(not row.cached for row in rows)
+            print(f"{label:<5} combos={len(rows)} computed={computed} workers={args.workers} wall={wall_s:.2f}s")
+        best = rows[0]
+        print(
+            f"best   symbol={best.symbol} step={best.result.params.grid_step} levels={best.result.params.levels_up} "
+            f"pnl={best.result.pnl:.2f} dd={best.result.max_drawdown:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""回放基准：用生产策略循环在虚拟时钟上跑一整天的行情，统计墙钟耗时。
+
+在 apps/server 目录下运行：
+  python -m benchmarks.replay_day [--hours 24] [--tick-mode interval]
+  python -m benchmarks.replay_day --tape data/tape/lighter/1   # 回放录制的磁带分段
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import tempfile
+from decimal import Decimal
+from pathlib import Path
+
+from app.exchanges.types import MarketMeta
+from app.services.replay import Quote, load_quotes, run_replay
+
+START_MS = 1_700_000_000_000
+QUOTE_INTERVAL_MS = 200
+
+
+def synthetic_quotes(hours: float, seed: int = 7) -> list[Quote]:
+    # 随机游走的 BTC 盘口，价差 0.1
+    rng = random.Random(seed)
+    mid = 640000
+    quotes: list[Quote] = []
+    for i in range(int(hours * 3_600_000 / QUOTE_INTERVAL_MS)):
+        mid += rng.choice((-3, -1, 0, 0, 1, 3))
+        quotes.append(Quote(START_MS + i * QUOTE_INTERVAL_MS, Decimal(mid).scaleb(-1), Decimal(mid + 1).scaleb(-1)))
+    return quotes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--tape", type=Path, default=None)
+    parser.add_argument("--tick-mode", default="interval", choices=["interval", "event"])
+    parser.add_argument("--levels", type=int, default=20)
+    parser.add_argument("--step", default="5")
+    parser.add_argument("--size", default="0.001")
+    args = parser.parse_args()
+
+    if args.tape is not None:
+        paths = sorted(args.tape.glob("*.tape")) if args.tape.is_dir() else [args.tape]
+        quotes = load_quotes(paths)
+    else:
+        quotes = synthetic_quotes(args.hours)
+    meta = MarketMeta(1, "BTC", 4, 1, Decimal("0.0001"), Decimal("1"))
+    strategy = {
+        "grid_step": args.step,
+        "levels_up": args.levels,
+        "levels_down": args.levels,
+        "order_size_mode": "base",
+        "order_size_value": args.size,
+    }
+    runtime = {"tick_mode": args.tick_mode, "tick_min_interval_ms": 0, "tick_debounce_ms": 0}
+    with tempfile.TemporaryDirectory() as workdir:
+        result = asyncio.run(run_replay(quotes, meta, strategy, Path(workdir), runtime=runtime, symbol="BTC"))
+    print(f"quotes={result.quotes} ticks={result.ticks} trades={result.trades} volume={result.volume:.2f}")
+    print(f"virtual  {result.virtual_s / 3600:9.2f} h")
+    print(f"wall     {result.wall_s:9.2f} s ({result.wall_s / max(1, result.ticks) * 1e6:.1f} us/tick)")
+    print(f"speedup  {result.virtual_s / max(result.wall_s, 1e-9):9.0f}x real time")
+
+
+if __name__ == "__main__":
+    main()
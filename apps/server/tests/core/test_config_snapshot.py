@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from app.core.config_store import ConfigStore
+
+
+def test_snapshot_shared_until_write(tmp_path) -> None:
+    store = ConfigStore(tmp_path / "config.json")
+    first = store.snapshot()
+    assert store.snapshot() is first
+    assert first["runtime"]["dry_run"] is True
+
+    cfg = store.read()
+    cfg["runtime"]["dry_run"] = False
+    store.write(cfg)
+
+    second = store.snapshot()
+    assert second is not first
+    assert second.version > first.version
+    assert second["runtime"]["dry_run"] is False
+    assert first["runtime"]["dry_run"] is True
+
+
+def test_snapshot_is_read_only(tmp_path) -> None:
+    store = ConfigStore(tmp_path / "config.json")
+    snap = store.snapshot()
+    with pytest.raises(TypeError):
+        snap["runtime"]["dry_run"] = False  # type: ignore[index]
+
+
+def test_snapshot_reloads_on_external_change(tmp_path, monkeypatch) -> None:
+    path = tmp_path / "config.json"
+    store = ConfigStore(path)
+    first = store.snapshot()
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["runtime"]["simulate_fill"] = True
+    path.write_text(json.dumps(data), encoding="utf-8")
+    monkeypatch.setattr("app.core.config_store.SNAPSHOT_STAT_INTERVAL_S", 0.0)
+
+    second = store.snapshot()
+    assert second.version > first.version
+    assert second["runtime"]["simulate_fill"] is True
+
+
+def test_snapshot_derive_cached_per_version(tmp_path) -> None:
+    store = ConfigStore(tmp_path / "config.json")
+    calls: list[int] = []
+
+    def _build(snap) -> int:
+        calls.append(snap.version)
+        return len(snap["strategies"])
+
+    snap = store.snapshot()
+    assert snap.derive("count", _build) == 0
+    assert snap.derive("count", _build) == 0
+    assert calls == [snap.version]
+
+    store.update({"strategies": {"ETH": {"grid_step": "1"}}})
+    assert store.snapshot().derive("count", _build) == 1
+    assert len(calls) == 2
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import asyncio
+
+from app.core.logbus import LogBus
+
+
+def _data_lines(frame: str) -> list[str]:
+    return [line[len("data: "):] for line in frame.strip().split("\n")]
+
+
+def test_publish_fans_out_to_every_subscriber() -> None:
+    async def scenario() -> None:
+        bus = LogBus()
+        first = bus.subscribe()
+        second = bus.subscribe()
+        bus.publish("a")
+        bus.publish("b")
+        lines_a, dropped_a = first.drain()
+        lines_b, dropped_b = second.drain()
+        assert [line.split("] ", 1)[1] for line in lines_a] == ["a", "b"]
+        assert lines_a == lines_b
+        assert dropped_a == dropped_b == 0
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_drops_oldest_and_counts() -> None:
+    async def scenario() -> None:
+        bus = LogBus(subscriber_buffer=3)
+        sub = bus.subscribe()
+        for idx in range(5):
+            bus.publish(f"m{idx}")
+        lines, dropped = sub.drain()
+        assert [line.split("] ", 1)[1] for line in lines] == ["m2", "m3", "m4"]
+        assert dropped == 2
+        assert sub.drain() == ([], 0)
+        # 最近日志环不受订阅者缓冲影响
+        assert len(bus.recent()) == 5
+
+    asyncio.run(scenario())
+
+
+def test_stream_batches_and_unsubscribes_on_close() -> None:
+    async def scenario() -> None:
+        bus = LogBus(subscriber_buffer=2, batch_interval_ms=0)
+        bus.publish("old")
+        stream = bus.stream()
+        first = await stream.__anext__()
+        assert bus.subscriber_count == 1
+        assert [line.split("] ", 1)[1] for line in _data_lines(first)] == ["old"]
+
+        for idx in range(4):
+            bus.publish(f"new{idx}")
+        frame = await stream.__anext__()
+        lines = [line.split("] ", 1)[1] for line in _data_lines(frame)]
+        assert lines == ["logbus.dropped count=2", "new2", "new3"]
+
+        await stream.aclose()
+        assert bus.subscriber_count == 0
+
+    asyncio.run(scenario())
+
+
+def test_structured_event_renders_lazily() -> None:
+    bus = LogBus()
+    bus.event("grid.reconcile", symbol="BTC", cancel=2, err=ValueError("bad"))
+    record = bus._items[-1]
+    assert record._text is None
+    assert bus.recent()[-1].endswith("grid.reconcile symbol=BTC cancel=2 err=ValueError:bad")
+
+
+def test_level_filter_skips_debug_events() -> None:
+    bus = LogBus()
+    bus.event("lighter.latency", name="order", ms=12)
+    assert bus.recent() == []
+    assert not bus.enabled("lighter.latency")
+
+    bus.apply_config({"log_level": "debug"})
+    assert bus.enabled("lighter.latency")
+    bus.event("lighter.latency", name="order", ms=18)
+    assert bus.recent()[-1].endswith("lighter.latency name=order ms=18")
+
+
+def test_sampling_and_rate_limit() -> None:
+    bus = LogBus()
+    bus.configure("sim.create", sample_every=3)
+    for idx in range(7):
+        bus.event("sim.create", id=idx)
+    assert [line.rsplit("=", 1)[1] for line in bus.recent()] == ["0", "3", "6"]
+
+    bus.configure("grid.reconcile", max_per_s=2)
+    for idx in range(5):
+        bus.event("grid.reconcile", n=idx)
+    assert len([line for line in bus.recent() if "grid.reconcile" in line]) == 2
+    gate = bus._gates["grid.reconcile"]
+    assert gate.suppressed == 3
+    gate.window_start -= 1.0
+    bus.event("grid.reconcile", n=9)
+    assert bus.recent()[-1].endswith("grid.reconcile n=9 suppressed=3")
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import pytest
+
+from app.core.metrics import MetricsRegistry
+
+
+def test_counter_and_gauge_render_with_labels() -> None:
+    registry = MetricsRegistry()
+    orders = registry.counter("grid_orders_total", "orders", ("symbol", "action"))
+    age = registry.gauge("grid_quote_age_seconds", "age", ("symbol",))
+    orders.inc("BTC", "create")
+    orders.inc("BTC", "create", amount=2)
+    age.set("BTC", value=0.25)
+
+    text = registry.render()
+    assert "# TYPE grid_orders_total counter" in text
+    assert 'grid_orders_total{symbol="BTC",action="create"} 3' in text
+    assert 'grid_quote_age_seconds{symbol="BTC"} 0.25' in text
+
+    age.remove("BTC")
+    assert "grid_quote_age_seconds{" not in registry.render()
+
+
+def test_histogram_buckets_are_cumulative() -> None:
+    registry = MetricsRegistry()
+    hist = registry.histogram("grid_tick_duration_seconds", "tick", ("symbol",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe("ETH", value=value)
+
+    text = registry.render()
+    assert 'grid_tick_duration_seconds_bucket{symbol="ETH",le="0.1"} 2' in text
+    assert 'grid_tick_duration_seconds_bucket{symbol="ETH",le="1"} 3' in text
+    assert 'grid_tick_duration_seconds_bucket{symbol="ETH",le="+Inf"} 4' in text
+    assert 'grid_tick_duration_seconds_count{symbol="ETH"} 4' in text
+    assert 'grid_tick_duration_seconds_sum{symbol="ETH"} 3.65' in text
+    assert hist.count("ETH") == 4
+
+
+def test_registry_reuses_and_validates_metrics() -> None:
+    registry = MetricsRegistry()
+    first = registry.counter("x_total", "x", ("a",))
+    assert registry.counter("x_total", "x", ("a",)) is first
+    with pytest.raises(ValueError):
+        registry.gauge("x_total", "x", ("a",))
+    with pytest.raises(ValueError):
+        first.inc()
+
+
+def test_collectors_run_at_scrape_time() -> None:
+    registry = MetricsRegistry()
+    gauge = registry.gauge("grid_waiting", "waiting")
+    calls: list[int] = []
+
+    def collect() -> None:
+        calls.append(1)
+        gauge.set(value=len(calls))
+
+    registry.add_collector(collect)
+    assert "grid_waiting 1" in registry.render()
+    assert "grid_waiting 2" in registry.render()
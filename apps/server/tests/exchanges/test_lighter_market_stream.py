@@ -0,0 +1,91 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from decimal import Decimal
+
+from app.exchanges.lighter.market_ws import LighterMarketData
+
+
+class _FakeWs:
+    def __init__(self) -> None:
+        self.sent: list[dict] = []
+
+    async def send(self, text: str) -> None:
+        self.sent.append(json.loads(text))
+
+
+def _book(bids, asks) -> dict:
+    return {
+        "bids": [{"price": p, "size": s} for p, s in bids],
+        "asks": [{"price": p, "size": s} for p, s in asks],
+    }
+
+
+def test_one_connection_resubscribes_all_markets_on_connect() -> None:
+    async def _run() -> list[dict]:
+        data = LighterMarketData("mainnet")
+        stream = data.stream
+        stream._ensure_task = lambda: None
+        await data.subscribe(1)
+        await data.subscribe(2)
+        await data.subscribe(1)
+        ws = _FakeWs()
+        await stream._handle_raw(ws, json.dumps({"type": "connected"}))
+        await stream._handle_raw(ws, json.dumps({"type": "ping"}))
+        return ws.sent
+
+    sent = asyncio.run(_run())
+    assert sent == [
+        {"type": "subscribe", "channel": "order_book/1"},
+        {"type": "subscribe", "channel": "order_book/2"},
+        {"type": "pong"},
+    ]
+
+
+def test_snapshot_and_delta_update_best_prices_per_market() -> None:
+    data = LighterMarketData("mainnet")
+    data._on_message(
+        {
+            "type": "subscribed/order_book",
+            "channel": "order_book:1",
+            "order_book": _book([("100.0", "1"), ("99.5", "2")], [("100.5", "1")]),
+        }
+    )
+    data._on_message(
+        {
+            "type": "subscribed/order_book",
+            "channel": "order_book:2",
+            "order_book": _book([("10", "1")], [("11", "1")]),
+        }
+    )
+    assert data._prices[1] == (Decimal("100.0"), Decimal("100.5"))
+    version = data.book_version(1)
+
+    data._on_message(
+        {
+            "type": "update/order_book",
+            "channel": "order_book:1",
+            "order_book": _book([("100.0", "0")], [("100.2", "3")]),
+        }
+    )
+    assert data._prices[1] == (Decimal("99.5"), Decimal("100.2"))
+    assert data.book_version(1) == version + 1
+    assert data._prices[2] == (Decimal("10"), Decimal("11"))
+
+
+def test_unsubscribe_drops_market_state() -> None:
+    async def _run() -> tuple[set[str], bool]:
+        data = LighterMarketData("mainnet")
+        data.stream._ensure_task = lambda: None
+        await data.subscribe(1)
+        await data.subscribe(2)
+        data._on_message(
+            {"type": "subscribed/order_book", "channel": "order_book:1", "order_book": _book([("1", "1")], [])}
+        )
+        await data.unsubscribe(1)
+        return data.stream.channels, 1 in data._prices
+
+    channels, has_price = asyncio.run(_run())
+    assert channels == {"order_book/2"}
+    assert has_price is False
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from app.exchanges.batching import cancel_orders_concurrently, run_bounded
+from app.exchanges.lighter.trader import LighterTrader, _order_keys
+from app.exchanges.order_mirror import OrderMirror
+from app.exchanges.rate_limit import TokenBucket
+from app.exchanges.types import LimitOrderRequest
+
+
+def test_run_bounded_limits_in_flight_and_reports_errors() -> None:
+    in_flight = 0
+    peak = 0
+
+    async def _call(key: int) -> None:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if key == 3:
+            raise RuntimeError("boom")
+
+    results = asyncio.run(run_bounded([1, 2, 3, 4, 5], _call, limit=2))
+    assert [r.key for r in results] == [1, 2, 3, 4, 5]
+    assert [r.ok for r in results] == [True, True, False, True, True]
+    assert str(results[2].error) == "boom"
+    assert peak == 2
+
+
+def test_cancel_orders_concurrently_uses_single_cancel() -> None:
+    calls: list[tuple[str, int]] = []
+
+    class _Trader:
+        async def cancel_order(self, market_id, order_index) -> None:
+            calls.append((market_id, order_index))
+
+    results = asyncio.run(cancel_orders_concurrently(_Trader(), "ETH-USD-PERP", [7, 8]))
+    assert all(r.ok for r in results)
+    assert sorted(calls) == [("ETH-USD-PERP", 7), ("ETH-USD-PERP", 8)]
+
+
+class _FakeNonceManager:
+    def __init__(self) -> None:
+        self.nonce = 10
+        self.refreshed = 0
+
+    async def async_next_nonce(self, api_key: int):
+        self.nonce += 1
+        return api_key, self.nonce
+
+    async def async_hard_refresh_nonce(self, api_key: int) -> None:
+        self.refreshed += 1
+
+
+class _FakeSigner:
+    ORDER_TIME_IN_FORCE_POST_ONLY = 2
+    ORDER_TIME_IN_FORCE_GOOD_TILL_TIME = 1
+    ORDER_TYPE_LIMIT = 0
+
+    def __init__(self, code: int = 200) -> None:
+        self.nonce_manager = _FakeNonceManager()
+        self.code = code
+        self.batches: list[tuple[list[int], list[str]]] = []
+
+    def sign_create_order(self, **kwargs):
+        return 14, f'{{"cid": {kwargs["client_order_index"]}, "nonce": {kwargs["nonce"]}}}', "hash", None
+
+    def sign_cancel_order(self, **kwargs):
+        return 15, f'{{"order": {kwargs["order_index"]}, "nonce": {kwargs["nonce"]}}}', "hash", None
+
+    async def send_tx_batch(self, tx_types, tx_infos):
+        self.batches.append((list(tx_types), list(tx_infos)))
+        return SimpleNamespace(code=self.code, message="rejected" if self.code != 200 else None)
+
+
+def _make_trader(signer: _FakeSigner) -> LighterTrader:
+    trader = object.__new__(LighterTrader)
+    trader._signer = signer
+    trader._nonce_lock = asyncio.Lock()
+    trader._limiter = TokenBucket(rate_per_s=1000.0, burst=1000.0)
+    trader._retry_limit = 1
+    trader._retry_base_s = 0.0
+    trader.api_key_index = 3
+    trader._logbus = None
+    trader._orders = OrderMirror(_order_keys)
+    return trader
+
+
+def _orders(count: int) -> list[LimitOrderRequest]:
+    return [
+        LimitOrderRequest(client_order_index=100 + i, base_amount=10, price=2000 + i, is_ask=bool(i % 2))
+        for i in range(count)
+    ]
+
+
+def test_lighter_create_limit_orders_single_batch_with_sequential_nonces() -> None:
+    signer = _FakeSigner()
+    trader = _make_trader(signer)
+    results = asyncio.run(trader.create_limit_orders(1, _orders(3)))
+    assert [r.key for r in results] == [100, 101, 102]
+    assert all(r.ok for r in results)
+    assert len(signer.batches) == 1
+    tx_types, tx_infos = signer.batches[0]
+    assert tx_types == [14, 14, 14]
+    assert [info.split('"nonce": ')[1].rstrip("}") for info in tx_infos] == ["11", "12", "13"]
+
+
+def test_lighter_cancel_orders_batch_failure_marks_all_and_resyncs_nonce() -> None:
+    signer = _FakeSigner(code=21000)
+    trader = _make_trader(signer)
+    results = asyncio.run(trader.cancel_orders(1, [5, 6]))
+    assert [r.key for r in results] == [5, 6]
+    assert not any(r.ok for r in results)
+    assert "code=21000" in str(results[0].error)
+    assert signer.nonce_manager.refreshed == 1
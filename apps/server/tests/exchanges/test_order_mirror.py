@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import time
+
+from app.exchanges import order_mirror
+from app.exchanges.lighter.trader import LighterTrader, _order_keys
+from app.exchanges.order_mirror import ORDER_STREAM_STALE_S, OrderMirror
+from app.exchanges.paradex.trader import ParadexTrader
+from app.exchanges.paradex.trader import _order_keys as paradex_order_keys
+from app.exchanges.types import LimitOrderRequest, OrderResult
+
+
+def _order(oid: int, cid: int, status: str = "open") -> dict:
+    return {"order_index": oid, "client_order_index": cid, "price": "2000", "is_ask": False, "status": status}
+
+
+def _ids(orders) -> list:
+    return sorted(o.get("order_index") for o in orders)
+
+
+def test_cached_requires_live_stream_and_rest_sync() -> None:
+    mirror = OrderMirror(_order_keys)
+    mirror.reset(1, [_order(10, 100)])
+    assert mirror.cached(1) is None
+
+    mirror.set_live(True)
+    assert mirror.cached(1) is None
+    mirror.reset(1, [_order(10, 100)])
+    assert _ids(mirror.cached(1)) == [10]
+
+    mirror.set_live(False)
+    mirror.set_live(True)
+    assert mirror.cached(1) is None
+
+
+def test_cached_expires_after_resync_interval() -> None:
+    mirror = OrderMirror(_order_keys, resync_s=0.0)
+    mirror.set_live(True)
+    mirror.reset(1, [])
+    assert mirror.cached(1) is None
+
+
+class _Clock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_stream_without_heartbeat_goes_stale(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(order_mirror.time, "monotonic", clock)
+    mirror = OrderMirror(_order_keys, stale_s=10.0)
+    mirror.set_live(True)
+    mirror.reset(1, [_order(10, 100)])
+    clock.now += 8
+    mirror.heartbeat()
+    clock.now += 8
+    assert _ids(mirror.cached(1)) == [10]
+
+    # 超时没有任何推送：按断线处理，恢复后仍需 REST 重新校准
+    clock.now += 10
+    assert mirror.cached(1) is None
+    assert not mirror.live
+    mirror.heartbeat(clock.now - 20)
+    assert not mirror.live
+    mirror.heartbeat()
+    assert mirror.cached(1) is None
+    mirror.reset(1, [])
+    assert mirror.cached(1) == []
+
+
+class _FakeParadexWs:
+    last_message_at = None
+
+
+def test_paradex_order_mirror_uses_shared_connection_heartbeat(monkeypatch) -> None:
+    clock = _Clock()
+    monkeypatch.setattr(order_mirror.time, "monotonic", clock)
+    trader = object.__new__(ParadexTrader)
+    trader._market_ws = _FakeParadexWs()
+    trader._orders = OrderMirror(paradex_order_keys, stale_s=ORDER_STREAM_STALE_S)
+    trader._orders_stream_started = True
+    trader._orders.set_live(True)
+    trader._orders.reset("ETH-USD-PERP", [])
+
+    # BBO 消息仍在到达：订单推送安静也保持在线
+    clock.now += ORDER_STREAM_STALE_S + 1
+    trader._market_ws.last_message_at = clock.now - 1
+    assert trader.cached_orders("ETH-USD-PERP") == []
+    # 整条连接静默：回退 REST
+    clock.now += ORDER_STREAM_STALE_S
+    assert trader.cached_orders("ETH-USD-PERP") is None
+
+
+def test_stream_updates_and_closed_tombstones() -> None:
+    mirror = OrderMirror(_order_keys)
+    mirror.set_live(True)
+    started = time.monotonic()
+    mirror.reset(1, [_order(10, 100)])
+    mirror.apply(1, _order(11, 101), True)
+    mirror.apply(1, _order(10, 100, "filled"), False)
+    assert _ids(mirror.cached(1)) == [11]
+
+    # 请求发起早于成交推送的 REST 结果不会复活已关闭订单，也不会丢掉请求期间的新单
+    mirror.apply(1, _order(12, 102), True)
+    mirror.reset(1, [_order(10, 100), _order(11, 101)], fetched_at=started)
+    assert _ids(mirror.cached(1)) == [11, 12]
+
+
+def test_pending_orders_until_confirmed() -> None:
+    mirror = OrderMirror(_order_keys)
+    mirror.set_live(True)
+    mirror.reset(1, [])
+    req = LimitOrderRequest(client_order_index=200, base_amount=5, price=199900, is_ask=True)
+    mirror.track_created(1, [req], [OrderResult(key=200, ok=True)])
+    cached = mirror.cached(1)
+    assert len(cached) == 1 and cached[0]["pending"] and cached[0]["base_price"] == 199900
+
+    mirror.apply(1, _order(20, 200), True)
+    assert _ids(mirror.cached(1)) == [20]
+
+    mirror.track_canceled(1, [OrderResult(key=20, ok=True)])
+    assert mirror.cached(1) == []
+
+
+def test_lighter_account_orders_message_feeds_mirror() -> None:
+    trader = object.__new__(LighterTrader)
+    trader._orders = OrderMirror(_order_keys)
+    trader._orders_channel = "account_all_orders/7"
+    trader._on_order_message(
+        {"type": "subscribed/account_all_orders", "channel": "account_all_orders:7", "orders": {}}
+    )
+    assert trader._orders.live
+    trader._orders.reset(1, [])
+    trader._on_order_message(
+        {
+            "type": "update/account_all_orders",
+            "channel": "account_all_orders:7",
+            "orders": {"1": [_order(30, 300), _order(31, 301, "canceled-post-only")]},
+        }
+    )
+    trader._on_order_message(
+        {"type": "update/account_all_orders", "channel": "account_all_orders:8", "orders": {"1": [_order(40, 400)]}}
+    )
+    assert _ids(trader.cached_orders(1)) == [30]
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+from app.exchanges.paradex.trader import ParadexTrader
+from app.exchanges.rate_limit import TokenBucket
+
+
+def _make_trader() -> ParadexTrader:
+    trader = object.__new__(ParadexTrader)
+    trader._limiter = TokenBucket(rate_per_s=1000.0, burst=1000.0)
+    return trader
+
+
+def test_call_runs_off_event_loop_thread() -> None:
+    trader = _make_trader()
+
+    async def _run() -> tuple[str, str]:
+        loop_thread = threading.current_thread().name
+        worker = await trader.call(lambda: threading.current_thread().name)
+        return loop_thread, worker
+
+    loop_thread, worker = asyncio.run(_run())
+    assert worker != loop_thread
+    assert worker.startswith("paradex-io")
+
+
+def test_call_keeps_loop_responsive_and_times_out() -> None:
+    trader = _make_trader()
+
+    async def _run() -> int:
+        ticks = 0
+
+        async def _ticker() -> None:
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(_ticker())
+        with pytest.raises(asyncio.TimeoutError):
+            await trader.call(time.sleep, 0.3, timeout_s=0.1)
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(_run()) >= 3
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 
 from app.exchanges.paradex.trader import ParadexTrader
+from app.exchanges.rate_limit import TokenBucket
 
 
 class _FakeMarketWs:
@@ -31,6 +32,7 @@ def _make_trader(ws_result=None, ws_exc: Exception | None = None):
     trader = object.__new__(ParadexTrader)
     trader._market_ws = _FakeMarketWs(result=ws_result, exc=ws_exc)
     trader._api = _FakeApi()
+    trader._limiter = TokenBucket(rate_per_s=1000.0, burst=1000.0)
     return trader
 
 
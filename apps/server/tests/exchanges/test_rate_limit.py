@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.exchanges.rate_limit import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_QUERY,
+    PRIORITY_TRADE,
+    TokenBucket,
+    current_priority,
+    is_rate_limited_error,
+    is_rate_limited_text,
+    rate_limiter,
+    rate_priority,
+)
+
+
+def test_burst_then_paced_by_rate() -> None:
+    async def _run() -> float:
+        bucket = TokenBucket(rate_per_s=50.0, burst=2.0)
+        started = time.monotonic()
+        for _ in range(4):
+            await bucket.acquire()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(_run())
+    assert 0.03 <= elapsed < 0.5
+
+
+def test_waiters_released_by_priority() -> None:
+    async def _run() -> list[str]:
+        bucket = TokenBucket(rate_per_s=20.0, burst=1.0)
+        await bucket.acquire()
+        order: list[str] = []
+
+        async def _take(name: str, priority: int) -> None:
+            await bucket.acquire(priority=priority)
+            order.append(name)
+
+        tasks = [
+            asyncio.create_task(_take("status", PRIORITY_BACKGROUND)),
+            asyncio.create_task(_take("reconcile", PRIORITY_QUERY)),
+            asyncio.create_task(_take("cancel", PRIORITY_TRADE)),
+        ]
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(_run()) == ["cancel", "reconcile", "status"]
+
+
+def test_backoff_pauses_all_callers() -> None:
+    async def _run() -> float:
+        bucket = TokenBucket(rate_per_s=1000.0, burst=10.0)
+        bucket.backoff(0.1)
+        started = time.monotonic()
+        await bucket.acquire(priority=PRIORITY_TRADE)
+        return time.monotonic() - started
+
+    assert asyncio.run(_run()) >= 0.09
+
+
+def test_priority_context_and_shared_registry() -> None:
+    assert current_priority() == PRIORITY_QUERY
+    with rate_priority(PRIORITY_BACKGROUND):
+        assert current_priority() == PRIORITY_BACKGROUND
+    assert current_priority() == PRIORITY_QUERY
+    assert rate_limiter("lighter", 7) is rate_limiter("Lighter", "7")
+    assert rate_limiter("lighter", 7) is not rate_limiter("lighter", 8)
+
+
+def test_rate_limit_matcher_covers_all_exchanges() -> None:
+    assert is_rate_limited_error(RuntimeError("(429)\nReason: Too Many Requests"))
+    assert is_rate_limited_text("HTTP 429")
+    assert is_rate_limited_text("too many request, slow down")
+    assert is_rate_limited_text('{"code": 23000, "message": "Rate limit exceeded"}')
+    assert not is_rate_limited_text("order 14290 not found")
+    assert not is_rate_limited_text("invalid param code=20001")
@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+import pytest
+
+import app.exchanges.lighter.market_ws as lighter_market_ws
+from app.core.metrics import PERSIST_ERRORS
+from app.exchanges.lighter.market_ws import LighterMarketData
+from app.exchanges.tape import (
+    KIND_DEPTH,
+    KIND_FILL,
+    KIND_QUOTE,
+    TapeRecorder,
+    encode_record,
+    read_tape,
+    tape_files,
+)
+
+DAY_MS = 86_400_000
+
+
+def test_records_round_trip_and_rotate_daily(tmp_path) -> None:
+    tape = TapeRecorder()
+    tape.configure(tmp_path, {"tape_enabled": True, "tape_depth": 2})
+    base = 1_700_000_000_000
+    tape._append("paradex", "BTC-USD-PERP", KIND_QUOTE, base, (Decimal("65000.5"), Decimal("65001")))
+    tape._append("paradex", "BTC-USD-PERP", KIND_QUOTE, base + 1, (None, Decimal("0.000012345")))
+    tape._append("paradex", "BTC-USD-PERP", KIND_QUOTE, base + DAY_MS, (Decimal("-1.5"), Decimal("1E+3")))
+    tape.fill("sim", "ETH", "ask", Decimal("2000.10"), Decimal("0.25"), ts_ms=base)
+    tape.book("lighter", 1, [(Decimal("10"), Decimal("1"))], [(Decimal("11"), Decimal("2")), (Decimal("12"), Decimal("3"))])
+    asyncio.run(tape.close())
+
+    files = tape_files(tmp_path, "paradex", "BTC-USD-PERP")
+    assert len(files) == 2 and files[0].name < files[1].name
+    first = list(read_tape(files[0]))
+    assert [(r.kind, r.ts_ms, r.bid, r.ask) for r in first] == [
+        (KIND_QUOTE, base, Decimal("65000.5"), Decimal("65001")),
+        (KIND_QUOTE, base + 1, None, Decimal("0.000012345")),
+    ]
+    assert [(r.bid, r.ask) for r in read_tape(files[1])] == [(Decimal("-1.5"), Decimal("1000"))]
+
+    (fill,) = read_tape(tape_files(tmp_path, "sim", "ETH")[0])
+    assert (fill.kind, fill.side, fill.price, fill.size) == (KIND_FILL, "ask", Decimal("2000.10"), Decimal("0.25"))
+    (book,) = read_tape(tape_files(tmp_path, "lighter", 1)[0])
+    assert book.kind == KIND_DEPTH
+    assert book.bids == ((Decimal("10"), Decimal("1")),)
+    assert book.asks == ((Decimal("11"), Decimal("2")), (Decimal("12"), Decimal("3")))
+
+
+def test_appends_across_restarts_and_ignores_torn_tail(tmp_path) -> None:
+    for price in ("1", "2"):
+        tape = TapeRecorder()
+        tape.configure(tmp_path, {"tape_enabled": True})
+        tape._append("grvt", "BTC_USDT_Perp", KIND_QUOTE, 0, (Decimal(price), None))
+        asyncio.run(tape.close())
+    (path,) = tape_files(tmp_path, "grvt", "BTC_USDT_Perp")
+    with open(path, "ab") as handle:
+        handle.write(encode_record(KIND_QUOTE, 1, (Decimal("3"), None))[:-3])
+    assert [r.bid for r in read_tape(path)] == [Decimal("1"), Decimal("2")]
+
+
+def test_disabled_and_full_buffer_do_not_record(tmp_path) -> None:
+    tape = TapeRecorder(max_buffer=2)
+    tape.configure(tmp_path, {})
+    tape.quote("paradex", "ETH-USD-PERP", Decimal("1"), Decimal("2"))
+    assert tape._buffer == []
+
+    tape.configure(tmp_path, {"tape_enabled": True})
+    tape.book("lighter", 1, [], [])
+    for _ in range(3):
+        tape.quote("paradex", "ETH-USD-PERP", Decimal("1"), Decimal("2"))
+    assert len(tape._buffer) == 2 and tape.dropped == 1
+
+
+def test_lighter_callback_records_quote_changes_and_depth(tmp_path, monkeypatch) -> None:
+    tape = TapeRecorder()
+    tape.configure(tmp_path, {"tape_enabled": True, "tape_depth": 1})
+    monkeypatch.setattr(lighter_market_ws, "TAPE", tape)
+    data = LighterMarketData("mainnet")
+    book = {
+        "bids": [{"price": "100.0", "size": "1"}, {"price": "99.5", "size": "2"}],
+        "asks": [{"price": "100.5", "size": "1"}, {"price": "101", "size": "4"}],
+    }
+    data._on_message({"type": "subscribed/order_book", "channel": "order_book:1", "order_book": book})
+    data._on_message(
+        {"type": "update/order_book", "channel": "order_book:1", "order_book": {"asks": [{"price": "101", "size": "5"}]}}
+    )
+    # 没有档位变化的推送不记录深度
+    data._on_message({"type": "update/order_book", "channel": "order_book:1", "order_book": {}})
+    asyncio.run(tape.close())
+
+    records = list(read_tape(tape_files(tmp_path, "lighter", 1)[0]))
+    assert [r.kind for r in records] == [KIND_QUOTE, KIND_DEPTH, KIND_DEPTH]
+    assert (records[1].bids, records[1].asks) == (((Decimal("100.0"), Decimal("1")),), ((Decimal("100.5"), Decimal("1")),))
+
+
+def test_write_failures_are_counted(tmp_path, monkeypatch) -> None:
+    tape = TapeRecorder()
+    tape.configure(tmp_path, {"tape_enabled": True})
+
+    def broken(batch) -> None:
+        raise OSError("disk full")
+
+    monkeypatch.setattr(tape, "_write", broken)
+    before = PERSIST_ERRORS.value("tape", "dropped")
+    for _ in range(3):
+        tape.quote("paradex", "ETH-USD-PERP", Decimal("1"), Decimal("2"))
+    with pytest.raises(OSError):
+        asyncio.run(tape.flush())
+    assert tape.write_errors == 3 and not tape._buffer
+    assert PERSIST_ERRORS.value("tape", "dropped") == before + 3
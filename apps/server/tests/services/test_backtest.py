@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.exchanges.types import MarketMeta
+from app.services.backtest import BacktestParams, MarketSeries, run_backtest, sweep
+from app.services.replay import Quote, run_replay
+
+META = MarketMeta(1, "BTC", 4, 1, Decimal("0.0001"), Decimal("1"))
+
+
+def _quotes(n: int, seed: int = 3) -> list[Quote]:
+    # 默认 500ms 一轮：每轮正好对应一条行情
+    rng = random.Random(seed)
+    mid = 10000
+    quotes: list[Quote] = []
+    for i in range(n):
+        mid += rng.choice((-3, -1, 0, 0, 1, 3))
+        quotes.append(Quote(1_000_000 + i * 500, Decimal(mid).scaleb(-1), Decimal(mid + 1).scaleb(-1)))
+    return quotes
+
+
+@pytest.mark.parametrize(
+    "strategy",
+    [
+        {"grid_step": "0.5", "levels_up": 5, "levels_down": 5, "order_size_mode": "base", "order_size_value": "0.01"},
+        {
+            "grid_step": "0.5",
+            "levels_up": 5,
+            "levels_down": 4,
+            "order_size_mode": "notional",
+            "order_size_value": "20",
+            "max_position_notional": "60",
+            "reduce_order_size_multiplier": "2",
+            "max_open_orders": 7,
+        },
+        {
+            "grid_mode": "as",
+            "order_size_mode": "base",
+            "order_size_value": "0.01",
+            "as_gamma": "2",
+            "as_k": "1000",
+            "as_vol_points": 10,
+        },
+    ],
+)
+def test_backtest_matches_replay(tmp_path, strategy) -> None:
+    quotes = _quotes(1500)
+    replay = asyncio.run(run_replay(quotes, META, strategy, tmp_path))
+    # 回放首轮在第一条行情之前，策略实际看到的是 quotes[1:]
+    result = run_backtest(MarketSeries.from_quotes(quotes[1:], 1), BacktestParams.from_strategy(strategy), META)
+
+    assert replay.trades > 0
+    assert result.ticks == replay.ticks
+    assert result.trades == replay.trades
+    assert result.volume == pytest.approx(float(replay.volume))
+    assert result.position_base == pytest.approx(float(replay.position_base), abs=1e-9)
+    assert result.pnl == pytest.approx(float(replay.pnl), abs=1e-6)
+
+
+def test_dynamic_backtest_only_visits_grid_events() -> None:
+    series = MarketSeries.from_arrays([0, 1, 2, 3], [99.9, 99.9, 100.0, 100.4], [100.0, 100.0, 100.1, 100.5], 1)
+    params = BacktestParams(
+        grid_step=Decimal("1"), levels_up=2, levels_down=2, order_size_mode="base", order_size_value=Decimal("1")
+    )
+    result = run_backtest(series, params, META)
+    # 第 2 轮买一跨过 100 整档；第 1、3 轮中心/买一/卖一所在网格不变，被压缩掉
+    assert result.events == 2
+    assert result.trades == 0
+
+
+def test_sweep_and_validation() -> None:
+    series = MarketSeries.from_quotes(_quotes(300), 1)
+    base = {"levels_up": 3, "levels_down": 3, "order_size_mode": "base", "order_size_value": "0.01"}
+    grid = [BacktestParams.from_strategy({**base, "grid_step": step}) for step in ("0.3", "0.5", "1")]
+    results = sweep(series, grid, META)
+    assert [r.params.grid_step for r in results] == [Decimal("0.3"), Decimal("0.5"), Decimal("1")]
+    assert all(r.max_drawdown >= 0 for r in results)
+    with pytest.raises(ValueError):
+        run_backtest(series, BacktestParams.from_strategy({**base, "grid_step": "0.05"}), META)
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+from datetime import datetime, timedelta, timezone
+
+from app.services.history_store import read_history_jsonl, record_symbols, record_ts_ms
+
+BASE = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+
+def _record(idx: int, *symbols: str) -> dict:
+    return {
+        "created_at": (BASE + timedelta(minutes=idx)).isoformat(),
+        "reason": f"r{idx}",
+        "symbols": {sym: {"profit": str(idx)} for sym in symbols},
+    }
+
+
+def test_reads_legacy_file_skipping_bad_lines(tmp_path) -> None:
+    path = tmp_path / "runtime_history.jsonl"
+    lines = [json.dumps(_record(idx, "BTC")) for idx in range(4)]
+    path.write_text("\n".join(lines[:2]) + "\n\nnot json\n[1]\n" + "\n".join(lines[2:]) + "\n", encoding="utf-8")
+
+    assert [item["reason"] for item in read_history_jsonl(path)] == ["r0", "r1", "r2", "r3"]
+    # 只读不写：不会在旧文件旁生成任何附属文件
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["runtime_history.jsonl"]
+    assert read_history_jsonl(tmp_path / "missing.jsonl") == []
+
+
+def test_record_fields() -> None:
+    record = _record(1, "btc", "Eth")
+    assert record_ts_ms(record) == int((BASE + timedelta(minutes=1)).timestamp() * 1000)
+    assert record_ts_ms({"created_at": "2024-01-01T00:00:00Z"}) == int(BASE.timestamp() * 1000)
+    assert record_ts_ms({"created_at": "bad"}) == 0
+    assert record_symbols(record) == ("BTC", "ETH")
+    assert record_symbols({}) == ()
@@ -0,0 +1,94 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from decimal import Decimal
+
+from app.core import clock
+from app.core.clock import VirtualClock, reset_clock, use_clock
+from app.exchanges.tape import KIND_QUOTE, TapeRecorder, tape_files
+from app.exchanges.types import MarketMeta
+from app.services.replay import Quote, ReplayTrader, load_quotes, run_replay
+
+META = MarketMeta(1, "BTC", 4, 1, Decimal("0.0001"), Decimal("1"))
+STRATEGY = {"grid_step": "1", "levels_up": 5, "levels_down": 5, "order_size_mode": "base", "order_size_value": "0.01"}
+
+
+def _quotes(n: int) -> list[Quote]:
+    quotes: list[Quote] = []
+    mid = 1000
+    for i in range(n):
+        mid += (-2, 1, 1, 0)[i % 4] * (1 if (i // 40) % 2 == 0 else -1)
+        quotes.append(Quote(1_000_000 + i * 100, Decimal(mid) - Decimal("0.5"), Decimal(mid) + Decimal("0.5")))
+    return quotes
+
+
+def test_replay_is_deterministic_and_runs_on_virtual_time(tmp_path) -> None:
+    quotes = _quotes(3000)
+    first = asyncio.run(run_replay(quotes, META, STRATEGY, tmp_path / "a"))
+    second = asyncio.run(run_replay(quotes, META, STRATEGY, tmp_path / "b"))
+
+    assert first.trades > 0
+    assert (first.ticks, first.trades, first.volume, first.position_base, first.pnl) == (
+        second.ticks,
+        second.trades,
+        second.volume,
+        second.position_base,
+        second.pnl,
+    )
+    # 默认 500ms 一轮：300 秒行情约 600 轮，墙钟远小于虚拟时长
+    assert abs(first.ticks - 600) <= 2
+    assert first.virtual_s >= 299.9
+    assert first.wall_s < first.virtual_s
+
+
+def test_event_mode_ticks_on_every_quote(tmp_path) -> None:
+    quotes = _quotes(500)
+    runtime = {"tick_mode": "event", "tick_min_interval_ms": 0, "tick_debounce_ms": 0}
+    result = asyncio.run(run_replay(quotes, META, STRATEGY, tmp_path, runtime=runtime))
+    # 首轮尚未绑定市场，按默认 500ms 间隔等待，跳过前 5 条行情中的 4 条
+    assert result.ticks == len(quotes) - 4
+
+
+def test_virtual_clock_is_task_local() -> None:
+    async def _run() -> tuple[int, int]:
+        virtual = VirtualClock(5_000)
+        token = use_clock(virtual)
+        try:
+            await clock.sleep(2.5)
+            inner = await asyncio.create_task(asyncio.sleep(0, clock.now_ms()))
+        finally:
+            reset_clock(token)
+        return inner, clock.now_ms()
+
+    inner, outer = asyncio.run(_run())
+    assert inner == 7_500
+    assert abs(outer - time.time() * 1000) < 5_000
+
+
+def test_trader_follows_clock_and_waits_for_next_quote() -> None:
+    async def _run() -> list:
+        virtual = VirtualClock(0, end_ms=1_000)
+        quotes = [Quote(100, Decimal("1"), Decimal("2")), Quote(400, Decimal("3"), Decimal("4"))]
+        trader = ReplayTrader(quotes, META, virtual)
+        seen = [await trader.best_bid_ask(1), trader.book_version(1)]
+        seen.append(await trader.wait_book_update(1, 0, 10))
+        seen.append(virtual.now_ms)
+        seen.append(await trader.wait_book_update(1, 1, 0.1))
+        seen.append(virtual.now_ms)
+        seen.append(await trader.wait_book_update(1, 1, 10))
+        seen.append(await trader.best_bid_ask(1))
+        return seen
+
+    assert asyncio.run(_run()) == [(None, None), 0, 1, 100, 1, 200, 2, (Decimal("3"), Decimal("4"))]
+
+
+def test_load_quotes_from_tape(tmp_path) -> None:
+    tape = TapeRecorder()
+    tape.configure(tmp_path, {"tape_enabled": True})
+    quotes = _quotes(10)
+    for quote in quotes:
+        tape._append("lighter", 1, KIND_QUOTE, quote.ts_ms, (quote.bid, quote.ask))
+    tape.fill("sim", "BTC", "bid", Decimal("1"), Decimal("1"))
+    asyncio.run(tape.close())
+    assert load_quotes(tape_files(tmp_path, "lighter", 1)) == quotes
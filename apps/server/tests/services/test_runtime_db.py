@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import sqlite3
+from decimal import Decimal
+
+import pytest
+
+from app.core.logbus import LogBus
+from app.core.metrics import PERSIST_ERRORS
+from app.exchanges.types import FillRecord
+from app.services.runtime_db import RuntimeDB
+
+
+def _record(minute: int, *symbols: str) -> dict:
+    return {
+        "created_at": f"2024-01-01T00:{minute:02d}:00+00:00",
+        "exchange": "lighter",
+        "reason": f"r{minute}",
+        "symbols": {sym: {} for sym in symbols},
+    }
+
+
+def test_batched_writes_and_history_queries(tmp_path) -> None:
+    async def scenario() -> None:
+        db = RuntimeDB(tmp_path / "runtime.sqlite3", flush_interval_s=60)
+        for minute in range(5):
+            db.add_history(_record(minute, "BTC" if minute % 2 == 0 else "ETH"))
+        # 写入仍在队列中，读取前自动落盘
+        assert db._pending
+        items = await db.history(limit=2)
+        assert [item["reason"] for item in items] == ["r3", "r4"]
+        assert not db._pending
+
+        btc = await db.history(limit=0, symbol="btc")
+        assert [item["reason"] for item in btc] == ["r0", "r2", "r4"]
+        start = 1704067260000  # 00:01
+        end = 1704067380000  # 00:03
+        assert [item["reason"] for item in await db.history(limit=0, start_ms=start, end_ms=end)] == ["r1", "r2", "r3"]
+        await db.close()
+
+    asyncio.run(scenario())
+    conn = sqlite3.connect(str(tmp_path / "runtime.sqlite3"))
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+
+
+def test_fill_stats_dedupes_and_restores_cursor(tmp_path) -> None:
+    async def scenario() -> None:
+        db = RuntimeDB(tmp_path / "runtime.sqlite3")
+        fills = [
+            FillRecord(ts_ms=1000, key="a", notional=Decimal("10")),
+            FillRecord(ts_ms=2000, key="b", notional=Decimal("5.5")),
+            FillRecord(ts_ms=2000, key="c", notional=Decimal("4.5")),
+        ]
+        db.add_fills("lighter", "btc", fills)
+        db.add_fills("lighter", "BTC", fills[1:])
+        db.add_fills("paradex", "BTC", fills[:1])
+
+        volume, count, last_ts, keys = await db.fill_stats("lighter", "BTC", 0)
+        assert (volume, count, last_ts, sorted(keys)) == (Decimal("20.0"), 3, 2000, ["b", "c"])
+        assert (await db.fill_stats("lighter", "BTC", 1500))[:2] == (Decimal("10.0"), 2)
+        assert await db.fill_stats("grvt", "BTC", 0) == (Decimal(0), 0, 0, [])
+
+        # 成交额按 Decimal 精确累加，不经过浮点
+        db.add_fills("grvt", "ETH", [FillRecord(ts_ms=i, key=str(i), notional=Decimal("0.1")) for i in range(3)])
+        big = Decimal("1234567.123456789")
+        db.add_fills("grvt", "SOL", [FillRecord(ts_ms=i, key=str(i), notional=big) for i in range(7)])
+        assert (await db.fill_stats("grvt", "ETH", 0))[0] == Decimal("0.3")
+        assert (await db.fill_stats("grvt", "SOL", 0))[0] == big * 7
+        await db.close()
+
+    asyncio.run(scenario())
+
+
+def test_background_writer_and_ledgers(tmp_path) -> None:
+    async def scenario() -> None:
+        db = RuntimeDB(tmp_path / "runtime.sqlite3", flush_interval_s=0.01)
+        db.add_pnl("lighter", "ETH", 1000, Decimal("1.5"))
+        db.add_status("ETH", 1000, True, reason="manual", message="启动中")
+        db.add_status("ETH", 2000, False, reason="manual", message="stopped")
+        await asyncio.sleep(0.05)
+        assert not db._pending
+        assert await db.pnl_snapshots("ETH") == [(1000, Decimal("1.5"))]
+        transitions = await db.status_transitions("ETH")
+        assert [(item["ts_ms"], item["running"]) for item in transitions] == [(1000, True), (2000, False)]
+        await db.close()
+
+    asyncio.run(scenario())
+
+
+def test_imports_legacy_jsonl_once(tmp_path) -> None:
+    path = tmp_path / "runtime_history.jsonl"
+    path.write_text("".join(json.dumps(_record(m, sym)) + "\n" for m, sym in ((1, "BTC"), (2, "ETH"))), encoding="utf-8")
+    db = RuntimeDB(tmp_path / "runtime.sqlite3")
+    assert db.import_history_jsonl(path) == 2
+    assert db.import_history_jsonl(path) == 0
+
+    async def scenario() -> list[dict]:
+        items = await db.history(limit=0)
+        await db.close()
+        return items
+
+    assert [item["reason"] for item in asyncio.run(scenario())] == ["r1", "r2"]
+
+
+def test_failed_batches_are_retried_then_salvaged(tmp_path) -> None:
+    async def scenario() -> tuple[list, list]:
+        logbus = LogBus()
+        db = RuntimeDB(tmp_path / "runtime.sqlite3", logbus=logbus)
+        real_write = db._write_batch
+        calls = {"n": 0}
+
+        def flaky(batch):
+            calls["n"] += 1
+            # 前两次整批失败；之后逐条写入时只有 BAD 这一条失败
+            if calls["n"] <= 2 or any(params[0] == "BAD" for _, params in batch if isinstance(params, tuple)):
+                raise sqlite3.OperationalError("disk I/O error")
+            real_write(batch)
+
+        db._write_batch = flaky
+        db.add_status("btc", 1, True)
+        db.add_status("bad", 2, True)
+        db.add_status("eth", 3, False)
+        for _ in range(2):
+            with pytest.raises(sqlite3.OperationalError):
+                await db.flush()
+        await db.flush()
+        kept = await db.status_transitions("BTC") + await db.status_transitions("ETH")
+        await db.close()
+        return kept, logbus.recent()
+
+    retries = PERSIST_ERRORS.value("runtime_db", "retry")
+    dropped = PERSIST_ERRORS.value("runtime_db", "dropped")
+    kept, logs = asyncio.run(scenario())
+    assert [row["ts_ms"] for row in kept] == [1, 3]
+    assert PERSIST_ERRORS.value("runtime_db", "retry") == retries + 2
+    assert PERSIST_ERRORS.value("runtime_db", "dropped") == dropped + 1
+    assert sum("runtime_db.write.error" in line for line in logs) == 2
+    assert any("runtime_db.write.dropped" in line and "rows=1" in line for line in logs)
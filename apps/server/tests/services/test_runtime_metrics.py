@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+from app.core.config_store import ConfigStore
+from app.core.logbus import LogBus
+from app.exchanges.paradex.trader import ParadexTrader
+from app.services.bot_manager import BotManager, BotStatus
+from app.services.runtime_metrics import RuntimeMetricsService, RuntimeStatusCalculator
+
+
+def test_refresh_is_single_flight_and_reads_are_cached() -> None:
+    calls: list[str] = []
+
+    async def compute(name: str) -> dict:
+        calls.append(name)
+        await asyncio.sleep(0.01)
+        return {"exchange": name, "n": len(calls)}
+
+    async def scenario() -> None:
+        service = RuntimeMetricsService(compute, lambda: 60, lambda: [])
+        results = await asyncio.gather(*(service.refresh("lighter") for _ in range(5)))
+        assert calls == ["lighter"]
+        assert all(item == {"exchange": "lighter", "n": 1} for item in results)
+
+        # 读取只返回最新快照，不触发计算
+        for _ in range(10):
+            assert (await service.get("lighter"))["n"] == 1
+        assert len(calls) == 1
+
+        service.invalidate("lighter")
+        assert (await service.get("lighter"))["n"] == 2
+        await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_invalidate_discards_inflight_result() -> None:
+    calls: list[int] = []
+    gate = asyncio.Event()
+
+    async def compute(name: str) -> dict:
+        calls.append(len(calls) + 1)
+        n = len(calls)
+        if n == 1:
+            await gate.wait()
+        return {"n": n}
+
+    async def scenario() -> None:
+        service = RuntimeMetricsService(compute, lambda: 60, lambda: [])
+        stale = asyncio.create_task(service.refresh("lighter"))
+        await asyncio.sleep(0)
+        # 计算进行中发生启停：之后的读取要重新计算，旧结果不能写回
+        service.invalidate("lighter")
+        fresh = asyncio.create_task(service.get("lighter"))
+        await asyncio.sleep(0)
+        gate.set()
+        assert (await stale)["n"] == 1
+        assert (await fresh)["n"] == 2
+        assert service.latest("lighter") == {"n": 2}
+        await service.close()
+
+    asyncio.run(scenario())
+
+
+def test_background_loop_refreshes_active_exchanges() -> None:
+    calls: list[str] = []
+
+    async def compute(name: str) -> dict:
+        calls.append(name)
+        return {"exchange": name}
+
+    async def scenario() -> None:
+        service = RuntimeMetricsService(compute, lambda: 0.2, lambda: ["paradex"])
+        service.start()
+        await asyncio.sleep(0.3)
+        await service.close()
+
+    asyncio.run(scenario())
+    assert len(calls) >= 2 and set(calls) == {"paradex"}
+
+
+def test_history_reuses_shared_snapshot(tmp_path) -> None:
+    manager = BotManager(LogBus(), ConfigStore(tmp_path / "config.json"))
+    manager._status["ETH"] = BotStatus(symbol="ETH", running=True, started_at="2024-01-01T00:00:00+00:00")
+    requested: list[str] = []
+
+    async def provider(name: str) -> dict:
+        requested.append(name)
+        row = {"symbol": "ETH", "profit": "1.5000", "volume": "200.0000", "trade_count": 3, "atr": "9"}
+        return {"symbols": {"ETH": row}}
+
+    manager.set_runtime_metrics(provider)
+    trader = object.__new__(ParadexTrader)
+
+    async def scenario():
+        return await manager._build_history_record(trader, ["ETH"], "manual_stop", "")
+
+    record, recorded = asyncio.run(scenario())
+    assert requested == ["paradex"]
+    assert recorded == ["ETH"]
+    assert record["totals"]["profit"] == "1.5000"
+    assert record["symbols"]["ETH"]["trade_count"] == 3
+    assert "atr" not in record["symbols"]["ETH"]
+
+
+def test_calculator_keeps_baseline_and_last_good_values(tmp_path) -> None:
+    config = ConfigStore(tmp_path / "config.json")
+    cfg = config.read()
+    cfg["runtime"]["dry_run"] = False
+    cfg["strategies"] = {"ETH": {"exchange": "paradex", "market_id": "ETH-USD-PERP"}}
+    config.write(cfg)
+    manager = BotManager(LogBus(), config)
+    manager._status["ETH"] = BotStatus(symbol="ETH", running=True, started_at="2024-01-01T00:00:00+00:00", mid=2000)
+    trader = object.__new__(ParadexTrader)
+    pnl = {"value": Decimal("10")}
+    stats: list = [(Decimal("500"), 5), RuntimeError("429 Too Many Requests")]
+
+    async def load_trader(name: str):
+        return trader
+
+    async def positions(_trader) -> dict:
+        return {"ETH-USD-PERP": {"base": Decimal("0.5"), "pnl": pnl["value"]}}
+
+    async def trade_stats(*_args):
+        item = stats.pop(0)
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    manager.trade_stats = trade_stats
+    calculator = RuntimeStatusCalculator(manager, config, load_trader, positions)
+
+    async def scenario() -> tuple[dict, dict]:
+        first = await calculator("paradex")
+        pnl["value"] = Decimal("12.5")
+        return first, await calculator("paradex")
+
+    first, second = asyncio.run(scenario())
+    assert first["symbols"]["ETH"]["profit"] == "0.0000"
+    assert first["totals"]["position_notional"] == "1000.0000"
+    # 盈亏相对首次快照计算；成交统计限流时沿用上一次的值
+    assert second["symbols"]["ETH"]["profit"] == "2.5000"
+    assert (second["totals"]["volume"], second["totals"]["trade_count"]) == ("500.0000", 5)
+
+    calculator.track("ETH", "paradex", 0)
+    stats.append((Decimal(0), 0))
+    third = asyncio.run(calculator("paradex"))
+    assert third["symbols"]["ETH"]["profit"] == "0.0000"
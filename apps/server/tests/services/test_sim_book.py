@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+from decimal import Decimal
+
+from app.core.config_store import ConfigStore
+from app.core.logbus import LogBus
+from app.services.bot_manager import BotManager
+from app.services.sim_book import SimOrder, SimOrderBook
+
+
+def _order(idx: int, price: str, qty: str = "1", ask: bool = True, queue: str = "0") -> SimOrder:
+    return SimOrder(
+        order_index=idx,
+        client_order_index=idx,
+        price=Decimal(price),
+        base_qty=Decimal(qty),
+        is_ask=ask,
+        created_at_ms=0,
+        queue_ahead=Decimal(queue),
+    )
+
+
+def test_only_crossed_levels_fill() -> None:
+    book = SimOrderBook()
+    for i in range(1, 6):
+        book.add(_order(i, str(100 + i)))
+        book.add(_order(100 + i, str(100 - i), ask=False))
+
+    fills = book.match(Decimal("102.5"), Decimal("103"))
+    assert sorted(f.order.order_index for f in fills) == [1, 2]
+    assert all(f.done for f in fills)
+    assert len(book) == 8
+
+    # 卖一 97.5 只穿越 99、98 两档买单
+    fills = book.match(Decimal("97"), Decimal("97.5"))
+    assert sorted(f.order.order_index for f in fills) == [101, 102]
+    assert len(book) == 6
+
+
+def test_cancel_is_lazy_and_compacts() -> None:
+    book = SimOrderBook()
+    for i in range(200):
+        book.add(_order(i, str(1000 + i)))
+    for i in range(150):
+        assert book.pop(i) is not None
+    assert len(book) == 50
+    assert len(book._asks) < 200
+    fills = book.match(Decimal("1155"), Decimal("1156"))
+    assert [f.order.order_index for f in fills] == list(range(150, 156))
+
+
+def test_touch_size_and_queue_position() -> None:
+    book = SimOrderBook()
+    book.add(_order(1, "100", qty="2", queue="1.5"))
+    book.add(_order(2, "100", qty="1"))
+
+    # 最优价恰好在挂单价：每轮只成交 1，先消耗排队
+    assert book.match(Decimal("100"), Decimal("100.5"), Decimal("1")) == []
+    fills = book.match(Decimal("100"), Decimal("100.5"), Decimal("1"))
+    assert [(f.order.order_index, f.size, f.done) for f in fills] == [(1, Decimal("0.5"), False)]
+    assert book.get(1).queue_ahead == 0 and book.get(1).base_qty == Decimal("1.5")
+
+    fills = book.match(Decimal("100"), Decimal("100.5"), Decimal("3"))
+    assert [(f.order.order_index, f.size, f.done) for f in fills] == [(1, Decimal("1.5"), True), (2, Decimal("1"), True)]
+    assert len(book) == 0
+
+    # 价格穿越时全部成交，不受 touch_size 限制
+    book.add(_order(3, "100", qty="5", queue="10"))
+    fills = book.match(Decimal("100.1"), Decimal("100.2"), Decimal("1"))
+    assert [(f.size, f.done) for f in fills] == [(Decimal("5"), True)]
+
+
+def test_partial_fills_update_sim_position(tmp_path) -> None:
+    manager = BotManager(LogBus(), ConfigStore(tmp_path / "config.json"))
+    manager._sim_create_order("ETH", 1, 1, Decimal("2000"), Decimal("3"), False, 0)
+    manager._sim_match_orders("ETH", Decimal("1999"), Decimal("2000"), 1, touch_size=Decimal("1"))
+    assert manager.sim_position_base("ETH") == Decimal("1")
+    assert manager.sim_open_orders("ETH") == 1
+    manager._sim_match_orders("ETH", Decimal("1998"), Decimal("1999"), 2, touch_size=Decimal("1"))
+    assert manager.sim_position_base("ETH") == Decimal("3")
+    assert manager.sim_open_orders("ETH") == 0
+
+
+def test_sim_cancel_removes_order_from_book(tmp_path) -> None:
+    manager = BotManager(LogBus(), ConfigStore(tmp_path / "config.json"))
+    manager._sim_create_order("ETH", 1, 1, Decimal("2000"), Decimal("1"), False, 0)
+    manager._sim_create_order("ETH", 2, 2, Decimal("2010"), Decimal("1"), True, 0)
+    manager._sim_cancel_order("ETH", 1)
+    # 未知编号的撤单直接忽略
+    manager._sim_cancel_order("ETH", 99)
+    assert [o.order_index for o in manager.sim_orders("ETH")] == [2]
+    manager._sim_match_orders("ETH", Decimal("2011"), Decimal("2012"), 1)
+    assert manager.sim_position_base("ETH") == Decimal("-1")
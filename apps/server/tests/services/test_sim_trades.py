@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import random
+from decimal import Decimal
+
+from app.core.config_store import ConfigStore
+from app.core.logbus import LogBus
+from app.services.bot_manager import BotManager
+from app.services import sim_trades
+from app.services.sim_trades import SimTradeLog
+
+
+def _naive(trades: list[tuple[int, Decimal, Decimal]], start: int, end: int) -> tuple[Decimal, int]:
+    picked = [abs(p * s) for ts, p, s in trades if start <= ts <= end]
+    return sum(picked, Decimal(0)), len(picked)
+
+
+def test_range_stats_match_full_scan_across_spilled_blocks(tmp_path) -> None:
+    rng = random.Random(5)
+    log = SimTradeLog(cap=40, spill_path=tmp_path / "BTC.jsonl")
+    trades: list[tuple[int, Decimal, Decimal]] = []
+    ts = 1000
+    for _ in range(500):
+        ts += rng.choice((0, 0, 1, 3))
+        price = Decimal(rng.randint(9000, 11000)).scaleb(-1)
+        size = Decimal(rng.randint(1, 50)).scaleb(-3)
+        trades.append((ts, price, size))
+        log.append(ts, price, size, rng.choice(("ask", "bid")))
+
+    # 内存只保留不超过 cap 笔，其余在溢出文件中
+    assert len(log.recent()) <= 40
+    assert log.spilled + len(log.recent()) == len(log) == 500
+    assert log.volume == sum((abs(p * s) for _, p, s in trades), Decimal(0))
+    for _ in range(300):
+        start = rng.randint(990, ts + 5)
+        end = rng.randint(start - 5, ts + 10)
+        assert log.stats(start, end) == _naive(trades, start, end)
+
+    log.discard()
+    assert len(log) == 0
+    assert not (tmp_path / "BTC.jsonl").exists()
+
+
+def test_out_of_order_timestamps_are_clamped() -> None:
+    log = SimTradeLog()
+    log.append(2000, Decimal("10"), Decimal("1"), "bid")
+    log.append(1500, Decimal("10"), Decimal("2"), "ask")
+    assert [t.ts_ms for t in log.recent()] == [2000, 2000]
+    assert log.stats(1500, 1999) == (Decimal(0), 0)
+    assert log.stats(2000, 2000) == (Decimal("30"), 2)
+
+
+def test_bot_manager_uses_runtime_cap_and_resets_spill(tmp_path) -> None:
+    config = ConfigStore(tmp_path / "config.json")
+    config.update({"runtime": {"sim_trade_cap": 10}})
+    manager = BotManager(LogBus(), config)
+    for i in range(25):
+        manager._sim_apply_trade("eth", "bid" if i % 2 else "ask", Decimal("100"), Decimal("0.1"), 1000 + i)
+
+    assert manager.sim_trade_stats("ETH", 1000, 1024) == (Decimal("250.0"), 25)
+    assert manager.sim_trade_stats("ETH", 1003, 1004) == (Decimal("20.0"), 2)
+    spill = tmp_path / "sim_trades" / "ETH.jsonl"
+    assert spill.exists()
+    manager._sim_reset("eth")
+    assert not spill.exists()
+    assert manager.sim_trade_stats("ETH", 0, 10**13) == (Decimal(0), 0)
+
+
+def test_spill_blocks_are_bounded(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(sim_trades, "SPILL_BLOCK", 8)
+    log = SimTradeLog(cap=40, spill_path=tmp_path / "BTC.jsonl")
+    for i in range(200):
+        log.append(1000 + i, Decimal("100"), Decimal("0.1"), "bid")
+
+    # 每次只溢出一小块，单次同步写入/读回的行数有上限
+    assert len(log.recent()) <= 40
+    assert {block.count for block in log._blocks} == {8}
+    assert log.stats(1003, 1100) == (Decimal("980.0"), 98)
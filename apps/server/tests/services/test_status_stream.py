@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import asyncio
+import json
+
+from app.services.status_stream import _UNCHANGED, SSE_PING, StatusBroadcaster, merge_patch
+
+
+def _parse(frame: str) -> tuple[str, dict]:
+    lines = frame.strip().split("\n")
+    return lines[0][len("event: "):], json.loads(lines[1][len("data: "):])
+
+
+def test_merge_patch_reports_changes_and_deletions() -> None:
+    old = {"a": 1, "b": {"x": 1, "y": 2}, "c": [1, 2], "d": "keep"}
+    new = {"a": 1, "b": {"x": 3, "y": 2}, "c": [1, 2, 3], "e": True}
+    assert merge_patch(old, new) == {"b": {"x": 3}, "c": [1, 2, 3], "d": None, "e": True}
+    assert merge_patch(new, dict(new)) is _UNCHANGED
+
+
+def test_subscribers_share_one_computation() -> None:
+    calls: list[str] = []
+
+    async def compute(key: str) -> dict:
+        calls.append(key)
+        return {"exchange": key, "tick": len(calls), "bots": {"BTC": {"running": True}}}
+
+    async def scenario() -> None:
+        broadcaster = StatusBroadcaster(compute, lambda: 0.2)
+        first = broadcaster.stream("lighter")
+        second = broadcaster.stream("lighter")
+
+        event_a, body_a = _parse(await first.__anext__())
+        event_b, body_b = _parse(await second.__anext__())
+        assert (event_a, event_b) == ("snapshot", "snapshot")
+        assert body_a == body_b
+        assert broadcaster.subscriber_count("lighter") == 2
+
+        event, body = _parse(await first.__anext__())
+        assert event == "diff"
+        assert body == {"tick": body_a["tick"] + 1}
+        # 两个订阅者共享同一次计算
+        assert len(calls) == body["tick"]
+
+        await first.aclose()
+        await second.aclose()
+        assert broadcaster.subscriber_count("lighter") == 0
+        await broadcaster.close()
+
+    asyncio.run(scenario())
+
+
+def test_idle_stream_sends_keepalive_comments() -> None:
+    async def compute(key: str) -> dict:
+        return {"exchange": key}
+
+    async def scenario() -> list[str]:
+        broadcaster = StatusBroadcaster(compute, lambda: 0.2, keepalive_s=0.05)
+        stream = broadcaster.stream("grvt")
+        frames = [await stream.__anext__() for _ in range(3)]
+        await stream.aclose()
+        await broadcaster.close()
+        return frames
+
+    frames = asyncio.run(scenario())
+    assert _parse(frames[0])[0] == "snapshot"
+    # 状态不变时只有保活注释，不重发快照
+    assert frames[1:] == [SSE_PING, SSE_PING]
@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+import csv
+import random
+from decimal import Decimal
+
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.exchanges.types import MarketMeta
+from app.services.backtest import BacktestParams, MarketSeries, run_backtest
+from app.services.sweep import SweepJob, publish_series, result_digest, run_sweep
+
+META = MarketMeta(1, "BTC", 4, 1, Decimal("0.0001"), Decimal("1"))
+
+
+def _series(n: int, seed: int) -> MarketSeries:
+    rng = random.Random(seed)
+    mid = 10000
+    ts, bids, asks = [], [], []
+    for i in range(n):
+        mid += rng.choice((-3, -1, 0, 0, 1, 3))
+        ts.append(i * 500)
+        bids.append(mid)
+        asks.append(mid + 1)
+    return MarketSeries.from_arrays(ts, [b / 10 for b in bids], [a / 10 for a in asks], 1)
+
+
+def _grid(steps: list[str]) -> list[BacktestParams]:
+    return [
+        BacktestParams.from_strategy(
+            {"grid_step": step, "levels_up": 3, "levels_down": 3, "order_size_mode": "base", "order_size_value": "0.01"}
+        )
+        for step in steps
+    ]
+
+
+def test_sweep_runs_in_processes_and_reuses_cache(tmp_path) -> None:
+    jobs = [
+        SweepJob("btc", _series(2000, 1), META, _grid(["0.3", "0.5", "1", "0.5"])),
+        SweepJob("eth", _series(2000, 2), META, _grid(["0.5", "2"])),
+    ]
+    report = tmp_path / "report.csv"
+    first = run_sweep(jobs, tmp_path, workers=2, report_path=report)
+
+    # 重复的参数组只算一次；结果与直接回测一致，并按收益排名
+    assert len(first) == 5
+    assert not any(row.cached for row in first)
+    assert [row.result.pnl for row in first] == sorted((row.result.pnl for row in first), reverse=True)
+    for row in first:
+        job = jobs[0] if row.symbol == "BTC" else jobs[1]
+        assert row.result == run_backtest(job.series, row.result.params, META)
+
+    jobs.append(SweepJob("btc", _series(2000, 1), META, _grid(["0.3", "0.2"])))
+    second = run_sweep(jobs, tmp_path, workers=1)
+    assert sum(not row.cached for row in second) == 1
+    cached = {(row.symbol, row.digest): row.result for row in second if row.cached}
+    assert all(cached[(row.symbol, row.digest)] == row.result for row in first)
+
+    with report.open(encoding="utf-8") as fp:
+        lines = list(csv.DictReader(fp))
+    assert [line["rank"] for line in lines] == ["1", "2", "3", "4", "5"]
+    assert lines[0]["digest"] == first[0].digest
+
+
+def test_publish_series_is_content_addressed(tmp_path) -> None:
+    first = publish_series(_series(100, 1), tmp_path)
+    second = publish_series(_series(100, 1), tmp_path)
+    other = publish_series(_series(100, 2), tmp_path)
+    assert first == second
+    assert other[0] != first[0]
+    assert sorted(p.name for p in (tmp_path / "series").iterdir()) == sorted({first[1].name, other[1].name})
+
+
+def test_digest_ignores_decimal_spelling() -> None:
+    same = result_digest("tape", META, BacktestParams(grid_step=Decimal("1"), order_size_value=Decimal("20")))
+    spelled = result_digest("tape", META, BacktestParams(grid_step=Decimal("1.0"), order_size_value=Decimal("2E+1")))
+    other = result_digest("tape", META, BacktestParams(grid_step=Decimal("1.5"), order_size_value=Decimal("20")))
+    assert same == spelled
+    assert other != same
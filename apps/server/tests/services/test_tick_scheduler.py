@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+from app.exchanges.book_events import BookUpdateNotifier
+from app.services.tick_scheduler import TickScheduler, TickSchedulerConfig
+
+
+class _FakeTrader:
+    def __init__(self) -> None:
+        self.updates = BookUpdateNotifier()
+
+    def book_version(self, market_id) -> int:
+        return self.updates.version(market_id)
+
+    async def wait_book_update(self, market_id, version: int, timeout_s: float) -> int:
+        return await self.updates.wait(market_id, version, timeout_s)
+
+
+def test_config_from_runtime_defaults_and_clamp() -> None:
+    cfg = TickSchedulerConfig.from_runtime({})
+    assert cfg.mode == "interval"
+    assert cfg.max_interval_ms == 1000
+
+    cfg = TickSchedulerConfig.from_runtime(
+        {"tick_mode": "EVENT", "tick_min_interval_ms": 500, "tick_max_interval_ms": 200}
+    )
+    assert cfg.mode == "event"
+    assert cfg.min_interval_ms == 200
+    assert cfg.max_interval_ms == 200
+
+
+def test_event_mode_wakes_on_book_change() -> None:
+    async def _run() -> tuple[str, float]:
+        trader = _FakeTrader()
+        scheduler = TickScheduler(
+            TickSchedulerConfig(mode="event", min_interval_ms=0, max_interval_ms=5000, debounce_ms=0)
+        )
+        scheduler.bind(1)
+        loop = asyncio.get_running_loop()
+        loop.call_later(0.05, trader.updates.notify, 1)
+        started = time.monotonic()
+        reason = await scheduler.wait(trader)
+        return reason, time.monotonic() - started
+
+    reason, elapsed = asyncio.run(_run())
+    assert reason == "book"
+    assert elapsed < 1.0
+
+
+def test_event_mode_heartbeat_without_updates() -> None:
+    async def _run() -> str:
+        trader = _FakeTrader()
+        scheduler = TickScheduler(
+            TickSchedulerConfig(mode="event", min_interval_ms=0, max_interval_ms=50, debounce_ms=0)
+        )
+        scheduler.bind(1)
+        return await scheduler.wait(trader)
+
+    assert asyncio.run(_run()) == "heartbeat"
+
+
+def test_event_mode_falls_back_without_market() -> None:
+    async def _run() -> str:
+        scheduler = TickScheduler(TickSchedulerConfig(mode="event"))
+        return await scheduler.wait(_FakeTrader())
+
+    assert asyncio.run(_run()) == "interval"
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import asyncio
+from decimal import Decimal
+
+from app.core.config_store import ConfigStore
+from app.core.logbus import LogBus
+from app.exchanges.paradex.trader import ParadexTrader
+from app.exchanges.rate_limit import TokenBucket
+from app.exchanges.types import FillRecord
+from app.services.bot_manager import BotManager, TradeVolumeState, _apply_fills
+
+
+def test_apply_fills_dedupes_same_millisecond() -> None:
+    state = TradeVolumeState(start_ms=1000, last_ts_ms=1000)
+    _apply_fills(state, [FillRecord(1000, "a", Decimal("10")), FillRecord(1500, "b", Decimal("5"))])
+    assert (state.volume, state.count) == (Decimal("15"), 2)
+
+    # 同一毫秒边界上的成交会被再次返回，只计入新 key
+    _apply_fills(state, [FillRecord(1500, "b", Decimal("5")), FillRecord(1500, "c", Decimal("2"))])
+    assert (state.volume, state.count) == (Decimal("17"), 3)
+    assert state.last_ts_ms == 1500
+    assert state.last_keys == {"b", "c"}
+
+
+class _FakeParadexApi:
+    def __init__(self) -> None:
+        self.fills: list[dict] = []
+        self.starts: list[int] = []
+
+    def fetch_fills(self, params):
+        self.starts.append(params["start_at"])
+        items = [f for f in self.fills if params["start_at"] <= f["created_at"] <= params["end_at"]]
+        return {"results": items}
+
+
+def test_trade_stats_only_pulls_new_fills(tmp_path) -> None:
+    start = 1_700_000_000_000
+    manager = BotManager(LogBus(), ConfigStore(tmp_path / "config.json"))
+    manager._start_ms["ETH"] = start
+    trader = object.__new__(ParadexTrader)
+    trader._api = _FakeParadexApi()
+    trader._limiter = TokenBucket(rate_per_s=1000.0, burst=1000.0)
+    trader._api.fills = [
+        {"id": str(i), "created_at": start + i, "price": "2000", "size": "0.01"} for i in range(600)
+    ]
+
+    async def _run():
+        first = await manager.trade_stats(trader, "ETH", "ETH-USD-PERP", start, start + 5000)
+        trader._api.fills.append({"id": "new", "created_at": start + 599, "price": "1000", "size": "1"})
+        second = await manager.trade_stats(trader, "ETH", "ETH-USD-PERP", start, start + 5000)
+        return first, second
+
+    first, second = asyncio.run(_run())
+    assert first == (Decimal("12000.00"), 600)
+    assert second == (Decimal("13000.00"), 601)
+    assert trader._api.starts == [start, start + 599]
+
+
+def test_trade_stats_restores_from_local_db(tmp_path) -> None:
+    start = 1_700_000_000_000
+    config = ConfigStore(tmp_path / "config.json")
+    trader = object.__new__(ParadexTrader)
+    trader._api = _FakeParadexApi()
+    trader._limiter = TokenBucket(rate_per_s=1000.0, burst=1000.0)
+    trader._api.fills = [
+        {"id": str(i), "created_at": start + i, "price": "2000", "size": "0.01"} for i in range(10)
+    ]
+
+    async def _fresh_process():
+        manager = BotManager(LogBus(), config)
+        manager._start_ms["ETH"] = start
+        stats = await manager.trade_stats(trader, "ETH", "ETH-USD-PERP", start, start + 5000)
+        await manager.close()
+        return stats
+
+    assert asyncio.run(_fresh_process()) == (Decimal("200.00"), 10)
+    trader._api.fills.append({"id": "new", "created_at": start + 20, "price": "1000", "size": "1"})
+    volume, count = asyncio.run(_fresh_process())
+    assert (volume, count) == (Decimal("1200.00"), 11)
+    # 重启后从库中恢复游标，只补拉最新成交之后的部分
+    assert trader._api.starts == [start, start + 9]
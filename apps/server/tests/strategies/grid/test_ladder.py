@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import random
+from decimal import Decimal
+
+from app.strategies.grid.ladder import LadderCache, OrderIndex
+from app.strategies.grid.ticks import build_ladder
+
+
+def _assert_same(cache_ladder, fresh) -> None:
+    assert list(cache_ladder.asks) == list(fresh.asks)
+    assert list(cache_ladder.bids) == list(fresh.bids)
+    assert set(cache_ladder.ask_set) == set(fresh.asks)
+    assert set(cache_ladder.bid_set) == set(fresh.bids)
+    for ticks in list(fresh.asks) + list(fresh.bids):
+        assert cache_ladder.distance(ticks) == fresh.distance(ticks)
+
+
+def test_recentering_shifts_only_k_levels() -> None:
+    cache = LadderCache()
+    step = Decimal("0.50")
+    cache.update(Decimal("100.00"), step, 5, 5, 2)
+    assert cache.last_shift is None
+
+    ladder = cache.update(Decimal("100.00"), step, 5, 5, 2)
+    assert cache.last_shift == 0
+    ladder = cache.update(Decimal("101.00"), step, 5, 5, 2)
+    assert cache.last_shift == 2
+    assert list(ladder.asks) == [10150, 10200, 10250, 10300, 10350]
+    assert list(ladder.bids) == [10050, 10000, 9950, 9900, 9850]
+    assert ladder.ask_boundary == 10350 and ladder.bid_boundary == 9850
+
+    # 不是 step 整数倍、或参数变化时整体重建
+    cache.update(Decimal("101.20"), step, 5, 5, 2)
+    assert cache.last_shift is None
+    cache.update(Decimal("101.20"), step, 6, 5, 2)
+    assert cache.last_shift is None
+
+
+def test_random_walk_matches_full_rebuild() -> None:
+    rng = random.Random(3)
+    for decimals, step, up, down in [(2, Decimal("0.25"), 8, 3), (0, Decimal("3"), 0, 6), (1, Decimal("0.15"), 4, 4)]:
+        cache = LadderCache()
+        center = Decimal(500)
+        for _ in range(300):
+            center += step * rng.randint(-6, 6)
+            if rng.random() < 0.1:
+                center += Decimal(1).scaleb(-decimals)
+            _assert_same(cache.update(center, step, up, down, decimals), build_ladder(center, step, up, down, decimals))
+
+
+def test_near_zero_and_unaligned_fall_back_to_rebuild() -> None:
+    cache = LadderCache()
+    ladder = cache.update(Decimal("3"), Decimal("1"), 2, 5, 0)
+    assert list(ladder.bids) == [2, 1]
+    ladder = cache.update(Decimal("10"), Decimal("1"), 2, 5, 0)
+    assert list(ladder.bids) == [9, 8, 7, 6, 5]
+
+    ladder = cache.update(Decimal("10"), Decimal("0.3"), 3, 3, 0)
+    _assert_same(ladder, build_ladder(Decimal("10"), Decimal("0.3"), 3, 3, 0))
+
+
+def test_order_index_reuses_unchanged_orders() -> None:
+    calls: list[dict] = []
+
+    def parse(order: dict):
+        calls.append(order)
+        return order["price"] if order["price"] > 0 else None
+
+    index: OrderIndex[int] = OrderIndex()
+    a, b, c = {"price": 1}, {"price": 2}, {"price": 0}
+    assert index.parse([a, b, c], "k", parse) == [(a, 1), (b, 2)]
+    assert len(calls) == 3
+
+    d = {"price": 4}
+    assert index.parse([a, c, d], "k", parse) == [(a, 1), (d, 4)]
+    assert calls[3:] == [d]
+
+    index.parse([a], "other", parse)
+    assert calls[4:] == [a]
@@ -0,0 +1,37 @@
+from __future__ import annotations
+
+from app.strategies.grid.ids import MAX_LEVEL_PER_SIDE, GridLevelAllocator
+
+
+def test_allocate_lowest_free_level() -> None:
+    allocator = GridLevelAllocator()
+    allocator.sync("ask", {1, 2, 4})
+    assert allocator.allocate("ask") == 3
+    assert allocator.allocate("ask") == 5
+    assert allocator.allocate("bid") == 1
+
+
+def test_sync_releases_levels_no_longer_active() -> None:
+    allocator = GridLevelAllocator()
+    allocator.sync("bid", {1, 2, 3})
+    assert allocator.allocate("bid") == 4
+    allocator.sync("bid", {2, 4})
+    assert allocator.allocate("bid") == 1
+    assert allocator.allocate("bid") == 3
+
+
+def test_rotating_cursor_wraps_and_skips_used() -> None:
+    allocator = GridLevelAllocator(rotate=True, seed=MAX_LEVEL_PER_SIDE - 1)
+    allocator.sync("ask", {MAX_LEVEL_PER_SIDE, 1})
+    assert allocator.allocate("ask") == MAX_LEVEL_PER_SIDE - 1
+    assert allocator.allocate("ask") == 2
+    allocator.sync("ask", set())
+    assert allocator.allocate("ask") == 3
+
+
+def test_exhausted_side_returns_none() -> None:
+    allocator = GridLevelAllocator()
+    allocator.sync("ask", set(range(1, MAX_LEVEL_PER_SIDE + 1)))
+    assert allocator.allocate("ask") is None
+    allocator.release("ask", 7)
+    assert allocator.allocate("ask") == 7
@@ -4,6 +4,7 @@ from decimal import Decimal
 
 from app.strategies.grid.market_filter import (
     BAR_INTERVAL_MS,
+    IncrementalIndicators,
     MarketFilterConfig,
     MarketFilterRuntime,
     OhlcBar,
@@ -200,3 +201,36 @@ def test_evaluate_filter_timeout_stop_trigger() -> None:
     assert decision.close_only is True
     assert decision.block_seconds >= 60
     assert decision.timeout_stop is True
+
+
+def _mixed_bars(count: int) -> list[OhlcBar]:
+    bars = _trend_bars(count // 2)
+    tail = _sideways_bars(count - len(bars), start=bars[-1].close)
+    for i, bar in enumerate(tail):
+        bar.ts_ms = (len(bars) + i) * BAR_INTERVAL_MS
+    return bars + tail
+
+
+def test_incremental_indicators_match_batch_bar_by_bar() -> None:
+    bars = _mixed_bars(80)
+    indicators = IncrementalIndicators(atr_period=7, adx_period=9)
+    for n in range(1, len(bars) + 1):
+        window = bars[:n]
+        # 当前分钟尚未收线的 K 线不参与计算
+        now_ms = window[-1].ts_ms + BAR_INTERVAL_MS
+        assert indicators.update(window, now_ms) == n
+        assert indicators.atr_pct == calc_atr_pct(window, 7)
+        assert indicators.adx == calc_adx(window, 9)
+
+
+def test_incremental_indicators_skip_open_bar_and_reseed_on_trim() -> None:
+    bars = _mixed_bars(60)
+    indicators = IncrementalIndicators(atr_period=5, adx_period=5)
+    assert indicators.update(bars, bars[-1].ts_ms) == len(bars) - 1
+    assert indicators.adx == calc_adx(bars[:-1], 5)
+
+    trimmed = bars[10:]
+    now_ms = trimmed[-1].ts_ms + BAR_INTERVAL_MS
+    assert indicators.update(trimmed, now_ms) == len(trimmed)
+    assert indicators.atr_pct == calc_atr_pct(trimmed, 5)
+    assert indicators.adx == calc_adx(trimmed, 5)
@@ -0,0 +1,64 @@
+from __future__ import annotations
+
+import random
+from decimal import ROUND_DOWN, ROUND_HALF_UP, Decimal
+
+from app.strategies.grid.ticks import SizeRule, build_ladder, from_ticks, text_to_ticks
+
+
+def _q(value: Decimal, decimals: int, rounding) -> Decimal:
+    return value.quantize(Decimal(1).scaleb(-decimals), rounding=rounding)
+
+
+def _decimal_ladder(center: Decimal, step: Decimal, levels: int, decimals: int, sign: int) -> list[Decimal]:
+    result: list[Decimal] = []
+    for i in range(1, levels + 1):
+        p = _q(center + sign * step * i, decimals, ROUND_HALF_UP)
+        if p > 0 and p not in result:
+            result.append(p)
+    return result
+
+
+def test_ladder_matches_decimal_reference() -> None:
+    rng = random.Random(7)
+    for _ in range(300):
+        decimals = rng.randint(0, 6)
+        center = Decimal(rng.randint(1, 10**8)).scaleb(-rng.randint(0, 8))
+        step = Decimal(rng.randint(1, 10**6)).scaleb(-rng.randint(0, 9))
+        levels = rng.randint(0, 40)
+        ladder = build_ladder(center, step, levels, levels, decimals)
+        assert [from_ticks(t, decimals) for t in ladder.asks] == _decimal_ladder(center, step, levels, decimals, 1)
+        assert [from_ticks(t, decimals) for t in ladder.bids] == _decimal_ladder(center, step, levels, decimals, -1)
+        for ticks in ladder.asks + ladder.bids:
+            expected = abs(from_ticks(ticks, decimals) - center)
+            scale = Decimal(10) ** (ladder.unit_shift + decimals)
+            assert Decimal(ladder.distance(ticks)) / scale == expected
+
+
+def test_text_to_ticks_rounds_half_up() -> None:
+    assert text_to_ticks("123.456", 2) == 12346
+    assert text_to_ticks("123.454", 2) == 12345
+    assert text_to_ticks("-0.005", 2) == -1
+    assert text_to_ticks("7", 3) == 7000
+    assert text_to_ticks(".5", 0) == 1
+    assert text_to_ticks("1e2", 1) == 1000
+    assert text_to_ticks(Decimal("2.25"), 1) == 23
+
+
+def test_size_rule_matches_decimal_reference() -> None:
+    rng = random.Random(11)
+    for _ in range(300):
+        pd, sd = rng.randint(0, 6), rng.randint(0, 6)
+        mode = rng.choice(["base", "quote"])
+        value = Decimal(rng.randint(1, 10**6)).scaleb(-rng.randint(0, 6))
+        price_ticks = rng.randint(1, 10**9)
+        price = from_ticks(price_ticks, pd)
+        min_base = Decimal(rng.randint(0, 1000)).scaleb(-rng.randint(0, 8))
+        min_quote = Decimal(rng.randint(0, 1000)).scaleb(-rng.randint(0, 4))
+
+        rule = SizeRule.build(mode, value, pd, sd, min_base, min_quote)
+        size_ticks = rule.size_ticks(price_ticks)
+        qty = _q(value if mode == "base" else value / price, sd, ROUND_DOWN)
+        assert from_ticks(size_ticks, sd) == qty
+        assert rule.below_min_base(size_ticks) == (qty < min_base)
+        assert rule.below_min_quote(size_ticks, price_ticks) == (qty * price < min_quote)
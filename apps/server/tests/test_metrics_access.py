@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+
+import pytest
+from fastapi import HTTPException
+from starlette.requests import Request
+
+from app.core.config_store import ConfigStore
+from app.main import require_metrics_access
+
+
+def _request(tmp_path, token: str = "", headers: dict | None = None, cookie: str = "") -> Request:
+    config = ConfigStore(tmp_path / "config.json")
+    config.update({"server": {"metrics_token": token}})
+    app = SimpleNamespace(state=SimpleNamespace(config=config, sessions={"s1": {}}))
+    raw = [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()]
+    if cookie:
+        raw.append((b"cookie", f"grid_session={cookie}".encode()))
+    return Request({"type": "http", "headers": raw, "client": ("127.0.0.1", 5000), "app": app})
+
+
+def test_loopback_clients_still_need_auth(tmp_path) -> None:
+    with pytest.raises(HTTPException):
+        require_metrics_access(_request(tmp_path))
+    require_metrics_access(_request(tmp_path, cookie="s1"))
+
+
+def test_bearer_token_is_explicit_opt_in(tmp_path) -> None:
+    require_metrics_access(_request(tmp_path, token="abc", headers={"Authorization": "Bearer abc"}))
+    with pytest.raises(HTTPException):
+        require_metrics_access(_request(tmp_path, token="abc", headers={"Authorization": "Bearer abd"}))
+    # 未配置令牌时空令牌不能放行
+    with pytest.raises(HTTPException):
+        require_metrics_access(_request(tmp_path, headers={"Authorization": "Bearer "}))